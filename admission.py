@@ -0,0 +1,161 @@
+"""Admission control for /api/v1/assess.
+
+A sync handler used to go straight onto Starlette's thread pool, which
+queues without limit. Under a burst every assessment shared the CPU and the
+disk with every other, latency grew for all of them, and the proxy timed
+out requests that were still being computed, so the work was wasted.
+
+Here at most `max_concurrency` assessments compute at once, and at most
+`max_queue` more wait for a slot. Waiters are served cheapest first, by
+the predicted cost cost_model.py gives each parcel: a freed slot goes to the
+waiter with the lowest ``arrival + cost_weight × predicted_s``
+(cost_model.priority). Twenty-metre lots no longer queue behind a
+50-hectare parcel, and the parcel still gets its turn once it has waited
+``cost_weight`` times its own predicted run time. Equal costs, and
+``cost_weight`` 0, are first come first served.
+
+A request that finds the queue full is refused at once with 429 and a
+Retry-After estimate. Clients should back off, not pile on. A request whose
+client disconnected while it waited is dropped when its turn comes, before
+it costs a computation.
+
+The counters and the queue-wait and service-time summaries are served as
+JSON on /metrics.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from cost_model import priority
+
+# Recent samples kept for the percentiles on /metrics.
+_SAMPLES = 512
+
+
+class QueueFull(Exception):
+    """No slot and no room in the queue; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"assessment queue full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ClientGone(Exception):
+    """The client disconnected while its request was queued."""
+
+
+def _summary(samples) -> dict:
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "max": ordered[-1],
+    }
+
+
+class Admission:
+    """Bounded concurrency with a bounded, cost-ordered queue in front of it."""
+
+    def __init__(self, max_concurrency: int, max_queue: int, cost_weight: float = 0.0):
+        if max_concurrency < 1 or max_queue < 0 or cost_weight < 0:
+            raise ValueError("max_concurrency must be >= 1, max_queue and cost_weight >= 0")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.cost_weight = cost_weight
+        self.running = 0
+        # Heap of (arrival + cost_weight × cost, arrival sequence, future).
+        self._waiters: list[tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.admitted = self.rejected = self.shed = 0
+        self._queue_wait = deque(maxlen=_SAMPLES)
+        self._service = deque(maxlen=_SAMPLES)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Seconds until the queue has likely drained by one concurrency's worth."""
+        if not self._service:
+            return 1
+        mean = sum(self._service) / len(self._service)
+        waves = (self.queued + self.running) / self.max_concurrency
+        return max(1, math.ceil(mean * waves))
+
+    @asynccontextmanager
+    async def slot(self, is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+                   cost: float = 0.0):
+        """Hold one of the ``max_concurrency`` slots for the body of the block.
+
+        ``cost`` is the request's predicted compute seconds (cost_model.py);
+        it sets the request's place in the queue. Raises QueueFull at once
+        if the queue is full, and ClientGone if ``is_disconnected()`` says
+        the client left while it waited.
+        """
+        enqueued = time.perf_counter()
+        if self.running >= self.max_concurrency or self._waiters:
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                raise QueueFull(self.retry_after())
+            waiter = asyncio.get_running_loop().create_future()
+            entry = (priority(enqueued, cost, self.cost_weight), next(self._seq), waiter)
+            heapq.heappush(self._waiters, entry)
+            try:
+                await waiter  # resolved by _release, which hands us its slot
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()  # handed a slot just as we were cancelled
+                elif entry in self._waiters:
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                raise
+        else:
+            self.running += 1
+        self._queue_wait.append(time.perf_counter() - enqueued)
+
+        if is_disconnected is not None and await is_disconnected():
+            self.shed += 1
+            self._release()
+            raise ClientGone
+
+        self.admitted += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._service.append(time.perf_counter() - started)
+            self._release()
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next waiter, so a newcomer cannot
+        # take it first.
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    def metrics(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "cost_weight": self.cost_weight,
+            "running": self.running,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "shed": self.shed,
+            "queue_wait_s": _summary(self._queue_wait),
+            "service_s": _summary(self._service),
+        }
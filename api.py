@@ -1,17 +1,23 @@
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 from typing import Any, Optional, Union
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, ConfigDict, Field
-from shapely.geometry import shape
 
+from admission import Admission, ClientGone, QueueFull
+from coalesce import Coalescer, request_key
+from deadline import Deadline, DeadlineExceeded, earliest
+from fingerprint import assessment_etag, dem_identity
 from health import DemProbe
-from orchestrator import EILOrchestrator
 from settings import get_settings
-from smart_fetcher import SmartFetcher
+
+# The geoprocessing stack (orchestrator, rasterio, scipy, shapely) is imported
+# where it is first used — in the lifespan hook and the assess handler — so
+# importing this module stays cheap: bench_startup.py holds it to a budget.
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,6 +33,9 @@ async def lifespan(app: FastAPI):
     Failing here surfaces it in `systemctl status` on the first start, instead
     of as a 503 the first time an assessor submits a parcel.
     """
+    from smart_fetcher import SmartFetcher
+    from warmup import Warmer
+
     fetcher = SmartFetcher()
     resolved = fetcher.resolved_source()
     if resolved is None:
@@ -36,7 +45,24 @@ async def lifespan(app: FastAPI):
     # /readyz reports what startup resolved rather than re-deriving it, so the
     # two answers cannot drift apart.
     app.state.dem_probe = DemProbe(path=path, source_type=source_type)
+
+    # Warm the hot regions before taking traffic, but never wait past the
+    # budget: a slow disk must delay readiness by seconds, not by the size of
+    # the CAR window.
+    app.state.warmer = Warmer()
+    if settings.dem_warm_bboxes:
+        batch = app.state.warmer.start(settings.dem_warm_bboxes)
+        finished = await asyncio.to_thread(
+            Warmer.wait, batch, settings.dem_warm_budget_seconds
+        )
+        logger.info(
+            "DEM warm-up of %d region(s) %s",
+            len(batch.jobs),
+            "finished" if finished else
+            f"still running after {settings.dem_warm_budget_seconds:g}s budget",
+        )
     yield
+    app.state.warmer.stop()
 
 
 app = FastAPI(
@@ -196,20 +222,138 @@ async def readyz():
     }
 
 
+class WarmupRequest(BaseModel):
+    bbox: tuple[float, float, float, float]   # WGS84 minx, miny, maxx, maxy
+
+
+def _warmer():
+    # Set by the lifespan hook; created on demand when it has not run (tests).
+    warmer = getattr(app.state, "warmer", None)
+    if warmer is None:
+        from warmup import Warmer
+
+        warmer = app.state.warmer = Warmer()
+    return warmer
+
+
+@app.post("/admin/warmup", status_code=202, include_in_schema=False)
+async def admin_warmup(request: WarmupRequest):
+    """Warm the DEM under a bbox ahead of a scheduled batch.
+
+    Returns at once with the job; poll `GET /admin/warmup` for progress.
+    409 while another warm-up is running, 400 for a bbox over the size limit.
+    Like the probes, this is for operators on the host — the reverse proxy
+    only forwards /api/.
+    """
+    from warmup import WarmupBusy, check_bbox
+
+    warmer = _warmer()
+    try:
+        check_bbox(request.bbox, warmer.max_bbox_deg2)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    try:
+        batch = warmer.start([request.bbox])
+    except WarmupBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    return batch.jobs[0].as_dict()
+
+
+@app.get("/admin/warmup", include_in_schema=False)
+async def admin_warmup_status():
+    """Status of every warm-up started since startup, newest first."""
+    jobs = sorted(_warmer().jobs.values(), key=lambda j: -j.id)
+    return {"jobs": [j.as_dict() for j in jobs]}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Assessment admission and coalescing counters, as JSON.
+
+    Queue wait is the time a request spent waiting for a compute slot;
+    service time is the time it then held the slot (see admission.py).
+    """
+    return {"assess": admission.metrics(), "coalescing": coalescer.metrics()}
+
+
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
 
-@app.post("/api/v1/assess", response_model=AssessmentResponse, response_model_by_alias=True)
-def assess_parcel(request: AssessmentRequest):
+# Concurrent identical requests share one computation (see coalesce.py), and
+# at most EIL_ASSESS_MAX_CONCURRENCY computations run at once (admission.py),
+# cheapest first by predicted cost (cost_model.py).
+coalescer = Coalescer()
+admission = Admission(settings.assess_max_concurrency, settings.assess_max_queue,
+                      settings.assess_cost_weight)
+
+
+def _run_assessment(payload: dict, deadline: Optional[Deadline] = None) -> dict:
+    """The pipeline itself; runs in a worker thread."""
+    from orchestrator import EILOrchestrator
+
+    return EILOrchestrator().run_assessment(payload, deadline)
+
+
+def _dem_identity(geometry: dict) -> str:
+    """Identity of the DEM an assessment of ``geometry`` would read; runs in a
+    worker thread, since it stats the DEM files."""
+    from smart_fetcher import SmartFetcher
+
+    dem_path, _ = SmartFetcher().fetch_dem_path(geometry)
+    return dem_identity(dem_path)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison (RFC 9110 §13.1.2): W/ is ignored.
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+@app.post(
+    "/api/v1/assess",
+    response_model=AssessmentResponse,
+    response_model_by_alias=True,
+    responses={304: {"description": "Not Modified: the If-None-Match tag is current"}},
+)
+async def assess_parcel(
+    request: AssessmentRequest,
+    http_request: Request,
+    response: Response,
+    x_eil_deadline_ms: Optional[float] = Header(default=None),
+    if_none_match: Optional[str] = Header(default=None),
+):
     """
     Run the EIL hazard assessment on the provided GeoJSON polygon.
+
+    An `X-EIL-Deadline-Ms` header (or `config.deadline_ms`) bounds the time
+    from arrival to answer; past it the assessment is abandoned with 504.
+
+    The response carries a strong `ETag` derived from the project id,
+    geometry, config, DEM identity and engine version. A repeat request
+    with that tag in `If-None-Match` gets `304` without being computed, for
+    as long as none of those has changed.
     """
+    from shapely.geometry import shape
+
+    import cost_model
+    from eil_types import ComputeOptions
+
+    try:
+        # Both counted from arrival, so time queued for a slot counts
+        # against either; the earlier applies.
+        header = Deadline.after_ms(x_eil_deadline_ms) if x_eil_deadline_ms is not None else None
+        deadline = earliest(header, ComputeOptions.from_config(request.config).deadline)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid config: {e}")
+
     try:
         # Validate the geometry can be parsed
         geom = shape(request.geometry)
         if not geom.is_valid:
             raise ValueError("Geometry is invalid (self-intersecting or poorly structured)")
+        key = request_key(request.geometry, request.config)
+        # The DEM is not chosen yet, so the queue orders on the nominal pixel.
+        cost = cost_model.estimate(request.geometry)["predicted_s"]
     except Exception as e:
         logger.error(f"Invalid GeoJSON: {e}")
         raise HTTPException(status_code=400, detail=f"Invalid GeoJSON geometry: {str(e)}")
@@ -220,16 +364,51 @@ def assess_parcel(request: AssessmentRequest):
         "config": request.config,
     }
 
+    if if_none_match is not None:
+        # Only the DEM choice is needed for the tag: no slot, no compute.
+        try:
+            dem = await asyncio.to_thread(_dem_identity, request.geometry)
+        except FileNotFoundError as e:
+            logger.error(f"DEM Data Missing: {e}")
+            raise HTTPException(status_code=503, detail=f"DEM Data Missing: {str(e)}")
+        etag = assessment_etag(request.project_id, request.geometry, request.config, dem,
+                               settings.compute_max_window_mb or None)
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    def admitted():
+        return admission.slot(http_request.is_disconnected, cost)
+
     try:
-        orc = EILOrchestrator()
-        result = orc.run_assessment(payload)
-        return result
+        # Joining a computation already in flight, queued or running, costs
+        # no slot; only the first of identical requests is admitted.
+        result = await coalescer.run(key, _run_assessment, payload,
+                                     admit=admitted, deadline=deadline)
+    except DeadlineExceeded as e:
+        logger.warning("Assessment %s abandoned: %s", request.project_id, e)
+        raise HTTPException(status_code=504, detail=f"Deadline exceeded during stage '{e.stage}'")
+    except QueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e),
+                            headers={"Retry-After": str(e.retry_after)})
+    except ClientGone:
+        logger.info("Client of %s disconnected while queued; not computed", request.project_id)
+        # nginx's "client closed request"; nobody is left to read it.
+        raise HTTPException(status_code=499, detail="Client closed request")
     except FileNotFoundError as e:
         logger.error(f"DEM Data Missing: {e}")
         raise HTTPException(status_code=503, detail=f"DEM Data Missing: {str(e)}")
     except Exception as e:
         logger.exception("Assessment failed")
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+    # Tagged with the DEM the computation actually read.
+    dem = result.get("diagnostics", {}).get("dem_identity")
+    if dem is not None:
+        response.headers["ETag"] = assessment_etag(
+            request.project_id, request.geometry, request.config, dem,
+            settings.compute_max_window_mb or None,
+        )
+    # The result may be shared with identical requests from other projects.
+    return {**result, "project_id": request.project_id}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+EIL-Calc slope kernel benchmark.
+
+Times the slope surface with the reference "gradient" kernel (np.gradient
+over the whole buffered window) and the "dog" kernel (derivative-of-Gaussian
+on the parcel's bounding box; see slope_stability._dog_slope). It also
+reports the largest per-pixel difference between them over the site slope
+samples. Square parcels of each size are centred at random points in the
+middle of the DEM.
+
+--gaps N punches N random nodata holes (1–5 px) into a temporary copy of the
+DEM first. The kernels only differ near nodata, so this is the run that
+checks DOG_TOLERANCE_DEG.
+
+Usage:
+  python bench_slope_kernel.py
+  python bench_slope_kernel.py --sizes 30,100,300 --parcels 20 --gaps 60
+  python bench_slope_kernel.py --dem /path/to/IfSAR_PH.tif --precision float32
+"""
+
+import argparse
+import math
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from shapely.geometry import box
+
+from eil_types import PRECISIONS
+from slope_stability import DOG_TOLERANCE_DEG, site_slope_sample
+
+FIXTURE = Path(__file__).resolve().parent / "test_fixtures" / "ifsar_tile.tif"
+
+KERNELS = ("gradient", "dog")
+
+
+def punch_gaps(src_path: Path, out_path: Path, count: int, seed: int = 0) -> None:
+    """Copy ``src_path`` to ``out_path`` with ``count`` square nodata holes."""
+    rng = np.random.default_rng(seed)
+    with rasterio.open(src_path) as src:
+        data = src.read(1)
+        profile = src.profile
+    nodata = profile.get("nodata")
+    if nodata is None:
+        nodata = profile["nodata"] = -9999
+    for _ in range(count):
+        r, c = rng.integers(0, data.shape[0]), rng.integers(0, data.shape[1])
+        k = rng.integers(1, 6)
+        data[r:r + k, c:c + k] = nodata
+    with rasterio.open(out_path, "w", **profile) as dst:
+        dst.write(data, 1)
+
+
+def _parcels(dataset, half_m: float, count: int, rng) -> list:
+    """``count`` squares of half-width ``half_m`` in the middle half of the DEM."""
+    left, bottom, right, top = dataset.bounds
+    cx, cy = (left + right) / 2, (bottom + top) / 2
+    if dataset.crs and dataset.crs.is_geographic:
+        hy = half_m / 111320.0
+        hx = half_m / (111320.0 * math.cos(math.radians(cy)))
+    else:
+        hx = hy = half_m
+    spread_x, spread_y = (right - left) / 4, (top - bottom) / 4
+    parcels = []
+    for _ in range(count):
+        x = cx + rng.uniform(-spread_x, spread_x)
+        y = cy + rng.uniform(-spread_y, spread_y)
+        parcels.append(box(x - hx, y - hy, x + hx, y + hy))
+    return parcels
+
+
+def measure(dem: Path, sizes_m: list[float], parcels: int, runs: int,
+            dtype=np.float64, seed: int = 0) -> list[dict]:
+    """One row per parcel size: median seconds per kernel and max |Δ| (deg)."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    with rasterio.open(dem) as dataset:
+        for size in sizes_m:
+            geoms = _parcels(dataset, size / 2, parcels, rng)
+            seconds = {k: [] for k in KERNELS}
+            max_delta = 0.0
+            for geom in geoms:
+                samples = {}
+                for kernel in KERNELS:
+                    for _ in range(runs):
+                        start = time.perf_counter()
+                        samples[kernel] = site_slope_sample(geom, dataset, dtype, kernel)
+                        seconds[kernel].append(time.perf_counter() - start)
+                if samples["gradient"].size:
+                    max_delta = max(max_delta, float(np.max(np.abs(
+                        samples["dog"] - samples["gradient"]))))
+            rows.append({
+                "size_m": size,
+                **{f"{k}_s": statistics.median(v) for k, v in seconds.items()},
+                "max_delta_deg": max_delta,
+            })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="EIL-Calc slope kernel benchmark",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--dem", type=Path, default=FIXTURE, metavar="PATH",
+                        help="DEM to benchmark against (default: the IfSAR fixture).")
+    parser.add_argument("--sizes", default="30,100,300", metavar="M,M,...",
+                        help="Parcel edge lengths in metres (default: 30,100,300).")
+    parser.add_argument("--parcels", type=int, default=10, metavar="N",
+                        help="Parcels per size (default: 10).")
+    parser.add_argument("--runs", type=int, default=3, metavar="N",
+                        help="Timed runs per parcel and kernel (default: 3).")
+    parser.add_argument("--gaps", type=int, default=0, metavar="N",
+                        help="Punch N nodata holes into a temporary copy of the DEM.")
+    parser.add_argument("--precision", choices=PRECISIONS, default="float64")
+    args = parser.parse_args()
+
+    sizes = [float(s) for s in args.sizes.split(",")]
+    with tempfile.TemporaryDirectory() as tmp:
+        dem = args.dem
+        if args.gaps:
+            dem = Path(tmp) / "gaps.tif"
+            punch_gaps(args.dem, dem, args.gaps)
+        rows = measure(dem, sizes, args.parcels, args.runs, np.dtype(args.precision))
+
+    print(f"{'size':>7s} {'gradient':>10s} {'dog':>10s} {'speedup':>8s} {'max |Δ|':>9s}")
+    failed = False
+    for r in rows:
+        over = r["max_delta_deg"] > DOG_TOLERANCE_DEG
+        failed |= over
+        print(f"{r['size_m']:>6.0f}m {r['gradient_s']*1000:>8.1f}ms {r['dog_s']*1000:>8.1f}ms "
+              f"{r['gradient_s'] / r['dog_s']:>7.2f}x {r['max_delta_deg']:>8.4f}°"
+              f"{'   <-- over DOG_TOLERANCE_DEG' if over else ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
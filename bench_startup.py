@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+EIL-Calc startup benchmark.
+
+Times the entry points in fresh interpreters and fails if any exceeds its
+budget or pulls in the geoprocessing stack before it is needed:
+
+  import cli      — every scripted `eil-calc` call pays this
+  cli --help      — whole process, interpreter start to exit
+  import api      — uvicorn worker boot, before the lifespan hook runs
+
+Usage:
+  python bench_startup.py            # 7 runs per entry point, median reported
+  python bench_startup.py --runs 15
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+# Modules that cost hundreds of milliseconds between them and are only
+# needed once an assessment actually runs.
+HEAVY_MODULES = ("numpy", "rasterio", "pyproj", "scipy", "shapely", "skimage")
+
+# Seconds. Measured medians on a warm dev box are ~0.003 / 0.06 / 0.45-0.5,
+# nearly all of the last being FastAPI and pydantic. The budgets only catch
+# gross regressions; an eager `import orchestrator` is caught by the
+# heavy-import check, not the clock.
+BUDGETS_S = {
+    "import cli": 0.10,
+    "cli --help": 0.40,
+    "import api": 0.80,
+}
+
+_IMPORT_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+print(json.dumps({{"seconds": elapsed,
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _import_run(module: str) -> dict:
+    code = _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], cwd=HERE, check=True,
+                         capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def _help_run() -> dict:
+    code = ("import json, sys, cli\n"
+            "try:\n    cli.main(['--help'])\nexcept SystemExit:\n    pass\n"
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]), "
+            "file=sys.stderr)")
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", code], cwd=HERE, check=True,
+                          capture_output=True, text=True)
+    return {"seconds": time.perf_counter() - start,
+            "heavy": json.loads(proc.stderr)}
+
+
+def measure(runs: int = 7) -> dict:
+    """{entry point: {"seconds": median, "budget": s, "heavy": [...]}}."""
+    probes = {
+        "import cli": lambda: _import_run("cli"),
+        "cli --help": _help_run,
+        "import api": lambda: _import_run("api"),
+    }
+    results = {}
+    for name, probe in probes.items():
+        samples = [probe() for _ in range(runs)]
+        results[name] = {
+            "seconds": statistics.median(s["seconds"] for s in samples),
+            "budget": BUDGETS_S[name],
+            "heavy": sorted({m for s in samples for m in s["heavy"]}),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="EIL-Calc startup benchmark")
+    parser.add_argument("--runs", type=int, default=7, metavar="N",
+                        help="Fresh interpreters per entry point (default: 7).")
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    failed = False
+    print(f"{'entry point':<14s} {'median':>9s} {'budget':>9s}  heavy imports")
+    for name, r in results.items():
+        over = r["seconds"] > r["budget"] or r["heavy"]
+        failed |= bool(over)
+        print(f"{name:<14s} {r['seconds']*1000:>7.1f}ms {r['budget']*1000:>7.0f}ms  "
+              f"{', '.join(r['heavy']) or '-'}{'   <-- FAIL' if over else ''}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
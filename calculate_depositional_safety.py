@@ -1,19 +1,27 @@
 import math
+from dataclasses import dataclass
 
 import rasterio
 import rasterio.features
 import rasterio.mask
+from rasterio.windows import Window
 import numpy as np
 from pyproj import Geod
+import shapely
+from scipy import ndimage
 from shapely.geometry import Point
 from shapely.geometry.base import BaseGeometry
 
+import large_parcel
+from deadline import check
 from eil_types import (
+    ComputeOptions,
     DEMContext,
     DepositionalAssessment,
     DepositionalMetrics,
     DepositionalResult,
 )
+from eil_status import RUNOUT_RATIO
 
 def get_boundary_pixels(mask_2d):
     """
@@ -29,103 +37,140 @@ def get_boundary_pixels(mask_2d):
     return np.argwhere(inside_border)
 
 
+def _elevations(band, nodata, dtype):
+    """``band`` cast to ``dtype`` with nodata as NaN. The nodata mask is taken
+    before the cast: a sentinel need not survive float32 rounding exactly."""
+    elevations = band.astype(dtype)
+    if nodata is not None:
+        elevations[band == nodata] = np.nan
+    return elevations
+
+
 # Minimum horizontal runout distance for a transect to be considered a real threat.
 # Paths shorter than this are micro-topographic noise at IfSAR 5m resolution
 # (< 6 pixels), not genuine landslide source areas.
 _MIN_RUNOUT_METRES = 30.0
 
+# D8 neighbour offsets in the order the walkers scan them; ties go to the first.
+DIRECTIONS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
 
-def compute_depositional_safety(
-    geometry: BaseGeometry,
-    dataset,
-    search_buffer_meters: int = 1000,
-) -> DepositionalResult | dict:
-    """Compute depositional zone safety from an open rasterio dataset.
-
-    Pure computation — geometry must already be in the dataset CRS.
-    No CRS reprojection is performed here; that responsibility belongs
-    to the orchestrator.
 
-    Args:
-        geometry:              Parcel polygon already in dataset CRS.
-        dataset:               Open rasterio dataset.
-        search_buffer_meters:  Radius (metres) to search upslope for the peak.
+@dataclass(frozen=True)
+class _FlowGrids:
+    """Walker steps precomputed over one lot's elevation window.
 
-    Returns:
-        DepositionalResult dict or {"error": ...} on failure.
+    ``uphill`` and ``downhill`` hold an index into DIRECTIONS, or -1 for no
+    step: the neighbour with the largest strictly positive rise, and the
+    lowest strictly lower neighbour, first in DIRECTIONS order on ties.
+    They are computed once over a window shared by many lots, so they only
+    stand in for the scan where it would see the same neighbours:
+    ``downhill_ok`` marks pixels none of whose neighbours differ between the
+    shared window and the lot's, and ``uphill_ok`` additionally excludes
+    pixels next to the lot (the Outward-Only Constraint).
     """
-    # --- STEP A: Analyse the site (parcel) ---
-    site_img, site_transform = rasterio.mask.mask(dataset, [geometry], crop=True)
-    site_elevations = site_img[0].astype(float)  # Band 1
-    if dataset.nodata is not None:
-        site_elevations[site_elevations == dataset.nodata] = np.nan
+    uphill: np.ndarray
+    downhill: np.ndarray
+    uphill_ok: np.ndarray
+    downhill_ok: np.ndarray
 
-    site_valid_elevs = site_elevations[~np.isnan(site_elevations)]
-    if len(site_valid_elevs) == 0:
-        return {"error": "No valid elevation data found inside parcel geometry"}
 
-    # Site elevation = lowest point in the lot.
-    elev_site_min = np.nanmin(site_valid_elevs)
+def flow_directions(elevations: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(uphill, downhill) step indices over ``elevations``; see _FlowGrids.
 
-    # Coordinates of the minimum-elevation pixel.
-    min_idx = np.unravel_index(np.nanargmin(site_elevations), site_elevations.shape)
-    site_min_xy = rasterio.transform.xy(site_transform, min_idx[0], min_idx[1])
-    site_point = Point(site_min_xy)
+    NaN and off-window neighbours are never stepped to, as in the scans.
+    """
+    rows, cols = elevations.shape
+    padded = np.pad(elevations, 1, constant_values=np.nan)
+    uphill = np.full(elevations.shape, -1, dtype=np.int8)
+    downhill = np.full(elevations.shape, -1, dtype=np.int8)
+    steepest = np.zeros_like(elevations)
+    lowest = elevations.copy()
+    with np.errstate(invalid="ignore"):
+        for k, (dr, dc) in enumerate(DIRECTIONS):
+            neighbour = padded[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+            rise = neighbour - elevations
+            up = rise > steepest
+            steepest[up] = rise[up]
+            uphill[up] = k
+            down = neighbour < lowest
+            lowest[down] = neighbour[down]
+            downhill[down] = k
+    return uphill, downhill
 
-    # --- STEP B: Analyse the vicinity (find the peak) ---
-    # Buffer must be in the dataset's native CRS units.
-    # For geographic CRS (degrees), convert metres to degrees at the parcel's latitude.
-    if dataset.crs and dataset.crs.is_geographic:
-        lat_rad = math.radians(geometry.centroid.y)
-        search_buffer = search_buffer_meters / (111320.0 * math.cos(lat_rad))
-    else:
-        search_buffer = float(search_buffer_meters)
-    vicinity_polygon = geometry.buffer(search_buffer)
 
-    vicinity_img, vic_transform = rasterio.mask.mask(
-        dataset, [vicinity_polygon], crop=True
-    )
-    vic_elevations = vicinity_img[0].astype(float)
-    if dataset.nodata is not None:
-        vic_elevations[vic_elevations == dataset.nodata] = np.nan
+def _walk(
+    vic_elevations: np.ndarray,
+    vic_transform,
+    parcel_mask_vic: np.ndarray,
+    boundary_coords,
+    elev_site_min: float,
+    site_point: Point,
+    geod,
+    seen_peaks: set,
+    origin: tuple[int, int] = (0, 0),
+    flow: "_FlowGrids | None" = None,
+    decision_only: bool = False,
+    deadline=None,
+    share_walks: bool = True,
+) -> list[dict]:
+    """Uphill Walker from ``boundary_coords``, then the Downhill Stepper from
+    every new peak, over one elevation window.
 
-    vic_valid_elevs = vic_elevations[~np.isnan(vic_elevations)]
-    if len(vic_valid_elevs) == 0:
-        return {"error": "No valid elevation data found in vicinity"}
+    ``seen_peaks`` holds the peaks already traced, in dataset pixel
+    coordinates (window coordinates plus ``origin``). It is updated in place,
+    so the tiles of a large parcel never trace the same peak twice.
 
-    # We need a boolean mask of the parcel inside the vicinity grid
-    # (True = inside parcel, False = outside)
-    parcel_mask_vic = ~rasterio.features.geometry_mask(
-        [geometry],
-        out_shape=vic_elevations.shape,
-        transform=vic_transform,
-        invert=False
-    )
-    
-    geod = Geod(ellps="WGS84") if (dataset.crs and dataset.crs.is_geographic) else None
+    ``flow`` (see _FlowGrids) replaces the 8-neighbour scans with a lookup
+    wherever it is valid for this window.
+
+    With ``decision_only`` no ``path`` is recorded, and the walk returns as
+    soon as one transect is PRONE, which already decides the parcel.
 
+    ``deadline`` is checked before each walk and each runout (deadline.py).
+
+    ``share_walks`` ends a walk as soon as it joins the path of an earlier
+    one; the peaks are the same either way, and False is for tests.
+    """
     # --- STEP C: PHYSICS LOGIC (REVERSE GRADIENT ASCENT) ---
-    
+
     # 1. Trace steepest ascent from parcel boundaries to find threatening local peaks.
-    boundary_coords = get_boundary_pixels(parcel_mask_vic)
-    
-    unique_peaks = set()
     peak_paths = []
     
-    directions = [(-1,-1), (-1,0), (-1,1), (0,-1), (0,1), (1,-1), (1,0), (1,1)]
+    directions = DIRECTIONS
     max_steps = 500
     
+    # Where a walk ended, keyed by every pixel it passed through: (end pixel,
+    # steps from that pixel to it). The next step depends only on the pixel,
+    # so a later walk that reaches one of them ends in the same place, unless
+    # the max_steps cap would stop it first. Walks from neighbouring boundary
+    # pixels merge within a few steps, so most end by lookup.
+    ends = {}
+
     # Uphill Walker
     for start_r, start_c in boundary_coords:
+        check(deadline, "depositional")
         curr_r, curr_c = start_r, start_c
-        
-        for _ in range(max_steps):
+        path = []
+        end = None
+
+        for step in range(max_steps):
+            known = ends.get((curr_r, curr_c)) if share_walks else None
+            if known is not None and step + known[1] <= max_steps:
+                end = known
+                break
             max_uphill_diff = 0
             next_step = None
             curr_elev = vic_elevations[curr_r, curr_c]
             
             # Step 1: Check immediate 8 neighbors
-            for dr, dc in directions:
+            if flow is not None and flow.uphill_ok[curr_r, curr_c]:
+                k = flow.uphill[curr_r, curr_c]
+                if k >= 0:
+                    next_step = (curr_r + directions[k][0], curr_c + directions[k][1])
+                directions_to_scan = ()
+            else:
+                directions_to_scan = directions
+            for dr, dc in directions_to_scan:
                 nr, nc = curr_r + dr, curr_c + dc
                 if 0 <= nr < vic_elevations.shape[0] and 0 <= nc < vic_elevations.shape[1]:
                     # Outward-Only Constraint: Do not step if the neighbor is inside the parcel
@@ -166,12 +211,23 @@ def compute_depositional_safety(
                     next_step = (window_r, window_c)
                 else:
                     # Truly trapped on a ridge, terminate pathfinding
+                    end = ((curr_r, curr_c), 0)
+                    ends[curr_r, curr_c] = end
                     break
                 
+            path.append((curr_r, curr_c))
             curr_r, curr_c = next_step
-            
+
+        if end is not None:
+            # A walk cut short by max_steps is not recorded: where it would
+            # have ended is unknown.
+            (curr_r, curr_c), remaining = end
+            for behind, pixel in enumerate(reversed(path), start=1):
+                ends[pixel] = ((curr_r, curr_c), remaining + behind)
+
         peak_coord = (curr_r, curr_c)
-        if peak_coord not in unique_peaks:
+        peak_key = (curr_r + origin[0], curr_c + origin[1])
+        if peak_key not in seen_peaks:
             # Regional Filter: Ensure H > 50m
             peak_x, peak_y = rasterio.transform.xy(vic_transform, peak_coord[0], peak_coord[1])
             if geod:
@@ -180,7 +236,7 @@ def compute_depositional_safety(
                 peak_dist = math.hypot(site_point.x - peak_x, site_point.y - peak_y)
                 
             if peak_dist > 50.0:
-                unique_peaks.add(peak_coord)
+                seen_peaks.add(peak_key)
                 peak_paths.append(peak_coord)
 
     # 2. Process downhill runouts from each unique peak
@@ -188,6 +244,7 @@ def compute_depositional_safety(
     parcel_inv_mask = ~parcel_mask_vic  # True = Outside, False = Inside
     
     for peak_r, peak_c in peak_paths:
+        check(deadline, "depositional")
         # Skip peaks that landed inside the parcel — the downhill stepper would
         # never enter its loop, producing h_distance=0 and an empty transect list.
         if not parcel_inv_mask[peak_r, peak_c]:
@@ -210,24 +267,29 @@ def compute_depositional_safety(
             visited.add((curr_r, curr_c))
             
             curr_x, curr_y = rasterio.transform.xy(vic_transform, curr_r, curr_c)
-            transect.append({"dist_m": round(h_distance, 1), "elev_m": round(float(vic_elevations[curr_r, curr_c]), 1)})
+            if not decision_only:
+                transect.append({"dist_m": round(h_distance, 1), "elev_m": round(float(vic_elevations[curr_r, curr_c]), 1)})
             
             min_elev = vic_elevations[curr_r, curr_c]
             next_r, next_c = curr_r, curr_c
             
-            for dr in [-1, 0, 1]:
-                for dc in [-1, 0, 1]:
-                    if dr == 0 and dc == 0:
+            if flow is not None and flow.downhill_ok[curr_r, curr_c]:
+                k = flow.downhill[curr_r, curr_c]
+                if k >= 0:
+                    next_r, next_c = curr_r + directions[k][0], curr_c + directions[k][1]
+                neighbours = ()
+            else:
+                neighbours = directions
+            for dr, dc in neighbours:
+                nr, nc = curr_r + dr, curr_c + dc
+                if 0 <= nr < vic_elevations.shape[0] and 0 <= nc < vic_elevations.shape[1]:
+                    if (nr, nc) in visited:
                         continue
-                    nr, nc = curr_r + dr, curr_c + dc
-                    if 0 <= nr < vic_elevations.shape[0] and 0 <= nc < vic_elevations.shape[1]:
-                        if (nr, nc) in visited:
-                            continue
-                            
-                        elev = vic_elevations[nr, nc]
-                        if not np.isnan(elev) and elev < min_elev:
-                            min_elev = elev
-                            next_r, next_c = nr, nc
+                        
+                    elev = vic_elevations[nr, nc]
+                    if not np.isnan(elev) and elev < min_elev:
+                        min_elev = elev
+                        next_r, next_c = nr, nc
                             
             if next_r == curr_r and next_c == curr_c:
                 break
@@ -249,8 +311,9 @@ def compute_depositional_safety(
             else:
                 trap_dist = math.hypot(site_point.x - trap_x, site_point.y - trap_y)
             h_distance += float(trap_dist)
-            transect.append({"dist_m": round(h_distance, 1), "elev_m": round(float(elev_site_min), 1)})
-        else:
+            if not decision_only:
+                transect.append({"dist_m": round(h_distance, 1), "elev_m": round(float(elev_site_min), 1)})
+        elif not decision_only:
             transect.append({"dist_m": round(h_distance, 1), "elev_m": round(float(vic_elevations[curr_r, curr_c]), 1)})
 
         # Discard sub-pixel noise paths — a genuine landslide source must produce
@@ -258,7 +321,7 @@ def compute_depositional_safety(
         if h_distance < _MIN_RUNOUT_METRES:
             continue
 
-        required_runout = 3.0 * delta_e
+        required_runout = RUNOUT_RATIO * delta_e
         is_compliant = h_distance > required_runout
         status = "SAFE (Beyond Runout)" if is_compliant else "PRONE (Within Runout Zone)"
         
@@ -280,6 +343,255 @@ def compute_depositional_safety(
             "path": transect,
             "threat_ratio": threat_ratio
         })
+        if decision_only and not is_compliant:
+            break
+
+    return all_transects
+
+
+def trace_transects(
+    geometry: BaseGeometry,
+    dataset,
+    search_buffer_meters: int = 1000,
+    dtype=np.float64,
+    decision_only: bool = False,
+    deadline=None,
+) -> tuple[float, list[dict]] | dict:
+    """Trace every runout transect that threatens the parcel.
+
+    Runs the Uphill Walker and Downhill Stepper and returns every transect
+    that survives the minimum-runout filter, unsorted, each shaped like an
+    entry of ``_viz_transects``. ``compute_depositional_safety`` ranks and
+    aggregates these; the validation tooling caches their ΔE and H directly.
+    Elevations are held in ``dtype`` (see ComputeOptions); distances and the
+    reported metrics are always Python floats. ``decision_only`` stops at the
+    first PRONE transect and leaves every ``path`` empty (see _walk).
+    ``deadline`` is checked as the walks go (see _walk).
+
+    Returns:
+        (elevation_site, transects) or {"error": ...} on failure.
+    """
+    # --- STEP A: Analyse the site (parcel) ---
+    site_img, site_transform = rasterio.mask.mask(dataset, [geometry], crop=True)
+    site_elevations = _elevations(site_img[0], dataset.nodata, dtype)  # Band 1
+
+    site_valid_elevs = site_elevations[~np.isnan(site_elevations)]
+    if len(site_valid_elevs) == 0:
+        return {"error": "No valid elevation data found inside parcel geometry"}
+
+    # Site elevation = lowest point in the lot.
+    elev_site_min = np.nanmin(site_valid_elevs)
+
+    # Coordinates of the minimum-elevation pixel.
+    min_idx = np.unravel_index(np.nanargmin(site_elevations), site_elevations.shape)
+    site_min_xy = rasterio.transform.xy(site_transform, min_idx[0], min_idx[1])
+    site_point = Point(site_min_xy)
+
+    # --- STEP B: Analyse the vicinity (find the peak) ---
+    # Buffer must be in the dataset's native CRS units.
+    # For geographic CRS (degrees), convert metres to degrees at the parcel's latitude.
+    if dataset.crs and dataset.crs.is_geographic:
+        lat_rad = math.radians(geometry.centroid.y)
+        search_buffer = search_buffer_meters / (111320.0 * math.cos(lat_rad))
+    else:
+        search_buffer = float(search_buffer_meters)
+    vicinity_polygon = geometry.buffer(search_buffer)
+
+    vicinity_img, vic_transform = rasterio.mask.mask(
+        dataset, [vicinity_polygon], crop=True
+    )
+    vic_elevations = _elevations(vicinity_img[0], dataset.nodata, dtype)
+
+    vic_valid_elevs = vic_elevations[~np.isnan(vic_elevations)]
+    if len(vic_valid_elevs) == 0:
+        return {"error": "No valid elevation data found in vicinity"}
+
+    # We need a boolean mask of the parcel inside the vicinity grid
+    # (True = inside parcel, False = outside)
+    parcel_mask_vic = ~rasterio.features.geometry_mask(
+        [geometry],
+        out_shape=vic_elevations.shape,
+        transform=vic_transform,
+        invert=False
+    )
+    
+    geod = Geod(ellps="WGS84") if (dataset.crs and dataset.crs.is_geographic) else None
+
+    # --- STEP C: PHYSICS LOGIC (REVERSE GRADIENT ASCENT) ---
+    all_transects = _walk(vic_elevations, vic_transform, parcel_mask_vic,
+                          get_boundary_pixels(parcel_mask_vic), elev_site_min,
+                          site_point, geod, seen_peaks=set(), decision_only=decision_only,
+                          deadline=deadline)
+
+    return float(elev_site_min), all_transects
+
+
+def _bytes_per_pixel(dtype, dataset) -> int:
+    """Peak bytes per window pixel: the raw band, its float copy and the
+    parcel, vicinity and boundary masks."""
+    return np.dtype(dtype).itemsize + np.dtype(dataset.dtypes[0]).itemsize + 4
+
+
+def _streamed_site_minimum(geometry: BaseGeometry, dataset, dtype,
+                           strip_rows: int) -> tuple[float, Point] | None:
+    """Lowest valid pixel inside the parcel and its centre, read in strips.
+
+    Same answer as STEP A of trace_transects, including ties (first pixel in
+    row-major order), without holding the parcel's window at once.
+    """
+    window = rasterio.features.geometry_window(dataset, [geometry])
+    best, best_rc = np.inf, None
+    for row in range(window.row_off, window.row_off + window.height, strip_rows):
+        strip = Window(window.col_off, row, window.width,
+                       min(strip_rows, window.row_off + window.height - row))
+        transform = dataset.window_transform(strip)
+        elevations = _elevations(dataset.read(1, window=strip), dataset.nodata, dtype)
+        inside = rasterio.features.geometry_mask(
+            [geometry], out_shape=elevations.shape, transform=transform, invert=True
+        )
+        candidates = np.where(inside & ~np.isnan(elevations), elevations, np.inf)
+        idx = np.unravel_index(np.argmin(candidates), candidates.shape)
+        if candidates[idx] < best:
+            best = candidates[idx]
+            best_rc = rasterio.transform.xy(transform, idx[0], idx[1])
+    if best_rc is None:
+        return None
+    return float(best), Point(best_rc)
+
+
+def trace_transects_tiled(
+    geometry: BaseGeometry,
+    dataset,
+    search_buffer_meters: int = 1000,
+    dtype=np.float64,
+    max_window_mb: float = 512.0,
+    decision_only: bool = False,
+    deadline=None,
+) -> tuple[float, list[dict]] | dict:
+    """trace_transects for parcels over the window cap (large_parcel.py).
+
+    The site minimum is found in row strips. The parcel boundary is then
+    walked one tile at a time, each tile read with the search radius as its
+    halo and masked to the same vicinity polygon as the untiled read. A walk
+    or runout that would leave its tile's window stops at the window edge,
+    where the untiled walk would carry on. A tile's halo is the full search
+    radius, so only walks of more than a kilometre are affected.
+    """
+    search_buffer = large_parcel.metres_to_crs(dataset, geometry, search_buffer_meters)
+    halo_px = large_parcel.halo_pixels(dataset, search_buffer)
+    side = large_parcel.tile_side(halo_px, _bytes_per_pixel(dtype, dataset), max_window_mb)
+
+    site = _streamed_site_minimum(geometry, dataset, dtype, strip_rows=side)
+    if site is None:
+        return {"error": "No valid elevation data found inside parcel geometry"}
+    elev_site_min, site_point = site
+
+    vicinity_polygon = geometry.buffer(search_buffer)
+    geod = Geod(ellps="WGS84") if (dataset.crs and dataset.crs.is_geographic) else None
+    seen_peaks = set()
+    all_transects = []
+    any_valid = False
+    for tile_window, _ in large_parcel.pixel_tiles(geometry, dataset, side):
+        window = large_parcel.grow(tile_window, halo_px, dataset)
+        transform = dataset.window_transform(window)
+        vic_elevations = _elevations(dataset.read(1, window=window), dataset.nodata, dtype)
+        outside = rasterio.features.geometry_mask(
+            [vicinity_polygon], out_shape=vic_elevations.shape, transform=transform
+        )
+        vic_elevations[outside] = np.nan
+        any_valid = any_valid or not np.isnan(vic_elevations).all()
+
+        parcel_mask_vic = rasterio.features.geometry_mask(
+            [geometry], out_shape=vic_elevations.shape, transform=transform, invert=True
+        )
+        # Only this tile's share of the boundary; its neighbours walk the rest.
+        boundary = get_boundary_pixels(parcel_mask_vic)
+        r0, c0 = tile_window.row_off - window.row_off, tile_window.col_off - window.col_off
+        boundary = boundary[
+            (boundary[:, 0] >= r0) & (boundary[:, 0] < r0 + tile_window.height)
+            & (boundary[:, 1] >= c0) & (boundary[:, 1] < c0 + tile_window.width)
+        ]
+        all_transects += _walk(vic_elevations, transform, parcel_mask_vic, boundary,
+                               elev_site_min, site_point, geod, seen_peaks,
+                               origin=(window.row_off, window.col_off),
+                               decision_only=decision_only, deadline=deadline)
+        if decision_only and any(not t["assessment"]["is_compliant"] for t in all_transects):
+            break
+
+    if not any_valid:
+        return {"error": "No valid elevation data found in vicinity"}
+    return elev_site_min, all_transects
+
+
+def compute_depositional_safety(
+    geometry: BaseGeometry,
+    dataset,
+    search_buffer_meters: int = 1000,
+    options: ComputeOptions | None = None,
+) -> DepositionalResult | dict:
+    """Compute depositional zone safety from an open rasterio dataset.
+
+    Pure computation — geometry must already be in the dataset CRS.
+    No CRS reprojection is performed here; that responsibility belongs
+    to the orchestrator.
+
+    Args:
+        geometry:              Parcel polygon already in dataset CRS.
+        dataset:               Open rasterio dataset.
+        search_buffer_meters:  Radius (metres) to search upslope for the peak.
+        options:               Compute options (precision); defaults to ComputeOptions().
+
+    Returns:
+        DepositionalResult dict or {"error": ...} on failure.
+    """
+    options = options or ComputeOptions()
+    search_buffer = large_parcel.metres_to_crs(dataset, geometry, search_buffer_meters)
+    if large_parcel.exceeds_cap(geometry, dataset, search_buffer,
+                                _bytes_per_pixel(options.dtype, dataset), options.max_window_mb):
+        traced = trace_transects_tiled(geometry, dataset, search_buffer_meters,
+                                       options.dtype, options.max_window_mb,
+                                       options.decision_only, options.deadline)
+    else:
+        traced = trace_transects(geometry, dataset, search_buffer_meters, options.dtype,
+                                 options.decision_only, options.deadline)
+    if isinstance(traced, dict):
+        return traced
+    return _depositional_result(*traced, decision_only=options.decision_only)
+
+
+def _decision_result(elev_site_min: float, all_transects: list[dict]) -> DepositionalResult:
+    """Status and deciding metrics only, for ComputeOptions.decision_only.
+
+    The metrics are the PRONE transect the walk stopped at, or the worst
+    SAFE one (highest threat ratio) when none was PRONE. There are no
+    ``_viz_transects``.
+    """
+    if not all_transects:
+        return DepositionalResult(
+            metrics=DepositionalMetrics(
+                elevation_peak=float(elev_site_min),
+                elevation_site=float(elev_site_min),
+                delta_e=0.0,
+                horizontal_distance_h=0.0,
+                required_runout_3x=0.0,
+            ),
+            assessment=DepositionalAssessment(status="SAFE (Beyond Runout)", is_compliant=True),
+            _viz_transects=[],
+        )
+    prone = [t for t in all_transects if not t["assessment"]["is_compliant"]]
+    deciding = prone[0] if prone else max(all_transects, key=lambda t: t["threat_ratio"])
+    return DepositionalResult(
+        metrics=deciding["metrics"],
+        assessment=deciding["assessment"],
+        _viz_transects=[],
+    )
+
+
+def _depositional_result(elev_site_min: float, all_transects: list[dict],
+                         decision_only: bool = False) -> DepositionalResult:
+    """Rank the traced transects and build the result from the worst three."""
+    if decision_only:
+        return _decision_result(elev_site_min, all_transects)
 
     # 3. Sort by severity (highest threat ratio first)
     all_transects.sort(key=lambda t: t["threat_ratio"], reverse=True)
@@ -323,11 +635,133 @@ def compute_depositional_safety(
     )
 
 
+def _crop(elevations: np.ndarray, union_window: Window, dataset,
+          shape: BaseGeometry) -> tuple[np.ndarray, object, Window, np.ndarray]:
+    """rasterio.mask.mask(dataset, [shape], crop=True), cut from a union read.
+
+    Returns (elevations, transform, window, outside): the crop as
+    ``_elevations`` would give it, including mask's fill outside ``shape``
+    (nodata, or 0 when the DEM declares none).
+    """
+    window = rasterio.features.geometry_window(dataset, [shape])
+    r0 = int(window.row_off - union_window.row_off)
+    c0 = int(window.col_off - union_window.col_off)
+    crop = elevations[r0:r0 + int(window.height), c0:c0 + int(window.width)].copy()
+    transform = dataset.window_transform(window)
+    outside = rasterio.features.geometry_mask([shape], out_shape=crop.shape, transform=transform)
+    crop[outside] = np.nan if dataset.nodata is not None else 0
+    return crop, transform, window, outside
+
+
+def _trace_in_union(geometry: BaseGeometry, vicinity_polygon: BaseGeometry, dataset,
+                    union_window: Window, elevations: np.ndarray, uphill: np.ndarray,
+                    downhill: np.ndarray, geod, decision_only: bool = False,
+                    deadline=None) -> tuple[float, list[dict]] | dict:
+    """trace_transects for one lot of compute_depositional_safety_many."""
+    # --- STEP A: Analyse the site (parcel) ---
+    site_elevations, site_transform, _, _ = _crop(elevations, union_window, dataset, geometry)
+    if np.isnan(site_elevations).all():
+        return {"error": "No valid elevation data found inside parcel geometry"}
+    elev_site_min = np.nanmin(site_elevations)
+    min_idx = np.unravel_index(np.nanargmin(site_elevations), site_elevations.shape)
+    site_point = Point(rasterio.transform.xy(site_transform, min_idx[0], min_idx[1]))
+
+    # --- STEP B: Analyse the vicinity (find the peak) ---
+    vic_elevations, vic_transform, vic_window, outside = _crop(
+        elevations, union_window, dataset, vicinity_polygon
+    )
+    if np.isnan(vic_elevations).all():
+        return {"error": "No valid elevation data found in vicinity"}
+    parcel_mask_vic = rasterio.features.geometry_mask(
+        [geometry], out_shape=vic_elevations.shape, transform=vic_transform, invert=True
+    )
+
+    # The shared steps hold wherever no neighbour was masked out of this
+    # lot's crop: not outside its vicinity polygon, and not in the ring of
+    # the union read just beyond its window.
+    r0 = int(vic_window.row_off - union_window.row_off)
+    c0 = int(vic_window.col_off - union_window.col_off)
+    h, w = vic_elevations.shape
+    gr0, gc0 = max(r0 - 1, 0), max(c0 - 1, 0)
+    changed = np.ones((min(r0 + h + 1, elevations.shape[0]) - gr0,
+                       min(c0 + w + 1, elevations.shape[1]) - gc0), dtype=bool)
+    inner = np.s_[r0 - gr0:r0 - gr0 + h, c0 - gc0:c0 - gc0 + w]
+    changed[inner] = outside
+    eight = np.ones((3, 3), dtype=bool)
+    downhill_ok = ~ndimage.binary_dilation(changed, structure=eight)[inner]
+    lot = np.s_[r0:r0 + h, c0:c0 + w]
+    flow = _FlowGrids(
+        uphill=uphill[lot],
+        downhill=downhill[lot],
+        uphill_ok=downhill_ok & ~ndimage.binary_dilation(parcel_mask_vic, structure=eight),
+        downhill_ok=downhill_ok,
+    )
+
+    # --- STEP C: PHYSICS LOGIC (REVERSE GRADIENT ASCENT) ---
+    all_transects = _walk(vic_elevations, vic_transform, parcel_mask_vic,
+                          get_boundary_pixels(parcel_mask_vic), elev_site_min,
+                          site_point, geod, seen_peaks=set(), flow=flow,
+                          decision_only=decision_only, deadline=deadline)
+    return float(elev_site_min), all_transects
+
+
+def compute_depositional_safety_many(
+    geometries: list[BaseGeometry],
+    dataset,
+    search_buffer_meters: int = 1000,
+    options: ComputeOptions | None = None,
+) -> list[DepositionalResult | dict]:
+    """compute_depositional_safety for many lots over one shared raster pass.
+
+    The union of the lots' search vicinities is read once, and the uphill
+    and downhill D8 steps are computed once over it (flow_directions). Each
+    lot is then cut from that read exactly as its own masked crop would be,
+    and walked with the shared steps standing in for the neighbour scans
+    wherever they agree (see _FlowGrids); next to the lot and along the edge
+    of its vicinity the walkers still scan. The per-lot result matches a
+    separate compute_depositional_safety call.
+
+    If the union window exceeds ``options.max_window_mb``, each lot falls
+    back to its own call.
+
+    Returns:
+        One DepositionalResult or {"error": ...} per geometry, in order.
+    """
+    options = options or ComputeOptions()
+    if not geometries:
+        return []
+    vicinities = [
+        g.buffer(large_parcel.metres_to_crs(dataset, g, search_buffer_meters))
+        for g in geometries
+    ]
+    union = shapely.union_all(vicinities)
+    # The shared read also holds the two int8 step grids.
+    bpp = _bytes_per_pixel(options.dtype, dataset) + 2
+    if large_parcel.exceeds_cap(union, dataset, 0.0, bpp, options.max_window_mb):
+        return [compute_depositional_safety(g, dataset, search_buffer_meters, options)
+                for g in geometries]
+
+    union_window = rasterio.features.geometry_window(dataset, [union])
+    elevations = _elevations(dataset.read(1, window=union_window), dataset.nodata,
+                             options.dtype)
+    uphill, downhill = flow_directions(elevations)
+    geod = Geod(ellps="WGS84") if (dataset.crs and dataset.crs.is_geographic) else None
+
+    results = []
+    for geometry, vicinity_polygon in zip(geometries, vicinities):
+        traced = _trace_in_union(geometry, vicinity_polygon, dataset, union_window,
+                                 elevations, uphill, downhill, geod, options.decision_only,
+                                 options.deadline)
+        results.append(traced if isinstance(traced, dict)
+                       else _depositional_result(*traced, decision_only=options.decision_only))
+    return results
+
+
 def calculate_depositional_safety(
     context: DEMContext,
     search_buffer_meters: int = 1000,
 ) -> DepositionalResult | dict:
     """Entry point accepting a DEMContext (geometry already projected)."""
     return compute_depositional_safety(
-        context.geometry, context.dataset, search_buffer_meters
+        context.geometry, context.dataset, search_buffer_meters, context.options
     )
@@ -1,11 +1,20 @@
 #!/usr/bin/env python3
-"""EIL-Calc command-line interface."""
+"""EIL-Calc command-line interface.
+
+Only the standard library is imported at module level. The orchestrator —
+and with it rasterio, pyproj, scipy and shapely — is imported once the
+arguments and GeoJSON have been validated, so `--help` and usage errors
+return immediately (see bench_startup.py for the enforced budget).
+
+If an `eil-calc serve-local` daemon is listening (local_daemon.py), the
+assessment runs there instead, skipping the imports and DEM open entirely;
+with no daemon the CLI falls back to running in-process.
+"""
 import argparse
 import json
+import os
 import sys
 
-from orchestrator import EILOrchestrator
-
 
 def build_parser():
     parser = argparse.ArgumentParser(
@@ -18,12 +27,124 @@ def build_parser():
                         help="Project identifier included in the output.")
     parser.add_argument("--mode", choices=["compliance", "research"], default="compliance",
                         help="Assessment mode (default: compliance).")
+    parser.add_argument("--precision", choices=["float64", "float32"], default="float64",
+                        help="Compute precision (default: float64).")
+    parser.add_argument("--decision-only", action="store_true", dest="decision_only",
+                        help="Depositional screening: stop at the first PRONE transect "
+                             "and omit transect paths.")
     parser.add_argument("--output", metavar="PATH",
                         help="Write JSON result to this file (default: stdout).")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="Daemon socket to try first (default: $EIL_LOCAL_SOCKET, "
+                             "else a per-user path).")
+    parser.add_argument("--no-daemon", action="store_true", dest="no_daemon",
+                        help="Always assess in-process, even if a daemon is running.")
     return parser
 
 
+def build_serve_parser():
+    parser = argparse.ArgumentParser(
+        prog="eil-calc serve-local",
+        description="Keep an assessment engine warm and serve `eil-calc` calls "
+                    "over a Unix socket until interrupted.",
+    )
+    parser.add_argument("--socket", metavar="PATH",
+                        help="Socket to listen on (default: $EIL_LOCAL_SOCKET, "
+                             "else a per-user path).")
+    return parser
+
+
+def serve_local(argv):
+    args = build_serve_parser().parse_args(argv)
+    import local_daemon
+
+    local_daemon.serve(args.socket or local_daemon.default_socket_path())
+    sys.exit(0)
+
+
+def _bbox(text):
+    values = text.split(",")
+    try:
+        if len(values) == 4:
+            return tuple(float(v) for v in values)
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError("expected MINX,MINY,MAXX,MAXY")
+
+
+def build_regional_map_parser():
+    parser = argparse.ArgumentParser(
+        prog="eil-calc regional-map",
+        description="Classify every lot-sized cell of a DEM by Phase 1 slope status "
+                    "and write the map as a tiled GeoTIFF.",
+    )
+    parser.add_argument("--dem", required=True, metavar="PATH",
+                        help="DEM to classify.")
+    parser.add_argument("--output", required=True, metavar="PATH",
+                        help="GeoTIFF to write (uint8: 0 nodata, 1 SAFE, 2 FLAG, 3 SUSCEPTIBLE).")
+    parser.add_argument("--bbox", type=_bbox, metavar="MINX,MINY,MAXX,MAXY",
+                        help="Area to classify, in the DEM's CRS (default: the whole DEM).")
+    parser.add_argument("--cell-m", type=float, default=30.0, dest="cell_m", metavar="M",
+                        help="Cell side in metres, rounded to whole pixels (default: 30).")
+    parser.add_argument("--chunk-cells", type=int, default=64, dest="chunk_cells", metavar="N",
+                        help="Cells per side of each chunk (default: 64).")
+    parser.add_argument("--workers", type=int, metavar="N",
+                        help="Worker processes (default: all cores).")
+    parser.add_argument("--checkpoints", metavar="DIR",
+                        help="Per-chunk checkpoint directory (default: OUTPUT.chunks). "
+                             "Rerunning with the same directory resumes.")
+    parser.add_argument("--precision", choices=["float64", "float32"], default="float64",
+                        help="Compute precision (default: float64).")
+    return parser
+
+
+def regional_map(argv):
+    args = build_regional_map_parser().parse_args(argv)
+    import regional_map
+    from rasterio.errors import RasterioIOError
+
+    try:
+        summary = regional_map.build_map(
+            args.dem, args.output, cell_m=args.cell_m, bbox=args.bbox,
+            chunk_cells=args.chunk_cells, workers=args.workers,
+            checkpoint_dir=args.checkpoints, precision=args.precision,
+        )
+    except (FileNotFoundError, ValueError, RasterioIOError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(summary, indent=2))
+    sys.exit(0)
+
+
+def _assess(payload, args):
+    """Run on the local daemon if one answers, otherwise in-process."""
+    if not args.no_daemon:
+        import local_daemon
+
+        socket_path = args.socket or local_daemon.default_socket_path()
+        try:
+            return local_daemon.assess_via_daemon(payload, socket_path)
+        except local_daemon.DaemonUnavailable as e:
+            # Stay quiet when no daemon was ever started; warn when one
+            # was expected, or is running but cannot serve (stale engine or
+            # other DEM settings). A timeout is not caught: the daemon may
+            # still be computing, and running again here would do it twice.
+            if args.socket or os.path.exists(socket_path):
+                print(f"Warning: daemon unavailable ({e}); running in-process.",
+                      file=sys.stderr)
+
+    from orchestrator import EILOrchestrator
+
+    return EILOrchestrator().run_assessment(payload)
+
+
 def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["serve-local"]:
+        serve_local(argv[1:])
+    if argv[:1] == ["regional-map"]:
+        regional_map(argv[1:])
+
     parser = build_parser()
     args = parser.parse_args(argv)
 
@@ -54,14 +175,15 @@ def main(argv=None):
     payload = {
         "project_id": args.project_id,
         "geometry": geometry,
-        "config": {"mode": args.mode},
+        "config": {"mode": args.mode, "precision": args.precision},
     }
+    if args.decision_only:
+        payload["config"]["decision_only"] = True
 
     # Run assessment
     try:
-        orc = EILOrchestrator()
-        result = orc.run_assessment(payload)
-    except FileNotFoundError as e:
+        result = _assess(payload, args)
+    except (FileNotFoundError, TimeoutError) as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
     except Exception as e:
@@ -0,0 +1,147 @@
+"""Sharing one computation between concurrent identical assessments.
+
+The eil-viz frontend and batch clients often send the same parcel twice at
+once: a double-click, or a retry after the proxy timed out a request that is
+still being computed. Each copy used to run the whole pipeline. Here, a
+request that arrives while an identical one is in flight waits on the same
+future instead, the way `health.DemProbe` shares its readability check.
+
+"Identical" means the same normalised geometry and the same config (see
+`fingerprint.geometry_digest` and `fingerprint.config_digest`). The project
+id is not part of the key: it is only echoed back, so each caller gets the
+shared result with its own id put back in.
+
+The key is registered when the first request arrives, before it waits for
+an admission slot (admission.py), so a duplicate of a queued request waits
+with it instead of taking a second queue place. Should the queued request
+be refused or its client leave before its turn, a waiting duplicate queues
+in its place.
+
+Callers may have different deadlines (deadline.py). The shared computation
+runs until the latest of them, or without one if any caller has none, and
+each caller waits only until its own, then gets DeadlineExceeded.
+
+Nothing is cached. The entry is dropped when its computation finishes, so
+a request that arrives afterwards computes afresh.
+"""
+import asyncio
+import math
+import time
+from typing import Any, AsyncContextManager, Callable, Optional
+
+from deadline import Deadline, DeadlineExceeded
+
+
+def request_key(geometry: dict, config: Optional[dict]) -> str:
+    """Coalescing key of an assessment: normalised geometry plus config."""
+    # Imported here: geometry_digest loads shapely, and api.py must stay
+    # cheap to import (bench_startup.py).
+    from fingerprint import config_digest, geometry_digest
+
+    return f"{geometry_digest(geometry)}:{config_digest(config)}"
+
+
+class _NotAdmitted(Exception):
+    """The leader's admission failed before the computation started."""
+
+    def __init__(self, reason: BaseException):
+        super().__init__(str(reason))
+        self.reason = reason
+
+
+class Coalescer:
+    """Runs a function in the default executor once per key in flight."""
+
+    def __init__(self):
+        # key -> (the shared computation, its deadline)
+        self._inflight: dict[str, tuple[asyncio.Future, Deadline]] = {}
+        self.computed = 0  # computations started
+        self.shared = 0    # callers that joined one already in flight
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._inflight
+
+    def metrics(self) -> dict:
+        return {"inflight": self.inflight(), "computed": self.computed, "shared": self.shared}
+
+    async def run(self, key: str, fn: Callable[..., Any], *args,
+                  admit: Optional[Callable[[], AsyncContextManager]] = None,
+                  deadline: Optional[Deadline] = None) -> Any:
+        """``fn(*args, shared_deadline)`` in a worker thread, or the in-flight
+        call for ``key``.
+
+        The first caller for a key runs ``fn`` inside ``admit()``, e.g. an
+        admission slot; callers that join it do not. If ``admit()`` raises,
+        the first caller gets the error and a joiner runs ``admit()`` itself.
+
+        ``shared_deadline`` is pushed back to each caller's ``deadline`` as
+        it joins. A caller whose own deadline passes first gets
+        DeadlineExceeded, naming the last stage the computation checked.
+
+        Every caller gets the same return value or exception, so callers
+        must not mutate it.
+        """
+        expires_at = deadline.expires_at if deadline is not None else math.inf
+        while (entry := self._inflight.get(key)) is not None:
+            shared, shared_deadline = entry
+            shared_deadline.expires_at = max(shared_deadline.expires_at, expires_at)
+            self.shared += 1
+            try:
+                return await self._wait(shared, shared_deadline, deadline)
+            except _NotAdmitted:
+                self.shared -= 1
+            except DeadlineExceeded:
+                if time.monotonic() > expires_at:
+                    raise
+                # It gave up just before this caller pushed its deadline back.
+                self.shared -= 1
+
+        shared_deadline = Deadline(expires_at)
+        shared = asyncio.ensure_future(self._compute(admit, fn, args, shared_deadline))
+        self._inflight[key] = (shared, shared_deadline)
+        shared.add_done_callback(lambda done: self._forget(key, done))
+        try:
+            return await self._wait(shared, shared_deadline, deadline)
+        except _NotAdmitted as e:
+            raise e.reason from None
+
+    @staticmethod
+    async def _wait(shared: asyncio.Future, shared_deadline: Deadline,
+                    deadline: Optional[Deadline]) -> Any:
+        # shield() so a caller that goes away (a client disconnect cancels its
+        # handler, or its deadline passes) does not cancel the computation
+        # the others are waiting on.
+        if deadline is None:
+            return await asyncio.shield(shared)
+        try:
+            return await asyncio.wait_for(asyncio.shield(shared), deadline.remaining())
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(shared_deadline.stage or "queue") from None
+
+    async def _compute(self, admit, fn, args, deadline: Deadline) -> Any:
+        loop = asyncio.get_running_loop()
+        if admit is None:
+            self.computed += 1
+            return await loop.run_in_executor(None, fn, *args, deadline)
+        admitted = False
+        try:
+            async with admit():
+                # Every caller may have given up while it queued.
+                deadline.check("queue")
+                admitted = True
+                self.computed += 1
+                return await loop.run_in_executor(None, fn, *args, deadline)
+        except Exception as e:
+            if admitted:
+                raise
+            raise _NotAdmitted(e) from e
+
+    def _forget(self, key: str, future: asyncio.Future) -> None:
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is future:
+            del self._inflight[key]
+        if not future.cancelled():
+            future.exception()  # retrieved, so an unawaited failure is not logged
@@ -0,0 +1,184 @@
+"""Columnar (Arrow / Parquet) export of batch and validation results.
+
+Analysing thousands of assessments from the JSON reports means parsing a
+nested document per parcel. With ``test_ground_truth.py --columnar
+PATH`` the harness also writes two flat tables:
+
+* PATH: one row per parcel. It holds the ids and ETag, statuses, slope metrics and
+  coverage fractions, the worst transect's ΔE, H and threat ratio, the
+  measured and predicted latency, and one ``<stage>_s`` column per pipeline
+  stage.
+* PATH with ``.transects`` before the suffix: one row per traced transect.
+  It holds the parcel key, the transect's rank (0 is the worst), its
+  metrics, and its path as two list columns, ``path_dist_m`` and
+  ``path_elev_m``.
+
+The suffix picks the format: ``.parquet``, or ``.arrow`` / ``.feather`` for
+an Arrow IPC file. Rows are buffered and written as one row group (record
+batch) every ``row_group_size`` parcels, so memory stays flat however long
+the run.
+
+pyarrow is an optional dependency (``pip install 'eil-calc[columnar]'``).
+It is imported only when a writer is opened.
+"""
+import math
+from pathlib import Path
+
+# Pipeline stages, in the order orchestrator.run_assessment times them.
+STAGES = ("fetch", "open", "reproject", "slope", "depositional", "phase_2")
+
+FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+
+_PARCEL_COLUMNS = (
+    [(name, "string") for name in (
+        "key", "parcel_id", "category", "data_source",
+        "slope_status", "depositional_status", "overall_status", "quadrant", "etag",
+    )]
+    + [(name, "float64") for name in (
+        "max_slope_deg", "avg_slope_deg", "susceptible_fraction", "flag_fraction",
+        "delta_e_m", "horizontal_distance_m", "threat_ratio",
+        "latency_s", "predicted_s",
+    )]
+    + [(f"{stage}_s", "float64") for stage in STAGES]
+    + [("cached", "bool"), ("error", "string")]
+)
+
+_TRANSECT_COLUMNS = [
+    ("key", "string"), ("parcel_id", "string"), ("rank", "int32"), ("status", "string"),
+    ("elevation_peak_m", "float64"), ("elevation_site_m", "float64"),
+    ("delta_e_m", "float64"), ("horizontal_distance_m", "float64"),
+    ("threat_ratio", "float64"),
+    ("path_dist_m", "list<float64>"), ("path_elev_m", "list<float64>"),
+]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError(
+            "Columnar export needs pyarrow, an optional dependency: "
+            "pip install 'eil-calc[columnar]' (or pip install pyarrow)"
+        ) from None
+    return pyarrow
+
+
+def transects_path(path: Path) -> Path:
+    """Where the transect table for parcel table ``path`` goes."""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.transects{path.suffix}")
+
+
+def threat_ratio(metrics: dict) -> float | None:
+    """3ΔE / H for depositional ``metrics``: above 1 is within the runout."""
+    if not metrics:
+        return None
+    required, h = metrics["required_runout_3x"], metrics["horizontal_distance_h"]
+    if h > 0:
+        return required / h
+    return math.inf if required > 0 else 0.0
+
+
+class _TableWriter:
+    """One output file, written a record batch at a time."""
+
+    def __init__(self, path: Path, columns: list[tuple[str, str]], row_group_size: int):
+        pa = _pyarrow()
+        types = {"string": pa.string(), "float64": pa.float64(), "int32": pa.int32(),
+                 "bool": pa.bool_(), "list<float64>": pa.list_(pa.float64())}
+        self._pa = pa
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self._buffer = {name: [] for name in self.schema.names}
+        if FORMATS[Path(path).suffix] == "parquet":
+            self._writer = pa.parquet.ParquetWriter(path, self.schema)
+        else:
+            self._writer = pa.ipc.new_file(path, self.schema)
+
+    def append(self, record: dict) -> None:
+        for name, values in self._buffer.items():
+            values.append(record.get(name))
+        self.rows += 1
+        if len(self._buffer["key"]) >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer["key"]:
+            return
+        # One call per flush: a Parquet row group, or an IPC record batch.
+        batch = self._pa.record_batch(list(self._buffer.values()), schema=self.schema)
+        self._writer.write_batch(batch)
+        for values in self._buffer.values():
+            values.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self._writer.close()
+
+
+class ColumnarWriter:
+    """Streams harness rows (test_ground_truth.assess_parcel) to the parcel
+    and transect tables. Use as a context manager, or call ``close()``."""
+
+    def __init__(self, path: Path, row_group_size: int = 1000):
+        path = Path(path)
+        if path.suffix not in FORMATS:
+            raise ValueError(f"{path}: columnar output must end in "
+                             f"{', '.join(FORMATS)}")
+        if row_group_size < 1:
+            raise ValueError(f"row_group_size must be >= 1, got {row_group_size!r}")
+        self.path = path
+        self.transects_path = transects_path(path)
+        self._parcels = _TableWriter(path, _PARCEL_COLUMNS, row_group_size)
+        try:
+            self._transects = _TableWriter(self.transects_path, _TRANSECT_COLUMNS,
+                                           row_group_size)
+        except BaseException:
+            self._parcels.close()
+            raise
+
+    @property
+    def parcels(self) -> int:
+        return self._parcels.rows
+
+    @property
+    def transects(self) -> int:
+        return self._transects.rows
+
+    def write(self, row: dict, transects: list[dict] = ()) -> None:
+        """One parcel's report row, and its depositional ``_viz_transects``."""
+        flat = {k: v for k, v in row.items() if not isinstance(v, dict)}
+        flat.update({f"{s}_s": t for s, t in (row.get("timings_s") or {}).items()})
+        flat["predicted_s"] = (row.get("cost_estimate") or {}).get("predicted_s")
+        self._parcels.append(flat)
+
+        for rank, transect in enumerate(transects):
+            metrics, path = transect["metrics"], transect["path"]
+            self._transects.append({
+                "key": row["key"],
+                "parcel_id": row["parcel_id"],
+                "rank": rank,
+                "status": transect["assessment"]["status"],
+                "elevation_peak_m": metrics["elevation_peak"],
+                "elevation_site_m": metrics["elevation_site"],
+                "delta_e_m": metrics["delta_e"],
+                "horizontal_distance_m": metrics["horizontal_distance_h"],
+                "threat_ratio": transect["threat_ratio"],
+                "path_dist_m": [p["dist_m"] for p in path],
+                "path_elev_m": [p["elev_m"] for p in path],
+            })
+
+    def close(self) -> None:
+        try:
+            self._parcels.close()
+        finally:
+            self._transects.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+EIL-Calc float32 vs float64 comparison.
+
+Runs every ground-truth parcel through the full pipeline twice — once with
+config {"precision": "float64"} (the reference) and once with "float32" — and
+reports what float32 changes:
+
+  * every parcel whose slope, depositional or overall status differs
+  * the largest absolute difference of each reported metric, and the parcel
+    it occurred on
+  * the median slope and depositional stage time for each precision
+
+Exit status is 1 if any classification changed, so the check can gate a
+deployment switching to float32.
+
+Usage:
+  python compare_precision.py
+  python compare_precision.py --store gt_store.sqlite --workers 8 --json precision.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from gt_store import GroundTruthStore, parse_bbox
+from orchestrator import EILOrchestrator
+from test_ground_truth import (
+    discover_parcels,
+    load_ledger,
+    parcel_geometry,
+    parcel_key,
+)
+
+PRECISIONS = ("float64", "float32")
+
+# (label, module key, metric key) for every scalar metric in the response.
+_METRICS = (
+    ("max_slope_degrees", "slope_stability", "max_slope_degrees"),
+    ("avg_slope_degrees", "slope_stability", "avg_slope_degrees"),
+    ("elevation_peak", "depositional_hazard", "elevation_peak"),
+    ("elevation_site", "depositional_hazard", "elevation_site"),
+    ("delta_e", "depositional_hazard", "delta_e"),
+    ("horizontal_distance_h", "depositional_hazard", "horizontal_distance_h"),
+)
+
+_STATUSES = ("slope", "depositional", "overall")
+
+# ── Per-parcel run (runs in the worker) ────────────────────────────────────
+
+_worker_orchestrator = None
+
+
+def _init_worker() -> None:
+    global _worker_orchestrator
+    _worker_orchestrator = EILOrchestrator(reuse_datasets=True)
+
+
+def _summarise(result: dict) -> dict:
+    p1 = result["phase_1_compliance"]
+    timings = result["diagnostics"]["timings_s"]
+    return {
+        "status": {
+            "slope": p1["slope_stability"].get("assessment", {}).get("status", "UNKNOWN"),
+            "depositional": p1["depositional_hazard"].get("assessment", {}).get("status", "UNKNOWN"),
+            "overall": p1["overall_status"],
+        },
+        "metrics": {
+            label: p1[module].get("metrics", {}).get(key)
+            for label, module, key in _METRICS
+        },
+        "seconds": {stage: timings[stage] for stage in ("slope", "depositional")},
+    }
+
+
+def compare_parcel(parcel: dict) -> dict:
+    """Both precisions for one parcel. Never raises."""
+    row = {"key": parcel_key(parcel), "error": None}
+    try:
+        geometry = parcel_geometry(parcel)
+        for precision in PRECISIONS:
+            result = _worker_orchestrator.run_assessment({
+                "project_id": row["key"],
+                "geometry": geometry,
+                "config": {"mode": "compliance", "precision": precision},
+            })
+            row[precision] = _summarise(result)
+    except Exception as exc:
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    return row
+
+
+def _run_all(parcels: list[dict], workers: int) -> list[dict]:
+    if workers <= 1:
+        _init_worker()
+        return [compare_parcel(p) for p in parcels]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(compare_parcel, parcels, chunksize=1))
+
+# ── Report ─────────────────────────────────────────────────────────────────
+
+def summarise(rows: list[dict]) -> dict:
+    """Classification changes, worst metric deltas and stage timings."""
+    ok = [r for r in rows if r["error"] is None]
+    changes = []
+    for r in ok:
+        ref, f32 = r["float64"]["status"], r["float32"]["status"]
+        changed = {s: [ref[s], f32[s]] for s in _STATUSES if ref[s] != f32[s]}
+        if changed:
+            changes.append({"key": r["key"], "changed": changed})
+
+    worst = {}
+    for label, _, _ in _METRICS:
+        best = {"abs_delta": 0.0, "key": None}
+        for r in ok:
+            a, b = r["float64"]["metrics"][label], r["float32"]["metrics"][label]
+            if a is None or b is None:
+                continue
+            delta = abs(b - a)
+            if delta > best["abs_delta"]:
+                best = {"abs_delta": delta, "key": r["key"]}
+        worst[label] = best
+
+    timings = {
+        precision: {
+            stage: statistics.median(r[precision]["seconds"][stage] for r in ok) if ok else None
+            for stage in ("slope", "depositional")
+        }
+        for precision in PRECISIONS
+    }
+    return {
+        "parcels": len(rows),
+        "crashed": [r["key"] for r in rows if r["error"] is not None],
+        "classification_changes": changes,
+        "max_abs_delta": worst,
+        "median_seconds": timings,
+    }
+
+
+def print_report(summary: dict) -> None:
+    print(f"\n  Parcels compared: {summary['parcels'] - len(summary['crashed'])}"
+          f" ({len(summary['crashed'])} crashed)")
+
+    changes = summary["classification_changes"]
+    print(f"\n  Classification changes (float64 -> float32): {len(changes)}")
+    for c in changes:
+        for stage, (ref, f32) in c["changed"].items():
+            print(f"    {c['key']:<40s} {stage:<13s} {ref} -> {f32}")
+
+    print("\n  Max |float32 - float64| per metric:")
+    for label, w in summary["max_abs_delta"].items():
+        print(f"    {label:<24s} {w['abs_delta']:>12.6f}  {w['key'] or '-'}")
+
+    print("\n  Median stage time:")
+    for precision, stages in summary["median_seconds"].items():
+        cells = "  ".join(
+            f"{stage} {s * 1000:7.1f} ms" if s is not None else f"{stage} -"
+            for stage, s in stages.items()
+        )
+        print(f"    {precision:<8s} {cells}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare float32 and float64 compute over the ground truth set",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--base-dir", default="tests/ground_truth", metavar="DIR")
+    parser.add_argument("--ledger", type=Path, metavar="CSV")
+    parser.add_argument("--store", type=Path, metavar="PATH")
+    parser.add_argument("--category", action="append", metavar="NAME")
+    parser.add_argument("--bbox", type=parse_bbox, metavar="MINX,MINY,MAXX,MAXY")
+    parser.add_argument("--workers", type=int, default=1, metavar="N")
+    parser.add_argument("--json", type=Path, dest="json_report", metavar="PATH",
+                        help="Write the summary and per-parcel rows as JSON.")
+    args = parser.parse_args()
+
+    categories = [c.lower() for c in args.category] if args.category else None
+    if args.store:
+        with GroundTruthStore(args.store) as gt:
+            parcels = gt.select(categories, args.bbox)
+    else:
+        parcels = load_ledger(args.ledger) if args.ledger else discover_parcels(Path(args.base_dir))
+        if categories:
+            parcels = [p for p in parcels if p["category"] in categories]
+
+    print(f"[precision] {len(parcels)} parcel(s), {args.workers} worker(s)")
+    rows = _run_all(parcels, args.workers)
+    for r in rows:
+        if r["error"]:
+            print(f"  [crash] {r['key']}: {r['error']}")
+
+    summary = summarise(rows)
+    print_report(summary)
+    if args.json_report:
+        with open(args.json_report, "w") as f:
+            json.dump({"summary": summary, "parcels": rows}, f, indent=2)
+        print(f"\n  Report written to {args.json_report}")
+
+    sys.exit(1 if summary["classification_changes"] else 0)
+
+
+if __name__ == "__main__":
+    main()
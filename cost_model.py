@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Predicted compute cost of one assessment, for shortest-job-first scheduling.
+
+A 50-hectare parcel ahead of dozens of 20 m lots makes every one of them wait
+for it. The schedulers (admission.py for the API, the ground-truth harness
+for batches) therefore order work by a predicted cost, from features known
+before any pixel is read:
+
+* the slope window: the parcel's bounding box plus the 500 m slope-unit
+  buffer, in DEM pixels. Smoothing, gradients and the watershed scale with it.
+* the runout window: the bounding box plus the 1 km search radius, in pixels.
+  Reading and masking the vicinity scale with it.
+* the boundary pixels: perimeter over pixel size. The uphill walker starts
+  one walk per boundary pixel, and this dominates the depositional check.
+
+predicted_s is a linear model of the three. Every assessment reports its estimate in
+``diagnostics.cost_estimate``, next to the measured ``timings_s``, so they
+can be refitted on real traffic:
+
+    python cost_model.py calibrate report.json [report.json ...]
+
+reads ground-truth harness JSON reports (``test_ground_truth.py --json``)
+and prints coefficients fitted to the measured latencies.
+
+Scheduling by cost alone would starve large parcels under a steady stream of
+small ones. Jobs are therefore ordered by ``arrival + weight × predicted_s``
+(see priority). A job is overtaken only by jobs that arrive less than
+``weight × predicted_s`` after it, so its wait is bounded.
+"""
+import argparse
+import json
+import math
+import sys
+
+# Pixel size assumed when the DEM is not yet known (the API schedules before
+# the fetcher picks one): IfSAR, the preferred source.
+NOMINAL_PIXEL_M = 5.0
+
+_SLOPE_BUFFER_M = 500.0
+_RUNOUT_BUFFER_M = 1000.0
+
+# predicted_s = sum(COEFFICIENTS[f] * feature f) + INTERCEPT_S
+# Fitted on the IfSAR fixture (44 parcels, 20 m to 700 m, median error 15%).
+# The fixture tile clips both windows, so their terms are set from the time
+# of the clipped reads; refit on a full DEM.
+COEFFICIENTS = {
+    "slope_window_px": 2e-7,
+    "runout_window_px": 5e-8,
+    "boundary_px": 1.7e-3,
+}
+INTERCEPT_S = 0.005
+
+_METRES_PER_DEGREE = 111320.0
+
+
+def features(geometry: dict, pixel_m: float = NOMINAL_PIXEL_M) -> dict:
+    """Cost features of a WGS84 GeoJSON geometry on a ``pixel_m`` DEM."""
+    # Imported here so api.py stays cheap to import (bench_startup.py).
+    import shapely
+    from shapely.geometry import shape
+
+    geom = shape(geometry)
+    # Local metres: longitude scaled by the cosine of the parcel's latitude.
+    kx = _METRES_PER_DEGREE * math.cos(math.radians(geom.centroid.y))
+    metric = shapely.transform(geom, lambda xy: xy * (kx, _METRES_PER_DEGREE))
+    minx, miny, maxx, maxy = metric.bounds
+    width, height = maxx - minx, maxy - miny
+
+    def window_px(buffer_m):
+        return (width + 2 * buffer_m) * (height + 2 * buffer_m) / pixel_m ** 2
+
+    return {
+        "area_m2": metric.area,
+        "perimeter_m": metric.length,
+        "pixel_m": pixel_m,
+        "slope_window_px": window_px(_SLOPE_BUFFER_M),
+        "runout_window_px": window_px(_RUNOUT_BUFFER_M),
+        "boundary_px": metric.length / pixel_m,
+    }
+
+
+def predict(feats: dict) -> float:
+    """Predicted seconds of compute for ``feats`` (see features)."""
+    return INTERCEPT_S + sum(c * feats[f] for f, c in COEFFICIENTS.items())
+
+
+def estimate(geometry: dict, pixel_m: float = NOMINAL_PIXEL_M) -> dict:
+    """features() plus ``predicted_s``: what diagnostics.cost_estimate reports."""
+    feats = features(geometry, pixel_m)
+    return feats | {"predicted_s": predict(feats)}
+
+
+def priority(arrival: float, predicted_s: float, weight: float) -> float:
+    """Scheduling key, lowest first: arrival time plus ``weight`` seconds of
+    queueing handicap per predicted second."""
+    return arrival + weight * predicted_s
+
+
+# ── Calibration ────────────────────────────────────────────────────────────
+
+def calibrate(rows: list[dict]) -> dict:
+    """Non-negative least-squares fit of the coefficients to measured latency.
+
+    ``rows`` are harness report rows carrying ``cost_estimate`` and
+    ``latency_s``. Returns the coefficients, the intercept and the fit's
+    median relative error.
+    """
+    import numpy as np
+    from scipy.optimize import nnls
+
+    usable = [r for r in rows if r.get("cost_estimate") and r.get("latency_s") is not None]
+    if len(usable) <= len(COEFFICIENTS):
+        raise ValueError(f"need more than {len(COEFFICIENTS)} assessed parcels, "
+                         f"got {len(usable)}")
+    names = list(COEFFICIENTS)
+    a = np.array([[r["cost_estimate"][f] for f in names] + [1.0] for r in usable])
+    b = np.array([r["latency_s"] for r in usable])
+    # Scale the columns so the solver sees comparable magnitudes.
+    scale = np.maximum(a.max(axis=0), 1e-12)
+    solution, _ = nnls(a / scale, b)
+    solution /= scale
+    fitted = a @ solution
+    return {
+        "coefficients": dict(zip(names, solution[:-1].tolist())),
+        "intercept_s": float(solution[-1]),
+        "parcels": len(usable),
+        "median_relative_error": float(np.median(np.abs(fitted - b) / np.maximum(b, 1e-9))),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="EIL-Calc assessment cost model")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cal = sub.add_parser("calibrate", help="Fit the coefficients to harness JSON reports.")
+    cal.add_argument("reports", nargs="+", help="test_ground_truth.py --json output")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for path in args.reports:
+        with open(path) as f:
+            rows += json.load(f)["parcels"].values()
+    try:
+        fit = calibrate(rows)
+    except ValueError as exc:
+        print(f"[cost-model] {exc}", file=sys.stderr)
+        return 1
+    print(f"[cost-model] fitted on {fit['parcels']} parcels, "
+          f"median relative error {fit['median_relative_error']:.1%}")
+    print("COEFFICIENTS = {")
+    for name, value in fit["coefficients"].items():
+        print(f'    "{name}": {value:.3g},')
+    print("}")
+    print(f"INTERCEPT_S = {fit['intercept_s']:.3g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Precomputed DEM coverage index.
+
+IfSAR does not cover the whole country. Without an index the gap is found
+only after the compute modules have read their windows and come back with
+"No valid elevation data". This module summarises a DEM's validity mask once,
+as a coarse bitmap with one cell per BLOCK×BLOCK pixels:
+
+  full — every pixel in the cell is valid
+  any  — at least one pixel in the cell is valid
+
+A DEM covers a parcel when every pixel under the parcel is valid and no
+cell of its search radius is entirely void. The engine tolerates scattered
+nodata in the search radius (radar shadow in steep terrain is common), so
+one void pixel a kilometre away must not send a lot to 30 m SRTM.
+
+Summed-area tables over ``~full`` and ``~any`` are built on load, so both
+questions are four array lookups each, constant time whatever the parcel
+size. Only where a cell under the parcel is partly valid are the few pixels
+under the parcel read from the DEM. SmartFetcher can thus pick IfSAR or SRTM
+per parcel without reading a window.
+
+The DEM is scanned in strips of BLOCK rows, so building the index for a
+nationwide file needs memory for one strip, not the whole raster.
+
+Usage:
+  python coverage_index.py build                     # every configured DEM
+  python coverage_index.py build /srv/eil-data/IfSAR_PH.tif --block 128
+"""
+
+import argparse
+import os
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from affine import Affine
+from rasterio.crs import CRS
+from rasterio.warp import transform_bounds
+from rasterio.windows import Window
+
+from dem_catalog import SEARCH_MARGIN_M, parcel_box
+from fingerprint import dem_identity
+from settings import get_settings
+
+DEFAULT_BLOCK = 256       # DEM pixels per index cell side (1.28 km on 5 m IfSAR)
+_INDEX_VERSION = 1
+
+
+def index_path(dem_path: str) -> Path:
+    """Where the index for ``dem_path`` lives.
+
+    Next to the DEM by default; under EIL_DEM_COVERAGE_DIR when the DEM sits
+    on a read-only mount.
+    """
+    directory = get_settings().dem_coverage_dir
+    name = Path(dem_path).name + ".coverage.npz"
+    return Path(directory) / name if directory else Path(dem_path).with_name(name)
+
+
+def build_index(dem_path: str, block: int = DEFAULT_BLOCK, out: Path | None = None) -> Path:
+    """Scan ``dem_path`` in strips and write its coverage index."""
+    out = out or index_path(dem_path)
+    with rasterio.open(dem_path) as src:
+        n_rows = -(-src.height // block)
+        n_cols = -(-src.width // block)
+        full = np.zeros((n_rows, n_cols), dtype=bool)
+        any_ = np.zeros((n_rows, n_cols), dtype=bool)
+        pad = n_cols * block - src.width
+
+        for r in range(n_rows):
+            window = Window(0, r * block, src.width, min(block, src.height - r * block))
+            valid = src.read_masks(1, window=window) > 0
+            if pad:
+                valid = np.pad(valid, ((0, 0), (0, pad)), constant_values=False)
+            cells = valid.reshape(valid.shape[0], n_cols, block)
+            full[r] = cells.all(axis=(0, 2))
+            any_[r] = cells.any(axis=(0, 2))
+
+        # Cells hanging off the raster edge are never fully valid. The padded
+        # columns already make that true on the right; the short last strip
+        # needs it set explicitly.
+        if src.height % block:
+            full[-1, :] = False
+
+        np.savez_compressed(
+            out,
+            version=_INDEX_VERSION,
+            full=full,
+            any=any_,
+            block=block,
+            transform=np.array(src.transform * Affine.scale(block))[:6],
+            crs=src.crs.to_wkt(),
+            dem=dem_identity(dem_path),
+        )
+    return out
+
+
+def _summed(mask: np.ndarray) -> np.ndarray:
+    # s[r, c] = number of True cells above and left of (r, c).
+    return np.pad(mask.astype(np.int64).cumsum(0).cumsum(1), ((1, 0), (1, 0)))
+
+
+def _span(transform: Affine, bounds) -> tuple[int, int, int, int]:
+    """(r0, r1, c0, c1), inclusive, of the grid cells ``bounds`` touches."""
+    minx, miny, maxx, maxy = bounds
+    inv = ~transform
+    cols, rows = zip(*(inv * (x, y) for x in (minx, maxx) for y in (miny, maxy)))
+    return (int(np.floor(min(rows))), int(np.floor(max(rows))),
+            int(np.floor(min(cols))), int(np.floor(max(cols))))
+
+
+class CoverageIndex:
+    """A loaded coverage index: O(1) "does this DEM cover the parcel?" queries."""
+
+    def __init__(self, full: np.ndarray, transform: Affine, crs, dem: str = "",
+                 any_: np.ndarray | None = None, block: int = DEFAULT_BLOCK):
+        self.full = full
+        self.any = full if any_ is None else any_
+        self.transform = transform
+        self.crs = crs
+        self.dem = dem
+        self.block = block
+        self._gaps = _summed(~full)      # cells with at least one void pixel
+        self._voids = _summed(~self.any)  # cells with no valid pixel at all
+
+    @classmethod
+    def load(cls, path) -> "CoverageIndex":
+        with np.load(path) as data:
+            if int(data["version"]) != _INDEX_VERSION:
+                raise ValueError(f"{path}: unsupported coverage index version")
+            return cls(
+                full=data["full"],
+                any_=data["any"],
+                block=int(data["block"]),
+                transform=Affine(*data["transform"]),
+                crs=CRS.from_wkt(str(data["crs"])),
+                dem=str(data["dem"]),
+            )
+
+    def _count(self, table: np.ndarray, span) -> int:
+        r0, r1, c0, c1 = span
+        return int(table[r1 + 1, c1 + 1] - table[r0, c1 + 1] - table[r1 + 1, c0] + table[r0, c0])
+
+    def _inside(self, span) -> bool:
+        r0, r1, c0, c1 = span
+        n_rows, n_cols = self.full.shape
+        return r0 >= 0 and c0 >= 0 and r1 < n_rows and c1 < n_cols
+
+    def covers(self, geometry, margin_m: float = SEARCH_MARGIN_M,
+               dem_path: str | None = None) -> bool:
+        """True if every DEM pixel under the parcel is valid and no index
+        cell within ``margin_m`` of it is entirely void.
+
+        ``geometry`` is a WGS84 GeoJSON geometry or (minx, miny, maxx, maxy).
+        Where a cell under the parcel is only partly valid, the pixels under
+        the parcel's box are read from ``dem_path``; without it such a
+        parcel is given the benefit of the doubt. A search radius reaching
+        past the raster edge is not covered.
+        """
+        search = _span(self.transform, transform_bounds(
+            "EPSG:4326", self.crs, *parcel_box(geometry, margin_m).bounds))
+        if not self._inside(search) or self._count(self._voids, search):
+            return False
+        parcel = transform_bounds("EPSG:4326", self.crs, *parcel_box(geometry, 0.0).bounds)
+        if self._count(self._gaps, _span(self.transform, parcel)) == 0 or dem_path is None:
+            return True
+        r0, r1, c0, c1 = _span(self.transform * Affine.scale(1 / self.block), parcel)
+        with rasterio.open(dem_path) as src:
+            if r1 >= src.height or c1 >= src.width:
+                return False
+            window = Window(c0, r0, c1 - c0 + 1, r1 - r0 + 1)
+            return bool((src.read_masks(1, window=window) > 0).all())
+
+
+@lru_cache(maxsize=32)
+def _load_cached(path: str, mtime_ns: int) -> CoverageIndex:
+    return CoverageIndex.load(path)
+
+
+def coverage_for(dem_path: str) -> CoverageIndex | None:
+    """The index for ``dem_path``, or None if none was built or it is stale.
+
+    A stale index (the DEM was replaced after it was built) is ignored rather
+    than trusted: the fetcher then behaves as it did without one.
+    """
+    path = index_path(dem_path)
+    try:
+        index = _load_cached(str(path), os.stat(path).st_mtime_ns)
+    except (FileNotFoundError, ValueError):
+        return None
+    try:
+        if index.dem != dem_identity(dem_path):
+            return None
+    except OSError:
+        return None
+    return index
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="EIL-Calc DEM coverage index",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="Scan DEMs and write their coverage indexes.")
+    p_build.add_argument("dems", nargs="*", metavar="DEM",
+                         help="DEM files (default: the configured IfSAR, SRTM and catalog tiles).")
+    p_build.add_argument("--block", type=int, default=DEFAULT_BLOCK, metavar="PX",
+                         help=f"DEM pixels per index cell side (default: {DEFAULT_BLOCK}).")
+    args = parser.parse_args(argv)
+
+    dems = args.dems
+    if not dems:
+        from smart_fetcher import SmartFetcher
+        fetcher = SmartFetcher()
+        dems = [p for p in (fetcher.ifsar_path, fetcher.srtm_path) if p]
+        if fetcher.catalog is not None:
+            dems += [t.path for t in fetcher.catalog.tiles]
+        dems = [p for p in dems if os.path.exists(p)]
+        if not dems:
+            parser.error("no DEM configured; pass DEM paths explicitly")
+
+    for dem in dems:
+        start = time.perf_counter()
+        out = build_index(dem, args.block)
+        index = CoverageIndex.load(out)
+        pct = 100.0 * index.full.mean()
+        void = 100.0 * (~index.any).mean()
+        print(f"[coverage] {dem}: {index.full.shape[1]}×{index.full.shape[0]} cells, "
+              f"{pct:.1f}% fully valid, {void:.1f}% void -> {out} "
+              f"({time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Per-request deadlines with cooperative checks in the compute loops.
+
+An assessment used to run to completion even after its caller had given up,
+so during an incident workers kept computing answers nobody would read. A
+caller can now give a deadline: the ``X-EIL-Deadline-Ms`` header, or
+``"config": {"deadline_ms": ...}``. The API resolves both when the request
+arrives, so time spent queued (admission.py) counts against either.
+
+Python cannot stop a thread from outside, so the compute code checks the
+deadline itself. It does so between pipeline stages, between the steps of
+the slope analysis, and every so often in the walker and stepper loops. An
+expired check raises DeadlineExceeded, which unwinds the assessment and
+names the stage that was running. The API answers it with 504.
+
+The numpy steps between two checks still run to completion, so a deadline
+is honoured to within one such step, typically well under a second.
+"""
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed while ``stage`` was running."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"deadline exceeded during {stage}")
+        self.stage = stage
+
+
+class Deadline:
+    """A point in time (time.monotonic) after which the work is abandoned."""
+
+    def __init__(self, expires_at: float):
+        self.expires_at = expires_at
+        # The last stage checked, to name where a waiting caller gave up.
+        self.stage: Optional[str] = None
+
+    @classmethod
+    def after_ms(cls, ms: float) -> "Deadline":
+        if isinstance(ms, bool) or not isinstance(ms, (int, float)) or not ms > 0:
+            raise ValueError(f"deadline_ms must be a positive number, got {ms!r}")
+        return cls(time.monotonic() + ms / 1000.0)
+
+    def remaining(self) -> float:
+        """Seconds left; negative once expired."""
+        return self.expires_at - time.monotonic()
+
+    def check(self, stage: str) -> None:
+        """Raise DeadlineExceeded(stage) if the deadline has passed."""
+        self.stage = stage
+        if time.monotonic() > self.expires_at:
+            raise DeadlineExceeded(stage)
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+
+def check(deadline: Optional[Deadline], stage: str) -> None:
+    """Deadline.check for an optional deadline; no deadline never expires."""
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def earliest(*deadlines: Optional[Deadline]) -> Optional[Deadline]:
+    """The soonest of the given deadlines, or None if there are none."""
+    given = [d for d in deadlines if d is not None]
+    return min(given, key=lambda d: d.expires_at) if given else None
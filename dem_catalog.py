@@ -0,0 +1,141 @@
+"""Tiled DEM catalog.
+
+Instead of one nationwide GeoTIFF per source, a deployment can describe a set
+of regional tiles — per-province IfSAR extracts, or hot regions copied to fast
+local SSD — in a JSON catalog:
+
+    {
+      "tiles": [
+        {"name": "benguet", "path": "ifsar/benguet.tif", "source": "ifsar",
+         "bounds": [120.4, 16.1, 120.95, 16.95]},
+        {"name": "bukidnon", "path": "/ssd/ifsar_bukidnon.tif", "source": "ifsar"}
+      ]
+    }
+
+``bounds`` are WGS84 (minx, miny, maxx, maxy); when omitted they are read from
+the file. Relative paths are resolved against the catalog's directory.
+
+A tile is only usable for a parcel if it covers the parcel *plus* the
+depositional search radius, otherwise the runout walker would hit the tile
+edge and under-report upslope sources. Footprints sit in an STRtree, so the
+lookup stays cheap with hundreds of tiles.
+"""
+import json
+import math
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+import rasterio
+from rasterio.warp import transform_bounds
+from shapely import STRtree, box
+from shapely.geometry import shape
+
+# Must match the search_buffer_meters the depositional module walks
+# (calculate_depositional_safety.trace_transects).
+SEARCH_MARGIN_M = 1000.0
+
+# Lower is preferred — IfSAR (5 m) over SRTM (30 m), anything else last.
+SOURCE_RANK = {"ifsar": 0, "srtm": 1}
+
+
+def source_rank(source: str) -> int:
+    return SOURCE_RANK.get(source, len(SOURCE_RANK))
+
+
+@dataclass(frozen=True)
+class DEMTile:
+    name: str
+    path: str
+    source: str
+    bounds: tuple[float, float, float, float]   # WGS84
+
+    @property
+    def label(self) -> str:
+        """data_source value for assessments that used this tile."""
+        return f"{self.source}:{self.name}"
+
+
+def _read_bounds(path: str) -> tuple[float, float, float, float]:
+    with rasterio.open(path) as src:
+        return tuple(transform_bounds(src.crs, "EPSG:4326", *src.bounds))
+
+
+def parcel_box(geometry, margin_m: float):
+    """WGS84 box around a GeoJSON geometry or (minx, miny, maxx, maxy), grown
+    by ``margin_m`` metres on every side."""
+    if isinstance(geometry, dict):
+        minx, miny, maxx, maxy = shape(geometry).bounds
+    else:
+        minx, miny, maxx, maxy = geometry
+    dlat = margin_m / 111320.0
+    dlon = margin_m / (111320.0 * max(math.cos(math.radians((miny + maxy) / 2)), 1e-6))
+    return box(minx - dlon, miny - dlat, maxx + dlon, maxy + dlat)
+
+
+class DEMCatalog:
+    """Regional DEM tiles indexed by footprint."""
+
+    def __init__(self, tiles: list[DEMTile]):
+        self.tiles = tiles
+        self._footprints = [box(*t.bounds) for t in tiles]
+        self._tree = STRtree(self._footprints)
+
+    @classmethod
+    def from_file(cls, path) -> "DEMCatalog":
+        path = Path(path)
+        with open(path) as f:
+            entries = json.load(f)["tiles"]
+        tiles = []
+        for entry in entries:
+            tile_path = Path(entry["path"])
+            if not tile_path.is_absolute():
+                tile_path = path.parent / tile_path
+            bounds = entry.get("bounds")
+            if bounds is None:
+                bounds = _read_bounds(str(tile_path))
+            tiles.append(DEMTile(
+                name=entry.get("name") or tile_path.stem,
+                path=str(tile_path),
+                source=entry.get("source", "ifsar"),
+                bounds=tuple(bounds),
+            ))
+        return cls(tiles)
+
+    def covering(self, geometry, margin_m: float = SEARCH_MARGIN_M) -> list[DEMTile]:
+        """Tiles on disk that contain the parcel plus ``margin_m``, best first:
+        preferred source, then smallest footprint."""
+        need = parcel_box(geometry, margin_m)
+        hits = self._tree.query(need, predicate="within")
+        tiles = [(self.tiles[i], self._footprints[i].area) for i in hits]
+        tiles = [(t, a) for t, a in tiles if os.path.exists(t.path)]
+        tiles.sort(key=lambda ta: (source_rank(ta[0].source), ta[1]))
+        return [t for t, _ in tiles]
+
+    def best_partial(self, geometry, margin_m: float = SEARCH_MARGIN_M) -> DEMTile | None:
+        """At a seam no single tile covers the search area. Return the tile on
+        disk that contains the parcel itself and overlaps most of the search
+        area, or None if the parcel is outside every tile."""
+        need = parcel_box(geometry, margin_m)
+        parcel = parcel_box(geometry, 0.0)
+        best, best_key = None, None
+        for i in self._tree.query(parcel, predicate="within"):
+            tile = self.tiles[i]
+            if not os.path.exists(tile.path):
+                continue
+            key = (source_rank(tile.source), -self._footprints[i].intersection(need).area)
+            if best_key is None or key < best_key:
+                best, best_key = tile, key
+        return best
+
+    def any_tile(self) -> DEMTile | None:
+        """Preferred tile on disk — what a bounds-less lookup reports."""
+        on_disk = [t for t in self.tiles if os.path.exists(t.path)]
+        return min(on_disk, key=lambda t: source_rank(t.source), default=None)
+
+
+@lru_cache
+def load_catalog(path: str, mtime_ns: int) -> DEMCatalog:
+    """Parsed catalog, cached per file version (callers pass the mtime)."""
+    return DEMCatalog.from_file(path)
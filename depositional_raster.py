@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+EIL-Calc depositional threat raster.
+
+compute_depositional_safety answers for one parcel: it climbs from the lot's
+boundary to the peaks above it, then steps each peak's steepest-descent path
+back down, and calls the lot PRONE if some path reaches it within
+H <= 3·ΔE. This module answers the same question for every cell of a region
+in one pass, so a parcel's status becomes a zonal lookup.
+
+Along a path, 3·ΔE − H = (3·E_peak − H) − 3·E_site. The first term depends
+only on the path, not on the lot, so it can be propagated down the D8
+steepest-descent graph (the Downhill Stepper's own step rule) ahead of time:
+
+    A(c) = max over donors d of  max(3·E_d if d is a peak, A(d)) − dist(d, c)
+
+where a peak is a cell with no strictly higher neighbour. Every donor lies
+above its receiver, so the graph is a forest draining to pits and A settles
+level by level: the cells with no donors first, then every cell whose donors
+are all settled, each level as one vectorised step. For a parcel, the worst
+path then gives
+
+    threat = max A over the parcel's boundary pixels − 3·E_site
+
+and the parcel is PRONE when threat >= 0. A descent that pools in a pit short
+of the lot is closed by the engine with the straight line from the pit to the
+site; the lookup does the same for every pit in the lot's 1 km vicinity,
+taking A at the pit minus that distance. The raster stores A (band 1), the
+elevation (band 2) and A at pits only (band 3), so the lookup needs nothing
+else.
+
+The raster is built in square chunks, each read with a HALO_METRES halo and
+written without it, so memory is bounded by the chunk rather than the region.
+A chunk's A counts every descent path that starts within the halo. The
+engine's paths for a lot stay inside the lot's 1 km vicinity, so a 3 km halo
+holds all of them for lots up to 1 km across, at boundary pixels and pits
+alike. Cells at the edge of a read may look like peaks because their higher
+neighbour was not read. That only adds paths, i.e. conservatism.
+
+This is a screening surface, not the certifying engine, and it is more
+conservative than it:
+
+  * every peak whose descent reaches the lot or a pit near it counts, not
+    only those the Uphill Walker climbs to from the boundary;
+  * the 30 m minimum runout and 50 m peak distance filters are not applied;
+  * paths that cross the lot before reaching a boundary pixel also count.
+
+So a raster SAFE should mean an engine SAFE, while a raster PRONE still
+needs the engine. `validate` counts both kinds of disagreement on the
+ground truth. On random lots over the IfSAR fixture no engine-PRONE lot was
+missed; about three in four engine-SAFE lots were flagged.
+
+Usage:
+  python depositional_raster.py build --dem IfSAR_PH.tif --output threat.tif --bbox 124.8,8.0,125.0,8.2
+  python depositional_raster.py build --dem IfSAR_PH.tif --output threat.tif --chunk-px 512
+  python depositional_raster.py validate --raster threat.tif --store gt_store.sqlite --json threat.json
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+import rasterio
+import rasterio.features
+import rasterio.warp
+from rasterio.windows import Window, from_bounds
+from shapely.geometry import box, shape
+from shapely.geometry.base import BaseGeometry
+
+from pyproj import Geod
+
+import large_parcel
+from calculate_depositional_safety import (
+    DIRECTIONS,
+    flow_directions,
+    get_boundary_pixels,
+)
+from eil_status import RUNOUT_RATIO
+from gt_store import GroundTruthStore, parse_bbox
+
+# The engine's default search radius (compute_depositional_safety).
+SEARCH_BUFFER_METRES = 1000
+
+# Halo read around each chunk: the search radius on both sides of a lot up to
+# 1 km across (see the module docstring).
+HALO_METRES = 3 * SEARCH_BUFFER_METRES
+
+# Chunk side in pixels. With 5 m IfSAR the read is (1024 + 2·600)² ≈ 5 M cells,
+# ~0.5 GB at peak; --chunk-px trades memory for halo re-reads.
+DEFAULT_CHUNK_PX = 1024
+
+_BLOCK = 256
+
+# ── Dynamic programme ──────────────────────────────────────────────────────
+
+def step_lengths(shape_rc: tuple[int, int], transform, crs) -> tuple[np.ndarray, float]:
+    """(x step per row, y step) in metres; x shrinks with latitude in degrees."""
+    px, py = abs(transform.a), abs(transform.e)
+    if crs and crs.is_geographic:
+        rows = np.arange(shape_rc[0]) + 0.5
+        lat = transform.f + rows * transform.e
+        return px * 111320.0 * np.cos(np.radians(lat)), py * 111320.0
+    return np.full(shape_rc[0], px), py
+
+
+def runout_potential(elevations: np.ndarray, transform, crs) -> tuple[np.ndarray, np.ndarray]:
+    """A = max over peaks upslope of (3·E_peak − H), per cell; -inf if none.
+
+    ``elevations`` has nodata as NaN. H follows the Downhill Stepper's step
+    rule (flow_directions) and is measured in metres.
+
+    Returns:
+        (A, pits) where ``pits`` marks valid cells with no lower neighbour.
+    """
+    rows, cols = elevations.shape
+    uphill, downhill = flow_directions(elevations)
+    flat = elevations.ravel()
+    valid = ~np.isnan(flat)
+
+    k = downhill.ravel().astype(np.intp)
+    moves = k >= 0
+    offsets = np.array(DIRECTIONS)
+    index = np.arange(flat.size)
+    successor = np.full(flat.size, -1, dtype=np.intp)
+    successor[moves] = index[moves] + offsets[k[moves], 0] * cols + offsets[k[moves], 1]
+
+    dx_rows, dy = step_lengths(elevations.shape, transform, crs)
+    dx = np.repeat(dx_rows, cols)
+    step = np.hypot(np.abs(offsets[k, 1]) * dx, np.abs(offsets[k, 0]) * dy)
+
+    peak = valid & (uphill.ravel() < 0)
+    seed = np.where(peak, RUNOUT_RATIO * flat.astype(np.float64), -np.inf)
+    pits = (valid & ~moves).reshape(rows, cols)
+    return _propagate(seed, successor, step).reshape(rows, cols), pits
+
+
+def _propagate(seed: np.ndarray, successor: np.ndarray, step: np.ndarray) -> np.ndarray:
+    """A over the successor forest, one level of settled cells at a time.
+
+    A cell is settled once all its donors are; it then passes
+    max(seed, A) − step to its successor. Each level is a handful of array
+    operations, and there are as many levels as the longest descent path has
+    steps.
+    """
+    potential = np.full(seed.size, -np.inf)
+    moves = successor >= 0
+    pending = np.bincount(successor[moves], minlength=seed.size)
+    slot = np.empty(seed.size, dtype=np.intp)
+    level = np.flatnonzero((pending == 0) & moves)
+    while level.size:
+        carried = np.maximum(potential[level], seed[level])
+        reached = carried > -np.inf
+        targets = successor[level]
+        np.maximum.at(potential, targets[reached], carried[reached] - step[level[reached]])
+        np.subtract.at(pending, targets, 1)
+        ready = targets[(pending[targets] == 0) & moves[targets]]
+        # A cell whose last donors settle together appears once per donor;
+        # keep the entry that wins the scatter (cheaper than np.unique).
+        order = np.arange(ready.size)
+        slot[ready] = order
+        level = ready[slot[ready] == order]
+    return potential
+
+
+def parcel_threat(geometry: BaseGeometry, potential: np.ndarray, pit_potential: np.ndarray,
+                  elevations: np.ndarray, transform, crs, search_buffer: float) -> dict:
+    """Zonal lookup: worst 3·ΔE − H (metres) for a parcel in the grids' CRS.
+
+    The grids (A, A at pits with -inf elsewhere, elevations) must cover the
+    parcel buffered by ``search_buffer`` (CRS units), its vicinity. Returns {"threat_m", "elevation_site", "status"} or
+    {"error": ...}.
+    """
+    inside = rasterio.features.geometry_mask(
+        [geometry], out_shape=elevations.shape, transform=transform, invert=True
+    )
+    site = np.where(inside & ~np.isnan(elevations), elevations, np.inf)
+    site_idx = np.unravel_index(np.argmin(site), site.shape)
+    if not np.isfinite(site[site_idx]):
+        return {"error": "No valid elevation data found inside parcel geometry"}
+    elev_site = float(site[site_idx])
+    boundary = get_boundary_pixels(inside)
+    worst = float(potential[boundary[:, 0], boundary[:, 1]].max())
+
+    # Trapped closure: pits in the vicinity, closed by a straight line to the site.
+    vicinity = rasterio.features.geometry_mask(
+        [geometry.buffer(search_buffer)], out_shape=elevations.shape, transform=transform, invert=True
+    )
+    pit_r, pit_c = np.nonzero(vicinity & ~inside & np.isfinite(pit_potential))
+    if pit_r.size:
+        site_x, site_y = rasterio.transform.xy(transform, *site_idx)
+        xs, ys = (np.asarray(v) for v in rasterio.transform.xy(transform, pit_r, pit_c))
+        if crs and crs.is_geographic:
+            _, _, dist = Geod(ellps="WGS84").inv(xs, ys, np.full_like(xs, site_x),
+                                                 np.full_like(ys, site_y))
+        else:
+            dist = np.hypot(xs - site_x, ys - site_y)
+        worst = max(worst, float((pit_potential[pit_r, pit_c] - dist).max()))
+
+    threat = worst - RUNOUT_RATIO * elev_site
+    status = "PRONE (Within Runout Zone)" if threat >= 0 else "SAFE (Beyond Runout)"
+    return {"threat_m": threat if math.isfinite(threat) else None,
+            "elevation_site": elev_site, "status": status}
+
+# ── Raster file ────────────────────────────────────────────────────────────
+
+def _read_elevations(dataset, window: Window) -> np.ndarray:
+    band = dataset.read(1, window=window, masked=True)
+    elevations = band.data.astype(np.float64)
+    elevations[np.ma.getmaskarray(band)] = np.nan
+    return elevations
+
+
+def build_raster(dem: str, output: str, bbox=None, chunk_px: int = DEFAULT_CHUNK_PX,
+                 halo_metres: float = HALO_METRES) -> dict:
+    """Compute A over ``dem`` (or ``bbox`` of it, in the DEM's CRS) and write
+    it, the elevations and A at pits as a three-band tiled float32 GeoTIFF.
+
+    Works chunk by chunk: each ``chunk_px`` square is computed from a read
+    grown by ``halo_metres`` (beyond the bbox too, as runout paths may start
+    outside it) and only its own cells are written.
+    """
+    with rasterio.open(dem) as dataset:
+        full = Window(0, 0, dataset.width, dataset.height)
+        window = full
+        if bbox is not None:
+            window = from_bounds(*bbox, transform=dataset.transform).round_offsets() \
+                .round_lengths().intersection(full)
+        transform = dataset.window_transform(window)
+        profile = dataset.profile
+        halo = large_parcel.halo_pixels(dataset, large_parcel.metres_to_crs(
+            dataset, box(*dataset.window_bounds(window)), halo_metres))
+        profile.update(
+            driver="GTiff", dtype="float32", count=3, nodata=np.nan,
+            width=int(window.width), height=int(window.height), transform=transform,
+            tiled=True, blockxsize=_BLOCK, blockysize=_BLOCK, compress="deflate",
+        )
+        cells = reached = 0
+        row0, col0 = int(window.row_off), int(window.col_off)
+        with rasterio.open(output, "w", **profile) as dst:
+            dst.set_band_description(1, "runout potential max(3*E_peak - H), m")
+            dst.set_band_description(2, "elevation, m")
+            dst.set_band_description(3, "runout potential at pits, m")
+            for r in range(row0, row0 + int(window.height), chunk_px):
+                for c in range(col0, col0 + int(window.width), chunk_px):
+                    inner = Window(c, r, min(chunk_px, col0 + int(window.width) - c),
+                                   min(chunk_px, row0 + int(window.height) - r))
+                    outer = Window(c - halo, r - halo, inner.width + 2 * halo,
+                                   inner.height + 2 * halo).intersection(full)
+                    elevations = _read_elevations(dataset, outer)
+                    potential, pits = runout_potential(
+                        elevations, dataset.window_transform(outer), dataset.crs)
+                    own = np.s_[r - outer.row_off:r - outer.row_off + inner.height,
+                                c - outer.col_off:c - outer.col_off + inner.width]
+                    potential, pits, elevations = potential[own], pits[own], elevations[own]
+                    finite = np.where(np.isfinite(potential), potential, np.nan)
+                    out = Window(c - col0, r - row0, inner.width, inner.height)
+                    dst.write(finite.astype("float32"), 1, window=out)
+                    dst.write(elevations.astype("float32"), 2, window=out)
+                    dst.write(np.where(pits, finite, np.nan).astype("float32"), 3, window=out)
+                    cells += potential.size
+                    reached += int(np.isfinite(potential).sum())
+    return {"cells": cells, "reached": reached}
+
+
+def lookup(raster, geometry: BaseGeometry,
+           search_buffer_meters: float = SEARCH_BUFFER_METRES) -> dict:
+    """parcel_threat for ``geometry`` (raster CRS) read from an open threat raster."""
+    buffer = large_parcel.metres_to_crs(raster, geometry, search_buffer_meters)
+    window = rasterio.features.geometry_window(raster, [geometry.buffer(buffer)])
+    potential, elevations, pit_potential = raster.read(window=window).astype(np.float64)
+    potential[np.isnan(potential)] = -np.inf
+    pit_potential[np.isnan(pit_potential)] = -np.inf
+    return parcel_threat(geometry, potential, pit_potential, elevations,
+                         raster.window_transform(window), raster.crs, buffer)
+
+# ── Validation against the per-parcel engine ───────────────────────────────
+
+def validate(raster_path: str, parcels: list[dict]) -> dict:
+    """Per-parcel engine status vs raster lookup over ``parcels``."""
+    from orchestrator import EILOrchestrator
+    from test_ground_truth import parcel_geometry, parcel_key
+
+    orchestrator = EILOrchestrator(reuse_datasets=True)
+    rows = []
+    with rasterio.open(raster_path) as raster:
+        for parcel in parcels:
+            row = {"key": parcel_key(parcel), "error": None}
+            try:
+                geometry = parcel_geometry(parcel)
+                result = orchestrator.run_assessment({
+                    "project_id": row["key"], "geometry": geometry,
+                    "config": {"mode": "compliance"},
+                })
+                engine = result["phase_1_compliance"]["depositional_hazard"]
+                row["engine"] = engine.get("assessment", {}).get("status", "UNKNOWN")
+                local = shape(rasterio.warp.transform_geom("EPSG:4326", raster.crs, geometry))
+                looked_up = lookup(raster, local)
+                row["raster"] = looked_up.get("status", "UNKNOWN")
+                row["threat_m"] = looked_up.get("threat_m")
+            except Exception as exc:
+                row["error"] = f"{type(exc).__name__}: {exc}"
+            rows.append(row)
+
+    ok = [r for r in rows if r["error"] is None]
+    prone = lambda status: status.startswith("PRONE")  # noqa: E731
+    confusion = {
+        "both_prone": sum(prone(r["engine"]) and prone(r["raster"]) for r in ok),
+        "both_safe": sum(not prone(r["engine"]) and not prone(r["raster"]) for r in ok),
+        "raster_only_prone": sum(not prone(r["engine"]) and prone(r["raster"]) for r in ok),
+        "engine_only_prone": sum(prone(r["engine"]) and not prone(r["raster"]) for r in ok),
+    }
+    agree = confusion["both_prone"] + confusion["both_safe"]
+    return {
+        "parcels": len(rows),
+        "crashed": [r["key"] for r in rows if r["error"] is not None],
+        "confusion": confusion,
+        "agreement": agree / len(ok) if ok else None,
+        "disagreements": [r for r in ok if prone(r["engine"]) != prone(r["raster"])],
+        "rows": rows,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="EIL-Calc depositional threat raster",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="Compute the threat raster over a DEM.")
+    p_build.add_argument("--dem", required=True, metavar="PATH")
+    p_build.add_argument("--output", required=True, metavar="PATH")
+    p_build.add_argument("--bbox", type=parse_bbox, metavar="MINX,MINY,MAXX,MAXY",
+                         help="Area in the DEM's CRS (default: the whole DEM).")
+    p_build.add_argument("--chunk-px", type=int, default=DEFAULT_CHUNK_PX, dest="chunk_px",
+                         metavar="N", help=f"Chunk side in pixels (default: {DEFAULT_CHUNK_PX}).")
+
+    p_val = sub.add_parser("validate", help="Compare lookups with compute_depositional_safety.")
+    p_val.add_argument("--raster", required=True, metavar="PATH")
+    p_val.add_argument("--base-dir", default="tests/ground_truth", metavar="DIR")
+    p_val.add_argument("--ledger", type=Path, metavar="CSV")
+    p_val.add_argument("--store", type=Path, metavar="PATH")
+    p_val.add_argument("--json", type=Path, dest="json_report", metavar="PATH")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        summary = build_raster(args.dem, args.output, args.bbox, args.chunk_px)
+        print(f"[threat] {summary['cells']} cells, {summary['reached']} reached by a runout path")
+        print(f"  Written to {args.output}")
+        return
+
+    from test_ground_truth import discover_parcels, load_ledger
+
+    if args.store:
+        with GroundTruthStore(args.store) as gt:
+            parcels = gt.select(None, None)
+    else:
+        parcels = load_ledger(args.ledger) if args.ledger else discover_parcels(Path(args.base_dir))
+    print(f"[threat] validating {len(parcels)} parcel(s) against {args.raster}")
+    report = validate(args.raster, parcels)
+    for key in report["crashed"]:
+        print(f"  [crash] {key}")
+    c = report["confusion"]
+    print(f"\n  engine PRONE / raster PRONE : {c['both_prone']}")
+    print(f"  engine SAFE  / raster SAFE  : {c['both_safe']}")
+    print(f"  engine SAFE  / raster PRONE : {c['raster_only_prone']}")
+    print(f"  engine PRONE / raster SAFE  : {c['engine_only_prone']}")
+    if report["agreement"] is not None:
+        print(f"\n  Agreement: {report['agreement']:.1%}")
+    for r in report["disagreements"]:
+        threat = "-" if r["threat_m"] is None else f"{r['threat_m']:+.1f} m"
+        print(f"    {r['key']:<40s} engine {r['engine']:<28s} raster {threat}")
+    if args.json_report:
+        with open(args.json_report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n  Report written to {args.json_report}")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
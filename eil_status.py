@@ -3,6 +3,15 @@ from enum import Enum
 SLOPE_THRESHOLD_FLAG = 14.0
 SLOPE_THRESHOLD_SUSCEPTIBLE = 16.0
 
+# Fraction of the parcel's slope pixels that must exceed the degree thresholds
+# above before the parcel is SUSCEPTIBLE / FLAG FOR REVIEW.
+COVERAGE_FRACTION_SUSCEPTIBLE = 0.015
+COVERAGE_FRACTION_FLAG = 0.10
+
+# A runout path is SAFE only if its horizontal reach H exceeds this multiple of
+# its fall height ΔE.
+RUNOUT_RATIO = 3.0
+
 
 class SlopeStatus(str, Enum):
     SAFE = "SAFE"
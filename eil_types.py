@@ -3,9 +3,12 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Optional, TypedDict
 
+import numpy as np
 import rasterio
 from shapely.geometry.base import BaseGeometry
 
+from deadline import Deadline
+
 
 # ---------------------------------------------------------------------------
 # Output contracts
@@ -14,6 +17,10 @@ from shapely.geometry.base import BaseGeometry
 class SlopeMetrics(TypedDict):
     max_slope_degrees: float
     avg_slope_degrees: float
+    # Fractions of the site's slope pixels above 16° and in (14°, 16°], the
+    # coverage the status is classified on (eil_status).
+    susceptible_fraction: float
+    flag_fraction: float
 
 
 class SlopeAssessment(TypedDict):
@@ -48,6 +55,89 @@ class DepositionalResult(TypedDict):
 
 
 
+# ---------------------------------------------------------------------------
+# Compute options
+# ---------------------------------------------------------------------------
+
+PRECISIONS = ("float64", "float32")
+SLOPE_KERNELS = ("gradient", "dog")
+
+
+@dataclass(frozen=True)
+class ComputeOptions:
+    """Per-assessment knobs for the compute modules, read from payload config.
+
+    ``precision`` is the dtype elevations are held in from the DEM read through
+    smoothing, gradients and runout tracing. float32 halves the memory traffic
+    of every full-window temporary; float64 is the reference. Run
+    compare_precision.py over the ground truth set before switching a
+    deployment to float32.
+
+    ``slope_kernel`` picks how the smoothed surface is differentiated:
+    "gradient" (np.gradient over the whole buffered window, the reference) or
+    "dog" (derivative-of-Gaussian on the parcel's bounding box only; see
+    slope_stability._dog_slope for the tolerance).
+
+    ``decision_only`` is for batch screening: the depositional check stops at
+    the first PRONE transect, records no transect paths and returns only the
+    status and deciding metrics, with ``_viz_transects`` empty. The status is
+    the same as a full run's.
+
+    ``deadline`` (see deadline.py) is checked cooperatively by the compute
+    loops, which raise DeadlineExceeded once it has passed. It is not part
+    of what the options compare equal on.
+    """
+
+    precision: str = "float64"
+    slope_kernel: str = "gradient"
+    # Peak-memory cap for one module's DEM window; above it the parcel is
+    # processed in tiles (large_parcel.py). None never tiles.
+    max_window_mb: Optional[float] = None
+    decision_only: bool = False
+    deadline: Optional[Deadline] = field(default=None, compare=False)
+
+    def __post_init__(self):
+        if self.precision not in PRECISIONS:
+            raise ValueError(
+                f"precision must be one of {', '.join(PRECISIONS)}, got {self.precision!r}"
+            )
+        if self.slope_kernel not in SLOPE_KERNELS:
+            raise ValueError(
+                f"slope_kernel must be one of {', '.join(SLOPE_KERNELS)}, "
+                f"got {self.slope_kernel!r}"
+            )
+        if self.max_window_mb is not None and not self.max_window_mb > 0:
+            raise ValueError(f"max_window_mb must be positive, got {self.max_window_mb!r}")
+        if not isinstance(self.decision_only, bool):
+            raise ValueError(f"decision_only must be true or false, got {self.decision_only!r}")
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(self.precision)
+
+    @classmethod
+    def from_config(cls, config: dict | None,
+                    max_window_mb: Optional[float] = None,
+                    deadline: Optional[Deadline] = None) -> ComputeOptions:
+        """Options from a payload's ``config``; ``max_window_mb`` is the
+        deployment default (settings.compute_max_window_mb) it may override.
+        ``deadline`` is the caller's, already resolved: the API combines
+        its header with ``deadline_ms`` on arrival. Without one, a config
+        ``deadline_ms`` is counted from now."""
+        config = config or {}
+        if "deadline_ms" in config:
+            own = Deadline.after_ms(config["deadline_ms"])  # validated either way
+            if deadline is None:
+                deadline = own
+        return cls(
+            precision=config.get("precision", "float64"),
+            slope_kernel=config.get("slope_kernel", "gradient"),
+            max_window_mb=config.get("max_window_mb", max_window_mb),
+            decision_only=config.get("decision_only", False),
+            deadline=deadline,
+        )
+
+
 # ---------------------------------------------------------------------------
 # DEM context
 # ---------------------------------------------------------------------------
@@ -63,5 +153,6 @@ class DEMContext:
 
     dataset: rasterio.io.DatasetReader
     geometry: BaseGeometry        # already reprojected to dataset.crs
-    source_type: str              # 'ifsar' | 'srtm' | 'local_override'
+    source_type: str              # 'ifsar' | 'srtm' | 'local_override' | '<source>:<tile>'
+    options: ComputeOptions = field(default_factory=ComputeOptions)
     landlab_grid: Optional[object] = field(default=None)
@@ -0,0 +1,119 @@
+"""Content fingerprints for caching assessment results.
+
+A cached result is reusable only while everything that produced it is
+unchanged: the parcel geometry, the DEM it was read from, and the code and
+thresholds that interpreted it. Each of those gets a digest here so every
+cache in the project keys on the same definition of "unchanged".
+"""
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+# Modules whose source decides the assessment outcome. Editing any of them —
+# a threshold in eil_status.py, the walker in calculate_depositional_safety.py,
+# the verdict logic in orchestrator.py, which DEM smart_fetcher.py picks —
+# invalidates every cached result.
+_ENGINE_MODULES = (
+    "eil_status.py",
+    "eil_types.py",
+    "slope_stability.py",
+    "calculate_depositional_safety.py",
+    "hybrid_engine.py",
+    "orchestrator.py",
+    "large_parcel.py",
+    "smart_fetcher.py",
+    "dem_catalog.py",
+    "coverage_index.py",
+)
+
+
+def file_digest(path) -> str:
+    """sha256 of a file's bytes."""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def geometry_digest(geometry: dict) -> str:
+    """sha256 of a GeoJSON geometry, independent of how it was written.
+
+    Normalised first, so ring start point, ring orientation and JSON key order
+    do not change the digest; two requests for the same lot hash the same.
+    """
+    # shapely is imported here so the CLI can check engine_version() against
+    # a running daemon without loading the geometry stack.
+    import shapely
+    from shapely.geometry import shape
+
+    normalized = shapely.normalize(shape(geometry))
+    return hashlib.sha256(shapely.to_wkb(normalized, hex=False)).hexdigest()
+
+
+def config_digest(config: dict) -> str:
+    """sha256 of a request config, independent of key order."""
+    canonical = json.dumps(config or {}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def dem_identity(path: str) -> str:
+    """Identity of a DEM file: resolved path, size and modification time.
+
+    Cheaper than hashing 15 GB, and a replaced or re-exported DEM changes at
+    least one of the three.
+    """
+    st = os.stat(path)
+    return f"{os.path.realpath(path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+# Config keys that bound how long an assessment may take but not what it
+# returns; two requests differing only in these get the same ETag.
+_UNTAGGED_CONFIG_KEYS = ("deadline_ms",)
+
+
+def assessment_etag(project_id: str, geometry: dict, config: dict, dem: str,
+                    max_window_mb: float | None = None) -> str:
+    """Strong ETag, quoted, for an assessment of ``geometry`` under ``config``.
+
+    ``dem`` is the dem_identity() of the DEM it reads, and ``max_window_mb``
+    the deployment's tiling cap (settings.compute_max_window_mb), which a
+    config ``max_window_mb`` overrides: a tiled run returns no viz grid, so
+    the cap changes the response. The project id is part of the tag because
+    it is echoed in the response, and a strong tag must change whenever the
+    bytes would. Any edit to the engine or the thresholds changes
+    engine_version(), and any change to the response model changes
+    response_version(), and so every tag.
+    """
+    tagged = {k: v for k, v in (config or {}).items() if k not in _UNTAGGED_CONFIG_KEYS}
+    tagged.setdefault("max_window_mb", max_window_mb)
+    if tagged["max_window_mb"] is None:
+        del tagged["max_window_mb"]
+    digest = hashlib.sha256()
+    for part in (project_id, geometry_digest(geometry), config_digest(tagged),
+                 dem, engine_version(), response_version()):
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+@lru_cache
+def engine_version() -> str:
+    """Short digest of the engine source and thresholds (see _ENGINE_MODULES)."""
+    digest = hashlib.sha256()
+    here = Path(__file__).resolve().parent
+    for name in _ENGINE_MODULES:
+        digest.update(name.encode())
+        digest.update((here / name).read_bytes())
+    return digest.hexdigest()[:16]
+
+
+@lru_cache
+def response_version() -> str:
+    """Short digest of the API's response model (api.AssessmentResponse).
+
+    The response bytes depend on the model as well as the engine: a field
+    added, dropped or re-aliased there changes every ETag.
+    """
+    # Imported here: api imports this module.
+    from api import AssessmentResponse
+
+    return config_digest(AssessmentResponse.model_json_schema(by_alias=True))[:16]
@@ -3,29 +3,65 @@
 EIL-Calc Ground Truth Ledger Generator.
 Scans the local tests/ground_truth/ directories and builds a CSV ledger
 of all manually exported hasadmin parcels to prevent duplicate work.
+
+Each row carries the file's content hash, the same one the validation
+harness keys its result cache on, and the summary lists which parcels are
+new or changed since the previous ledger — exactly the ones the next
+validation run will re-assess.
 """
 
+import argparse
 import csv
 from pathlib import Path
 
-def generate_ledger():
+from fingerprint import file_digest
+from gt_store import GroundTruthStore
+
+
+def _scan_folders(base_dir: Path) -> list[tuple[str, str, str, str]]:
+    """(parcel_id, category, file_path, sha256) for every file under base_dir."""
+    # rglog finds both .json and .geojson files recursively
+    return [
+        (f.stem, f.parent.name, str(f), file_digest(f))
+        for f in base_dir.rglob("*.*json")
+    ]
+
+
+def _scan_store(store_path: Path, base_dir: Path) -> list[tuple[str, str, str, str]]:
+    """Same rows from a gt_store.py store, with the path export would write to."""
+    with GroundTruthStore(store_path) as store:
+        return [
+            (p["parcel_id"], p["category"],
+             str(base_dir / p["category"] / f"{p['parcel_id']}.geojson"),
+             p["content_sha256"])
+            for p in store.select()
+        ]
+
+
+def generate_ledger(store_path: Path | None = None):
     # Adjust this path if you place the script outside the eil-calc root
     base_dir = Path("tests/ground_truth")
     output_file = Path("gt_parcel_ledger.csv")
     
-    if not base_dir.exists():
+    if store_path is None and not base_dir.exists():
         print(f"[error] Directory {base_dir.absolute()} does not exist.")
         return
 
+    # Previous ledger, to report what changed since it was written.
+    previous = {}
+    if output_file.exists():
+        with open(output_file, newline="") as csvfile:
+            previous = {
+                row["File_Path"]: row.get("Content_SHA256", "")
+                for row in csv.DictReader(csvfile)
+            }
+
     ledger_data = []
     # Tracking your progress towards the Tier 1 goals
     counts = {"safe": 0, "susceptible": 0, "prone": 0}
 
-    # rglog finds both .json and .geojson files recursively
-    for geojson_file in base_dir.rglob("*.*json"):
-        parcel_id = geojson_file.stem
-        category = geojson_file.parent.name
-        
+    scanned = _scan_store(store_path, base_dir) if store_path else _scan_folders(base_dir)
+    for parcel_id, category, file_path, digest in scanned:
         if category in counts:
             counts[category] += 1
         else:
@@ -34,7 +70,8 @@ def generate_ledger():
         ledger_data.append({
             "Parcel_ID": parcel_id,
             "Ground_Truth": category.upper(),
-            "File_Path": str(geojson_file)
+            "File_Path": file_path,
+            "Content_SHA256": digest,
         })
 
     # Sort alphabetically/numerically by Parcel ID so it matches the hasadmin list
@@ -42,7 +79,7 @@ def generate_ledger():
 
     # Write the CSV
     with open(output_file, mode="w", newline="") as csvfile:
-        fieldnames = ["Parcel_ID", "Ground_Truth", "File_Path"]
+        fieldnames = ["Parcel_ID", "Ground_Truth", "File_Path", "Content_SHA256"]
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         
         writer.writeheader()
@@ -59,7 +96,25 @@ def generate_ledger():
             progress = (count / target * 100) if target > 0 else 0
             print(f"  {cat.upper():<12} : {count:>3} / {target}  ({progress:.1f}%)")
     print("=" * 40)
-    print(f"  Total Parcels Exported: {len(ledger_data)}\n")
+    print(f"  Total Parcels Exported: {len(ledger_data)}")
+
+    current = {row["File_Path"]: row["Content_SHA256"] for row in ledger_data}
+    added   = sorted(set(current) - set(previous))
+    removed = sorted(set(previous) - set(current))
+    # A ledger written before hashes were recorded cannot say what changed.
+    changed = sorted(p for p in set(current) & set(previous)
+                     if previous[p] and current[p] != previous[p])
+    print(f"  Since last ledger     : {len(added)} new, {len(changed)} changed, "
+          f"{len(removed)} removed")
+    for label, paths in (("new", added), ("changed", changed), ("removed", removed)):
+        for path in paths:
+            print(f"    [{label:<7s}] {path}")
+    print()
 
 if __name__ == "__main__":
-    generate_ledger()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="EIL-Calc ground truth ledger generator")
+    parser.add_argument(
+        "--store", type=Path, metavar="PATH",
+        help="Read parcels from a gt_store.py store instead of tests/ground_truth/.",
+    )
+    generate_ledger(parser.parse_args().store)
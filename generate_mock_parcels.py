@@ -3,7 +3,7 @@
 EIL-Calc Ground Truth Parcel Factory.
 
 Generates RFC 7946 GeoJSON test parcels from live PHIVOLCS ArcGIS REST
-endpoints.  Two modes:
+endpoints.  Three modes:
 
   slope        — dart-throw random coordinates against the Layer 0 raster
                  (EIL Susceptibility) using the /identify endpoint, then
@@ -14,10 +14,21 @@ endpoints.  Two modes:
                  points inside them, and save squares to
                  tests/ground_truth/prone/.
 
+  raster       — export the Layer 0 raster for a bbox in one /export call
+                 (or read a local copy), then draw stratified lot centres
+                 locally with NumPy.  Same output folders as slope mode.
+
 Usage:
   python generate_mock_parcels.py --type slope --count 20
   python generate_mock_parcels.py --type depositional --count 10
 
+  # Bulk mode: export Layer 0 once (or pass --raster FILE) and sample locally:
+  python generate_mock_parcels.py --type raster -u <user> --count 500
+  python generate_mock_parcels.py --type raster --raster layer0_export.tif --count 500
+
+  # /identify calls run concurrently under a shared rate limit:
+  python generate_mock_parcels.py --type slope --count 100 --rate 5 --workers 8
+
   # After a first run logs pixel values you can refine the thresholds:
   python generate_mock_parcels.py --type slope --high-pixels "3,High" \\
                                                --low-pixels  "1,Low"
@@ -25,12 +36,16 @@ Usage:
 
 import argparse
 import getpass
+import http.client
 import json
 import random
 import sys
+import threading
 import time
 import urllib.parse
 import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse
 
@@ -84,12 +99,17 @@ def _load_password_from_env() -> str | None:
     return None
 
 
+class AuthError(RuntimeError):
+    """The PHIVOLCS portal did not issue a token."""
+
+
 def get_token(username: str, password: str) -> str:
     """
     Obtain a short-lived ArcGIS token (60 min) from the PHIVOLCS server.
 
-    Exits with a clear error message if authentication fails so no GIS
-    queries are attempted with a bad credential.
+    Raises AuthError with a clear message if authentication fails, so no GIS
+    queries are attempted with a bad credential.  Also called from worker
+    threads when a token expires mid-run; main() reports the error and exits.
     """
     payload = urllib.parse.urlencode({
         "username":   username,
@@ -108,18 +128,15 @@ def get_token(username: str, password: str) -> str:
         with urllib.request.urlopen(req, timeout=15) as resp:
             result = json.loads(resp.read())
     except Exception as exc:
-        print(f"[error] Token request to {TOKEN_URL} failed: {exc}")
-        sys.exit(1)
+        raise AuthError(f"Token request to {TOKEN_URL} failed: {exc}") from exc
 
     if "error" in result:
         msg = result["error"].get("message") or str(result["error"])
-        print(f"[error] Authentication failed: {msg}")
-        sys.exit(1)
+        raise AuthError(f"Authentication failed: {msg}")
 
     token = result.get("token")
     if not token:
-        print(f"[error] Unexpected token response (no 'token' key): {result}")
-        sys.exit(1)
+        raise AuthError(f"Unexpected token response (no 'token' key): {result}")
 
     expires_ms = result.get("expires", 0)
     print(f"[auth] Token acquired for '{username}' — expires in 60 min.")
@@ -146,66 +163,251 @@ def _save_feature(feature: dict, folder: Path, stem: str) -> None:
         json.dump(feature, f, indent=2)
 
 
-# ── ArcGIS REST helpers ────────────────────────────────────────────────────
+# ── ArcGIS REST client ─────────────────────────────────────────────────────
 
-def _identify_pixel(lon: float, lat: float, token: str) -> dict | None:
+# ArcGIS reports an expired (498) or missing/invalid (499) token inside a
+# 200 OK JSON body, not as an HTTP status.
+TOKEN_ERROR_CODES = {498, 499}
+# HTTP statuses worth retrying: throttling and transient gateway failures.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
     """
-    Call the MapServer /identify endpoint for a single point against Layer 0.
+    Thread-safe token-bucket rate limiter.
 
-    Returns the first result dict from the response, or None if the point
-    is outside the raster coverage or the request fails.
+    Allows bursts of up to `burst` calls, refilled at `rate` calls per second.
+    `acquire()` blocks until a token is available, so N worker threads sharing
+    one bucket together never exceed the server's rate budget.
     """
 
-    # Create a tiny 0.001 degree box around the point
-    extent = f"{lon-0.0005},{lat-0.0005},{lon+0.0005},{lat+0.0005}"
+    def __init__(self, rate: float, burst: int = 1, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            self._sleep(wait)
+
+
+class ArcGISClient:
+    """
+    Concurrent-safe client for the PHIVOLCS MapServer REST endpoints.
+
+    - Every request draws from a shared TokenBucket (`rate` requests/s).
+    - Each worker thread keeps one keep-alive HTTP(S) connection to the host
+      instead of opening a fresh TLS session per call as urlopen does.
+    - Connection errors and 429/5xx responses are retried with exponential
+      backoff plus jitter (honouring Retry-After when sent).
+    - An ArcGIS 498/499 token error calls `token_provider()` once for all
+      threads and replays the request with the new token.
+    """
 
-    minx, miny, maxx, maxy = SLOPE_BBOX
-    params = urllib.parse.urlencode({
-        "geometry":      f"{lon},{lat}",
-        "geometryType":  "esriGeometryPoint",
-        "sr":            "4326",
-        "layers":        "show:0",          # Standard layer targeting
-        "tolerance":     "3",               # Standard pixel hit radius
-        "mapExtent":     f"{minx},{miny},{maxx},{maxy}",
-        "imageDisplay":  "800,600,96",      # Sane virtual screen ratio
-        "returnGeometry": "false",
-        "token":         token,
-        "f":             "json",
-    })
-    url = f"{BASE_URL}/identify?{params}"
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        token_provider=None,
+        rate: float = 5.0,
+        burst: int = 1,
+        retries: int = 4,
+        backoff: float = 0.5,
+        timeout: float = 15.0,
+    ):
+        parsed = urlparse(base_url)
+        self._scheme = parsed.scheme
+        self._host = parsed.netloc
+        self._base_path = parsed.path.rstrip("/")
+        self._token = token
+        self._token_generation = 0
+        self._token_provider = token_provider
+        self._token_lock = threading.Lock()
+        self._bucket = TokenBucket(rate, burst)
+        self._retries = retries
+        self._backoff = backoff
+        self._timeout = timeout
+        self._local = threading.local()
+        self._connections: list[http.client.HTTPConnection] = []
+        self._connections_lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self._bucket.rate
+
+    @property
+    def token(self) -> str:
+        return self._token
+
+    # ── connections ───────────────────────────────────────────────────────
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = (
+                http.client.HTTPSConnection if self._scheme == "https"
+                else http.client.HTTPConnection
+            )
+            conn = cls(self._host, timeout=self._timeout)
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _drop_connection(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def close(self) -> None:
+        """Close every worker's connection."""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+    # ── tokens ────────────────────────────────────────────────────────────
+
+    def _refresh_token(self, stale_generation: int) -> bool:
+        """Refresh the token unless another thread already has. False if impossible."""
+        if self._token_provider is None:
+            return False
+        with self._token_lock:
+            if self._token_generation == stale_generation:
+                print("[auth] Token rejected by server — refreshing.")
+                self._token = self._token_provider()
+                self._token_generation += 1
+        return True
+
+    # ── requests ──────────────────────────────────────────────────────────
+
+    def _sleep_backoff(self, attempt: int, retry_after: str | None = None) -> None:
+        if retry_after and retry_after.isdigit():
+            time.sleep(float(retry_after))
+        else:
+            # Jitter keeps the workers from retrying in lockstep.
+            time.sleep(self._backoff * (2 ** attempt) * random.uniform(0.5, 1.0))
+
+    def get_json(self, path: str, params: dict) -> dict:
+        """
+        GET `<base_url>/<path>?<params>&token=...&f=json` and return the JSON body.
+
+        Raises RuntimeError once retries are exhausted or when the token
+        cannot be refreshed; ArcGIS errors other than token errors are
+        returned as-is in the `{"error": ...}` body for the caller to report.
+        """
+        token_refreshed = False
+        last_exc: Exception | None = None
+        for attempt in range(self._retries + 1):
+            with self._token_lock:
+                token, generation = self._token, self._token_generation
+            query = urllib.parse.urlencode({**params, "token": token, "f": "json"})
+            url = f"{self._base_path}/{path.lstrip('/')}?{query}"
+
+            self._bucket.acquire()
+            conn = self._connection()
+            try:
+                conn.request("GET", url, headers={"User-Agent": "eil-calc-gt/0.1"})
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.HTTPException, OSError) as exc:
+                # Stale keep-alive socket or network hiccup — reconnect and retry.
+                self._drop_connection()
+                last_exc = exc
+                if attempt < self._retries:
+                    self._sleep_backoff(attempt)
+                continue
 
-    try:
-        req = urllib.request.Request(url, headers={"User-Agent": "eil-calc-gt/0.1"})
-        with urllib.request.urlopen(req, timeout=15) as resp:
-            data = json.loads(resp.read())
+            if resp.status in RETRY_STATUSES:
+                last_exc = RuntimeError(f"HTTP {resp.status}")
+                if attempt < self._retries:
+                    self._sleep_backoff(attempt, resp.getheader("Retry-After"))
+                continue
+            if resp.status != 200:
+                raise RuntimeError(f"HTTP {resp.status} from {path}")
+
+            data = json.loads(body)
+            code = data.get("error", {}).get("code") if isinstance(data, dict) else None
+            if code in TOKEN_ERROR_CODES:
+                if token_refreshed or not self._refresh_token(generation):
+                    raise RuntimeError(f"ArcGIS token rejected ({code})")
+                token_refreshed = True
+                continue
+            return data
+
+        raise RuntimeError(f"{path} failed after {self._retries + 1} attempts: {last_exc}")
+
+    def identify(self, lon: float, lat: float) -> dict | None:
+        """
+        Call the MapServer /identify endpoint for a single point against Layer 0.
+
+        Returns the first result dict from the response, or None if the point
+        is outside the raster coverage or the request fails.  An AuthError
+        from refreshing an expired token is raised: no later call can succeed.
+        """
+        minx, miny, maxx, maxy = SLOPE_BBOX
+        params = {
+            "geometry":      f"{lon},{lat}",
+            "geometryType":  "esriGeometryPoint",
+            "sr":            "4326",
+            "layers":        "show:0",          # Standard layer targeting
+            "tolerance":     "3",               # Standard pixel hit radius
+            "mapExtent":     f"{minx},{miny},{maxx},{maxy}",
+            "imageDisplay":  "800,600,96",      # Sane virtual screen ratio
+            "returnGeometry": "false",
+        }
+        try:
+            data = self.get_json("identify", params)
+        except AuthError:
+            raise                       # a failed refresh ends the run
+        except Exception as exc:
+            print(f"  [warn] identify failed ({lon:.5f}, {lat:.5f}): {exc}")
+            return None
 
-        # THE SMOKING GUN: Trap silent ArcGIS API errors
+        # Trap silent ArcGIS API errors
         if "error" in data:
             print(f"\n  [esri api error] {data['error']}")
             return None
-        
+
         results = data.get("results", [])
         return results[0] if results else None
-    
-    except Exception as exc:
-        print(f"  [warn] identify failed ({lon:.5f}, {lat:.5f}): {exc}")
-        return None
 
 
 # ── Mode 1: slope (raster dart-throwing) ──────────────────────────────────
 
 def mode_slope(
     count: int,
-    delay: float,
+    client: ArcGISClient,
+    workers: int,
     high_pixels: set[str],
     low_pixels: set[str],
-    token: str,
 ) -> None:
     """
     Randomly sample the CAR bounding box and ping the /identify endpoint.
     Sort results into tests/ground_truth/susceptible/ or safe/ based on the
     pixel value.  Log every pixel value seen so the user can refine the
     --high-pixels / --low-pixels thresholds if needed.
+
+    Up to 2×workers darts, and never more than the parcels still needed,
+    are in flight at once, identified concurrently; the client's token
+    bucket keeps the aggregate request rate in budget.  Results are
+    consumed in throw order, so a run is reproducible under random.seed
+    regardless of which request finishes first.
     """
     minx, miny, maxx, maxy = SLOPE_BBOX
     susceptible_dir = OUT_BASE / "susceptible"
@@ -219,8 +421,8 @@ def mode_slope(
 
     # Try querying as a feature layer first (works if it has an attribute table)
     query_url = f"{BASE_URL}/0/query?where=1=1&outFields=*&f=geojson&resultRecordCount={count}"
-    if token:
-        query_url += f"&token={token}"
+    if client.token:
+        query_url += f"&token={client.token}"
     
     try:
         print(f"[slope] Attempting direct vector query of Layer 0...")
@@ -233,57 +435,68 @@ def mode_slope(
         print(f"[slope] Dart-throwing for {count} parcels via {BASE_URL}/identify")
         print(f"[slope] High-susceptibility pixels : {sorted(high_pixels)}")
         print(f"[slope] Low-susceptibility pixels  : {sorted(low_pixels)}")
-        print(f"[slope] API delay                  : {delay}s between calls\n")
-
-        while total < count and attempts < max_attempts:
-            attempts += 1
-            lon = random.uniform(minx, maxx)
-            lat = random.uniform(miny, maxy)
-
-            hit = _identify_pixel(lon, lat, token)
-            time.sleep(delay)
-
-            if hit is None:
-                print(f"  [miss] ({lon:.4f}, {lat:.4f}) -> Outside Map")
-                n_skip += 1
-                continue
-
-            # ArcGIS returns pixel value in either attributes["Pixel Value"] or
-            # the top-level "value" field.  Try both.
-            raw = (
-                hit.get("attributes", {}).get("Pixel Value")
-                or hit.get("value")
-                or "NoData"
-            )
-            sv = str(raw).strip()
-            seen_values[sv] = seen_values.get(sv, 0) + 1
-
-            if sv in high_pixels:
-                category = "susceptible"
-                out_dir   = susceptible_dir
-                n_susceptible += 1
-            elif sv in low_pixels:
-                category = "safe"
-                out_dir   = safe_dir
-                n_safe += 1
-            else:
-                print(f"  [skip] ({lon:.4f}, {lat:.4f}) -> Pixel: {sv!r} (Moderate/NoData)")
-                n_skip += 1
-                continue
-
-            total += 1
-            stem = f"GT_SLOPE_{total:04d}"
-            feat = _geojson_feature(lon, lat, {
-                "id":               stem,
-                "source":           "phivolcs_eil_car_layer0",
-                "pixel_value_raw":  raw,
-                "expected_label":   category,
-            })
-            _save_feature(feat, out_dir, stem)
-            print(
-                f"  [{total:>4d}/{count}]  {stem}  "
-                f"pixel={sv!r:>12s}  -> {category.upper()}"
-            )
+        print(f"[slope] Rate limit                 : {client.rate:g} req/s, {workers} workers\n")
+
+        batch_size = 2 * workers
+        in_flight: deque = deque()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            try:
+                while total < count and attempts < max_attempts:
+                    # Darts are thrown and consumed in order, never more in
+                    # flight than batch_size or than parcels still needed.
+                    while (len(in_flight) < min(batch_size, count - total)
+                           and attempts + len(in_flight) < max_attempts):
+                        dart = (random.uniform(minx, maxx), random.uniform(miny, maxy))
+                        in_flight.append((dart, pool.submit(client.identify, *dart)))
+                    (lon, lat), future = in_flight.popleft()
+                    hit = future.result()
+                    attempts += 1
+
+                    if hit is None:
+                        print(f"  [miss] ({lon:.4f}, {lat:.4f}) -> Outside Map")
+                        n_skip += 1
+                        continue
+
+                    # ArcGIS returns pixel value in either attributes["Pixel Value"] or
+                    # the top-level "value" field.  Try both.
+                    raw = (
+                        hit.get("attributes", {}).get("Pixel Value")
+                        or hit.get("value")
+                        or "NoData"
+                    )
+                    sv = str(raw).strip()
+                    seen_values[sv] = seen_values.get(sv, 0) + 1
+
+                    if sv in high_pixels:
+                        category = "susceptible"
+                        out_dir   = susceptible_dir
+                        n_susceptible += 1
+                    elif sv in low_pixels:
+                        category = "safe"
+                        out_dir   = safe_dir
+                        n_safe += 1
+                    else:
+                        print(f"  [skip] ({lon:.4f}, {lat:.4f}) -> Pixel: {sv!r} (Moderate/NoData)")
+                        n_skip += 1
+                        continue
+
+                    total += 1
+                    stem = f"GT_SLOPE_{total:04d}"
+                    feat = _geojson_feature(lon, lat, {
+                        "id":               stem,
+                        "source":           "phivolcs_eil_car_layer0",
+                        "pixel_value_raw":  raw,
+                        "expected_label":   category,
+                    })
+                    _save_feature(feat, out_dir, stem)
+                    print(
+                        f"  [{total:>4d}/{count}]  {stem}  "
+                        f"pixel={sv!r:>12s}  -> {category.upper()}"
+                    )
+            finally:
+                # Darts not yet sent once `count` is reached, or on an error,
+                # would only spend rate-limited requests.
+                pool.shutdown(cancel_futures=True)
 
         print(
             f"\n[slope] Done — susceptible={n_susceptible}  "
@@ -304,10 +517,13 @@ def mode_slope(
 
 # ── Mode 2: depositional (vector query) ───────────────────────────────────
 
-def mode_depositional(count: int, delay: float, token: str) -> None:
+def mode_depositional(count: int, token: str) -> None:
     """
     Download Layer 1 (Depositional Zone polygons) via GeoJSON query, pick
     random points inside them, and save squares to tests/ground_truth/prone/.
+
+    Only the single Layer 1 query touches the server, so no rate limiting
+    is needed once the polygons are loaded.
     """
     try:
         import geopandas as gpd
@@ -370,13 +586,241 @@ def mode_depositional(count: int, delay: float, token: str) -> None:
             f"  [{generated:>4d}/{count}]  {stem}  "
             f"({lon:.5f}, {lat:.5f})  -> PRONE"
         )
-        time.sleep(delay)
 
     print(f"\n[depositional] Saved {generated} prone parcels to {prone_dir}")
 
 
+# ── Mode 3: raster (bulk export + local sampling) ─────────────────────────
+
+def export_layer0(
+    client: ArcGISClient,
+    bbox: tuple[float, float, float, float],
+    size: int,
+    out_path: Path,
+) -> Path:
+    """
+    Export Layer 0 over `bbox` as a single GeoTIFF via MapServer /export.
+
+    One request replaces the hundreds of /identify calls dart-throwing
+    needs.  `size` is the longer image side in pixels; the server's
+    maxImageWidth/Height (commonly 4096) caps it.
+    """
+    minx, miny, maxx, maxy = bbox
+    aspect = (maxy - miny) / (maxx - minx)
+    width, height = (size, max(1, round(size * aspect))) if aspect <= 1 else (max(1, round(size / aspect)), size)
+
+    data = client.get_json("export", {
+        "bbox":        f"{minx},{miny},{maxx},{maxy}",
+        "bboxSR":      "4326",
+        "imageSR":     "4326",
+        "size":        f"{width},{height}",
+        "format":      "tiff",
+        "layers":      "show:0",
+        "transparent": "true",
+    })
+    if "error" in data or "href" not in data:
+        raise RuntimeError(f"Layer 0 export failed: {data.get('error', data)}")
+
+    req = urllib.request.Request(data["href"], headers={"User-Agent": "eil-calc-gt/0.1"})
+    with urllib.request.urlopen(req, timeout=120) as resp:
+        out_path.write_bytes(resp.read())
+
+    # Keep the returned extent next to the image in case the TIFF carries
+    # no georeferencing of its own.
+    extent = data.get("extent") or {}
+    if {"xmin", "ymin", "xmax", "ymax"} <= extent.keys():
+        out_path.with_suffix(".extent.json").write_text(json.dumps(extent))
+    print(f"[raster] Exported Layer 0 {width}×{height} px -> {out_path}")
+    return out_path
+
+
+def _raster_classes(path: Path):
+    """
+    Read a Layer 0 raster and label each pixel with its value string.
+
+    Returns (codes, names, transform, crs): `codes` is an int32 array
+    indexing `names`, -1 where the pixel is nodata or transparent.
+    Single-band rasters are labelled by pixel value ("3"); rendered
+    RGB(A) exports by colour ("#ff0000"), since /export returns symbolised
+    colours rather than class values.
+    """
+    import numpy as np
+    import rasterio
+    from rasterio.transform import from_bounds
+
+    with rasterio.open(path) as src:
+        bands = src.read(masked=True)
+        transform, crs = src.transform, src.crs
+        height, width = src.height, src.width
+
+    if crs is None:
+        # /export TIFFs sometimes lack GeoTIFF tags; fall back to the extent
+        # recorded by export_layer0.
+        extent = json.loads(path.with_suffix(".extent.json").read_text())
+        transform = from_bounds(
+            extent["xmin"], extent["ymin"], extent["xmax"], extent["ymax"], width, height
+        )
+        crs = "EPSG:4326"
+
+    invalid = np.ma.getmaskarray(bands).any(axis=0)
+    if bands.shape[0] == 1:
+        values = bands[0].filled(0)
+        keys, codes = np.unique(values[~invalid], return_inverse=True)
+        names = [str(int(k)) if float(k).is_integer() else str(k) for k in keys]
+    else:
+        if bands.shape[0] == 4:
+            invalid |= bands[3].filled(0) == 0          # transparent
+        rgb = bands[:3].filled(0).astype(np.uint32)
+        packed = (rgb[0] << 16) | (rgb[1] << 8) | rgb[2]
+        keys, codes = np.unique(packed[~invalid], return_inverse=True)
+        names = [f"#{int(k):06x}" for k in keys]
+
+    labels = np.full((height, width), -1, dtype=np.int32)
+    labels[~invalid] = codes
+    return labels, names, transform, crs
+
+
+def sample_raster(
+    path: Path,
+    count: int,
+    high_pixels: set[str],
+    low_pixels: set[str],
+    rng=None,
+) -> tuple[list[tuple[float, float, str, str]], dict[str, int]]:
+    """
+    Draw up to `count` stratified lot centres from a Layer 0 raster.
+
+    Candidates are pixels whose 3×3 neighbourhood is a single class, so a
+    20 m lot centred on one does not straddle a class boundary.  The count
+    is split evenly between susceptible and safe; each class is sampled
+    without replacement from its candidates.
+
+    Returns ([(lon, lat, pixel_value, category), ...], histogram) where the
+    histogram counts every valid pixel value in the raster.  Raises
+    ValueError when no pixel carries any of the configured values, as when
+    the default class values meet an RGB(A) export labelled by colour.
+    """
+    import numpy as np
+    from rasterio.transform import xy
+    from rasterio.warp import transform as warp_transform
+    from scipy.ndimage import maximum_filter, minimum_filter
+
+    rng = rng or np.random.default_rng()
+    labels, names, transform, crs = _raster_classes(path)
+
+    valid = labels >= 0
+    counts = np.bincount(labels[valid], minlength=len(names))
+    histogram = {name: int(n) for name, n in zip(names, counts)}
+    if not (high_pixels | low_pixels) & set(names):
+        common = sorted(histogram, key=histogram.get, reverse=True)[:8]
+        raise ValueError(
+            f"No pixel in {path} has any of the values "
+            f"{sorted(high_pixels | low_pixels)}; the most common are {common}. "
+            "Pass them via --high-pixels / --low-pixels (RGB exports are "
+            "labelled by colour, e.g. '#ff0000')."
+        )
+
+    # Nodata borders count as a different class so edge pixels are excluded.
+    uniform = (
+        minimum_filter(labels, size=3, mode="constant", cval=-1)
+        == maximum_filter(labels, size=3, mode="constant", cval=-1)
+    ) & valid
+
+    strata = [("susceptible", high_pixels), ("safe", low_pixels)]
+    quotas = [count - count // 2, count // 2]
+    samples = []
+    for (category, pixel_set), quota in zip(strata, quotas):
+        class_codes = [i for i, name in enumerate(names) if name in pixel_set]
+        candidates = np.flatnonzero(uniform & np.isin(labels, class_codes))
+        take = min(quota, candidates.size)
+        if take < quota:
+            print(f"[raster] Only {candidates.size} {category} candidates for a quota of {quota}.")
+        chosen = rng.choice(candidates, size=take, replace=False)
+        rows, cols = np.unravel_index(chosen, labels.shape)
+        xs, ys = xy(transform, rows, cols)
+        lons, lats = warp_transform(crs, "EPSG:4326", list(np.atleast_1d(xs)), list(np.atleast_1d(ys)))
+        for lon, lat, r, c in zip(lons, lats, rows, cols):
+            samples.append((float(lon), float(lat), names[labels[r, c]], category))
+    return samples, histogram
+
+
+def mode_raster(
+    count: int,
+    raster: Path,
+    high_pixels: set[str],
+    low_pixels: set[str],
+) -> None:
+    """
+    Sample stratified parcels from a local Layer 0 raster and save them to
+    tests/ground_truth/susceptible/ or safe/.
+    """
+    print(f"[raster] Sampling {count} parcels from {raster}")
+    print(f"[raster] High-susceptibility pixels : {sorted(high_pixels)}")
+    print(f"[raster] Low-susceptibility pixels  : {sorted(low_pixels)}\n")
+
+    samples, histogram = sample_raster(raster, count, high_pixels, low_pixels)
+
+    for total, (lon, lat, sv, category) in enumerate(samples, start=1):
+        stem = f"GT_RASTER_{total:04d}"
+        feat = _geojson_feature(lon, lat, {
+            "id":               stem,
+            "source":           "phivolcs_eil_car_layer0_raster",
+            "pixel_value_raw":  sv,
+            "expected_label":   category,
+        })
+        _save_feature(feat, OUT_BASE / category, stem)
+        print(
+            f"  [{total:>4d}/{count}]  {stem}  "
+            f"pixel={sv!r:>12s}  -> {category.upper()}"
+        )
+
+    n_susceptible = sum(1 for s in samples if s[3] == "susceptible")
+    print(
+        f"\n[raster] Done — susceptible={n_susceptible}  "
+        f"safe={len(samples) - n_susceptible}"
+    )
+    print(
+        "[raster] All pixel values in the raster "
+        "(use these to refine --high-pixels / --low-pixels):"
+    )
+    for val, cnt in sorted(histogram.items(), key=lambda kv: -kv[1]):
+        tag = (
+            "HIGH" if val in high_pixels else
+            "LOW"  if val in low_pixels  else
+            "SKIP"
+        )
+        print(f"  {tag:<5s}  {val!r:>20s} : {cnt:>8d} px")
+
+
 # ── CLI ────────────────────────────────────────────────────────────────────
 
+def _run(args, password: str, high: set[str], low: set[str]) -> None:
+    """Authenticate, then run the server-backed mode chosen in `args`."""
+    # ── Authenticate before touching any GIS endpoint ─────────────────────
+    token = get_token(args.username, password)
+
+    if args.type in ("slope", "raster"):
+        rate = 1.0 / args.delay if args.delay else args.rate
+        client = ArcGISClient(
+            BASE_URL,
+            token,
+            token_provider=lambda: get_token(args.username, password),
+            rate=rate,
+            burst=args.workers,
+        )
+        try:
+            if args.type == "slope":
+                mode_slope(args.count, client, args.workers, high, low)
+            else:
+                bbox = tuple(float(v) for v in args.bbox.split(","))
+                raster = export_layer0(client, bbox, args.export_size, args.export_out)
+                mode_raster(args.count, raster, high, low)
+        finally:
+            client.close()
+    else:
+        mode_depositional(args.count, token)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="EIL-Calc Ground Truth Parcel Factory — PHIVOLCS ArcGIS REST",
@@ -385,31 +829,41 @@ def main() -> None:
     )
     parser.add_argument(
         "--type",
-        choices=["slope", "depositional"],
+        choices=["slope", "depositional", "raster"],
         required=True,
         help=(
             "slope       = Layer 0 raster /identify (dart-throwing)\n"
-            "depositional = Layer 1 vector query"
+            "depositional = Layer 1 vector query\n"
+            "raster      = Layer 0 bulk export + local stratified sampling"
         ),
     )
     parser.add_argument(
-        "-u", "--username", required=True, metavar="USER",
-        help="PHIVOLCS GIS portal username.",
+        "-u", "--username", metavar="USER",
+        help="PHIVOLCS GIS portal username (not needed for --type raster --raster FILE).",
     )
     parser.add_argument(
         "--count", type=int, default=20, metavar="N",
         help="Number of parcels to generate (default: 20)",
     )
     parser.add_argument(
-        "--delay", type=float, default=1.0, metavar="SEC",
-        help="Seconds to sleep between API calls (default: 1.0)",
+        "--rate", type=float, default=2.0, metavar="REQ/S",
+        help="Maximum /identify requests per second across all workers (default: 2.0)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4, metavar="N",
+        help="Concurrent /identify requests in flight (default: 4)",
+    )
+    parser.add_argument(
+        "--delay", type=float, default=None, metavar="SEC",
+        help="Deprecated: equivalent to --rate 1/SEC.",
     )
     parser.add_argument(
         "--high-pixels", default="3", metavar="VAL[,VAL]",
         help=(
             "Comma-separated pixel values that indicate High Susceptibility "
             "(default: '3').  Run once without this flag to see what values "
-            "the server returns, then pass the correct ones."
+            "the server returns, then pass the correct ones.  Rendered RGB(A) "
+            "rasters are labelled by colour, e.g. '#ff0000'."
         ),
     )
     parser.add_argument(
@@ -417,8 +871,39 @@ def main() -> None:
         help="Comma-separated pixel values for Low Susceptibility (default: '1').",
     )
 
+    parser.add_argument(
+        "--raster", type=Path, metavar="FILE",
+        help="raster mode: sample this local Layer 0 GeoTIFF instead of exporting one.",
+    )
+    parser.add_argument(
+        "--bbox", default=",".join(map(str, SLOPE_BBOX)), metavar="MINX,MINY,MAXX,MAXY",
+        help="raster mode: export extent in WGS84 (default: CAR region).",
+    )
+    parser.add_argument(
+        "--export-size", type=int, default=4096, metavar="PX",
+        help="raster mode: longer side of the exported image (default: 4096).",
+    )
+    parser.add_argument(
+        "--export-out", type=Path, default=Path("layer0_export.tif"), metavar="FILE",
+        help="raster mode: where to save the export (default: layer0_export.tif).",
+    )
+
     args = parser.parse_args()
 
+    high = {v.strip() for v in args.high_pixels.split(",")}
+    low  = {v.strip() for v in args.low_pixels.split(",")}
+
+    # A local raster needs no server access at all.
+    if args.type == "raster" and args.raster:
+        try:
+            mode_raster(args.count, args.raster, high, low)
+        except ValueError as exc:
+            print(f"[error] {exc}")
+            sys.exit(1)
+        return
+    if not args.username:
+        parser.error("-u/--username is required unless --type raster --raster FILE is given")
+
     # ── Acquire password ──────────────────────────────────────────────────
     # Prefer .env (PHIVOLCS_PASSWORD=...) so CI/automated runs don't need
     # an interactive prompt.  Fall back to getpass for interactive use.
@@ -428,16 +913,11 @@ def main() -> None:
     else:
         password = getpass.getpass(f"Password for {args.username}: ")
 
-    # ── Authenticate before touching any GIS endpoint ─────────────────────
-    token = get_token(args.username, password)
-
-    high = {v.strip() for v in args.high_pixels.split(",")}
-    low  = {v.strip() for v in args.low_pixels.split(",")}
-
-    if args.type == "slope":
-        mode_slope(args.count, args.delay, high, low, token)
-    else:
-        mode_depositional(args.count, args.delay, token)
+    try:
+        _run(args, password, high, low)
+    except (AuthError, ValueError) as exc:
+        print(f"[error] {exc}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+EIL-Calc Ground Truth Store.
+
+One SQLite file holding every ground-truth parcel: geometry (WKB plus its
+bounding box), category, source layer and provenance, alongside the original
+GeoJSON text so an export reproduces the source files byte for byte (and
+therefore with the same content hash the harness caches on).
+
+On load the geometries are decoded in one vectorised call and indexed with a
+shapely STRtree, so selecting by region and category touches only the
+matching parcels instead of re-parsing thousands of small files.
+
+Usage:
+  python gt_store.py import tests/ground_truth          # folder -> store
+  python gt_store.py export /tmp/ground_truth           # store -> folder
+  python gt_store.py list --category safe --bbox 120.5,16.2,120.8,16.5
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import shapely
+from shapely import STRtree, box
+from shapely.geometry import mapping, shape
+
+DEFAULT_STORE = Path("gt_store.sqlite")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS parcels (
+    category       TEXT NOT NULL,
+    parcel_id      TEXT NOT NULL,
+    source_layer   TEXT,
+    geometry       BLOB NOT NULL,
+    minx           REAL NOT NULL,
+    miny           REAL NOT NULL,
+    maxx           REAL NOT NULL,
+    maxy           REAL NOT NULL,
+    provenance     TEXT NOT NULL,
+    content_sha256 TEXT NOT NULL,
+    source_text    TEXT NOT NULL,
+    PRIMARY KEY (category, parcel_id)
+);
+CREATE INDEX IF NOT EXISTS parcels_category ON parcels (category);
+"""
+
+
+def feature_geometry(gj: dict) -> dict:
+    """Return the GeoJSON geometry dict from a Feature, FeatureCollection, or
+    bare geometry."""
+    if gj.get("type") == "Feature":
+        return gj["geometry"]
+    if gj.get("type") == "FeatureCollection":
+        # PHIVOLCS sometimes puts a polyline first. Find the polygon.
+        for feature in gj.get("features", []):
+            geom = feature.get("geometry", {})
+            if geom.get("type") in ("Polygon", "MultiPolygon"):
+                return geom
+        return gj["features"][0]["geometry"]
+    return gj  # bare geometry
+
+
+def _feature_properties(gj: dict) -> dict:
+    if gj.get("type") == "Feature":
+        return gj.get("properties") or {}
+    if gj.get("type") == "FeatureCollection" and gj.get("features"):
+        return gj["features"][0].get("properties") or {}
+    return {}
+
+
+class GroundTruthStore:
+    """A ground-truth set in a single SQLite file."""
+
+    def __init__(self, path: Path = DEFAULT_STORE):
+        self.path = Path(path)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.executescript(_SCHEMA)
+        self._index = None
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── Writing ───────────────────────────────────────────────────────────
+
+    def import_folder(self, base_dir: Path) -> dict:
+        """Upsert every .geojson under each category folder of ``base_dir``.
+
+        Returns {category: count}. The whole import is one transaction.
+        """
+        base_dir = Path(base_dir)
+        imported_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        rows, counts = [], {}
+        for folder in sorted(p for p in base_dir.iterdir() if p.is_dir()):
+            category = folder.name.lower()
+            for path in sorted(folder.glob("*.geojson")):
+                raw = path.read_bytes()
+                gj = json.loads(raw)
+                geom = shape(feature_geometry(gj))
+                props = _feature_properties(gj)
+                provenance = {
+                    "imported_from": str(path),
+                    "imported_at": imported_at,
+                    "properties": props,
+                }
+                rows.append((
+                    category,
+                    path.stem,
+                    props.get("source"),
+                    shapely.to_wkb(geom),
+                    *geom.bounds,
+                    json.dumps(provenance, sort_keys=True),
+                    hashlib.sha256(raw).hexdigest(),
+                    raw.decode(),
+                ))
+                counts[category] = counts.get(category, 0) + 1
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO parcels VALUES (?,?,?,?,?,?,?,?,?,?,?)", rows
+            )
+        self._index = None
+        return counts
+
+    def export_folder(self, base_dir: Path) -> int:
+        """Write every parcel back to ``base_dir/<category>/<parcel_id>.geojson``."""
+        base_dir = Path(base_dir)
+        n = 0
+        for category, parcel_id, text in self._conn.execute(
+            "SELECT category, parcel_id, source_text FROM parcels"
+        ):
+            folder = base_dir / category
+            folder.mkdir(parents=True, exist_ok=True)
+            (folder / f"{parcel_id}.geojson").write_bytes(text.encode())
+            n += 1
+        return n
+
+    # ── Reading ───────────────────────────────────────────────────────────
+
+    def _load_index(self):
+        """Decode every geometry once and build the STRtree over them."""
+        if self._index is None:
+            records = self._conn.execute(
+                "SELECT category, parcel_id, source_layer, geometry, provenance, "
+                "content_sha256 FROM parcels ORDER BY category, parcel_id"
+            ).fetchall()
+            geoms = shapely.from_wkb([r[3] for r in records]) if records else np.array([])
+            self._index = (records, geoms, STRtree(geoms))
+        return self._index
+
+    def select(
+        self,
+        categories: list[str] | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+    ) -> list[dict]:
+        """Parcels in ``categories`` (all if None) intersecting ``bbox`` (WGS84).
+
+        Each parcel dict carries what the validation harness needs —
+        parcel_id, category, path, geometry, content_sha256 — plus
+        source_layer and provenance. ``path`` is ``<store>#<category>/<id>``,
+        a label for reports rather than a file to open.
+        """
+        records, geoms, tree = self._load_index()
+        if bbox is not None:
+            hits = np.sort(tree.query(box(*bbox), predicate="intersects"))
+        else:
+            hits = range(len(records))
+
+        wanted = {c.lower() for c in categories} if categories else None
+        parcels = []
+        for i in hits:
+            category, parcel_id, source_layer, _, provenance, digest = records[i]
+            if wanted is not None and category not in wanted:
+                continue
+            parcels.append({
+                "parcel_id": parcel_id,
+                "category": category,
+                "path": f"{self.path}#{category}/{parcel_id}",
+                "geometry": mapping(geoms[i]),
+                "content_sha256": digest,
+                "source_layer": source_layer,
+                "provenance": json.loads(provenance),
+            })
+        return parcels
+
+    def counts(self) -> dict:
+        return dict(self._conn.execute(
+            "SELECT category, COUNT(*) FROM parcels GROUP BY category ORDER BY category"
+        ).fetchall())
+
+
+# ── CLI ────────────────────────────────────────────────────────────────────
+
+def parse_bbox(text: str) -> tuple[float, float, float, float]:
+    values = tuple(float(v) for v in text.split(","))
+    if len(values) != 4:
+        raise argparse.ArgumentTypeError("expected MINX,MINY,MAXX,MAXY")
+    return values
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(
+        description="EIL-Calc ground truth store (single-file SQLite)",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument(
+        "--store", type=Path, default=DEFAULT_STORE, metavar="PATH",
+        help=f"Store file (default: {DEFAULT_STORE}).",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_import = sub.add_parser("import", help="Load a category-folder tree into the store.")
+    p_import.add_argument("base_dir", type=Path, nargs="?", default=Path("tests/ground_truth"))
+
+    p_export = sub.add_parser("export", help="Write the store back out as category folders.")
+    p_export.add_argument("base_dir", type=Path)
+
+    p_list = sub.add_parser("list", help="List parcels, optionally filtered.")
+    p_list.add_argument("--category", action="append", metavar="NAME",
+                        help="Only this category (repeatable).")
+    p_list.add_argument("--bbox", type=parse_bbox, metavar="MINX,MINY,MAXX,MAXY",
+                        help="Only parcels intersecting this WGS84 box.")
+
+    args = parser.parse_args(argv)
+
+    with GroundTruthStore(args.store) as store:
+        if args.command == "import":
+            counts = store.import_folder(args.base_dir)
+            print(f"[store] Imported {sum(counts.values())} parcels from {args.base_dir} "
+                  f"into {args.store}")
+            for category, n in sorted(counts.items()):
+                print(f"  {category:<14s}: {n:>5d}")
+        elif args.command == "export":
+            n = store.export_folder(args.base_dir)
+            print(f"[store] Exported {n} parcels to {args.base_dir}")
+        else:
+            parcels = store.select(args.category, args.bbox)
+            for p in parcels:
+                print(f"  {p['category']:<14s} {p['parcel_id']:<20s} "
+                      f"{p['source_layer'] or '-':<32s} {p['content_sha256'][:12]}")
+            print(f"[store] {len(parcels)} parcel(s)")
+
+
+if __name__ == "__main__":
+    main()
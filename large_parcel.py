@@ -0,0 +1,108 @@
+"""Tiling for parcels whose DEM windows do not fit under the memory cap.
+
+Both compute modules read the parcel's bounding box plus a buffer (500 m for
+slope units, 1 km for the runout search) as one window and build several
+full-window temporaries over it. For a lot of a few hectares that is a few
+megabytes. For a subdivision of hundreds of hectares it is gigabytes. Above
+``ComputeOptions.max_window_mb`` the modules switch to a tiled path instead:
+
+* the parcel's pixel bounding box is cut into square tiles on the DEM grid;
+* each tile is processed with its own buffer (the halo) and discarded;
+* per-tile results are folded into running totals (slope coverage counts)
+  or a shared set of peaks already traced (runout transects).
+
+Tile edges fall on pixel edges, so no pixel centre lies on a seam and every
+parcel pixel belongs to exactly one tile. Peak memory is one tile plus its
+halo, whatever the parcel size.
+"""
+import math
+
+import rasterio.windows
+import shapely
+from rasterio.windows import Window
+from shapely.geometry import box
+from shapely.geometry.base import BaseGeometry
+
+# A tile narrower than this spends most of its read on the halo. Below it the
+# cap is exceeded rather than the parcel processed in thousands of slivers.
+MIN_TILE_PX = 64
+
+_MB = 2**20
+
+
+def metres_to_crs(dataset, geometry: BaseGeometry, metres: float) -> float:
+    """``metres`` in the dataset's CRS units at the parcel's latitude."""
+    if dataset.crs and dataset.crs.is_geographic:
+        lat_rad = math.radians(geometry.centroid.y)
+        return metres / (111320.0 * math.cos(lat_rad))
+    return float(metres)
+
+
+def halo_pixels(dataset, distance: float) -> int:
+    """Pixels needed to cover ``distance`` CRS units along either axis."""
+    return math.ceil(distance / min(abs(r) for r in dataset.res))
+
+
+def window_bytes(geometry: BaseGeometry, dataset, halo: float,
+                 bytes_per_pixel: float) -> float:
+    """Approximate bytes for the window over ``geometry`` grown by ``halo``."""
+    minx, miny, maxx, maxy = geometry.bounds
+    px, py = (abs(r) for r in dataset.res)
+    cols = math.ceil((maxx - minx + 2 * halo) / px)
+    rows = math.ceil((maxy - miny + 2 * halo) / py)
+    return cols * rows * bytes_per_pixel
+
+
+def exceeds_cap(geometry: BaseGeometry, dataset, halo: float, bytes_per_pixel: float,
+                max_window_mb: float | None) -> bool:
+    """True if the untiled window would exceed ``max_window_mb`` (None/0: never)."""
+    if not max_window_mb:
+        return False
+    return window_bytes(geometry, dataset, halo, bytes_per_pixel) > max_window_mb * _MB
+
+
+def tile_side(halo_px: int, bytes_per_pixel: float, max_window_mb: float) -> int:
+    """Largest tile side (pixels) whose window, halo included, fits the cap."""
+    side = math.isqrt(int(max_window_mb * _MB / bytes_per_pixel)) - 2 * halo_px
+    return max(side, MIN_TILE_PX)
+
+
+def pixel_tiles(geometry: BaseGeometry, dataset, side: int) -> list[tuple[Window, BaseGeometry]]:
+    """Grid-aligned ``side``-pixel tiles over ``geometry``'s bounds that it touches.
+
+    Returns (window, tile polygon in the dataset CRS) pairs in row-major order.
+    """
+    minx, miny, maxx, maxy = geometry.bounds
+    inverse = ~dataset.transform
+    cols, rows = zip(*(inverse * xy for xy in ((minx, maxy), (maxx, miny))))
+    # Clipped to the raster: parts of a parcel off the DEM have no pixels.
+    col0, col1 = max(math.floor(min(cols)), 0), min(math.ceil(max(cols)), dataset.width)
+    row0, row1 = max(math.floor(min(rows)), 0), min(math.ceil(max(rows)), dataset.height)
+
+    shapely.prepare(geometry)
+    tiles = []
+    for row in range(row0, row1, side):
+        for col in range(col0, col1, side):
+            window = Window(col, row, min(side, col1 - col), min(side, row1 - row))
+            tile = box(*rasterio.windows.bounds(window, dataset.transform))
+            if geometry.intersects(tile):
+                tiles.append((window, tile))
+    return tiles
+
+
+def grow(window: Window, halo_px: int, dataset) -> Window:
+    """``window`` grown by ``halo_px`` on every side, clipped to the dataset."""
+    grown = Window(window.col_off - halo_px, window.row_off - halo_px,
+                   window.width + 2 * halo_px, window.height + 2 * halo_px)
+    return grown.intersection(Window(0, 0, dataset.width, dataset.height))
+
+
+def clip(geometry: BaseGeometry, tile: BaseGeometry) -> BaseGeometry | None:
+    """The polygonal part of ``geometry`` inside ``tile``, or None if it has none.
+
+    Intersections along a tile edge can include stray lines and points, which
+    rasterize to nothing but would break the buffered reads.
+    """
+    parts = [g for g in shapely.get_parts(geometry.intersection(tile))
+             if g.geom_type in ("Polygon", "MultiPolygon") and g.area > 0]
+    return shapely.union_all(parts) if parts else None
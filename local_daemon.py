@@ -0,0 +1,304 @@
+"""Persistent local assessment daemon (`eil-calc serve-local`).
+
+Scripts that call `eil-calc` thousands of times pay for interpreter start,
+imports and a DEM open on every call. The daemon pays once: it holds one
+EILOrchestrator with `reuse_datasets=True` and answers assessments over a
+Unix socket. The CLI tries the socket first and falls back to running
+in-process when nothing is listening.
+
+Protocol: newline-delimited JSON, any number of requests per connection.
+
+  -> {"op": "assess", "payload": {...}, "engine": "<engine_version>",
+      "settings": "<settings_identity>"}
+  <- {"ok": true, "result": {...}}
+  <- {"ok": false, "kind": "FileNotFoundError", "error": "..."}
+
+  -> {"op": "ping"}
+  <- {"ok": true, "pid": 1234, "engine": "<engine_version>",
+      "settings": "<settings_identity>"}
+
+A request whose engine version differs from the daemon's is refused with
+kind "EngineMismatch": a daemon started before the compute modules or
+thresholds were edited would otherwise keep answering with the old code.
+Likewise a request whose DEM and compute settings differ is refused with
+kind "SettingsMismatch": the daemon reads the DEMs its own environment
+names, so a client's EIL_DEM_* override would otherwise be ignored.
+
+Assessments are serialised behind a lock — the cached rasterio datasets are
+not safe to share between threads — so concurrent clients queue rather than
+interleave. Only the standard library is imported at module level; the
+orchestrator is loaded by `serve()`.
+
+Without $XDG_RUNTIME_DIR the socket lives in the shared temp dir, where any
+user can create the path first. The daemon binds under a 0177 umask, so the
+socket is never reachable by others, not even briefly. The client connects
+only to a socket owned by the current user with mode 0600. Any failure to
+reach the daemon (a foreign socket, a refused connection) makes the client
+fall back to running in-process. A request the daemon accepted but did not
+answer in time is reported instead (DaemonTimeout): running it again
+in-process would compute a slow parcel twice.
+"""
+import hashlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+from fingerprint import engine_version
+
+# Assessments normally take well under a second; this guards against a wedged
+# daemon hanging every script that calls the CLI.
+CLIENT_TIMEOUT_SECONDS = 300.0
+
+
+def default_socket_path() -> str:
+    """$EIL_LOCAL_SOCKET, else $XDG_RUNTIME_DIR/eil-calc.sock, else a per-user
+    path in the temp dir. Read from the environment directly rather than via
+    settings.py so the CLI does not import pydantic before it needs to."""
+    if os.environ.get("EIL_LOCAL_SOCKET"):
+        return os.environ["EIL_LOCAL_SOCKET"]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return str(Path(runtime_dir) / "eil-calc.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return str(Path(tempfile.gettempdir()) / f"eil-calc-{uid}.sock")
+
+
+# Settings that change which DEM is read or how it is processed. Prefixes of
+# the environment variable names settings.py reads (see settings_identity).
+_SETTINGS_PREFIXES = ("EIL_DEM_", "EIL_COMPUTE_")
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening, or it cannot serve this request."""
+
+
+class DaemonTimeout(TimeoutError):
+    """The daemon accepted the request but did not answer in time."""
+
+
+def settings_identity(env_file: str = ".env") -> str:
+    """Short digest of the DEM and compute settings this process would use.
+
+    Taken from the raw EIL_DEM_* and EIL_COMPUTE_* environment variables and
+    ``env_file`` lines, the inputs settings.py reads, so the CLI need not
+    import pydantic to compute it. Equal inputs give equal settings; the
+    converse need not hold, which only costs an in-process run.
+    """
+    entries = sorted(
+        f"env:{key.upper()}={value}" for key, value in os.environ.items()
+        if key.upper().startswith(_SETTINGS_PREFIXES)
+    )
+    try:
+        with open(env_file, encoding="utf-8") as f:
+            lines = [line.strip().removeprefix("export ").strip() for line in f]
+    except OSError:
+        lines = []
+    entries += sorted(f"file:{line}" for line in lines
+                      if line.upper().startswith(_SETTINGS_PREFIXES))
+    return hashlib.sha256("\n".join(entries).encode()).hexdigest()[:16]
+
+
+def _check_socket(socket_path: str) -> None:
+    """Raise DaemonUnavailable unless ``socket_path`` is a socket owned by this
+    user with mode 0600, i.e. one our own daemon created."""
+    try:
+        st = os.stat(socket_path)
+    except OSError as exc:
+        raise DaemonUnavailable(str(exc)) from exc
+    if not stat.S_ISSOCK(st.st_mode):
+        raise DaemonUnavailable(f"{socket_path} is not a socket")
+    if st.st_uid != os.getuid():
+        raise DaemonUnavailable(f"{socket_path} is owned by uid {st.st_uid}, not this user")
+    if stat.S_IMODE(st.st_mode) != 0o600:
+        raise DaemonUnavailable(
+            f"{socket_path} has mode {stat.S_IMODE(st.st_mode):04o}, expected 0600"
+        )
+
+
+# ── Server ─────────────────────────────────────────────────────────────────
+
+class _Handler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                response = self.server.daemon.dispatch(json.loads(line))
+            except json.JSONDecodeError as exc:
+                response = {"ok": False, "kind": "BadRequest", "error": str(exc)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class LocalDaemon:
+    """Serves assessments from one warm orchestrator over a Unix socket."""
+
+    def __init__(self, socket_path: str, orchestrator=None):
+        self.socket_path = socket_path
+        if orchestrator is None:
+            from orchestrator import EILOrchestrator
+
+            orchestrator = EILOrchestrator(reuse_datasets=True)
+        self.orchestrator = orchestrator
+        self.engine = engine_version()
+        self.settings = settings_identity()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def dispatch(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "engine": self.engine,
+                    "settings": self.settings}
+        if op != "assess":
+            return {"ok": False, "kind": "BadRequest", "error": f"unknown op {op!r}"}
+        if request.get("engine") != self.engine:
+            return {"ok": False, "kind": "EngineMismatch",
+                    "error": f"daemon runs engine {self.engine}; restart it"}
+        if request.get("settings") != self.settings:
+            return {"ok": False, "kind": "SettingsMismatch",
+                    "error": "daemon was started with other EIL_DEM_*/EIL_COMPUTE_* "
+                             "settings; restart it from this environment"}
+        try:
+            with self._lock:
+                result = self.orchestrator.run_assessment(request["payload"])
+            return {"ok": True, "result": result}
+        except Exception as exc:
+            return {"ok": False, "kind": type(exc).__name__, "error": str(exc)}
+
+    def bind(self) -> None:
+        """Create the socket, replacing a stale one left by a dead daemon."""
+        if os.path.exists(self.socket_path):
+            if os.stat(self.socket_path).st_uid != os.getuid():
+                raise RuntimeError(f"{self.socket_path} belongs to another user")
+            if _ping(self.socket_path) is not None:
+                raise RuntimeError(f"a daemon is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        # Same-user only: the socket runs assessments with this user's DEMs.
+        # Created 0600 by the umask rather than chmod-ed after bind, which
+        # would leave it open to others in between.
+        umask = os.umask(0o177)
+        try:
+            self._server = _Server(self.socket_path, _Handler)
+        finally:
+            os.umask(umask)
+        self._server.daemon = self
+
+    def serve_forever(self) -> None:
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        self._server.shutdown()
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+        self.orchestrator.close()
+
+
+def serve(socket_path: str) -> None:
+    """Run the daemon in the foreground until SIGINT/SIGTERM."""
+    if not hasattr(socket, "AF_UNIX"):
+        print("Error: serve-local needs Unix domain sockets.", file=sys.stderr)
+        sys.exit(1)
+    daemon = LocalDaemon(socket_path)
+    daemon.bind()
+
+    def _stop(signum, frame):
+        # shutdown() blocks until serve_forever returns, so not on this thread.
+        threading.Thread(target=daemon.shutdown).start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    print(f"eil-calc daemon listening on {socket_path} (engine {daemon.engine})",
+          file=sys.stderr)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+# ── Client ─────────────────────────────────────────────────────────────────
+
+def _request(socket_path: str, request: dict, timeout: float) -> dict:
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonUnavailable("no Unix domain sockets")
+    _check_socket(socket_path)
+    connected = False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            connected = True
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                line = f.readline()
+    except OSError as exc:
+        if connected and isinstance(exc, TimeoutError):
+            # The daemon has the request and is still working on it.
+            raise DaemonTimeout(
+                f"daemon did not answer within {timeout:g}s; "
+                "use --no-daemon for parcels this slow"
+            ) from exc
+        # Refused, permission denied, reset: all mean "no usable daemon", and
+        # the caller runs the assessment in-process instead.
+        raise DaemonUnavailable(f"{type(exc).__name__}: {exc}") from exc
+    if not line:
+        raise DaemonUnavailable("daemon closed the connection")
+    try:
+        return json.loads(line)
+    except ValueError as exc:
+        raise DaemonUnavailable(f"bad response from daemon: {exc}") from exc
+
+
+def _ping(socket_path: str) -> dict | None:
+    try:
+        return _request(socket_path, {"op": "ping"}, timeout=2.0)
+    except (DaemonUnavailable, DaemonTimeout):
+        return None
+
+
+def assess_via_daemon(payload: dict, socket_path: str,
+                      timeout: float = CLIENT_TIMEOUT_SECONDS) -> dict:
+    """Run ``payload`` on the daemon at ``socket_path``.
+
+    Raises DaemonUnavailable when no daemon answers or it runs a different
+    engine version or settings — the caller should then assess in-process —
+    and DaemonTimeout when it took the request but did not answer within
+    ``timeout``. Errors from the assessment itself are re-raised as
+    FileNotFoundError (missing DEM) or RuntimeError, matching what an
+    in-process run would surface.
+    """
+    response = _request(
+        socket_path,
+        {"op": "assess", "payload": payload, "engine": engine_version(),
+         "settings": settings_identity()},
+        timeout,
+    )
+    if response.get("ok"):
+        return response["result"]
+    kind, error = response.get("kind"), response.get("error", "")
+    if kind in ("EngineMismatch", "SettingsMismatch"):
+        raise DaemonUnavailable(error)
+    if kind == "FileNotFoundError":
+        raise FileNotFoundError(error)
+    raise RuntimeError(f"{kind}: {error}")
@@ -1,53 +1,142 @@
 import json
+import math
+import time
+from contextlib import contextmanager, nullcontext
 
 import rasterio
 from rasterio.crs import CRS
 from rasterio.warp import transform_geom
 from shapely.geometry import mapping, shape
 
+import cost_model
 from calculate_depositional_safety import calculate_depositional_safety
-from eil_types import DEMContext
+from deadline import check
+from fingerprint import dem_identity
+from eil_types import ComputeOptions, DEMContext
 from hybrid_engine import run_hybrid_model
-from slope_stability import calculate_slope_stability
+from settings import get_settings
+from slope_stability import calculate_slope_stability, pixel_metres
 from smart_fetcher import SmartFetcher
 
 
+def _project(geometry, dataset):
+    """Shapely geometry for a WGS84 GeoJSON dict, in the dataset's CRS."""
+    wgs84 = CRS.from_epsg(4326)
+    projected = shape(geometry)
+    if dataset.crs != wgs84:
+        projected = shape(transform_geom(wgs84, dataset.crs, mapping(projected)))
+    return projected
+
+
 class EILOrchestrator:
-    def __init__(self):
+    """Runs the Phase 1 (and optionally Phase 2) pipeline for one parcel.
+
+    ``reuse_datasets=True`` keeps each DEM open across assessments instead of
+    opening it per call. That is what batch callers want — the validation
+    harness assesses hundreds of parcels against the same nationwide GeoTIFF,
+    and reopening it each time re-reads the header and throws away GDAL's
+    block cache. Callers that opt in own the handles and should ``close()``.
+    """
+
+    def __init__(self, reuse_datasets: bool = False):
         self.fetcher = SmartFetcher()
+        self._reuse_datasets = reuse_datasets
+        self._datasets = {}
+
+    def _open(self, dem_path):
+        """Context manager yielding an open dataset for ``dem_path``."""
+        if not self._reuse_datasets:
+            return rasterio.open(dem_path)
+        dataset = self._datasets.get(dem_path)
+        if dataset is None or dataset.closed:
+            dataset = self._datasets[dem_path] = rasterio.open(dem_path)
+        return nullcontext(dataset)
+
+    def close(self):
+        """Close any DEM handles kept open by ``reuse_datasets``."""
+        for dataset in self._datasets.values():
+            dataset.close()
+        self._datasets.clear()
+
+    @contextmanager
+    def dem_context(self, geometry, options: ComputeOptions | None = None):
+        """Yield a DEMContext for a WGS84 GeoJSON geometry.
+
+        For tooling that calls the compute modules directly rather than
+        through ``run_assessment`` — same DEM choice, same reprojection.
+        """
+        dem_path, dem_type = self.fetcher.fetch_dem_path(geometry)
+        with self._open(dem_path) as dataset:
+            yield DEMContext(
+                dataset=dataset,
+                geometry=_project(geometry, dataset),
+                source_type=dem_type,
+                options=options or ComputeOptions(),
+            )
+
+    def run_assessment(self, payload, deadline=None):
+        """Main pipeline entry point.
 
-    def run_assessment(self, payload):
-        """Main pipeline entry point."""
+        ``deadline`` (deadline.py) is the caller's, already combined with
+        the config's ``deadline_ms``; without one, ``deadline_ms`` counts
+        from now (the CLI and the daemon).
+        Once it passes, DeadlineExceeded propagates out naming the stage.
+        """
         results = {
             "project_id": payload.get("project_id"),
             "phase_1_compliance": {},
             "phase_2_scientific": None,
             "final_decision": "PENDING",
         }
+        # Wall-clock seconds per pipeline stage. Not part of the API contract
+        # (the response model drops it); the validation harness reports it.
+        timings = {}
+        stage_start = time.perf_counter()
+
+        def _lap(stage):
+            nonlocal stage_start
+            now = time.perf_counter()
+            timings[stage] = now - stage_start
+            stage_start = now
+
+        # Validated before any I/O: an unknown precision is a caller error.
+        options = ComputeOptions.from_config(
+            payload.get("config"), max_window_mb=get_settings().compute_max_window_mb or None,
+            deadline=deadline,
+        )
 
         # 1. Fetch DEM path
+        check(options.deadline, "fetch")
         dem_path, dem_type = self.fetcher.fetch_dem_path(payload.get("geometry"))
         results["data_source"] = dem_type
+        _lap("fetch")
 
-        with rasterio.open(dem_path) as dataset:
+        with self._open(dem_path) as dataset:
+            _lap("open")
             # 2. Reproject geometry once — all modules receive projected geometry.
-            wgs84 = CRS.from_epsg(4326)
-            geometry = shape(payload["geometry"])
-            if dataset.crs != wgs84:
-                geometry = shape(
-                    transform_geom(wgs84, dataset.crs, mapping(geometry))
-                )
+            geometry = _project(payload["geometry"], dataset)
+            _lap("reproject")
+            # The schedulers' prediction, on the DEM actually used, reported
+            # beside the measured timings so cost_model.py can be recalibrated.
+            cost_estimate = cost_model.estimate(
+                payload["geometry"], math.sqrt(math.prod(pixel_metres(dataset, geometry)))
+            )
 
             # 3. Build shared context
             context = DEMContext(
                 dataset=dataset,
                 geometry=geometry,
                 source_type=dem_type,
+                options=options,
             )
 
             # 4. Phase 1: Compliance
+            check(options.deadline, "slope")
             slope_res = calculate_slope_stability(context)
+            _lap("slope")
+            check(options.deadline, "depositional")
             dep_res = calculate_depositional_safety(context)
+            _lap("depositional")
 
         results["phase_1_compliance"]["slope_stability"] = slope_res
         results["phase_1_compliance"]["depositional_hazard"] = dep_res
@@ -69,8 +158,16 @@ class EILOrchestrator:
 
         # 6. Phase 2: Scientific (optional)
         if payload.get("config", {}).get("mode") == "research":
+            check(options.deadline, "phase_2")
             results["phase_2_scientific"] = run_hybrid_model(payload, dem_path)
+            _lap("phase_2")
 
+        results["diagnostics"] = {
+            "timings_s": timings,
+            "cost_estimate": cost_estimate,
+            # What fingerprint.assessment_etag keys on: the DEM actually read.
+            "dem_identity": dem_identity(dem_path),
+        }
         return results
 
 
@@ -0,0 +1,241 @@
+"""Wall-to-wall Phase 1 slope classification over a DEM (``eil-calc regional-map``).
+
+Answers "which lots in this area would fail?" without a parcel list. The
+area is cut into square lot-sized cells on the DEM grid, and each cell gets
+the slope status compute_slope_stability would give a parcel with that
+outline: SAFE, FLAG or SUSCEPTIBLE by coverage fraction.
+
+The work is split into chunks of cells. Each chunk is read with a
+SLOPE_HALO_PX halo, enough for the smoothing and the central difference,
+so its slopes equal those of a per-parcel read. Chunks run in a process
+pool. Each finished chunk is saved as a .npy checkpoint, so an interrupted
+run resumes where it stopped. The checkpoints are then assembled into a
+tiled GeoTIFF of class codes.
+
+Two simplifications against the per-parcel engine:
+
+* Slope units are not delineated. Per parcel they only drop pixels whose
+  basin has no local minimum, in practice none, and a watershed needs the
+  500 m buffer that a halo-sized read avoids.
+* Pixel sizes in metres are taken at each chunk's centre latitude rather
+  than each cell's. Across a chunk of a few kilometres that differs by well
+  under a tenth of a percent.
+"""
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import rasterio
+from rasterio.windows import Window
+from shapely.geometry import Point
+
+from eil_status import (
+    COVERAGE_FRACTION_FLAG,
+    COVERAGE_FRACTION_SUSCEPTIBLE,
+    SLOPE_THRESHOLD_FLAG,
+    SLOPE_THRESHOLD_SUSCEPTIBLE,
+)
+from fingerprint import dem_identity
+from slope_stability import SLOPE_HALO_PX, pixel_metres, slope_field
+
+# Class codes written to the map. 0 is the GeoTIFF's nodata value.
+NODATA, SAFE, FLAG, SUSCEPTIBLE = 0, 1, 2, 3
+CLASS_NAMES = {SAFE: "SAFE", FLAG: "FLAG", SUSCEPTIBLE: "SUSCEPTIBLE"}
+
+_MANIFEST = "manifest.json"
+_BLOCK = 256
+
+
+def grid(dataset, cell_m: float, bbox=None) -> dict:
+    """The cell grid over ``bbox`` (dataset CRS; default: the whole DEM).
+
+    Returns pixel offsets of the grid origin, the cell side in pixels and
+    the grid's size in cells. Cells are aligned to DEM pixels; the last row
+    and column may run past the DEM and are classified from what is on it.
+    """
+    inverse = ~dataset.transform
+    if bbox is None:
+        col0, row0, col1, row1 = 0, 0, dataset.width, dataset.height
+    else:
+        minx, miny, maxx, maxy = bbox
+        cols, rows = zip(*(inverse * xy for xy in ((minx, maxy), (maxx, miny))))
+        col0, col1 = max(math.floor(min(cols)), 0), min(math.ceil(max(cols)), dataset.width)
+        row0, row1 = max(math.floor(min(rows)), 0), min(math.ceil(max(rows)), dataset.height)
+        if col1 <= col0 or row1 <= row0:
+            raise ValueError("bbox does not overlap the DEM")
+
+    centre = Point(dataset.xy((row0 + row1) // 2, (col0 + col1) // 2))
+    px_m, py_m = pixel_metres(dataset, centre)
+    cell_px = max(1, round(cell_m / math.sqrt(abs(px_m * py_m))))
+    return {
+        "col0": col0, "row0": row0, "cell_px": cell_px,
+        "cols": math.ceil((col1 - col0) / cell_px),
+        "rows": math.ceil((row1 - row0) / cell_px),
+    }
+
+
+def chunks(g: dict, chunk_cells: int) -> list[tuple[int, int, int, int]]:
+    """(row, col, height, width) blocks of the cell grid, in cells."""
+    return [
+        (r, c, min(chunk_cells, g["rows"] - r), min(chunk_cells, g["cols"] - c))
+        for r in range(0, g["rows"], chunk_cells)
+        for c in range(0, g["cols"], chunk_cells)
+    ]
+
+
+def classify_cells(slope: np.ndarray, cell_px: int) -> np.ndarray:
+    """Class codes of the ``cell_px``-square cells of ``slope`` (degrees).
+
+    ``slope`` must be a whole number of cells on each side. Cells without a
+    single defined slope are NODATA.
+    """
+    rows, cols = slope.shape[0] // cell_px, slope.shape[1] // cell_px
+    cells = slope.reshape(rows, cell_px, cols, cell_px)
+    valid = ~np.isnan(cells)
+    n = valid.sum(axis=(1, 3))
+    with np.errstate(invalid="ignore"):
+        susceptible = (cells > SLOPE_THRESHOLD_SUSCEPTIBLE).sum(axis=(1, 3))
+        flag = ((cells > SLOPE_THRESHOLD_FLAG)
+                & (cells <= SLOPE_THRESHOLD_SUSCEPTIBLE)).sum(axis=(1, 3))
+    safe_n = np.maximum(n, 1)
+    codes = np.full((rows, cols), SAFE, dtype=np.uint8)
+    # Same order as slope_stability.classify_coverage.
+    codes[flag / safe_n > COVERAGE_FRACTION_FLAG] = FLAG
+    codes[susceptible / safe_n > COVERAGE_FRACTION_SUSCEPTIBLE] = SUSCEPTIBLE
+    codes[n == 0] = NODATA
+    return codes
+
+
+def classify_chunk(dataset, g: dict, chunk: tuple[int, int, int, int],
+                   dtype=np.float64) -> np.ndarray:
+    """Class codes for one chunk of the grid, read with a SLOPE_HALO_PX halo."""
+    r, c, h, w = chunk
+    cell_px = g["cell_px"]
+    row0, col0 = g["row0"] + r * cell_px, g["col0"] + c * cell_px
+    core = Window(col0, row0, w * cell_px, h * cell_px)
+    # Boundless, so the core is a whole number of cells; off-DEM pixels are
+    # NaN like nodata. The halo is clipped to the DEM, as a parcel's is.
+    read = Window(col0 - SLOPE_HALO_PX, row0 - SLOPE_HALO_PX,
+                  core.width + 2 * SLOPE_HALO_PX, core.height + 2 * SLOPE_HALO_PX)
+    band = dataset.read(1, window=read, boundless=True, masked=True)
+    elevations = band.data.astype(dtype)
+    elevations[np.ma.getmaskarray(band)] = np.nan
+
+    top, left = max(-read.row_off, 0), max(-read.col_off, 0)
+    bottom = min(dataset.height - read.row_off, read.height)
+    right = min(dataset.width - read.col_off, read.width)
+
+    centre = Point(dataset.xy(row0 + core.height // 2, col0 + core.width // 2))
+    px_m, py_m = pixel_metres(dataset, centre)
+    # Trim the read to the DEM before differentiating, as a parcel window is
+    # trimmed, then put the slopes back on the boundless grid.
+    slope = np.full(elevations.shape, np.nan, dtype=elevations.dtype)
+    on = np.s_[top:bottom, left:right]
+    slope[on] = slope_field(elevations[on], px_m, py_m, dtype)
+    inner = np.s_[SLOPE_HALO_PX:SLOPE_HALO_PX + core.height,
+                  SLOPE_HALO_PX:SLOPE_HALO_PX + core.width]
+    return classify_cells(slope[inner], cell_px)
+
+
+# ── Parallel run with checkpoints ──────────────────────────────────────────
+
+_worker_dataset = None
+
+
+def _init_worker(dem: str) -> None:
+    global _worker_dataset
+    _worker_dataset = rasterio.open(dem)
+
+
+def _checkpoint_path(checkpoint_dir: Path, chunk) -> Path:
+    return checkpoint_dir / f"chunk_{chunk[0]:06d}_{chunk[1]:06d}.npy"
+
+
+def _run_chunk(g: dict, chunk, dtype: str, checkpoint_dir: str) -> tuple:
+    codes = classify_chunk(_worker_dataset, g, chunk, np.dtype(dtype))
+    path = _checkpoint_path(Path(checkpoint_dir), chunk)
+    tmp = path.with_suffix(".tmp.npy")
+    np.save(tmp, codes)
+    os.replace(tmp, path)  # a killed worker never leaves a partial checkpoint
+    return chunk
+
+
+def _open_checkpoints(checkpoint_dir: Path, manifest: dict) -> None:
+    """Create ``checkpoint_dir``, or check it belongs to the same run."""
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    path = checkpoint_dir / _MANIFEST
+    if path.exists():
+        existing = json.loads(path.read_text())
+        if existing != manifest:
+            raise ValueError(
+                f"{checkpoint_dir} holds checkpoints of a different run (DEM file, "
+                f"thresholds, bbox, cell size, chunking or precision differ); "
+                f"delete it or pass another --checkpoints directory"
+            )
+    else:
+        path.write_text(json.dumps(manifest, indent=2))
+
+
+def build_map(dem: str, output: str, cell_m: float = 30.0, bbox=None,
+              chunk_cells: int = 64, workers: int | None = None,
+              checkpoint_dir: str | None = None, precision: str = "float64") -> dict:
+    """Classify every cell over ``dem`` and write the GeoTIFF to ``output``.
+
+    Chunks with a checkpoint in ``checkpoint_dir`` (default: ``output`` +
+    ".chunks") are not recomputed. Returns a summary: grid size, chunks
+    computed and resumed, and cell counts per class.
+    """
+    workers = workers or os.cpu_count() or 1
+    checkpoint_dir = Path(checkpoint_dir or f"{output}.chunks")
+    with rasterio.open(dem) as dataset:
+        g = grid(dataset, cell_m, bbox)
+        profile = dataset.profile
+        transform = dataset.transform * rasterio.Affine.translation(g["col0"], g["row0"]) \
+            * rasterio.Affine.scale(g["cell_px"])
+
+    # dem_identity changes when the DEM is replaced in place, and the
+    # thresholds are baked into every checkpointed class code.
+    manifest = {"dem": dem_identity(dem), "grid": g, "chunk_cells": chunk_cells,
+                "precision": precision,
+                "thresholds": {
+                    "slope_flag_deg": SLOPE_THRESHOLD_FLAG,
+                    "slope_susceptible_deg": SLOPE_THRESHOLD_SUSCEPTIBLE,
+                    "coverage_flag": COVERAGE_FRACTION_FLAG,
+                    "coverage_susceptible": COVERAGE_FRACTION_SUSCEPTIBLE,
+                }}
+    _open_checkpoints(checkpoint_dir, manifest)
+    todo = [ch for ch in chunks(g, chunk_cells)
+            if not _checkpoint_path(checkpoint_dir, ch).exists()]
+    total = len(chunks(g, chunk_cells))
+    print(f"[regional-map] {g['rows']}×{g['cols']} cells of {g['cell_px']} px, "
+          f"{total} chunk(s), {total - len(todo)} resumed, {workers} worker(s)")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(dem,)) as pool:
+        futures = [pool.submit(_run_chunk, g, ch, precision, str(checkpoint_dir))
+                   for ch in todo]
+        for done, future in enumerate(as_completed(futures), start=1):
+            future.result()
+            if done % 50 == 0 or done == len(futures):
+                print(f"  {done}/{len(futures)} chunks")
+
+    counts = dict.fromkeys([*CLASS_NAMES.values(), "NODATA"], 0)
+    profile.update(
+        driver="GTiff", dtype="uint8", count=1, nodata=NODATA,
+        width=g["cols"], height=g["rows"], transform=transform,
+        tiled=True, blockxsize=_BLOCK, blockysize=_BLOCK, compress="deflate",
+    )
+    with rasterio.open(output, "w", **profile) as dst:
+        dst.update_tags(classes=json.dumps(CLASS_NAMES), cell_px=g["cell_px"])
+        for ch in chunks(g, chunk_cells):
+            codes = np.load(_checkpoint_path(checkpoint_dir, ch))
+            dst.write(codes, 1, window=Window(ch[1], ch[0], ch[3], ch[2]))
+            values, n = np.unique(codes, return_counts=True)
+            for v, k in zip(values, n):
+                counts[CLASS_NAMES.get(int(v), "NODATA")] += int(k)
+
+    return {"cells": g["rows"] * g["cols"], "cell_px": g["cell_px"], "chunks": total,
+            "computed": len(todo), "resumed": total - len(todo), "counts": counts}
@@ -31,10 +31,50 @@ class Settings(BaseSettings):
     dem_ifsar_uri: str = ""
     dem_srtm_uri: str = ""
 
+    # Optional JSON catalog of regional DEM tiles (see dem_catalog.py). When
+    # set, each parcel is served from the smallest tile covering it plus the
+    # depositional search radius; the nationwide files above remain the
+    # fallback for parcels at tile seams or outside every tile.
+    dem_catalog_uri: str = ""
+
+    # Where `python coverage_index.py build` writes each DEM's coverage index
+    # and where SmartFetcher looks for it. Empty means next to the DEM itself;
+    # set it when the DEM lives on a read-only mount.
+    dem_coverage_dir: str = ""
+
+    # Hot regions read once at startup so the first assessments there do not
+    # pay for a cold page cache, as JSON: [[minx, miny, maxx, maxy], ...] in
+    # WGS84. The lifespan hook waits at most the budget before declaring the
+    # process ready; the warm-up finishes in the background after that.
+    dem_warm_bboxes: list[tuple[float, float, float, float]] = []
+    dem_warm_budget_seconds: float = 10.0
+    # Largest box one warm-up reads, in square degrees (1 deg² is ~12,000 km²
+    # and up to ~2 GB of IfSAR). Keeps a mistyped bbox from reading the country.
+    dem_warm_max_bbox_deg2: float = 1.0
+
     # Developer escape hatch: scan removable-drive mount points for the DEMs
     # when neither URI is set. Off by default so a server never does it.
     dem_allow_removable_scan: bool = False
 
+    # --- Compute -------------------------------------------------------------
+    # Peak-memory cap, in MB, for the DEM window one module holds at a time.
+    # A parcel whose buffered window would exceed it (subdivision-scale lots of
+    # hundreds of hectares) is processed in tiles that each fit under the cap;
+    # see large_parcel.py. 0 disables tiling. A request can override it with
+    # config {"max_window_mb": ...}.
+    compute_max_window_mb: float = 512.0
+
+    # Admission control for /api/v1/assess (see admission.py): assessments
+    # computing at once, and how many more may wait for a slot before
+    # requests are refused with 429. Identical requests already in flight
+    # join that computation without taking a slot.
+    assess_max_concurrency: int = 4
+    assess_max_queue: int = 32
+    # Waiters are served cheapest first by predicted cost (cost_model.py):
+    # a queued parcel is overtaken only by requests arriving less than this
+    # many times its predicted run time after it. 0 is first come first served.
+    assess_cost_weight: float = 4.0
+
     # --- HTTP ----------------------------------------------------------------
     # Origins allowed to call the API cross-origin. Empty is correct for the
     # deployment topology, where one reverse proxy serves the SPA and proxies
@@ -4,49 +4,122 @@ import scipy.ndimage as ndimage
 import rasterio.features
 import rasterio.mask
 import numpy as np
+import shapely
 from shapely.geometry.base import BaseGeometry
 
-from skimage import feature, segmentation
-from eil_types import DEMContext, SlopeAssessment, SlopeMetrics, SlopeResult
-from eil_status import SLOPE_THRESHOLD_FLAG, SLOPE_THRESHOLD_SUSCEPTIBLE, SlopeStatus
+import large_parcel
+from deadline import check
+from eil_types import (
+    ComputeOptions,
+    DEMContext,
+    SlopeAssessment,
+    SlopeMetrics,
+    SlopeResult,
+)
+from eil_status import (
+    COVERAGE_FRACTION_FLAG,
+    COVERAGE_FRACTION_SUSCEPTIBLE,
+    SLOPE_THRESHOLD_FLAG,
+    SLOPE_THRESHOLD_SUSCEPTIBLE,
+    SlopeStatus,
+)
 
 _CATCHMENT_BUFFER_METRES = 500.0
 
+# Gaussian smoothing of the elevation surface, in pixels.
+_SMOOTHING_SIGMA = 2.0
 
-def compute_slope_stability(geometry: BaseGeometry, dataset) -> SlopeResult | dict:
-    """Compute slope stability from an open rasterio dataset.
+# How far outside a region the smoothed slope reads: the Gaussian's radius
+# (scipy truncates it at four sigma) plus the central difference.
+SLOPE_HALO_PX = int(4 * _SMOOTHING_SIGMA + 0.5) + 1
 
-    Args:
-        geometry: Parcel polygon already in dataset CRS.
-        dataset:  Open rasterio dataset.
+# np.gradient's central difference reads the four edge neighbours, not the
+# pixel itself; a slope is undefined if any of them is nodata.
+_GRADIENT_STENCIL = np.array([[0, 1, 0], [1, 0, 1], [0, 1, 0]], dtype=bool)
 
-    Returns:
-        SlopeResult dict or {"error": ...} on failure.
+# Largest per-pixel difference (degrees) between the "dog" and "gradient"
+# kernels, reached only within the smoothing radius of a nodata gap; elsewhere
+# they agree to rounding. Measured on the IfSAR fixture with punched gaps
+# (bench_slope_kernel.py --gaps 60), where it stays under 1.2° on 60° terrain.
+DOG_TOLERANCE_DEG = 1.5
+
+
+def _dog_slope(smoothed, weights, valid_mask, region_mask, px_m, py_m):
+    """Slope in degrees on ``region_mask``'s bounding box, NaN elsewhere.
+
+    The smoothed surface is the normalised convolution S / W, with
+    S = G * (z·valid) and W = G * valid. Its derivative follows from the
+    quotient rule, (dS·W − S·dW) / W², where d is the central difference
+    np.gradient applies. d·G is then a discrete derivative-of-Gaussian, and
+    dS and dW reuse the full-window smoothing passes. Only the bounding box
+    is differentiated, plus a one-pixel halo. The S / W division,
+    np.gradient, hypot and arctan no longer sweep the whole buffered window.
+
+    Where every pixel under the kernel is valid, W is constant, so this
+    equals np.gradient(S / W) up to rounding. Near nodata gaps W varies and
+    the two differ by at most DOG_TOLERANCE_DEG.
     """
+    slope = np.full(smoothed.shape, np.nan, dtype=smoothed.dtype)
+    rows, cols = np.nonzero(region_mask)
+    if rows.size == 0:
+        return slope
+
+    r0, r1 = rows.min(), rows.max() + 1
+    c0, c1 = cols.min(), cols.max() + 1
+    hr0, hc0 = max(r0 - 1, 0), max(c0 - 1, 0)
+    padded = np.s_[hr0:min(r1 + 1, smoothed.shape[0]), hc0:min(c1 + 1, smoothed.shape[1])]
+    inner = np.s_[r0 - hr0:r1 - hr0, c0 - hc0:c1 - hc0]
+    box = np.s_[r0:r1, c0:c1]
+
+    def _difference(image, axis):
+        return ndimage.correlate1d(image[padded], [-0.5, 0.0, 0.5], axis=axis)[inner]
+
+    S, W = smoothed[box], weights[box]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dz_dy = (_difference(smoothed, 0) * W - S * _difference(weights, 0)) / (W * W * py_m)
+        dz_dx = (_difference(smoothed, 1) * W - S * _difference(weights, 1)) / (W * W * px_m)
+    box_slope = np.degrees(np.arctan(np.hypot(dz_dx, dz_dy)))
+
+    defined = ndimage.binary_erosion(valid_mask[padded], structure=_GRADIENT_STENCIL,
+                                     border_value=1)[inner]
+    box_slope[~defined] = np.nan
+    slope[box] = box_slope
+    return slope
+
+
+def pixel_metres(dataset, geometry: BaseGeometry) -> tuple[float, float]:
+    """(px, py) pixel size in metres at the parcel's latitude."""
     px, py = dataset.res
     if dataset.crs and dataset.crs.is_geographic:
         lat_rad = math.radians(geometry.centroid.y)
-        py_m_deg = py * 111320.0
-        px_m_deg = px * 111320.0 * math.cos(lat_rad)
-        buffer_dist = _CATCHMENT_BUFFER_METRES / (111320.0 * math.cos(lat_rad))
-    else:
-        py_m_deg, px_m_deg = py, px
-        buffer_dist = _CATCHMENT_BUFFER_METRES
-
-    # Buffer the parcel so edge pixels have real neighbours during gradient
-    # computation, preventing nodata sentinels from producing false 90° slopes.
-    buffered_geom = geometry.buffer(buffer_dist)
+        return px * 111320.0 * math.cos(lat_rad), py * 111320.0
+    return px, py
 
-    out_image, out_transform = rasterio.mask.mask(dataset, [buffered_geom], crop=True)
-    elevation_data = out_image[0].astype(float)
 
+def _read_elevations(dataset, shape: BaseGeometry, dtype):
+    """``shape``'s crop window in ``dtype`` with nodata as NaN, and its transform."""
+    out_image, out_transform = rasterio.mask.mask(dataset, [shape], crop=True)
     # NaN-out nodata pixels before gradient so arithmetic against sentinel values
     # (e.g. IfSAR INT32_MAX=2147483648, SRTM 0.0) does not corrupt slope angles.
     # Note: SRTM nodata=0.0 means valid sea-level pixels in the buffer zone are
     # also NaN'd, but they lie outside the actual parcel so this is acceptable.
-    if dataset.nodata is not None:
-        elevation_data[elevation_data == dataset.nodata] = np.nan
+    # The mask is taken on the raw band: a sentinel need not survive a cast to
+    # float32 exactly, and a valid pixel could round onto it.
+    nodata_mask = out_image[0] == dataset.nodata if dataset.nodata is not None else None
+    elevation_data = out_image[0].astype(dtype)
+    if nodata_mask is not None:
+        elevation_data[nodata_mask] = np.nan
+    return elevation_data, out_transform
 
+
+def _smooth(elevation_data, dtype):
+    """Gaussian-smoothed elevations with nodata kept sharp.
+
+    Returns:
+        (valid_mask, smoothed_elev, weight_map, elevation_smoothed): the
+        normalised convolution elevation_smoothed = smoothed_elev / weight_map,
+        NaN off valid_mask, plus the two passes it is built from.
+    """
     # --- Feature 3.1: DEM Noise Mitigation (Spatial Smoothing) ---
     # Apply a Gaussian low-pass filter to remove micro-topographic artifacts 
     # before evaluating the slope threshold. A sigma of 2.0 on 5m pixels 
@@ -55,8 +128,8 @@ def compute_slope_stability(geometry: BaseGeometry, dataset) -> SlopeResult | di
     elev_filled = np.nan_to_num(elevation_data, nan=0.0)
     
     # Smooth the filled elevation and the validity mask to prevent NaN propagation
-    smoothed_elev = ndimage.gaussian_filter(elev_filled * valid_mask, sigma=2.0)
-    weight_map = ndimage.gaussian_filter(valid_mask.astype(float), sigma=2.0)
+    smoothed_elev = ndimage.gaussian_filter(elev_filled * valid_mask, sigma=_SMOOTHING_SIGMA)
+    weight_map = ndimage.gaussian_filter(valid_mask.astype(dtype), sigma=_SMOOTHING_SIGMA)
     
     elevation_smoothed = np.full_like(elevation_data, np.nan)
     valid_weights = weight_map > 1e-6
@@ -64,19 +137,27 @@ def compute_slope_stability(geometry: BaseGeometry, dataset) -> SlopeResult | di
     
     # Re-apply the strict nodata mask to keep bounds sharp
     elevation_smoothed[~valid_mask] = np.nan
+    return valid_mask, smoothed_elev, weight_map, elevation_smoothed
 
-    dz_dy, dz_dx = np.gradient(elevation_smoothed, py_m_deg, px_m_deg)
-    slope_degrees = np.degrees(np.arctan(np.sqrt(dz_dx**2 + dz_dy**2)))
 
-    # Restrict the metric to pixels inside the original (unbuffered) parcel.
-    parcel_mask = rasterio.features.geometry_mask(
-        [geometry],
-        out_shape=elevation_data.shape,
-        transform=out_transform,
-        invert=True,  # True → pixels inside geometry are True
-    )
+def slope_field(elevation_data, px_m: float, py_m: float, dtype=np.float64) -> np.ndarray:
+    """Slope in degrees of the smoothed surface of ``elevation_data`` (NaN nodata).
+
+    The "gradient" kernel of _slope_surface without slope units, for callers
+    that tile a whole DEM themselves (regional_map.py). Values more than
+    SLOPE_HALO_PX from the array edge equal those of any larger window.
+    """
+    _, _, _, elevation_smoothed = _smooth(elevation_data, dtype)
+    dz_dy, dz_dx = np.gradient(elevation_smoothed, py_m, px_m)
+    return np.degrees(np.arctan(np.sqrt(dz_dx**2 + dz_dy**2)))
+
 
+def _catchments(elevation_smoothed, valid_mask):
+    """Watershed labels of the smoothed surface (0 where no basin reaches)."""
     # --- Feature 3.2: Dynamic Slope Unit (SU) Delineation ---
+    # skimage is the slowest import in the stack; only this step needs it.
+    from skimage import feature, segmentation
+
     # Partition the terrain into natural drainage basins (bounded by ridges).
     # 1. Identify local minima to serve as pour points mapping to the watershed.
     elev_valid = np.nan_to_num(elevation_smoothed, nan=np.nanmax(elevation_smoothed))
@@ -89,7 +170,52 @@ def compute_slope_stability(geometry: BaseGeometry, dataset) -> SlopeResult | di
         markers[r, c] = i
         
     # Segment terrain using standard watershed
-    catchments = segmentation.watershed(elev_valid, markers, mask=valid_mask)
+    return segmentation.watershed(elev_valid, markers, mask=valid_mask)
+
+
+def _slope_surface(geometry: BaseGeometry, dataset, dtype=np.float64, kernel="gradient",
+                   deadline=None):
+    """Slope in degrees over the buffered window, plus the masks it is read with.
+
+    Every full-window temporary is held in ``dtype`` (see ComputeOptions).
+    With ``kernel="dog"`` the slope is only evaluated on the parcel's bounding
+    box (see _dog_slope) and is NaN across the rest of the window.
+    ``deadline`` is checked between steps (deadline.py).
+
+    Returns:
+        (slope_degrees, parcel_mask, site_mask) where ``site_mask`` selects the
+        pixels the coverage metrics are computed over (parcel ∩ slope units ∩
+        valid data).
+    """
+    px_m_deg, py_m_deg = pixel_metres(dataset, geometry)
+    buffer_dist = large_parcel.metres_to_crs(dataset, geometry, _CATCHMENT_BUFFER_METRES)
+
+    # Buffer the parcel so edge pixels have real neighbours during gradient
+    # computation, preventing nodata sentinels from producing false 90° slopes.
+    buffered_geom = geometry.buffer(buffer_dist)
+
+    elevation_data, out_transform = _read_elevations(dataset, buffered_geom, dtype)
+    check(deadline, "slope")
+    valid_mask, smoothed_elev, weight_map, elevation_smoothed = _smooth(elevation_data, dtype)
+    check(deadline, "slope")
+
+    # Restrict the metric to pixels inside the original (unbuffered) parcel.
+    parcel_mask = rasterio.features.geometry_mask(
+        [geometry],
+        out_shape=elevation_data.shape,
+        transform=out_transform,
+        invert=True,  # True → pixels inside geometry are True
+    )
+
+    if kernel == "dog":
+        slope_degrees = _dog_slope(smoothed_elev, weight_map, valid_mask, parcel_mask,
+                                   px_m_deg, py_m_deg)
+    else:
+        dz_dy, dz_dx = np.gradient(elevation_smoothed, py_m_deg, px_m_deg)
+        slope_degrees = np.degrees(np.arctan(np.sqrt(dz_dx**2 + dz_dy**2)))
+
+    check(deadline, "slope")
+    catchments = _catchments(elevation_smoothed, valid_mask)
     
     # Identify which natural drainage basins (SUs) intersect the original parcel footprint
     overlapping_sus = np.unique(catchments[parcel_mask])
@@ -103,9 +229,63 @@ def compute_slope_stability(geometry: BaseGeometry, dataset) -> SlopeResult | di
     # Evaluate slope constraints within the SU basins, clipped to the parcel footprint.
     # su_mask selects which drainage basins are hydrologically relevant; parcel_mask
     # ensures the actual metric is computed only over pixels inside the lot boundary.
-    site_slopes = slope_degrees[su_mask & parcel_mask & valid_mask]
-    site_slopes = site_slopes[~np.isnan(site_slopes)]
+    site_mask = su_mask & parcel_mask & valid_mask & ~np.isnan(slope_degrees)
+    return slope_degrees, parcel_mask, site_mask
+
+
+def site_slope_sample(geometry: BaseGeometry, dataset, dtype=np.float64,
+                      kernel="gradient", deadline=None) -> np.ndarray:
+    """The slope samples (degrees) the coverage fractions are computed over.
+
+    Exposed for the validation tooling, which caches them once per parcel and
+    re-derives the classification for many candidate thresholds.
+    """
+    slope_degrees, _, site_mask = _slope_surface(geometry, dataset, dtype, kernel, deadline)
+    return slope_degrees[site_mask]
+
+
+def classify_coverage(pct_susceptible: float, pct_flag: float) -> SlopeStatus:
+    """Map coverage fractions to a slope status using the thresholds in eil_status."""
+    if pct_susceptible > COVERAGE_FRACTION_SUSCEPTIBLE:
+        return SlopeStatus.SUSCEPTIBLE
+    if pct_flag > COVERAGE_FRACTION_FLAG:
+        return SlopeStatus.FLAG
+    return SlopeStatus.SAFE
+
+
+def compute_slope_stability(
+    geometry: BaseGeometry,
+    dataset,
+    options: ComputeOptions | None = None,
+) -> SlopeResult | dict:
+    """Compute slope stability from an open rasterio dataset.
+
+    Args:
+        geometry: Parcel polygon already in dataset CRS.
+        dataset:  Open rasterio dataset.
+        options:  Compute options (precision); defaults to ComputeOptions().
+
+    Returns:
+        SlopeResult dict or {"error": ...} on failure.
+    """
+    options = options or ComputeOptions()
+    buffer_dist = large_parcel.metres_to_crs(dataset, geometry, _CATCHMENT_BUFFER_METRES)
+    if large_parcel.exceeds_cap(geometry, dataset, buffer_dist,
+                                _bytes_per_pixel(options.dtype), options.max_window_mb):
+        return _tiled_slope_stability(geometry, dataset, options, buffer_dist)
+
+    slope_degrees, parcel_mask, site_mask = _slope_surface(
+        geometry, dataset, options.dtype, options.slope_kernel, options.deadline
+    )
+    # Mask the 2D gradient array to NaN where the pixel isn't inside the parcel bounds
+    # (for the heatmap output).
+    viz_grid = slope_degrees.copy()
+    viz_grid[~parcel_mask] = np.nan
+    return _site_result(slope_degrees[site_mask], viz_grid)
 
+
+def _site_result(site_slopes: np.ndarray, viz_grid: np.ndarray) -> SlopeResult | dict:
+    """SlopeResult from the site's slope samples and its heatmap grid."""
     if site_slopes.size == 0:
         return {"error": "No valid slope data"}
 
@@ -120,21 +300,171 @@ def compute_slope_stability(geometry: BaseGeometry, dataset) -> SlopeResult | di
     pct_flag        = float(((site_slopes > SLOPE_THRESHOLD_FLAG) &
                              (site_slopes <= SLOPE_THRESHOLD_SUSCEPTIBLE)).mean())
 
-    # Mask the 2D gradient array to NaN where the pixel isn't inside the parcel bounds
-    # (for the heatmap output).
-    viz_grid = slope_degrees.copy()
-    viz_grid[~parcel_mask] = np.nan
     viz_grid_list = np.where(np.isnan(viz_grid), None, viz_grid).tolist()
+    return _slope_result(max_slope, avg_slope, pct_susceptible, pct_flag, viz_grid_list)
 
-    if pct_susceptible > 0.015:
-        status = SlopeStatus.SUSCEPTIBLE
-    elif pct_flag > 0.10:
-        status = SlopeStatus.FLAG
-    else:
-        status = SlopeStatus.SAFE
+
+def compute_slope_stability_many(
+    geometries: list[BaseGeometry],
+    dataset,
+    options: ComputeOptions | None = None,
+) -> list[SlopeResult | dict]:
+    """compute_slope_stability for many lots over one shared raster pass.
+
+    The union of the lots' 500 m buffers is read, smoothed and split into
+    slope units once, and the lots are rasterized into a label image on
+    that window (lot i is label i + 1). Each lot then differentiates only its
+    own bounding box of the shared smoothed surface, at its own latitude's
+    pixel size, and reduces the samples under its label. The per-lot result
+    matches a separate compute_slope_stability call: the smoothing kernel is
+    far narrower than the buffer, and a lot pixel belongs to a slope unit in
+    the union window exactly when it does in its own.
+
+    The label image holds one lot per pixel, so lots whose interiors overlap
+    another's (a lot and its redrawn copy, a mother lot and its subdivision)
+    each fall back to their own call; lots that only share an edge stay in the
+    shared pass. If the union window exceeds ``options.max_window_mb`` (lots
+    scattered across a province rather than one subdivision), each lot falls
+    back to its own call.
+
+    Returns:
+        One SlopeResult or {"error": ...} per geometry, in order.
+    """
+    options = options or ComputeOptions()
+    if not geometries:
+        return []
+    overlapping = _overlapping(geometries)
+    if overlapping:
+        shared = iter(compute_slope_stability_many(
+            [g for i, g in enumerate(geometries) if i not in overlapping], dataset, options
+        ))
+        return [compute_slope_stability(g, dataset, options) if i in overlapping
+                else next(shared) for i, g in enumerate(geometries)]
+    buffered = [
+        g.buffer(large_parcel.metres_to_crs(dataset, g, _CATCHMENT_BUFFER_METRES))
+        for g in geometries
+    ]
+    union = shapely.union_all(buffered)
+    if large_parcel.exceeds_cap(union, dataset, 0.0, _bytes_per_pixel(options.dtype),
+                                options.max_window_mb):
+        return [compute_slope_stability(g, dataset, options) for g in geometries]
+
+    elevation_data, out_transform = _read_elevations(dataset, union, options.dtype)
+    valid_mask, smoothed_elev, weight_map, elevation_smoothed = _smooth(
+        elevation_data, options.dtype
+    )
+    check(options.deadline, "slope")
+    catchments = _catchments(elevation_smoothed, valid_mask)
+    labels = rasterio.features.rasterize(
+        [(g, i) for i, g in enumerate(geometries, start=1)],
+        out_shape=elevation_data.shape, transform=out_transform, dtype=np.int32,
+    )
+    # Lots with no slope unit under them fall back to the bare footprint,
+    # as in _slope_surface.
+    has_su = np.bincount(labels[catchments > 0], minlength=len(geometries) + 1) > 0
+    union_window = rasterio.features.geometry_window(dataset, [union])
+
+    results = []
+    for i, (geometry, lot_box) in enumerate(
+        zip(geometries, ndimage.find_objects(labels, max_label=len(geometries))), start=1
+    ):
+        check(options.deadline, "slope")
+        window = rasterio.features.geometry_window(dataset, [buffered[i - 1]])
+        viz_grid = np.full((int(window.height), int(window.width)), np.nan,
+                           dtype=elevation_data.dtype)
+        if lot_box is None:
+            results.append(_site_result(np.empty(0, dtype=elevation_data.dtype), viz_grid))
+            continue
+
+        # The lot's bounding box plus the one-pixel halo a central difference
+        # reads, so every lot pixel sees the same neighbours as in its own window.
+        halo = tuple(
+            slice(max(s.start - 1, 0), min(s.stop + 1, n))
+            for s, n in zip(lot_box, labels.shape)
+        )
+        lot_mask = labels[halo] == i
+        px_m, py_m = pixel_metres(dataset, geometry)
+        if options.slope_kernel == "dog":
+            slope = _dog_slope(smoothed_elev[halo], weight_map[halo], valid_mask[halo],
+                               lot_mask, px_m, py_m)
+        else:
+            dz_dy, dz_dx = np.gradient(elevation_smoothed[halo], py_m, px_m)
+            slope = np.degrees(np.arctan(np.sqrt(dz_dx**2 + dz_dy**2)))
+
+        site_mask = lot_mask & valid_mask[halo] & ~np.isnan(slope)
+        if has_su[i]:
+            site_mask &= catchments[halo] > 0
+
+        # The lot's own buffered window, located inside the union window.
+        r0 = halo[0].start - (window.row_off - union_window.row_off)
+        c0 = halo[1].start - (window.col_off - union_window.col_off)
+        lot_rows, lot_cols = np.nonzero(lot_mask)
+        viz_grid[lot_rows + r0, lot_cols + c0] = slope[lot_rows, lot_cols]
+        results.append(_site_result(slope[site_mask], viz_grid))
+    return results
+
+
+def _overlapping(geometries: list[BaseGeometry]) -> set[int]:
+    """Indices of the lots whose interior overlaps another lot's. Neighbours
+    that only touch along an edge do not count."""
+    geoms = np.asarray(geometries, dtype=object)
+    left, right = shapely.STRtree(geoms).query(geoms, predicate="intersects")
+    pairs = left != right
+    left, right = left[pairs], right[pairs]
+    touching = shapely.touches(geoms[left], geoms[right])
+    return set(left[~touching].tolist())
+
+
+def _bytes_per_pixel(dtype) -> int:
+    """Peak bytes _slope_surface holds per window pixel: about ten float
+    temporaries (smoothing, gradients, slope) plus the int64 watershed markers
+    and labels and a handful of boolean masks."""
+    return 10 * np.dtype(dtype).itemsize + 24
+
+
+def _tiled_slope_stability(geometry: BaseGeometry, dataset, options: ComputeOptions,
+                           buffer_dist: float) -> SlopeResult | dict:
+    """compute_slope_stability for parcels over the window cap (large_parcel.py).
+
+    Each tile of the parcel runs the ordinary slope surface with its own 500 m
+    catchment buffer; only the coverage counts survive the tile. Slope units
+    are delineated per tile, so a basin cut by a seam is judged from the side
+    the tile sees. There is no heatmap: ``_viz_grid`` is empty, as a grid of a
+    subdivision would be larger than the window the cap exists to avoid.
+    """
+    bpp = _bytes_per_pixel(options.dtype)
+    side = large_parcel.tile_side(large_parcel.halo_pixels(dataset, buffer_dist), bpp,
+                                  options.max_window_mb)
+    n = n_susceptible = n_flag = 0
+    total, max_slope = 0.0, -np.inf
+    for _, tile in large_parcel.pixel_tiles(geometry, dataset, side):
+        check(options.deadline, "slope")
+        part = large_parcel.clip(geometry, tile)
+        if part is None:
+            continue
+        samples = site_slope_sample(part, dataset, options.dtype, options.slope_kernel,
+                                    options.deadline)
+        if samples.size == 0:
+            continue
+        n += samples.size
+        total += float(samples.sum(dtype=np.float64))
+        max_slope = max(max_slope, float(samples.max()))
+        n_susceptible += int((samples > SLOPE_THRESHOLD_SUSCEPTIBLE).sum())
+        n_flag += int(((samples > SLOPE_THRESHOLD_FLAG) &
+                       (samples <= SLOPE_THRESHOLD_SUSCEPTIBLE)).sum())
+
+    if n == 0:
+        return {"error": "No valid slope data"}
+    return _slope_result(max_slope, total / n, n_susceptible / n, n_flag / n, [])
+
+
+def _slope_result(max_slope: float, avg_slope: float, pct_susceptible: float,
+                  pct_flag: float, viz_grid_list: list) -> SlopeResult:
+    status = classify_coverage(pct_susceptible, pct_flag)
 
     return SlopeResult(
-        metrics=SlopeMetrics(max_slope_degrees=max_slope, avg_slope_degrees=avg_slope),
+        metrics=SlopeMetrics(max_slope_degrees=max_slope, avg_slope_degrees=avg_slope,
+                             susceptible_fraction=pct_susceptible, flag_fraction=pct_flag),
         assessment=SlopeAssessment(status=status, threshold_used="coverage_fraction"),
         _viz_grid=viz_grid_list,
     )
@@ -142,4 +472,4 @@ def compute_slope_stability(geometry: BaseGeometry, dataset) -> SlopeResult | di
 
 def calculate_slope_stability(context: DEMContext) -> SlopeResult | dict:
     """Entry point accepting a DEMContext (geometry already projected)."""
-    return compute_slope_stability(context.geometry, context.dataset)
+    return compute_slope_stability(context.geometry, context.dataset, context.options)
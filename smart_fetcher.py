@@ -3,8 +3,6 @@ import string
 import sys
 from pathlib import Path
 
-import rasterio
-
 from settings import get_settings
 
 # ---------------------------------------------------------------------------
@@ -99,7 +97,14 @@ class SmartFetcher:
     Abstracts DEM sources.
     Priority: Local IfSAR (5 m) > Local SRTM (30 m).
 
-    Both datasets are single nationwide GeoTIFFs — no tile-lookup needed.
+    Both datasets are single nationwide GeoTIFFs. Optionally a catalog of
+    regional tiles (EIL_DEM_CATALOG_URI, see dem_catalog.py) is consulted
+    first: the smallest tile of the best source covering the parcel and its
+    search radius wins, reported as data_source '<source>:<tile>'.
+
+    Where a coverage index exists for a DEM (`python coverage_index.py
+    build`), a DEM with nodata under the parcel is skipped before any pixel
+    is read — e.g. SRTM is chosen for parcels in IfSAR gaps.
 
     Path resolution order (for each source):
       1. config dict key ('ifsar_path' / 'srtm_path')
@@ -124,19 +129,39 @@ class SmartFetcher:
             "SRTM_PATH", _DEM_SUBPATH_SRTM, allow_scan,
         )
 
-    def fetch_dem_path(self, bounds=None):
+        catalog_path = self.config.get("dem_catalog") or settings.dem_catalog_uri
+        self.catalog = None
+        if catalog_path:
+            from dem_catalog import load_catalog
+
+            self.catalog = load_catalog(catalog_path, os.stat(catalog_path).st_mtime_ns)
+
+    def _warn_srtm_fallback(self):
+        if self.ifsar_path and os.path.exists(self.ifsar_path):
+            print("Warning: IfSAR has no data under this parcel. "
+                  "Falling back to SRTM (30 m).")
+        else:
+            print(f"Warning: IfSAR not found at '{self.ifsar_path}'. "
+                  "Falling back to SRTM (30 m).")
+
+    def fetch_dem_path(self, bounds=None, warn=True):
         """
         Returns the path to the best available DEM.
 
         Args:
-            bounds: unused — nationwide files cover all of PH.
+            bounds: WGS84 GeoJSON geometry or (minx, miny, maxx, maxy) of the
+                    parcel. Only used with a tile catalog; nationwide files
+                    cover all of PH.
+            warn:   print the SRTM-fallback and seam warnings. Warm-up turns
+                    them off: it looks up thousands of points per region.
 
         Returns:
             (str, str): (path, source_type) where source_type is one of
-                        'local_override', 'ifsar', 'srtm'.
+                        'local_override', 'ifsar', 'srtm', or
+                        '<source>:<tile name>' for a catalog tile.
 
         Raises:
-            FileNotFoundError: if neither IfSAR nor SRTM file is accessible.
+            FileNotFoundError: if no catalog tile, IfSAR or SRTM file is accessible.
         """
         # Explicit path override — used in tests and one-off runs.
         if "local_dem_path" in self.config:
@@ -145,18 +170,67 @@ class SmartFetcher:
                 return path, "local_override"
             raise FileNotFoundError(f"local_dem_path override not found: {path}")
 
-        if self.ifsar_path and os.path.exists(self.ifsar_path):
-            return self.ifsar_path, "ifsar"
-
-        if self.srtm_path and os.path.exists(self.srtm_path):
-            print(f"Warning: IfSAR not found at '{self.ifsar_path}'. Falling back to SRTM (30 m).")
-            return self.srtm_path, "srtm"
+        nationwide = [
+            (path, source, source)
+            for source, path in (("ifsar", self.ifsar_path), ("srtm", self.srtm_path))
+            if path and os.path.exists(path)
+        ]
+
+        if bounds is None:
+            if nationwide:
+                if warn and nationwide[0][1] == "srtm":
+                    self._warn_srtm_fallback()
+                return nationwide[0][0], nationwide[0][1]
+            tile = self.catalog.any_tile() if self.catalog is not None else None
+            if tile is not None:
+                return tile.path, tile.label
+            raise FileNotFoundError(self.describe_failure())
+
+        # Imported here, not at module level: resolving paths (the API's
+        # startup check) should not pay for rasterio, shapely and numpy.
+        from coverage_index import coverage_for
+        from dem_catalog import source_rank
+
+        # Candidates in preference order: best source first; within a source a
+        # covering catalog tile (smallest first) beats the nationwide file.
+        candidates = []
+        if self.catalog is not None:
+            candidates = [(t.path, t.label, t.source) for t in self.catalog.covering(bounds)]
+        candidates += nationwide
+        candidates.sort(key=lambda c: source_rank(c[2]))   # stable: tiles stay ahead
+
+        # Skip a DEM whose coverage index says it has nodata under the parcel or
+        # a void in its search radius. No index means "unknown" and the DEM is
+        # tried.
+        for path, label, source in candidates:
+            index = coverage_for(path)
+            if index is None or index.covers(bounds, dem_path=path):
+                if warn and source == "srtm" and label == "srtm":
+                    self._warn_srtm_fallback()
+                return path, label
+
+        if candidates:
+            # Every source has gaps here; let the compute modules report it
+            # against the preferred one, as they would without an index.
+            return candidates[0][0], candidates[0][1]
+
+        if self.catalog is not None:
+            # Parcel at a seam: no tile holds the full search radius.
+            tile = self.catalog.best_partial(bounds)
+            if tile is not None:
+                if warn:
+                    print(f"Warning: no catalog tile covers the parcel's search radius; "
+                          f"using '{tile.name}', which covers the parcel itself.")
+                return tile.path, tile.label
 
         raise FileNotFoundError(self.describe_failure())
 
     def describe_failure(self) -> str:
         """Actionable message naming what was tried and what to set."""
         tried = []
+        if self.catalog is not None:
+            on_disk = sum(os.path.exists(t.path) for t in self.catalog.tiles)
+            tried.append(f"  Tiles: {on_disk} of {len(self.catalog.tiles)} catalog tiles on disk")
         for label, path in (("IfSAR", self.ifsar_path), ("SRTM", self.srtm_path)):
             if not path:
                 tried.append(f"  {label:<5}: not configured")
@@ -185,6 +259,8 @@ class SmartFetcher:
         Checks whether the DEM resolution meets the ≤5 m requirement.
         Resolution is read from the file's native CRS units (metres for projected DEMs).
         """
+        import rasterio
+
         try:
             with rasterio.open(dem_path) as src:
                 res_x, res_y = src.res
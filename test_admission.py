@@ -0,0 +1,143 @@
+"""Tests for admission control on /api/v1/assess and the /metrics endpoint."""
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+import api
+from admission import Admission, ClientGone, QueueFull
+from coalesce import Coalescer
+from test_coalesce import SQUARE, STUB_RESULT, _Blocking
+
+
+async def _hold(admission, release, log, name, is_disconnected=None):
+    async with admission.slot(is_disconnected):
+        log.append(name)
+        await release.wait()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestAdmission(unittest.TestCase):
+
+    def test_bounds_concurrency_and_queue(self):
+        async def scenario():
+            admission, release, log = Admission(2, 1), asyncio.Event(), []
+            tasks = [asyncio.create_task(_hold(admission, release, log, n)) for n in "abc"]
+            await _settle()
+            self.assertEqual((admission.running, admission.queued), (2, 1))
+            self.assertEqual(log, ["a", "b"])
+            with self.assertRaises(QueueFull) as ctx:
+                async with admission.slot():
+                    pass
+            self.assertGreaterEqual(ctx.exception.retry_after, 1)
+            release.set()
+            await asyncio.gather(*tasks)
+            return admission, log
+
+        admission, log = asyncio.run(scenario())
+        self.assertEqual(log, ["a", "b", "c"])
+        metrics = admission.metrics()
+        self.assertEqual((metrics["admitted"], metrics["rejected"], metrics["running"]), (3, 1, 0))
+        self.assertEqual(metrics["queue_wait_s"]["count"], 3)
+
+    def test_slots_go_to_waiters_in_arrival_order(self):
+        async def scenario():
+            admission, log = Admission(1, 3), []
+            gates = [asyncio.Event() for _ in range(4)]
+            tasks = []
+            for name, gate in zip("abcd", gates):
+                tasks.append(asyncio.create_task(_hold(admission, gate, log, name)))
+                await _settle()
+            for gate in gates:
+                gate.set()
+                await _settle()
+            await asyncio.gather(*tasks)
+            return log
+
+        self.assertEqual(asyncio.run(scenario()), ["a", "b", "c", "d"])
+
+    def test_disconnected_client_is_shed_without_running(self):
+        async def gone():
+            return True
+
+        async def scenario():
+            admission, release, log = Admission(1, 1), asyncio.Event(), []
+            first = asyncio.create_task(_hold(admission, release, log, "a"))
+            queued = asyncio.create_task(_hold(admission, release, log, "b", gone))
+            await _settle()
+            release.set()
+            await first
+            with self.assertRaises(ClientGone):
+                await queued
+            return admission, log
+
+        admission, log = asyncio.run(scenario())
+        self.assertEqual(log, ["a"])
+        self.assertEqual((admission.shed, admission.running), (1, 0))
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        async def scenario():
+            admission, release, log = Admission(1, 1), asyncio.Event(), []
+            first = asyncio.create_task(_hold(admission, release, log, "a"))
+            queued = asyncio.create_task(_hold(admission, release, log, "b"))
+            await _settle()
+            queued.cancel()
+            await _settle()
+            self.assertEqual(admission.queued, 0)
+            release.set()
+            await first
+            return admission
+
+        admission = asyncio.run(scenario())
+        self.assertEqual(admission.running, 0)
+
+
+class TestAssessAdmission(unittest.TestCase):
+
+    def test_full_queue_is_429_with_retry_after(self):
+        fn = _Blocking(result=STUB_RESULT)
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                running = asyncio.create_task(client.post(
+                    "/api/v1/assess", json={"project_id": "a", "geometry": SQUARE}
+                ))
+                while api.admission.running < 1:
+                    await asyncio.sleep(0.01)
+                other = dict(SQUARE, coordinates=[[[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]])
+                refused = await client.post(
+                    "/api/v1/assess", json={"project_id": "b", "geometry": other}
+                )
+                metrics = (await client.get("/metrics")).json()
+                fn.release.set()
+                await running
+                return refused, metrics
+
+        with patch.object(api, "admission", Admission(1, 0)), \
+                patch.object(api, "coalescer", Coalescer()), \
+                patch.object(api, "_run_assessment", fn):
+            refused, metrics = asyncio.run(scenario())
+
+        self.assertEqual(refused.status_code, 429)
+        self.assertEqual(refused.headers["Retry-After"], "1")
+        self.assertEqual(metrics["assess"]["rejected"], 1)
+        self.assertEqual(metrics["assess"]["running"], 1)
+        self.assertEqual(metrics["coalescing"]["inflight"], 1)
+
+    def test_metrics_excluded_from_openapi(self):
+        async def scenario():
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return (await client.get("/openapi.json")).json()["paths"]
+
+        self.assertNotIn("/metrics", asyncio.run(scenario()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+"""Tests for sharing in-flight assessments between identical requests.
+
+No DEM is needed: the pipeline is replaced by a stub that blocks until the
+test releases it, so the requests are provably concurrent.
+"""
+import asyncio
+import threading
+import unittest
+from contextlib import asynccontextmanager
+from unittest.mock import patch
+
+import httpx
+
+import api
+from admission import Admission, ClientGone
+from coalesce import Coalescer, request_key
+
+SQUARE = {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]]}
+# The same lot, written from another start point and the other way round.
+SQUARE_REWRITTEN = {"type": "Polygon",
+                    "coordinates": [[[1, 1], [1, 0], [0, 0], [0, 1], [1, 1]]]}
+# A response-model-valid pipeline result.
+STUB_RESULT = {
+    "project_id": "stub",
+    "data_source": "ifsar",
+    "phase_1_compliance": {
+        "slope_stability": {"error": "stub"},
+        "depositional_hazard": {"error": "stub"},
+        "overall_status": "CERTIFIED SAFE",
+    },
+    "phase_2_scientific": None,
+    "final_decision": "PENDING",
+}
+
+
+class _Blocking:
+    """Stands in for the pipeline; counts calls and waits to be released."""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.release = threading.Event()
+        self.result, self.error = result, error
+
+    def __call__(self, *args):
+        self.calls += 1
+        self.release.wait(5)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+async def _until_inflight(coalescer, n=1):
+    while coalescer.inflight() < n:
+        await asyncio.sleep(0.01)
+
+
+class TestRequestKey(unittest.TestCase):
+
+    def test_same_lot_written_differently_shares_a_key(self):
+        self.assertEqual(request_key(SQUARE, {"mode": "compliance"}),
+                         request_key(SQUARE_REWRITTEN, {"mode": "compliance"}))
+
+    def test_config_is_part_of_the_key(self):
+        self.assertNotEqual(request_key(SQUARE, {"mode": "compliance"}),
+                            request_key(SQUARE, {"mode": "research"}))
+
+
+class TestCoalescer(unittest.TestCase):
+
+    def test_concurrent_callers_share_one_call(self):
+        fn = _Blocking(result={"ok": 1})
+
+        async def scenario():
+            coalescer = Coalescer()
+            tasks = [asyncio.create_task(coalescer.run("k", fn)) for _ in range(3)]
+            await _until_inflight(coalescer)
+            await asyncio.sleep(0.05)
+            fn.release.set()
+            results = await asyncio.gather(*tasks)
+            return coalescer, results
+
+        coalescer, results = asyncio.run(scenario())
+        self.assertEqual(fn.calls, 1)
+        self.assertEqual(results, [{"ok": 1}] * 3)
+        self.assertEqual((coalescer.computed, coalescer.shared), (1, 2))
+        self.assertEqual(coalescer.inflight(), 0)
+
+    def test_finished_call_is_not_reused(self):
+        fn = _Blocking(result=1)
+        fn.release.set()
+
+        async def scenario():
+            coalescer = Coalescer()
+            await coalescer.run("k", fn)
+            await coalescer.run("k", fn)
+
+        asyncio.run(scenario())
+        self.assertEqual(fn.calls, 2)
+
+    def test_error_reaches_every_caller(self):
+        fn = _Blocking(error=FileNotFoundError("no DEM"))
+
+        async def scenario():
+            coalescer = Coalescer()
+            tasks = [asyncio.create_task(coalescer.run("k", fn)) for _ in range(2)]
+            await _until_inflight(coalescer)
+            fn.release.set()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = asyncio.run(scenario())
+        self.assertEqual(fn.calls, 1)
+        self.assertTrue(all(isinstance(r, FileNotFoundError) for r in results))
+
+    def test_cancelled_caller_does_not_cancel_the_others(self):
+        fn = _Blocking(result="done")
+
+        async def scenario():
+            coalescer = Coalescer()
+            leaving = asyncio.create_task(coalescer.run("k", fn))
+            staying = asyncio.create_task(coalescer.run("k", fn))
+            await _until_inflight(coalescer)
+            await asyncio.sleep(0.05)
+            leaving.cancel()
+            await asyncio.sleep(0.05)
+            fn.release.set()
+            return await staying
+
+        self.assertEqual(asyncio.run(scenario()), "done")
+        self.assertEqual(fn.calls, 1)
+
+    def test_joiners_skip_admission(self):
+        fn = _Blocking(result="done")
+        entered = []
+
+        @asynccontextmanager
+        async def admit():
+            entered.append(1)
+            yield
+
+        async def scenario():
+            coalescer = Coalescer()
+            tasks = [asyncio.create_task(coalescer.run("k", fn, admit=admit)) for _ in range(3)]
+            await _until_inflight(coalescer)
+            await asyncio.sleep(0.05)
+            fn.release.set()
+            return await asyncio.gather(*tasks)
+
+        self.assertEqual(asyncio.run(scenario()), ["done"] * 3)
+        self.assertEqual((len(entered), fn.calls), (1, 1))
+
+    def test_joiner_takes_over_when_the_first_is_not_admitted(self):
+        fn = _Blocking(result="done")
+        fn.release.set()
+        gate = asyncio.Event()
+        attempts = []
+
+        @asynccontextmanager
+        async def admit():
+            attempts.append(1)
+            if len(attempts) == 1:
+                await gate.wait()
+                raise ClientGone
+            yield
+
+        async def scenario():
+            coalescer = Coalescer()
+            first = asyncio.create_task(coalescer.run("k", fn, admit=admit))
+            await _until_inflight(coalescer)
+            joiner = asyncio.create_task(coalescer.run("k", fn, admit=admit))
+            await asyncio.sleep(0.05)
+            gate.set()
+            return await asyncio.gather(first, joiner, return_exceptions=True)
+
+        first, joiner = asyncio.run(scenario())
+        self.assertIsInstance(first, ClientGone)
+        self.assertEqual(joiner, "done")
+        self.assertEqual((len(attempts), fn.calls), (2, 1))
+
+
+class TestAssessCoalescing(unittest.TestCase):
+
+    def test_identical_requests_compute_once_and_keep_their_project_id(self):
+        fn = _Blocking(result=dict(STUB_RESULT, project_id="first"))
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                requests = [
+                    asyncio.create_task(client.post("/api/v1/assess", json={
+                        "project_id": project_id, "geometry": geometry,
+                    }))
+                    for project_id, geometry in (("first", SQUARE), ("second", SQUARE_REWRITTEN))
+                ]
+                await _until_inflight(api.coalescer)
+                await asyncio.sleep(0.05)
+                fn.release.set()
+                return await asyncio.gather(*requests)
+
+        with patch.object(api, "coalescer", Coalescer()), \
+                patch.object(api, "_run_assessment", fn):
+            responses = asyncio.run(scenario())
+
+        self.assertEqual(fn.calls, 1)
+        self.assertEqual([r.status_code for r in responses], [200, 200])
+        self.assertEqual([r.json()["project_id"] for r in responses], ["first", "second"])
+
+    def test_duplicate_of_a_queued_request_takes_no_queue_place(self):
+        fn = _Blocking(result=STUB_RESULT)
+        other = dict(SQUARE, coordinates=[[[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]])
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                requests = []
+                # One computing, one queued, then the queued one's duplicate:
+                # with one slot and one queue place it would be refused.
+                for project_id, geometry in (("running", other), ("queued", SQUARE),
+                                             ("duplicate", SQUARE_REWRITTEN)):
+                    requests.append(asyncio.create_task(client.post("/api/v1/assess", json={
+                        "project_id": project_id, "geometry": geometry,
+                    })))
+                    await asyncio.sleep(0.05)
+                fn.release.set()
+                return await asyncio.gather(*requests)
+
+        with patch.object(api, "coalescer", Coalescer()), \
+                patch.object(api, "admission", Admission(1, 1)), \
+                patch.object(api, "_run_assessment", fn):
+            responses = asyncio.run(scenario())
+
+        self.assertEqual([r.status_code for r in responses], [200, 200, 200])
+        self.assertEqual(fn.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+"""Tests for the Arrow / Parquet export of harness results."""
+import json
+import math
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import test_ground_truth
+from columnar_export import ColumnarWriter, threat_ratio, transects_path
+
+try:
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+
+
+def _row(i, **extra):
+    return {
+        "key": f"safe/p{i}", "parcel_id": f"p{i}", "category": "safe", "path": f"p{i}.geojson",
+        "overall_status": "CERTIFIED SAFE", "max_slope_deg": 3.0 + i,
+        "susceptible_fraction": 0.0, "flag_fraction": 0.01 * i,
+        "latency_s": 0.5, "timings_s": {"slope": 0.2, "depositional": 0.3},
+        "cost_estimate": {"predicted_s": 0.4, "boundary_px": 16.0},
+        "cached": False, "error": None,
+    } | extra
+
+
+def _transect(dist):
+    return {
+        "metrics": {"elevation_peak": 120.0, "elevation_site": 100.0, "delta_e": 20.0,
+                    "horizontal_distance_h": dist, "required_runout_3x": 60.0},
+        "assessment": {"status": "SAFE (Beyond Runout)", "is_compliant": True},
+        "path": [{"dist_m": 0.0, "elev_m": 120.0}, {"dist_m": dist, "elev_m": 100.0}],
+        "threat_ratio": 60.0 / dist,
+    }
+
+
+def _square(lon, lat, side_deg=0.0005):
+    ring = [[lon, lat], [lon + side_deg, lat], [lon + side_deg, lat + side_deg],
+            [lon, lat + side_deg], [lon, lat]]
+    return {"type": "Feature", "properties": {},
+            "geometry": {"type": "Polygon", "coordinates": [ring]}}
+
+
+class TestThreatRatio(unittest.TestCase):
+
+    def test_ratio_of_required_runout_to_reach(self):
+        self.assertEqual(threat_ratio({"required_runout_3x": 60.0, "horizontal_distance_h": 120.0}),
+                         0.5)
+        self.assertEqual(threat_ratio({"required_runout_3x": 0.0, "horizontal_distance_h": 0.0}),
+                         0.0)
+        self.assertTrue(math.isinf(
+            threat_ratio({"required_runout_3x": 6.0, "horizontal_distance_h": 0.0})))
+        self.assertIsNone(threat_ratio(None))
+
+
+class TestWriter(unittest.TestCase):
+
+    def test_missing_pyarrow_is_a_clear_error(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.dict(sys.modules, {"pyarrow": None}), \
+                self.assertRaisesRegex(ImportError, "pip install"):
+            ColumnarWriter(Path(tmp) / "gt.parquet")
+
+    def test_unknown_suffix_is_refused(self):
+        with self.assertRaises(ValueError):
+            ColumnarWriter(Path("gt.csv"))
+
+    def test_transects_sit_beside_the_parcels(self):
+        self.assertEqual(transects_path(Path("out/gt.parquet")), Path("out/gt.transects.parquet"))
+
+    @unittest.skipUnless(pq, "pyarrow not installed")
+    def test_parquet_streams_row_groups(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "gt.parquet"
+            with ColumnarWriter(path, row_group_size=2) as writer:
+                for i in range(5):
+                    writer.write(_row(i), [_transect(100.0 + i), _transect(200.0)])
+            self.assertEqual(pq.ParquetFile(path).metadata.num_row_groups, 3)
+            parcels = pq.read_table(path).to_pylist()
+            transects = pq.read_table(transects_path(path)).to_pylist()
+
+        self.assertEqual([p["key"] for p in parcels], [f"safe/p{i}" for i in range(5)])
+        self.assertEqual(parcels[2]["flag_fraction"], 0.02)
+        self.assertEqual((parcels[0]["slope_s"], parcels[0]["phase_2_s"]), (0.2, None))
+        self.assertEqual(parcels[0]["predicted_s"], 0.4)
+        self.assertEqual(len(transects), 10)
+        self.assertEqual((transects[1]["key"], transects[1]["rank"]), ("safe/p0", 1))
+        self.assertEqual(transects[0]["path_dist_m"], [0.0, 100.0])
+        self.assertEqual(transects[0]["threat_ratio"], 0.6)
+
+    @unittest.skipUnless(pq, "pyarrow not installed")
+    def test_arrow_ipc_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "gt.arrow"
+            with ColumnarWriter(path, row_group_size=2) as writer:
+                for i in range(3):
+                    writer.write(_row(i, error="ValueError: bad ring") if i == 1 else _row(i))
+            with pyarrow.ipc.open_file(path) as reader:
+                self.assertEqual(reader.num_record_batches, 2)
+                table = reader.read_all()
+            with pyarrow.ipc.open_file(transects_path(path)) as reader:
+                self.assertEqual(reader.read_all().num_rows, 0)
+        self.assertEqual(table.column("error").to_pylist(), [None, "ValueError: bad ring", None])
+
+
+@unittest.skipUnless(pq and os.path.exists(FIXTURE), "pyarrow or IfSAR fixture missing")
+class TestHarnessExport(unittest.TestCase):
+
+    @patch("test_ground_truth.SmartFetcher")
+    @patch("orchestrator.SmartFetcher")
+    def test_validation_run_writes_both_tables_despite_the_cache(self, orchestrator_fetcher, _):
+        orchestrator_fetcher.return_value.fetch_dem_path.return_value = (FIXTURE, "ifsar")
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp) / "ground_truth"
+            (base / "safe").mkdir(parents=True)
+            for i, lon in enumerate((124.899, 124.901)):
+                (base / "safe" / f"lot{i}.geojson").write_text(json.dumps(_square(lon, 8.1)))
+            out = Path(tmp) / "gt.parquet"
+            cache = Path(tmp) / "cache.json"
+            with redirect_stdout(StringIO()):
+                test_ground_truth.run_validation(base, cache=cache)
+                # Every parcel is cached now; the export must still trace them.
+                test_ground_truth.run_validation(base, cache=cache, columnar=out)
+            parcels = pq.read_table(out).to_pylist()
+            transects = pq.read_table(transects_path(out)).to_pylist()
+
+        self.assertEqual(sorted(p["key"] for p in parcels), ["safe/lot0", "safe/lot1"])
+        for parcel in parcels:
+            self.assertIsNone(parcel["error"])
+            self.assertIsNotNone(parcel["susceptible_fraction"])
+            self.assertIsNotNone(parcel["threat_ratio"])
+            self.assertGreater(parcel["depositional_s"], 0)
+        worst = [t for t in transects if t["rank"] == 0]
+        self.assertEqual(len(worst), 2)
+        for t in worst:
+            parcel = next(p for p in parcels if p["key"] == t["key"])
+            self.assertAlmostEqual(t["threat_ratio"], parcel["threat_ratio"])
+            self.assertEqual(len(t["path_dist_m"]), len(t["path_elev_m"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""Tests for the assessment cost model and cost-ordered admission."""
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+import cost_model
+from admission import Admission
+from orchestrator import EILOrchestrator
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+
+
+def _rect(width_m, height_m, lon=124.9, lat=8.1):
+    """A WGS84 rectangle of roughly ``width_m`` × ``height_m`` at (lon, lat)."""
+    dx = width_m / (111320.0 * 0.99002)   # cos(8.1°)
+    dy = height_m / 111320.0
+    ring = [[lon, lat], [lon + dx, lat], [lon + dx, lat + dy], [lon, lat + dy], [lon, lat]]
+    return {"type": "Polygon", "coordinates": [ring]}
+
+
+async def _job(admission, log, name, cost, gate):
+    async with admission.slot(cost=cost):
+        log.append(name)
+        await gate.wait()
+
+
+class TestEstimate(unittest.TestCase):
+
+    def test_features_in_metres(self):
+        feats = cost_model.features(_rect(20, 20))
+        self.assertAlmostEqual(feats["area_m2"], 400, delta=2)
+        self.assertAlmostEqual(feats["perimeter_m"], 80, delta=0.5)
+        self.assertAlmostEqual(feats["boundary_px"], 16, delta=0.1)
+
+    def test_grows_with_area_and_perimeter(self):
+        small, large = (cost_model.estimate(_rect(s, s)) for s in (20, 700))
+        self.assertGreater(large["predicted_s"], 5 * small["predicted_s"])
+        # Same area, four times the perimeter: more walker starts.
+        square, strip = cost_model.estimate(_rect(100, 100)), cost_model.estimate(_rect(1000, 10))
+        self.assertGreater(strip["boundary_px"], 4 * square["boundary_px"])
+        self.assertGreater(strip["predicted_s"], square["predicted_s"])
+
+    def test_coarser_dem_is_cheaper(self):
+        self.assertLess(cost_model.estimate(_rect(100, 100), pixel_m=30)["predicted_s"],
+                        cost_model.estimate(_rect(100, 100), pixel_m=5)["predicted_s"])
+
+    def test_calibrate_recovers_the_coefficients(self):
+        rows = []
+        for side in (20, 50, 100, 200, 400, 700):
+            for pixel_m in (5, 10, 30):
+                feats = cost_model.features(_rect(side, side / 2), pixel_m)
+                rows.append({"cost_estimate": feats, "latency_s": cost_model.predict(feats)})
+        rows.append({"cost_estimate": None, "latency_s": None})   # a crashed parcel
+        fit = cost_model.calibrate(rows)
+        self.assertEqual(fit["parcels"], 18)
+        self.assertLess(fit["median_relative_error"], 1e-6)
+        self.assertAlmostEqual(fit["coefficients"]["boundary_px"],
+                               cost_model.COEFFICIENTS["boundary_px"], places=6)
+
+    def test_calibrate_needs_enough_parcels(self):
+        with self.assertRaises(ValueError):
+            cost_model.calibrate([])
+
+
+class TestCostOrderedAdmission(unittest.TestCase):
+
+    def test_cheap_jobs_overtake_a_queued_large_one(self):
+        async def scenario():
+            admission, log = Admission(1, 4, cost_weight=4.0), []
+            gates = {}
+            for name, cost in (("running", 0.0), ("large", 60.0), ("lot1", 0.05), ("lot2", 0.05)):
+                gates[name] = asyncio.Event()
+                asyncio.create_task(_job(admission, log, name, cost, gates[name]))
+                await asyncio.sleep(0)
+            for name in ("running", "lot1", "lot2", "large"):
+                await asyncio.sleep(0)
+                gates[name].set()
+                await asyncio.sleep(0.01)
+            return log
+
+        self.assertEqual(asyncio.run(scenario()), ["running", "lot1", "lot2", "large"])
+
+    def test_large_job_is_not_starved(self):
+        async def scenario():
+            admission, log = Admission(1, 4, cost_weight=1.0), []
+            running, large, late = asyncio.Event(), asyncio.Event(), asyncio.Event()
+            tasks = [asyncio.create_task(_job(admission, log, "running", 0.0, running))]
+            await asyncio.sleep(0)
+            tasks.append(asyncio.create_task(_job(admission, log, "large", 0.05, large)))
+            # Arrives after the large job has waited its handicap out.
+            await asyncio.sleep(0.1)
+            tasks.append(asyncio.create_task(_job(admission, log, "late", 0.0, late)))
+            await asyncio.sleep(0)
+            for gate in (running, large, late):
+                gate.set()
+            await asyncio.gather(*tasks)
+            return log
+
+        self.assertEqual(asyncio.run(scenario()), ["running", "large", "late"])
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestDiagnostics(unittest.TestCase):
+
+    @patch("orchestrator.SmartFetcher")
+    def test_estimate_uses_the_dem_pixel(self, mock_fetcher_cls):
+        mock_fetcher_cls.return_value.fetch_dem_path.return_value = (FIXTURE, "ifsar")
+        payload = {"project_id": "p", "geometry": _rect(50, 50), "config": {}}
+        estimate = EILOrchestrator().run_assessment(payload)["diagnostics"]["cost_estimate"]
+        self.assertAlmostEqual(estimate["pixel_m"], 5.0, delta=0.1)
+        self.assertAlmostEqual(estimate["boundary_px"], 40, delta=1)
+        self.assertGreater(estimate["predicted_s"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
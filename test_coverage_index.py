@@ -0,0 +1,114 @@
+"""Tests for the DEM coverage index and SmartFetcher's use of it."""
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from coverage_index import CoverageIndex, build_index, coverage_for, index_path
+from settings import Settings
+from smart_fetcher import SmartFetcher
+
+NODATA = -9999.0
+
+
+def _square(lon, lat, half=0.0001):
+    return {
+        "type": "Polygon",
+        "coordinates": [[
+            [lon - half, lat - half], [lon + half, lat - half],
+            [lon + half, lat + half], [lon - half, lat + half],
+            [lon - half, lat - half],
+        ]],
+    }
+
+
+def _write_dem(path, data):
+    """0.001° pixels, top-left corner at (121.0, 16.2)."""
+    profile = {
+        "driver": "GTiff", "width": data.shape[1], "height": data.shape[0],
+        "count": 1, "dtype": "float32", "crs": "EPSG:4326", "nodata": NODATA,
+        "transform": from_origin(121.0, 16.2, 0.001, 0.001),
+    }
+    with rasterio.open(path, "w", **profile) as dst:
+        dst.write(data.astype("float32"), 1)
+
+
+class TestCoverageIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        # 198×200: right half is an IfSAR gap, plus a scatter of dead pixels
+        # on the left; the height is deliberately not a multiple of the block.
+        rng = np.random.default_rng(1)
+        data = rng.uniform(100, 900, size=(198, 200))
+        data[:, 100:] = NODATA
+        data[rng.integers(0, 198, 5), rng.integers(0, 40, 5)] = NODATA
+        data[100, 20] = NODATA  # a radar-shadow pixel under one test lot
+        self.data = data
+        self.dem = self.tmp / "IfSAR_PH.tif"
+        _write_dem(self.dem, data)
+        self.block = 8
+        self.index = CoverageIndex.load(build_index(str(self.dem), self.block))
+
+    def test_strip_build_matches_full_read(self):
+        b = self.block
+        valid = self.data != NODATA
+        padded = np.zeros((-(-198 // b) * b, -(-200 // b) * b), dtype=bool)
+        padded[:198, :200] = valid
+        cells = padded.reshape(padded.shape[0] // b, b, padded.shape[1] // b, b)
+        np.testing.assert_array_equal(self.index.full, cells.all(axis=(1, 3)))
+
+    def test_covers(self):
+        # Clean data around (121.06, 16.1); 1 km margin stays left of the gap.
+        self.assertTrue(self.index.covers(_square(121.07, 16.1)))
+        # Inside the gap.
+        self.assertFalse(self.index.covers(_square(121.15, 16.1)))
+        # On valid data with the gap inside the search radius: the engine
+        # tolerates nodata there.
+        self.assertTrue(self.index.covers(_square(121.094, 16.1)))
+        # Search radius runs off the raster.
+        self.assertFalse(self.index.covers(_square(121.07, 16.195)))
+
+    def test_void_cell_in_search_radius_is_not_covered(self):
+        # Every cell from column 104 on is entirely void.
+        self.assertFalse(self.index.covers(_square(121.097, 16.1)))
+
+    def test_partly_valid_cell_reads_the_pixels_under_the_parcel(self):
+        dem = str(self.dem)
+        # Pixel (100, 20) is void; (97, 17) shares its 8-px cell and is valid.
+        self.assertNotEqual(self.data[97, 17], NODATA)
+        self.assertFalse(self.index.full[100 // 8, 20 // 8])
+        self.assertFalse(self.index.covers(_square(121.0205, 16.0995), dem_path=dem))
+        self.assertTrue(self.index.covers(_square(121.0175, 16.1025), dem_path=dem))
+
+    def test_stale_index_is_ignored(self):
+        self.assertIsNotNone(coverage_for(str(self.dem)))
+        st = os.stat(self.dem)
+        os.utime(self.dem, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertIsNone(coverage_for(str(self.dem)))
+
+    def test_fetcher_picks_srtm_in_ifsar_gap(self):
+        srtm = self.tmp / "SRTM30m.tif"
+        _write_dem(srtm, np.full((198, 200), 500.0))
+        settings = Settings(dem_ifsar_uri=str(self.dem), dem_srtm_uri=str(srtm),
+                            dem_catalog_uri="", dem_coverage_dir="")
+        with patch("smart_fetcher.get_settings", return_value=settings), \
+             patch("coverage_index.get_settings", return_value=settings):
+            fetcher = SmartFetcher()
+            self.assertEqual(fetcher.fetch_dem_path(_square(121.07, 16.1))[1], "ifsar")
+            self.assertEqual(fetcher.fetch_dem_path(_square(121.15, 16.1))[1], "srtm")
+            self.assertEqual(fetcher.fetch_dem_path(_square(121.094, 16.1))[1], "ifsar")
+            self.assertEqual(fetcher.fetch_dem_path(_square(121.0205, 16.0995))[1], "srtm")
+            # No index for SRTM means "unknown", not "uncovered".
+            self.assertFalse(index_path(str(srtm)).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,202 @@
+"""Tests for request deadlines and the cooperative checks in the compute loops."""
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+import httpx
+import rasterio
+from shapely.geometry import box
+
+import api
+from admission import Admission
+from calculate_depositional_safety import compute_depositional_safety
+from coalesce import Coalescer
+from deadline import Deadline, DeadlineExceeded, earliest
+from eil_types import ComputeOptions
+from orchestrator import EILOrchestrator
+from slope_stability import compute_slope_stability
+from test_coalesce import SQUARE, STUB_RESULT, _Blocking
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+LOT = box(124.899, 8.099, 124.9006, 8.1006)
+
+
+class _AfterChecks:
+    """A deadline that expires after ``n`` checks, wherever they are."""
+
+    def __init__(self, n):
+        self.n, self.stages = n, []
+
+    def check(self, stage):
+        self.stages.append(stage)
+        if len(self.stages) > self.n:
+            raise DeadlineExceeded(stage)
+
+
+class TestDeadline(unittest.TestCase):
+
+    def test_expired_check_names_the_stage(self):
+        Deadline.after_ms(60_000).check("slope")
+        with self.assertRaises(DeadlineExceeded) as ctx:
+            Deadline(0.0).check("slope")
+        self.assertEqual(ctx.exception.stage, "slope")
+
+    def test_deadline_ms_must_be_positive_number(self):
+        for bad in (0, -5, "100", True):
+            with self.subTest(bad=bad), self.assertRaises(ValueError):
+                ComputeOptions.from_config({"deadline_ms": bad})
+
+    def test_given_deadline_is_not_resolved_again(self):
+        resolved = Deadline.after_ms(1_000)
+        self.assertIs(ComputeOptions.from_config({"deadline_ms": 10}, deadline=resolved)
+                      .deadline, resolved)
+        own = ComputeOptions.from_config({"deadline_ms": 10}).deadline
+        self.assertLess(own.expires_at, resolved.expires_at)
+        self.assertIs(earliest(None, own, resolved), own)
+        self.assertIsNone(earliest(None, None))
+
+    def test_deadline_does_not_change_option_equality(self):
+        self.assertEqual(ComputeOptions(deadline=Deadline(0.0)), ComputeOptions())
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestComputeChecks(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = rasterio.open(FIXTURE)
+        self.addCleanup(self.dataset.close)
+
+    def test_slope_aborts_between_steps(self):
+        deadline = _AfterChecks(1)
+        with self.assertRaises(DeadlineExceeded) as ctx:
+            compute_slope_stability(LOT, self.dataset, ComputeOptions(deadline=deadline))
+        self.assertEqual(ctx.exception.stage, "slope")
+        self.assertEqual(len(deadline.stages), 2)
+
+    def test_walker_aborts_mid_walk(self):
+        deadline = _AfterChecks(5)
+        with self.assertRaises(DeadlineExceeded) as ctx:
+            compute_depositional_safety(LOT, self.dataset,
+                                        options=ComputeOptions(deadline=deadline))
+        self.assertEqual(ctx.exception.stage, "depositional")
+        self.assertEqual(len(deadline.stages), 6)
+
+    def test_generous_deadline_changes_nothing(self):
+        options = ComputeOptions(deadline=Deadline.after_ms(600_000))
+        self.assertEqual(compute_depositional_safety(LOT, self.dataset, options=options),
+                         compute_depositional_safety(LOT, self.dataset))
+
+
+class TestOrchestratorDeadline(unittest.TestCase):
+
+    @patch("orchestrator.SmartFetcher")
+    def test_expired_deadline_stops_before_fetching(self, mock_fetcher_cls):
+        payload = {"project_id": "late", "geometry": SQUARE, "config": {}}
+        with self.assertRaises(DeadlineExceeded) as ctx:
+            EILOrchestrator().run_assessment(payload, Deadline(0.0))
+        self.assertEqual(ctx.exception.stage, "fetch")
+        mock_fetcher_cls.return_value.fetch_dem_path.assert_not_called()
+
+
+class TestAssessDeadline(unittest.TestCase):
+
+    def _post(self, *requests, before=None):
+        async def scenario():
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                tasks = []
+                for body, headers in requests:
+                    tasks.append(asyncio.create_task(
+                        client.post("/api/v1/assess", json=body, headers=headers)))
+                    await asyncio.sleep(0.02)
+                if before:
+                    await before()
+                return await asyncio.gather(*tasks)
+
+        return asyncio.run(scenario())
+
+    def test_exceeded_deadline_is_504_naming_the_stage(self):
+        def late(payload, deadline):
+            raise DeadlineExceeded("depositional")
+
+        with patch.object(api, "_run_assessment", late):
+            (response,) = self._post(({"project_id": "a", "geometry": SQUARE},
+                                      {"X-EIL-Deadline-Ms": "5000"}))
+        self.assertEqual(response.status_code, 504)
+        self.assertIn("depositional", response.json()["detail"])
+
+    def test_deadline_spent_in_the_queue_is_504_without_computing(self):
+        fn = _Blocking(result=STUB_RESULT)
+        other = dict(SQUARE, coordinates=[[[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]])
+
+        async def release_later():
+            await asyncio.sleep(0.1)
+            fn.release.set()
+
+        with patch.object(api, "admission", Admission(1, 1)), \
+                patch.object(api, "coalescer", Coalescer()), \
+                patch.object(api, "_run_assessment", fn):
+            first, queued = self._post(
+                ({"project_id": "a", "geometry": SQUARE}, {}),
+                ({"project_id": "b", "geometry": other}, {"X-EIL-Deadline-Ms": "20"}),
+                before=release_later,
+            )
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(queued.status_code, 504)
+        self.assertIn("queue", queued.json()["detail"])
+        self.assertEqual(fn.calls, 1)
+
+    def test_config_deadline_counts_the_queue_wait(self):
+        fn = _Blocking(result=STUB_RESULT)
+        other = dict(SQUARE, coordinates=[[[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]])
+
+        async def release_later():
+            await asyncio.sleep(0.1)
+            fn.release.set()
+
+        with patch.object(api, "admission", Admission(1, 1)), \
+                patch.object(api, "coalescer", Coalescer()), \
+                patch.object(api, "_run_assessment", fn):
+            first, queued = self._post(
+                ({"project_id": "a", "geometry": SQUARE}, {}),
+                ({"project_id": "b", "geometry": other, "config": {"deadline_ms": 20}}, {}),
+                before=release_later,
+            )
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(queued.status_code, 504)
+        self.assertIn("queue", queued.json()["detail"])
+        self.assertEqual(fn.calls, 1)
+
+    def test_joiner_is_answered_after_the_first_callers_deadline(self):
+        fn = _Blocking(result=STUB_RESULT)
+        deadlines = []
+
+        def compute(payload, deadline):
+            deadlines.append(deadline)
+            return fn(payload)
+
+        async def release_later():
+            await asyncio.sleep(0.15)
+            fn.release.set()
+
+        with patch.object(api, "coalescer", Coalescer()), \
+                patch.object(api, "_run_assessment", compute):
+            hasty, patient = self._post(
+                ({"project_id": "a", "geometry": SQUARE}, {"X-EIL-Deadline-Ms": "50"}),
+                ({"project_id": "b", "geometry": SQUARE}, {"X-EIL-Deadline-Ms": "5000"}),
+                before=release_later,
+            )
+        self.assertEqual(hasty.status_code, 504)
+        self.assertEqual(patient.status_code, 200)
+        self.assertEqual(fn.calls, 1)
+        self.assertGreater(deadlines[0].remaining(), 4)
+
+    def test_bad_header_is_400(self):
+        (response,) = self._post(({"project_id": "a", "geometry": SQUARE},
+                                  {"X-EIL-Deadline-Ms": "-1"}))
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Tests for tiled DEM selection (dem_catalog.py + SmartFetcher catalog mode).
+
+Tile files only need to exist for selection, so empty temp files stand in for
+GeoTIFFs wherever bounds are given explicitly.
+"""
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest.mock import patch
+
+from dem_catalog import DEMCatalog
+from settings import Settings
+from smart_fetcher import SmartFetcher
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+
+
+def _square(lon, lat, half=0.0001):
+    return {
+        "type": "Polygon",
+        "coordinates": [[
+            [lon - half, lat - half], [lon + half, lat - half],
+            [lon + half, lat + half], [lon - half, lat + half],
+            [lon - half, lat - half],
+        ]],
+    }
+
+
+class TestDEMCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        tiles = [
+            # A province, a small SSD extract inside it, and its neighbour.
+            {"name": "benguet", "path": "benguet.tif", "bounds": [120.0, 16.0, 121.0, 17.0]},
+            {"name": "baguio", "path": "baguio.tif", "bounds": [120.5, 16.3, 120.7, 16.5]},
+            {"name": "ilocos", "path": "ilocos.tif", "bounds": [119.0, 16.0, 120.0, 17.0]},
+            {"name": "srtm_car", "path": "srtm_car.tif", "source": "srtm",
+             "bounds": [119.0, 15.0, 122.0, 18.0]},
+        ]
+        for t in tiles:
+            (self.tmp / t["path"]).touch()
+        self.catalog_path = self.tmp / "catalog.json"
+        self.catalog_path.write_text(json.dumps({"tiles": tiles}))
+        self.catalog = DEMCatalog.from_file(self.catalog_path)
+
+    def _fetcher(self, **settings):
+        settings.setdefault("dem_catalog_uri", str(self.catalog_path))
+        with patch("smart_fetcher.get_settings", return_value=Settings(**settings)):
+            return SmartFetcher()
+
+    def test_smallest_covering_tile_wins(self):
+        tiles = self.catalog.covering(_square(120.6, 16.4))
+        self.assertEqual([t.name for t in tiles], ["baguio", "benguet", "srtm_car"])
+
+    def test_search_radius_must_fit(self):
+        # 0.005° (~550 m) inside the Baguio extract: the parcel fits, the
+        # 1 km search radius does not, so the province tile is used.
+        tiles = self.catalog.covering(_square(120.695, 16.4))
+        self.assertEqual(tiles[0].name, "benguet")
+
+    def test_fetcher_reports_tile_in_data_source(self):
+        path, source = self._fetcher().fetch_dem_path(_square(120.6, 16.4))
+        self.assertEqual(source, "ifsar:baguio")
+        self.assertEqual(path, str(self.tmp / "baguio.tif"))
+
+    def test_seam_falls_back_to_coarser_covering_tile(self):
+        # On the Benguet/Ilocos seam no IfSAR tile holds the search radius.
+        _, source = self._fetcher().fetch_dem_path(_square(120.0, 16.5))
+        self.assertEqual(source, "srtm:srtm_car")
+
+    def test_seam_prefers_nationwide_ifsar(self):
+        nationwide = self.tmp / "IfSAR_PH.tif"
+        nationwide.touch()
+        fetcher = self._fetcher(dem_ifsar_uri=str(nationwide))
+        self.assertEqual(fetcher.fetch_dem_path(_square(120.0, 16.5)),
+                         (str(nationwide), "ifsar"))
+        # ...but a covering IfSAR tile still beats the nationwide file.
+        self.assertEqual(fetcher.fetch_dem_path(_square(120.6, 16.4))[1], "ifsar:baguio")
+
+    def test_seam_without_any_covering_tile_uses_partial(self):
+        (self.tmp / "srtm_car.tif").unlink()
+        _, source = self._fetcher().fetch_dem_path(_square(120.0005, 16.5))
+        self.assertEqual(source, "ifsar:benguet")
+
+    def test_srtm_fallback_warns_without_bounds(self):
+        srtm = self.tmp / "SRTM_PH.tif"
+        srtm.touch()
+        fetcher = self._fetcher(dem_catalog_uri="", dem_srtm_uri=str(srtm),
+                                dem_ifsar_uri=str(self.tmp / "missing.tif"))
+        out, quiet = io.StringIO(), io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(fetcher.fetch_dem_path(), (str(srtm), "srtm"))
+        with redirect_stdout(quiet):
+            fetcher.fetch_dem_path(warn=False)
+        self.assertIn("IfSAR not found", out.getvalue())
+        self.assertIn("Falling back to SRTM", out.getvalue())
+        self.assertEqual(quiet.getvalue(), "")
+
+    def test_outside_every_tile_raises(self):
+        with self.assertRaises(FileNotFoundError) as cm:
+            self._fetcher().fetch_dem_path(_square(125.0, 8.0))
+        self.assertIn("catalog tiles", str(cm.exception))
+
+    def test_bounds_read_from_file_when_omitted(self):
+        self.catalog_path.write_text(json.dumps(
+            {"tiles": [{"name": "bukidnon", "path": FIXTURE}]}
+        ))
+        tile = DEMCatalog.from_file(self.catalog_path).tiles[0]
+        minx, miny, maxx, maxy = tile.bounds
+        self.assertTrue(120 < minx < maxx < 126 and 5 < miny < maxy < 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Tests for the region-wide depositional threat raster (depositional_raster.py)."""
+import math
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from shapely.geometry import box
+
+import depositional_raster
+from calculate_depositional_safety import DIRECTIONS, compute_depositional_safety, flow_directions
+from eil_status import RUNOUT_RATIO
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+
+
+def _brute_force(elevations, pixel_m):
+    """Follow every peak's steepest descent and keep the best 3·E − H per cell."""
+    uphill, downhill = flow_directions(elevations)
+    best = np.full(elevations.shape, -np.inf)
+    for r, c in zip(*np.nonzero((uphill < 0) & ~np.isnan(elevations))):
+        value = RUNOUT_RATIO * elevations[r, c]
+        while downhill[r, c] >= 0:
+            dr, dc = DIRECTIONS[downhill[r, c]]
+            value -= pixel_m * math.hypot(dr, dc)
+            r, c = r + dr, c + dc
+            best[r, c] = max(best[r, c], value)
+    return best
+
+
+class TestRunoutPotential(unittest.TestCase):
+
+    def test_matches_path_by_path_propagation(self):
+        rng = np.random.default_rng(3)
+        elevations = rng.normal(size=(40, 50)).cumsum(axis=0).cumsum(axis=1)
+        elevations[5:8, 10:13] = np.nan
+        potential, pits = depositional_raster.runout_potential(
+            elevations, from_origin(0, 0, 5, 5), crs=None
+        )
+        np.testing.assert_allclose(potential, _brute_force(elevations, 5.0))
+        self.assertFalse(pits[np.isnan(elevations)].any())
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestThreatRaster(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, "threat.tif")
+        depositional_raster.build_raster(FIXTURE, cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_chunks_match_one_read(self):
+        # The 3 km halo spans this 2 km tile, so every chunk sees all of it.
+        chunked = os.path.join(self.tmp.name, "chunked.tif")
+        summary = depositional_raster.build_raster(FIXTURE, chunked, chunk_px=100)
+        with rasterio.open(self.path) as whole, rasterio.open(chunked) as parts:
+            np.testing.assert_array_equal(whole.read(), parts.read())
+            self.assertEqual(summary["cells"], whole.width * whole.height)
+
+    def test_raster_safe_implies_engine_safe(self):
+        rng = np.random.default_rng(1)
+        with rasterio.open(FIXTURE) as dem, rasterio.open(self.path) as raster:
+            self.assertEqual(raster.count, 3)
+            for _ in range(15):
+                x, y = rng.uniform(124.8935, 124.9065), rng.uniform(8.0935, 8.1065)
+                lot = box(x - 0.0002, y - 0.0002, x + 0.0002, y + 0.0002)
+                looked_up = depositional_raster.lookup(raster, lot)
+                engine = compute_depositional_safety(lot, dem)
+                with self.subTest(lot=lot.bounds):
+                    self.assertEqual(looked_up["elevation_site"],
+                                     engine["metrics"]["elevation_site"])
+                    if looked_up["status"].startswith("SAFE"):
+                        self.assertTrue(engine["assessment"]["is_compliant"])
+
+
+if __name__ == "__main__":
+    unittest.main()
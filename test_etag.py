@@ -0,0 +1,159 @@
+"""Tests for assessment ETags and If-None-Match on /api/v1/assess."""
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+import api
+import fingerprint
+import test_ground_truth
+from admission import Admission
+from coalesce import Coalescer
+from fingerprint import assessment_etag, dem_identity
+from test_coalesce import SQUARE, SQUARE_REWRITTEN, STUB_RESULT
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+DEM = "/srv/eil-data/IfSAR_PH.tif:1000:1"
+CONFIG = {"mode": "compliance"}
+
+
+class _Pipeline:
+    """Stands in for the pipeline; counts calls."""
+
+    def __init__(self, dem=DEM):
+        self.calls, self.dem = 0, dem
+
+    def __call__(self, payload, deadline=None):
+        self.calls += 1
+        return STUB_RESULT | {"diagnostics": {"dem_identity": self.dem}}
+
+
+class TestAssessmentEtag(unittest.TestCase):
+
+    def test_strong_and_quoted(self):
+        tag = assessment_etag("p1", SQUARE, CONFIG, DEM)
+        self.assertRegex(tag, r'^"[0-9a-f]{32}"$')
+
+    def test_same_lot_written_differently_has_the_same_tag(self):
+        self.assertEqual(assessment_etag("p1", SQUARE, CONFIG, DEM),
+                         assessment_etag("p1", SQUARE_REWRITTEN, CONFIG, DEM))
+
+    def test_every_input_changes_the_tag(self):
+        base = assessment_etag("p1", SQUARE, CONFIG, DEM)
+        other = dict(SQUARE, coordinates=[[[0, 0], [2, 0], [2, 2], [0, 2], [0, 0]]])
+        for changed in (
+            assessment_etag("p2", SQUARE, CONFIG, DEM),
+            assessment_etag("p1", other, CONFIG, DEM),
+            assessment_etag("p1", SQUARE, {"mode": "research"}, DEM),
+            assessment_etag("p1", SQUARE, CONFIG, DEM.replace(":1", ":2")),
+        ):
+            self.assertNotEqual(changed, base)
+
+    def test_deadline_does_not_change_the_tag(self):
+        self.assertEqual(assessment_etag("p1", SQUARE, CONFIG | {"deadline_ms": 500}, DEM),
+                         assessment_etag("p1", SQUARE, CONFIG, DEM))
+
+    def test_tiling_cap_changes_the_tag(self):
+        base = assessment_etag("p1", SQUARE, CONFIG, DEM, 512.0)
+        self.assertNotEqual(assessment_etag("p1", SQUARE, CONFIG, DEM, 1.0), base)
+        self.assertNotEqual(assessment_etag("p1", SQUARE, CONFIG, DEM), base)
+        # A config cap overrides the deployment's; only the one applied counts.
+        self.assertEqual(assessment_etag("p1", SQUARE, CONFIG | {"max_window_mb": 512.0}, DEM, 1.0),
+                         base)
+
+    def test_engine_change_changes_the_tag(self):
+        base = assessment_etag("p1", SQUARE, CONFIG, DEM)
+        with patch("fingerprint.engine_version", return_value="0" * 16):
+            self.assertNotEqual(assessment_etag("p1", SQUARE, CONFIG, DEM), base)
+
+    def test_response_model_change_changes_the_tag(self):
+        base = assessment_etag("p1", SQUARE, CONFIG, DEM)
+        with patch("fingerprint.response_version", return_value="0" * 16):
+            self.assertNotEqual(assessment_etag("p1", SQUARE, CONFIG, DEM), base)
+
+    def test_engine_modules_cover_the_dem_choice(self):
+        for name in ("smart_fetcher.py", "dem_catalog.py", "coverage_index.py",
+                     "hybrid_engine.py", "eil_types.py"):
+            self.assertIn(name, fingerprint._ENGINE_MODULES)
+        here = os.path.dirname(os.path.abspath(fingerprint.__file__))
+        for name in fingerprint._ENGINE_MODULES:
+            self.assertTrue(os.path.exists(os.path.join(here, name)), name)
+
+
+class TestConditionalAssess(unittest.TestCase):
+
+    def _post(self, headers=None, project_id="p1", pipeline=None, dem=DEM):
+        pipeline = pipeline or _Pipeline(dem)
+
+        async def scenario():
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post(
+                    "/api/v1/assess", headers=headers or {},
+                    json={"project_id": project_id, "geometry": SQUARE, "config": CONFIG},
+                )
+
+        with patch.object(api, "admission", Admission(1, 1)), \
+                patch.object(api, "coalescer", Coalescer()), \
+                patch.object(api, "_run_assessment", pipeline), \
+                patch.object(api, "_dem_identity", return_value=dem):
+            return asyncio.run(scenario()), pipeline
+
+    def test_response_carries_the_tag(self):
+        response, pipeline = self._post()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["ETag"], assessment_etag(
+            "p1", SQUARE, CONFIG, DEM, api.settings.compute_max_window_mb or None))
+        self.assertEqual(pipeline.calls, 1)
+
+    def test_current_tag_is_304_without_computing(self):
+        tag = self._post()[0].headers["ETag"]
+        for header in (tag, f'"stale", {tag}', f"W/{tag}"):
+            with self.subTest(header=header):
+                response, pipeline = self._post({"If-None-Match": header})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.headers["ETag"], tag)
+                self.assertEqual(response.content, b"")
+                self.assertEqual(pipeline.calls, 0)
+
+    def test_stale_tag_is_recomputed(self):
+        tag = self._post()[0].headers["ETag"]
+        # The DEM was replaced since the tag was issued, or another project asks.
+        for kwargs in ({"dem": DEM + "0"}, {"project_id": "p2"}):
+            with self.subTest(**kwargs):
+                response, pipeline = self._post({"If-None-Match": tag}, **kwargs)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response.headers["ETag"], tag)
+                self.assertEqual(pipeline.calls, 1)
+
+    def test_tag_names_the_dem_actually_read(self):
+        response, _ = self._post(pipeline=_Pipeline(dem="/tiles/ifsar_07.tif:5:5"))
+        self.assertEqual(response.headers["ETag"], assessment_etag(
+            "p1", SQUARE, CONFIG, "/tiles/ifsar_07.tif:5:5",
+            api.settings.compute_max_window_mb or None))
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestHarnessEtag(unittest.TestCase):
+
+    @patch("orchestrator.SmartFetcher")
+    def test_row_carries_the_api_tag(self, mock_fetcher_cls):
+        mock_fetcher_cls.return_value.fetch_dem_path.return_value = (FIXTURE, "ifsar")
+        lot = {"type": "Polygon", "coordinates": [[[124.899, 8.099], [124.8995, 8.099],
+                                                   [124.8995, 8.0995], [124.899, 8.0995],
+                                                   [124.899, 8.099]]]}
+        test_ground_truth._init_worker()
+        self.addCleanup(test_ground_truth._worker_orchestrator.close)
+        row = test_ground_truth.assess_parcel(
+            {"parcel_id": "lot1", "category": "safe", "path": "lot1.geojson", "geometry": lot}
+        )
+        self.assertIsNone(row["error"])
+        self.assertEqual(row["etag"], assessment_etag(
+            "lot1", lot, CONFIG, dem_identity(FIXTURE),
+            api.settings.compute_max_window_mb or None))
+
+
+if __name__ == "__main__":
+    unittest.main()
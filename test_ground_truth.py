@@ -2,140 +2,510 @@
 """
 EIL-Calc Executive Ground Truth Validation Harness.
 
-Iterates through tests/ground_truth/safe/ and tests/ground_truth/susceptible/,
-runs each GeoJSON blindly through the EIL-Calc pipeline (EILOrchestrator),
-measures latency, and produces an executive-ready Confusion Matrix.
+Iterates through every category folder under tests/ground_truth/ (or the rows
+of gt_parcel_ledger.csv with --ledger, or a gt_store.py store with --store,
+optionally narrowed by --category and --bbox), runs each GeoJSON blindly through the
+EIL-Calc pipeline (EILOrchestrator), measures latency, and produces an
+executive-ready Confusion Matrix.
+
+With --workers N the parcels are spread across N processes. Each worker keeps
+its own orchestrator with the DEM held open, so the per-parcel cost is the
+computation itself rather than a fresh GeoTIFF open.
+
+Results are cached in a manifest (--cache) keyed by the parcel file's content
+hash, the DEM's identity and the engine version (source of the compute
+modules and thresholds). A rerun assesses only parcels whose key changed and
+merges the rest from the cache into the same confusion matrix.
+
+Parcels are assessed cheapest first, by cost_model.py's predicted cost, so
+one large parcel does not hold up the small lots behind it. Each row carries
+the cost estimate next to the measured latency; ``python cost_model.py
+calibrate`` refits the model from a --json report.
+
+--columnar PATH also writes the rows, and every traced transect path, as
+Arrow or Parquet tables (see columnar_export.py). The cache holds no paths,
+so a columnar run assesses every parcel.
 """
 
 import argparse
+import csv
 import json
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import numpy as np
+
+import cost_model
+from columnar_export import FORMATS, ColumnarWriter, threat_ratio
+from fingerprint import assessment_etag, dem_identity, engine_version, file_digest
+from gt_store import GroundTruthStore, feature_geometry, parse_bbox
 from orchestrator import EILOrchestrator
+from settings import get_settings
+from smart_fetcher import SmartFetcher
 
 # ── Category configuration ─────────────────────────────────────────────────
-# We only care about safe and susceptible.
+# gt_hazard is the expected answer. None means the parcel is assessed and
+# reported but has no label to score against, so it stays out of the matrix.
 _CATEGORIES = {
     "safe": {"gt_hazard": False},
     "susceptible": {"gt_hazard": True},
+    "prone": {"gt_hazard": True},
+    "unclassified": {"gt_hazard": None},
 }
 
+_HAZARD_STATUSES = ("SUSCEPTIBLE", "NOT CERTIFIED", "MANUAL REVIEW REQUIRED")
+
+_PERCENTILES = (50, 95, 99)
+
+_CACHE_VERSION = 4
+
 # ── GeoJSON loading ────────────────────────────────────────────────────────
 
 def _extract_geometry(path: Path) -> dict:
     """Return the GeoJSON geometry dict from a Feature, FeatureCollection, or
     bare geometry file."""
     with open(path) as f:
-        gj = json.load(f)
-    if gj.get("type") == "Feature":
-        return gj["geometry"]
-    if gj.get("type") == "FeatureCollection":
-         # PHIVOLCS sometimes puts a polyline first. Find the polygon.
-         for feature in gj.get("features", []):
-             geom = feature.get("geometry", {})
-             if geom.get("type") in ("Polygon", "MultiPolygon"):
-                 return geom
-         return gj["features"][0]["geometry"]
-    return gj  # bare geometry
+        return feature_geometry(json.load(f))
+
+
+def parcel_geometry(parcel: dict) -> dict:
+    """A parcel's WGS84 GeoJSON geometry. Parcels selected from a
+    GroundTruthStore carry it; folder and ledger parcels are read from disk."""
+    return parcel.get("geometry") or _extract_geometry(Path(parcel["path"]))
+
+# ── Parcel discovery ───────────────────────────────────────────────────────
+
+def discover_parcels(base_dir: Path) -> list[dict]:
+    """Every .geojson under each category folder of ``base_dir``."""
+    parcels = []
+    for folder in sorted(p for p in base_dir.iterdir() if p.is_dir()):
+        for path in sorted(folder.glob("*.geojson")):
+            parcels.append({
+                "parcel_id": path.stem,
+                "category": folder.name.lower(),
+                "path": str(path),
+            })
+    return parcels
+
+
+def load_ledger(ledger_path: Path) -> list[dict]:
+    """Parcels listed in a ledger written by generate_gt_ledger.py."""
+    with open(ledger_path, newline="") as f:
+        return [
+            {
+                "parcel_id": row["Parcel_ID"],
+                "category": row["Ground_Truth"].lower(),
+                "path": row["File_Path"],
+            }
+            for row in csv.DictReader(f)
+        ]
+
+
+def within_bbox(parcels: list[dict],
+                bbox: tuple[float, float, float, float]) -> list[dict]:
+    """Folder or ledger parcels whose geometry intersects ``bbox`` (WGS84),
+    the same test GroundTruthStore.select applies.
+
+    A parcel whose file cannot be read is kept, so the run reports why
+    rather than dropping it silently.
+    """
+    from shapely.geometry import box, shape
+
+    area = box(*bbox)
+    kept = []
+    for parcel in parcels:
+        try:
+            if not shape(parcel_geometry(parcel)).intersects(area):
+                continue
+        except Exception:
+            pass
+        kept.append(parcel)
+    return kept
+
+
+def parcel_key(parcel: dict) -> str:
+    """``category/parcel_id``, the key of a parcel's row in every report.
+
+    The same parcel id can legitimately sit under two categories (a lot that
+    is both slope-susceptible and in a depositional zone), so the id alone
+    does not identify a row. category/id mirrors the on-disk layout.
+    """
+    return f"{parcel['category']}/{parcel['parcel_id']}"
+
+# ── Per-parcel assessment (runs in the worker) ────────────────────────────
+
+_worker_orchestrator = None
+
+
+def _init_worker() -> None:
+    """Give this process one orchestrator that keeps its DEM handles open."""
+    global _worker_orchestrator
+    _worker_orchestrator = EILOrchestrator(reuse_datasets=True)
+
+
+def _score(gt_hazard, pred_hazard) -> str | None:
+    if gt_hazard is None:
+        return None
+    if gt_hazard and pred_hazard:
+        return "TP"
+    if not gt_hazard and pred_hazard:
+        return "FP"
+    if not gt_hazard and not pred_hazard:
+        return "TN"
+    return "FN"  # hazard missed — dangerous
+
+
+def assess_parcel(parcel: dict, with_transects: bool = False) -> dict:
+    """Assess one parcel and return its report row. Never raises.
+
+    ``with_transects`` adds the depositional ``_viz_transects`` under
+    "transects", for the columnar export; run_validation takes them off
+    before the row is cached or reported.
+    """
+    row = {
+        "key": parcel_key(parcel),
+        "parcel_id": parcel["parcel_id"],
+        "category": parcel["category"],
+        "path": parcel["path"],
+        "data_source": None,
+        "slope_status": None,
+        "depositional_status": None,
+        "overall_status": None,
+        "quadrant": None,
+        "max_slope_deg": None,
+        "avg_slope_deg": None,
+        "susceptible_fraction": None,
+        "flag_fraction": None,
+        "delta_e_m": None,
+        "horizontal_distance_m": None,
+        "threat_ratio": None,
+        "latency_s": None,
+        "timings_s": {},
+        "cost_estimate": None,
+        "etag": None,
+        "error": None,
+    }
+    try:
+        geometry = parcel_geometry(parcel)
+        payload = {
+            "project_id": parcel["parcel_id"],
+            "geometry": geometry,
+            "config": {"mode": "compliance"},
+        }
+
+        start_time = time.perf_counter()
+        result = _worker_orchestrator.run_assessment(payload)
+        row["latency_s"] = time.perf_counter() - start_time
+    except Exception as exc:
+        row["error"] = f"{type(exc).__name__}: {exc}"
+        return row
+
+    phase_1 = result.get("phase_1_compliance", {})
+    slope = phase_1.get("slope_stability", {})
+    depo = phase_1.get("depositional_hazard", {})
+    status = phase_1.get("overall_status", "UNKNOWN")
+
+    row["data_source"] = result.get("data_source")
+    row["slope_status"] = slope.get("assessment", {}).get("status", slope.get("error"))
+    row["depositional_status"] = depo.get("assessment", {}).get("status", depo.get("error"))
+    row["overall_status"] = status
+    row["max_slope_deg"] = slope.get("metrics", {}).get("max_slope_degrees")
+    row["avg_slope_deg"] = slope.get("metrics", {}).get("avg_slope_degrees")
+    row["susceptible_fraction"] = slope.get("metrics", {}).get("susceptible_fraction")
+    row["flag_fraction"] = slope.get("metrics", {}).get("flag_fraction")
+    row["delta_e_m"] = depo.get("metrics", {}).get("delta_e")
+    row["horizontal_distance_m"] = depo.get("metrics", {}).get("horizontal_distance_h")
+    row["threat_ratio"] = threat_ratio(depo.get("metrics"))
+    row["timings_s"] = result.get("diagnostics", {}).get("timings_s", {})
+    row["cost_estimate"] = result.get("diagnostics", {}).get("cost_estimate")
+    # The tag /api/v1/assess would return for this parcel as project_id.
+    row["etag"] = assessment_etag(parcel["parcel_id"], geometry, payload["config"],
+                                  result["diagnostics"]["dem_identity"],
+                                  get_settings().compute_max_window_mb or None)
+
+    gt_hazard = _CATEGORIES.get(parcel["category"], {"gt_hazard": None})["gt_hazard"]
+    row["quadrant"] = _score(gt_hazard, status in _HAZARD_STATUSES)
+    if with_transects:
+        row["transects"] = depo.get("_viz_transects", [])
+    return row
+
+
+# ── Result cache ───────────────────────────────────────────────────────────
+
+def manifest_key(parcel: dict, fetcher: SmartFetcher) -> dict | None:
+    """What a cached row for ``parcel`` must match to be reused.
+
+    None when the key cannot be computed (missing file, no DEM) — such a
+    parcel is always assessed, and the assessment reports why it failed.
+    """
+    try:
+        dem_path, _ = fetcher.fetch_dem_path(parcel_geometry(parcel))
+        return {
+            "content_sha256": parcel.get("content_sha256") or file_digest(parcel["path"]),
+            "dem": dem_identity(dem_path),
+            "engine": engine_version(),
+            # Decides whether a lot is tiled, which its row and tag reflect.
+            "max_window_mb": get_settings().compute_max_window_mb,
+        }
+    except Exception:
+        return None
+
+
+def load_cache(path: Path) -> dict:
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if cache.get("version") != _CACHE_VERSION:
+        return {}
+    return cache.get("entries", {})
+
+
+def save_cache(path: Path, entries: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump({"version": _CACHE_VERSION, "entries": entries}, f, indent=1)
+        f.write("\n")
+    tmp.replace(path)
+
+
+def partition_cached(parcels: list[dict], entries: dict,
+                     keys: dict) -> tuple[list[dict], list[dict]]:
+    """(reusable cached rows, parcels to assess).
+
+    A cached row is reused only if its parcel's manifest key could be
+    computed and matches the one it was stored under, and the row is not a
+    crash (crashes are always retried).
+    """
+    rows, stale = [], []
+    for parcel in parcels:
+        k = parcel_key(parcel)
+        entry = entries.get(k)
+        if (keys.get(k) is not None and entry is not None
+                and entry["key"] == keys[k] and entry["row"]["error"] is None):
+            rows.append(entry["row"] | {"cached": True})
+        else:
+            stale.append(parcel)
+    return rows, stale
+
+
+def predicted_cost(parcel: dict) -> float:
+    """cost_model.py's predicted seconds for ``parcel`` on a nominal DEM.
+
+    0 for a parcel whose geometry cannot be read: it fails at once anyway.
+    """
+    try:
+        return cost_model.estimate(parcel_geometry(parcel))["predicted_s"]
+    except Exception:
+        return 0.0
+
+
+def _run_all(parcels: list[dict], workers: int, with_transects: bool = False):
+    """Yield report rows as parcels finish, in completion order.
+
+    Parcels start cheapest first (shortest job first). A batch has no late
+    arrivals, so the expensive ones still run, just last.
+    """
+    parcels = sorted(parcels, key=predicted_cost)
+    if workers <= 1:
+        _init_worker()
+        for parcel in parcels:
+            yield assess_parcel(parcel, with_transects)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(assess_parcel, parcel, with_transects) for parcel in parcels]
+        for future in as_completed(futures):
+            yield future.result()
+
+# ── Reporting ──────────────────────────────────────────────────────────────
+
+def latency_summary(rows: list[dict]) -> dict:
+    """p50/p95/p99 of total latency and of each orchestrator stage.
+
+    Over the parcels assessed in this run only: a cached row's latency was
+    measured by an earlier run, on whatever machine and load it had then.
+    """
+    def _pcts(values):
+        if not values:
+            return {}
+        return {
+            f"p{p}": float(np.percentile(values, p)) for p in _PERCENTILES
+        } | {"mean": float(np.mean(values))}
+
+    ok = [r for r in rows if r["error"] is None and not r.get("cached")]
+    # Pipeline order, as the orchestrator recorded them.
+    stages = list(dict.fromkeys(stage for r in ok for stage in r["timings_s"]))
+    return {
+        "total": _pcts([r["latency_s"] for r in ok]),
+        "stages": {s: _pcts([r["timings_s"][s] for r in ok if s in r["timings_s"]])
+                   for s in stages},
+    }
+
+
+def write_json_report(path: Path, rows: list[dict], summary: dict) -> None:
+    report = {
+        "summary": summary,
+        "parcels": {r["key"]: r for r in sorted(rows, key=lambda r: r["key"])},
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+
+
+_NESTED = ("timings_s", "cost_estimate")
+
+
+def write_csv_report(path: Path, rows: list[dict]) -> None:
+    stages = list(dict.fromkeys(stage for r in rows for stage in r["timings_s"]))
+    fields = ([k for k in rows[0] if k not in _NESTED] + ["predicted_s"]
+              + [f"{s}_s" for s in stages])
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for r in sorted(rows, key=lambda r: r["key"]):
+            flat = {k: v for k, v in r.items() if k not in _NESTED}
+            flat["predicted_s"] = (r.get("cost_estimate") or {}).get("predicted_s")
+            flat.update({f"{s}_s": r["timings_s"].get(s) for s in stages})
+            writer.writerow(flat)
 
 # ── Main validation loop ───────────────────────────────────────────────────
 
-def run_validation(base_dir: Path) -> None:
-    orchestrator = EILOrchestrator()
+def run_validation(
+    base_dir: Path,
+    ledger: Path | None = None,
+    workers: int = 1,
+    json_report: Path | None = None,
+    csv_report: Path | None = None,
+    cache: Path | None = None,
+    store: Path | None = None,
+    categories: list[str] | None = None,
+    bbox: tuple[float, float, float, float] | None = None,
+    columnar: Path | None = None,
+) -> dict:
+    if store:
+        with GroundTruthStore(store) as gt:
+            parcels = gt.select(categories, bbox)
+    else:
+        parcels = load_ledger(ledger) if ledger else discover_parcels(base_dir)
+        if categories:
+            parcels = [p for p in parcels if p["category"] in categories]
+        if bbox:
+            parcels = within_bbox(parcels, bbox)
 
-    matrix = {"TP": 0, "FP": 0, "TN": 0, "FN": 0}
-    crashes = 0
-    total_latency = 0.0
-    processed_count = 0
+    # Split into parcels whose cached row is still valid and parcels to assess.
+    entries = load_cache(cache) if cache else {}
+    fetcher = SmartFetcher()
+    keys = {parcel_key(p): manifest_key(p, fetcher) for p in parcels} if cache else {}
+    rows, stale = partition_cached(parcels, entries, keys)
+    if columnar:
+        # The cache keeps no transect paths, so a columnar export assesses
+        # every parcel; the fresh rows still refresh the cache.
+        rows, stale = [], parcels
 
     print("=" * 60)
     print("  EIL-CALC EXECUTIVE GROUND TRUTH VALIDATION")
     print("=" * 60)
-    print(f"  Base directory : {base_dir.resolve()}\n")
-
-    for category, cfg in _CATEGORIES.items():
-        folder = base_dir / category
-        gt_hazard = cfg["gt_hazard"]
-
-        if not folder.exists():
-            print(f"  [SKIP] {folder} — directory not found.\n")
-            continue
-
-        files = sorted(folder.glob("*.geojson"))
-        if not files:
-            print(f"  [SKIP] {folder} — no .geojson files.\n")
-            continue
-
-        print(f"── {category.upper()} ({len(files)} parcel(s)) ─────────────────────────")
-
-        for path in files:
-            parcel_id = path.stem
-            try:
-                geometry = _extract_geometry(path)
-                payload  = {
-                    "project_id": parcel_id,
-                    "geometry":   geometry,
-                    "config":     {"mode": "compliance"},
-                }
-                
-                # Measure latency
-                start_time = time.perf_counter()
-                result = orchestrator.run_assessment(payload)
-                end_time = time.perf_counter()
-                
-                latency = end_time - start_time
-                total_latency += latency
-                processed_count += 1
-
-                # Read the final assessment status from the orchestrator payload schema
-                status = result.get("phase_1_compliance", {}).get("overall_status", "UNKNOWN")
-                
-                pred_hazard = status in ("SUSCEPTIBLE", "NOT CERTIFIED", "MANUAL REVIEW REQUIRED")
-
-                if gt_hazard and pred_hazard:
-                    q = "TP"
-                elif not gt_hazard and pred_hazard:
-                    q = "FP"
-                elif not gt_hazard and not pred_hazard:
-                    q = "TN"
-                else:
-                    q = "FN"  # hazard missed — dangerous
-
-                matrix[q] += 1
-                
-                danger = "  *** MISSED HAZARD ***" if q == "FN" else ""
-                print(f"  {parcel_id:<20s}  status={status:<26s}  {q}{danger}  ({latency:.3f}s)")
-
-            except Exception as exc:
-                print(f"  {parcel_id:<20s}  *** CRASH: {exc} ***")
-                crashes += 1
-
-        print()
+    source = store or ledger or base_dir
+    print(f"  Source   : {source.resolve()}"
+          + (f"  (bbox {','.join(map(str, bbox))})" if bbox else ""))
+    print(f"  Parcels  : {len(parcels)}")
+    if cache:
+        print(f"  Cache    : {cache} — {len(rows)} reused, {len(stale)} to assess "
+              f"(engine {engine_version()})")
+    print(f"  Workers  : {workers}\n")
+
+    # Opened before assessing anything, so a missing pyarrow fails at once.
+    # Rows stream out as they finish.
+    writer = ColumnarWriter(columnar) if columnar else None
+    try:
+        wall_start = time.perf_counter()
+        for done, row in enumerate(_run_all(stale, workers, writer is not None), start=1):
+            transects = row.pop("transects", [])
+            row["cached"] = False
+            rows.append(row)
+            if writer:
+                writer.write(row, transects)
+            if cache and keys.get(row["key"]) is not None:
+                entries[row["key"]] = {"key": keys[row["key"]], "row": row}
+            progress = f"[{done:>4d}/{len(stale)}]"
+            if row["error"]:
+                print(f"  {progress} {row['key']:<28s}  *** CRASH: {row['error']} ***")
+                continue
+            q = row["quadrant"] or "--"
+            danger = "  *** MISSED HAZARD ***" if q == "FN" else ""
+            print(f"  {progress} {row['key']:<28s}  status={row['overall_status']:<26s}  "
+                  f"{q}{danger}  ({row['latency_s']:.3f}s)")
+        wall_time = time.perf_counter() - wall_start
+    finally:
+        if writer:
+            writer.close()
+    if cache:
+        save_cache(cache, entries)
 
     # ── Print Executive Summary ──────────────────────────────────────────────
+    matrix = {"TP": 0, "FP": 0, "TN": 0, "FN": 0}
+    for r in rows:
+        if r["quadrant"]:
+            matrix[r["quadrant"]] += 1
+    crashes = sum(1 for r in rows if r["error"])
+    unlabelled = sum(1 for r in rows if not r["error"] and r["quadrant"] is None)
+    processed_count = len(rows) - crashes
+
     TP, FP, TN, FN = matrix["TP"], matrix["FP"], matrix["TN"], matrix["FN"]
     total = TP + FP + TN + FN
-
     accuracy = (TP + TN) / total * 100 if total else 0.0
-    avg_latency = total_latency / processed_count if processed_count else 0.0
+    latency = latency_summary(rows)
 
+    print()
     print("=" * 60)
     print("  EXECUTIVE CONFUSION MATRIX")
     print("=" * 60)
-    print(f"  Total parcels tested : {total + crashes}")
+    print(f"  Total parcels tested : {len(rows)}")
     print(f"  Successful processed : {processed_count}")
+    print(f"  Reused from cache    : {sum(1 for r in rows if r['cached'])}")
+    print(f"  Unlabelled (no score): {unlabelled}")
     print(f"  Crashes (edge cases) : {crashes}")
-    print(f"  Average Compute Latency : {avg_latency:.3f} seconds/parcel")
+    print(f"  Wall time            : {wall_time:.1f} s ({workers} worker(s))")
+    if latency["total"]:
+        t = latency["total"]
+        print(f"  Compute Latency      : p50={t['p50']:.3f}s  p95={t['p95']:.3f}s  "
+              f"p99={t['p99']:.3f}s  mean={t['mean']:.3f}s")
+        for stage, s in latency["stages"].items():
+            print(f"    {stage:<18s} : p50={s['p50']:.3f}s  p95={s['p95']:.3f}s  "
+                  f"p99={s['p99']:.3f}s")
     print()
     print(f"  Overall Accuracy (%) : {accuracy:.1f}%\n")
-    
+
     print("  Confusion Matrix (Positive Class = Hazardous Parcel):")
     print(f"  {'':15s}  {'Pred HAZARD':>14s}  {'Pred SAFE':>12s}")
     print(f"  {'GT HAZARD':15s}  {'TP = ' + str(TP):>14s}  {'FN = ' + str(FN):>12s}  <- Critical Failures")
     print(f"  {'GT SAFE':15s}  {'FP = ' + str(FP):>14s}  {'TN = ' + str(TN):>12s}  <- Over-conservative")
     print("=" * 60)
 
+    summary = {
+        "matrix": matrix,
+        "accuracy_pct": accuracy,
+        "parcels": len(rows),
+        "crashes": crashes,
+        "unlabelled": unlabelled,
+        "workers": workers,
+        "wall_time_s": wall_time,
+        "latency_s": latency,
+    }
+    if json_report:
+        write_json_report(json_report, rows, summary)
+        print(f"  JSON report written to {json_report}")
+    if csv_report and rows:
+        write_csv_report(csv_report, rows)
+        print(f"  CSV report written to {csv_report}")
+    if writer:
+        print(f"  Columnar tables written to {writer.path} ({writer.parcels} parcels) "
+              f"and {writer.transects_path} ({writer.transects} transects)")
+    return summary
+
 # ── CLI ────────────────────────────────────────────────────────────────────
 
 def main() -> None:
@@ -145,10 +515,67 @@ def main() -> None:
     )
     parser.add_argument(
         "--base-dir", default="tests/ground_truth", metavar="DIR",
-        help="Root folder containing safe/ and susceptible/ sub-directories.",
+        help="Root folder containing one sub-directory per category.",
+    )
+    parser.add_argument(
+        "--ledger", type=Path, metavar="CSV",
+        help="Validate the parcels listed in this ledger (gt_parcel_ledger.csv) "
+             "instead of scanning --base-dir.",
+    )
+    parser.add_argument(
+        "--store", type=Path, metavar="PATH",
+        help="Validate parcels from a gt_store.py SQLite store instead of "
+             "scanning --base-dir.",
+    )
+    parser.add_argument(
+        "--category", action="append", metavar="NAME",
+        help="Only validate this category (repeatable).",
+    )
+    parser.add_argument(
+        "--bbox", type=parse_bbox, metavar="MINX,MINY,MAXX,MAXY",
+        help="Only parcels intersecting this WGS84 box (store, folder or ledger).",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, metavar="N",
+        help="Assess parcels in N worker processes (default: 1, in-process).",
+    )
+    parser.add_argument(
+        "--cache", type=Path, default=Path(".gt_validation_cache.json"), metavar="PATH",
+        help="Result manifest; only parcels whose content, DEM or engine version "
+             "changed are re-assessed (default: .gt_validation_cache.json).",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Assess every parcel and leave the cache untouched.",
+    )
+    parser.add_argument(
+        "--json", type=Path, dest="json_report", metavar="PATH",
+        help="Write a per-parcel JSON report keyed by category/parcel_id.",
+    )
+    parser.add_argument(
+        "--csv", type=Path, dest="csv_report", metavar="PATH",
+        help="Write a per-parcel CSV report, one row per parcel.",
+    )
+    parser.add_argument(
+        "--columnar", type=Path, metavar="PATH",
+        help="Also write the rows as an Arrow or Parquet table (.arrow / .parquet), "
+             "and each assessed parcel's transect paths beside it (needs pyarrow).",
     )
     args = parser.parse_args()
-    run_validation(Path(args.base_dir))
+    if args.columnar and args.columnar.suffix not in FORMATS:
+        parser.error(f"--columnar must end in {', '.join(FORMATS)}")
+    run_validation(
+        Path(args.base_dir),
+        ledger=args.ledger,
+        workers=args.workers,
+        json_report=args.json_report,
+        csv_report=args.csv_report,
+        cache=None if args.no_cache else args.cache,
+        store=args.store,
+        categories=[c.lower() for c in args.category] if args.category else None,
+        bbox=args.bbox,
+        columnar=args.columnar,
+    )
 
 if __name__ == "__main__":
     main()
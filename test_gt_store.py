@@ -0,0 +1,83 @@
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from fingerprint import file_digest
+from gt_store import GroundTruthStore
+
+
+def _square(lon, lat, half=0.0001):
+    return {
+        "type": "Polygon",
+        "coordinates": [[
+            [lon - half, lat - half], [lon + half, lat - half],
+            [lon + half, lat + half], [lon - half, lat + half],
+            [lon - half, lat - half],
+        ]],
+    }
+
+
+def _write_tree(base: Path) -> None:
+    """Three parcels: two in Benguet, one in Bukidnon, across two categories."""
+    parcels = [
+        ("safe", "GT_1", 120.60, 16.40, "phivolcs_eil_car_layer0"),
+        ("susceptible", "GT_2", 120.61, 16.41, "phivolcs_eil_car_layer0"),
+        ("susceptible", "GT_3", 124.05, 8.08, None),
+    ]
+    for category, stem, lon, lat, source in parcels:
+        folder = base / category
+        folder.mkdir(parents=True, exist_ok=True)
+        props = {"id": stem} | ({"source": source} if source else {})
+        feature = {"type": "Feature", "properties": props, "geometry": _square(lon, lat)}
+        (folder / f"{stem}.geojson").write_text(json.dumps(feature, indent=2))
+
+
+class TestGroundTruthStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        _write_tree(self.tmp / "gt")
+        self.store = GroundTruthStore(self.tmp / "gt.sqlite")
+        self.addCleanup(self.store.close)
+        self.counts = self.store.import_folder(self.tmp / "gt")
+
+    def test_import_counts_and_provenance(self):
+        self.assertEqual(self.counts, {"safe": 1, "susceptible": 2})
+        self.assertEqual(self.store.counts(), {"safe": 1, "susceptible": 2})
+
+        parcel = self.store.select(["safe"])[0]
+        self.assertEqual(parcel["parcel_id"], "GT_1")
+        self.assertEqual(parcel["source_layer"], "phivolcs_eil_car_layer0")
+        self.assertEqual(parcel["provenance"]["properties"]["id"], "GT_1")
+        self.assertEqual(
+            parcel["content_sha256"],
+            file_digest(self.tmp / "gt" / "safe" / "GT_1.geojson"),
+        )
+
+    def test_select_by_region_and_category(self):
+        benguet = (120.5, 16.3, 120.7, 16.5)
+        self.assertEqual(
+            [p["parcel_id"] for p in self.store.select(bbox=benguet)], ["GT_1", "GT_2"]
+        )
+        self.assertEqual(
+            [p["parcel_id"] for p in self.store.select(["susceptible"], benguet)], ["GT_2"]
+        )
+        self.assertEqual(self.store.select(bbox=(0, 0, 1, 1)), [])
+
+    def test_reimport_upserts(self):
+        self.store.import_folder(self.tmp / "gt")
+        self.assertEqual(self.store.counts(), {"safe": 1, "susceptible": 2})
+
+    def test_export_round_trips_bytes(self):
+        out = self.tmp / "exported"
+        self.assertEqual(self.store.export_folder(out), 3)
+        for original in (self.tmp / "gt").rglob("*.geojson"):
+            copy = out / original.parent.name / original.name
+            self.assertEqual(copy.read_bytes(), original.read_bytes())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -29,10 +29,12 @@ Ground-truth values recorded from tile extraction (2026-03-02):
 import os
 import unittest
 
+import numpy as np
 import pytest
 
-from slope_stability import compute_slope_stability
+from slope_stability import DOG_TOLERANCE_DEG, compute_slope_stability, site_slope_sample
 from calculate_depositional_safety import compute_depositional_safety
+from eil_types import ComputeOptions
 from orchestrator import EILOrchestrator
 
 FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "test_fixtures")
@@ -167,6 +169,100 @@ class TestIntegrationDepositional(unittest.TestCase):
         )
 
 
+@pytest.mark.integration
+class TestIntegrationFloat32(unittest.TestCase):
+    """float32 compute mode against the float64 reference on the real tile."""
+
+    def setUp(self):
+        import rasterio
+        from shapely.geometry import shape
+
+        self.dataset = rasterio.open(IFSAR_TILE)
+        self.parcel_geom = shape(_PARCEL_GEOJSON)
+        self.f32 = ComputeOptions(precision="float32")
+
+    def tearDown(self):
+        self.dataset.close()
+
+    def test_slope_matches_reference(self):
+        ref = compute_slope_stability(self.parcel_geom, self.dataset)
+        f32 = compute_slope_stability(self.parcel_geom, self.dataset, self.f32)
+        self.assertEqual(f32["assessment"], ref["assessment"])
+        for key in ("max_slope_degrees", "avg_slope_degrees"):
+            self.assertAlmostEqual(f32["metrics"][key], ref["metrics"][key], places=3)
+
+    def test_depositional_matches_reference(self):
+        ref = compute_depositional_safety(self.parcel_geom, self.dataset)
+        f32 = compute_depositional_safety(self.parcel_geom, self.dataset, options=self.f32)
+        self.assertEqual(f32["assessment"], ref["assessment"])
+        for key, value in ref["metrics"].items():
+            self.assertAlmostEqual(f32["metrics"][key], value, places=2, msg=key)
+
+    def test_unknown_precision_rejected(self):
+        with self.assertRaises(ValueError):
+            ComputeOptions.from_config({"precision": "float16"})
+
+
+@pytest.mark.integration
+class TestIntegrationDecisionOnly(unittest.TestCase):
+    """decision_only depositional screening against the full run."""
+
+    def test_status_matches_full_run(self):
+        import rasterio
+        from shapely.geometry import box
+
+        fast = ComputeOptions(decision_only=True)
+        with rasterio.open(IFSAR_TILE) as ds:
+            for lot in (box(124.8975, 8.0975, 124.8985, 8.0985),
+                        box(124.9025, 8.1005, 124.9035, 8.1015),
+                        box(124.896, 8.103, 124.8965, 8.1035)):
+                full = compute_depositional_safety(lot, ds)
+                screened = compute_depositional_safety(lot, ds, options=fast)
+                with self.subTest(lot=lot.bounds):
+                    self.assertEqual(screened["assessment"]["status"],
+                                     full["assessment"]["status"])
+                    self.assertEqual(screened["_viz_transects"], [])
+                    if full["assessment"]["is_compliant"]:
+                        self.assertEqual(screened["metrics"], full["metrics"])
+
+    def test_flag_must_be_boolean(self):
+        with self.assertRaises(ValueError):
+            ComputeOptions.from_config({"decision_only": "yes"})
+
+
+@pytest.mark.integration
+class TestIntegrationSlopeKernel(unittest.TestCase):
+    """The "dog" slope kernel against the np.gradient reference."""
+
+    def _both(self, dem_path, geometry):
+        import rasterio
+
+        with rasterio.open(dem_path) as ds:
+            return (site_slope_sample(geometry, ds, kernel="gradient"),
+                    site_slope_sample(geometry, ds, kernel="dog"))
+
+    def test_identical_without_nodata(self):
+        from shapely.geometry import shape
+
+        ref, dog = self._both(IFSAR_TILE, shape(_PARCEL_GEOJSON).buffer(0.001))
+        np.testing.assert_allclose(dog, ref, rtol=0, atol=1e-9)
+
+    def test_within_tolerance_near_nodata_gaps(self):
+        import tempfile
+        from shapely.geometry import box
+
+        from bench_slope_kernel import punch_gaps
+
+        with tempfile.TemporaryDirectory() as tmp:
+            gaps = os.path.join(tmp, "gaps.tif")
+            punch_gaps(IFSAR_TILE, gaps, count=400)
+            ref, dog = self._both(gaps, box(124.897, 8.097, 124.903, 8.103))
+        self.assertGreater(ref.size, 0)
+        self.assertFalse(np.isnan(dog).any())
+        self.assertLessEqual(np.max(np.abs(dog - ref)), DOG_TOLERANCE_DEG)
+        self.assertFalse(np.array_equal(dog, ref))  # the gaps did reach the parcel
+
+
 @pytest.mark.integration
 class TestIntegrationOrchestrator(unittest.TestCase):
     """Full pipeline exercised via EILOrchestrator with SmartFetcher patched."""
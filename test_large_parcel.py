@@ -0,0 +1,93 @@
+"""Tests for tiled large-parcel processing (large_parcel.py)."""
+import os
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import rasterio
+import rasterio.features
+from shapely.geometry import Polygon
+
+import large_parcel
+from calculate_depositional_safety import compute_depositional_safety
+from eil_types import ComputeOptions
+from slope_stability import compute_slope_stability
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+
+# ~770 m × 700 m quadrilateral in the middle of the Bukidnon tile: 150×150
+# pixels, so a cap of a fraction of a megabyte cuts it into many tiles.
+_PARCEL = Polygon([(124.8965, 8.0965), (124.9035, 8.0975),
+                   (124.9030, 8.1035), (124.8970, 8.1030)])
+
+# Small enough that both modules tile the parcel.
+_CAP_MB = 0.5
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestLargeParcel(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = rasterio.open(FIXTURE)
+        self.addCleanup(self.dataset.close)
+
+    def test_tiles_partition_parcel_pixels(self):
+        tiles = large_parcel.pixel_tiles(_PARCEL, self.dataset, side=40)
+        self.assertGreater(len(tiles), 4)
+
+        def _count(geometry):
+            return int(rasterio.features.geometry_mask(
+                [geometry], out_shape=self.dataset.shape,
+                transform=self.dataset.transform, invert=True,
+            ).sum())
+
+        parts = [large_parcel.clip(_PARCEL, tile) for _, tile in tiles]
+        self.assertEqual(sum(_count(p) for p in parts if p is not None), _count(_PARCEL))
+
+    def test_tile_side_fits_cap(self):
+        side = large_parcel.tile_side(halo_px=10, bytes_per_pixel=104, max_window_mb=1.0)
+        self.assertLessEqual((side + 20) ** 2 * 104, 2**20)
+        self.assertEqual(large_parcel.tile_side(10_000, 104, 1.0), large_parcel.MIN_TILE_PX)
+
+    def test_slope_matches_untiled(self):
+        ref = compute_slope_stability(_PARCEL, self.dataset)
+        seen, pixel_tiles = [], large_parcel.pixel_tiles
+
+        def _tiles(*args):
+            seen.extend(pixel_tiles(*args))
+            return seen
+
+        with patch("large_parcel.pixel_tiles", side_effect=_tiles):
+            tiled = compute_slope_stability(_PARCEL, self.dataset,
+                                            ComputeOptions(max_window_mb=_CAP_MB))
+        self.assertGreater(len(seen), 1)
+        self.assertEqual(tiled["assessment"], ref["assessment"])
+        for key, value in ref["metrics"].items():
+            self.assertAlmostEqual(tiled["metrics"][key], value, places=2, msg=key)
+        self.assertEqual(tiled["_viz_grid"], [])
+
+    def test_depositional_matches_untiled(self):
+        ref = compute_depositional_safety(_PARCEL, self.dataset)
+        tiled = compute_depositional_safety(_PARCEL, self.dataset,
+                                            options=ComputeOptions(max_window_mb=_CAP_MB))
+        self.assertEqual(tiled["assessment"], ref["assessment"])
+        self.assertEqual(tiled["metrics"]["elevation_site"], ref["metrics"]["elevation_site"])
+        self.assertEqual(tiled["metrics"]["delta_e"], ref["metrics"]["delta_e"])
+        self.assertAlmostEqual(tiled["metrics"]["horizontal_distance_h"],
+                               ref["metrics"]["horizontal_distance_h"], places=3)
+
+    def test_under_cap_is_untiled(self):
+        with patch("large_parcel.pixel_tiles") as tiles:
+            result = compute_slope_stability(_PARCEL, self.dataset,
+                                             ComputeOptions(max_window_mb=512))
+        tiles.assert_not_called()
+        self.assertTrue(result["_viz_grid"])
+
+    def test_cap_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            ComputeOptions.from_config({"max_window_mb": 0})
+        self.assertEqual(ComputeOptions.from_config({}, max_window_mb=64).max_window_mb, 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
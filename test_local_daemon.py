@@ -0,0 +1,197 @@
+"""Tests for the local assessment daemon (local_daemon.py) and CLI fallback."""
+import io
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from unittest.mock import MagicMock, patch
+
+import local_daemon
+from cli import main
+from local_daemon import (DaemonTimeout, DaemonUnavailable, LocalDaemon, assess_via_daemon,
+                          settings_identity)
+
+_GEOMETRY = {
+    "type": "Polygon",
+    "coordinates": [[[121.0, 14.5], [121.1, 14.5], [121.1, 14.6],
+                     [121.0, 14.6], [121.0, 14.5]]],
+}
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class TestLocalDaemon(unittest.TestCase):
+
+    def setUp(self):
+        # Short directory: AF_UNIX paths are limited to ~100 bytes.
+        self.tmp = tempfile.mkdtemp(prefix="eil")
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.socket_path = os.path.join(self.tmp, "d.sock")
+
+        self.orc = MagicMock()
+        self.orc.run_assessment.side_effect = (
+            lambda payload: {"project_id": payload["project_id"], "via": "daemon"}
+        )
+        self.daemon = LocalDaemon(self.socket_path, orchestrator=self.orc)
+        self.daemon.bind()
+        thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(self.daemon.shutdown)
+
+        self.geojson = os.path.join(self.tmp, "parcel.geojson")
+        with open(self.geojson, "w") as f:
+            json.dump({"type": "Feature", "geometry": _GEOMETRY}, f)
+
+    def _cli(self, *extra):
+        out, err = io.StringIO(), io.StringIO()
+        with redirect_stdout(out), redirect_stderr(err):
+            with self.assertRaises(SystemExit) as cm:
+                main(["--geojson", self.geojson, "--project-id", "LOT-1", *extra])
+        return cm.exception.code, out.getvalue(), err.getvalue()
+
+    def test_socket_is_private(self):
+        self.assertEqual(os.stat(self.socket_path).st_mode & 0o777, 0o600)
+
+    def test_assess_round_trip(self):
+        payload = {"project_id": "P", "geometry": _GEOMETRY, "config": {}}
+        self.assertEqual(assess_via_daemon(payload, self.socket_path),
+                         {"project_id": "P", "via": "daemon"})
+        self.orc.run_assessment.assert_called_once_with(payload)
+
+    def test_assessment_errors_keep_their_type(self):
+        self.orc.run_assessment.side_effect = FileNotFoundError("no DEM")
+        with self.assertRaisesRegex(FileNotFoundError, "no DEM"):
+            assess_via_daemon({"project_id": "P"}, self.socket_path)
+
+    def test_cli_uses_daemon(self):
+        code, out, _ = self._cli("--socket", self.socket_path)
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["via"], "daemon")
+
+    @patch("orchestrator.EILOrchestrator")
+    def test_cli_no_daemon_flag_runs_in_process(self, orc_cls):
+        orc_cls.return_value.run_assessment.return_value = {"via": "in-process"}
+        code, out, _ = self._cli("--socket", self.socket_path, "--no-daemon")
+        self.assertEqual(json.loads(out)["via"], "in-process")
+        self.orc.run_assessment.assert_not_called()
+
+    @patch("orchestrator.EILOrchestrator")
+    def test_engine_mismatch_falls_back_with_warning(self, orc_cls):
+        orc_cls.return_value.run_assessment.return_value = {"via": "in-process"}
+        self.daemon.engine = "0" * 16
+        code, out, err = self._cli("--socket", self.socket_path)
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["via"], "in-process")
+        self.assertIn("restart", err)
+        self.orc.run_assessment.assert_not_called()
+
+    def test_client_refuses_socket_open_to_others(self):
+        os.chmod(self.socket_path, 0o666)
+        with self.assertRaisesRegex(DaemonUnavailable, "0666"):
+            assess_via_daemon({"project_id": "P"}, self.socket_path)
+        self.orc.run_assessment.assert_not_called()
+
+    def test_client_refuses_socket_of_another_user(self):
+        with patch("local_daemon.os.getuid", return_value=os.getuid() + 1):
+            with self.assertRaisesRegex(DaemonUnavailable, "owned by uid"):
+                assess_via_daemon({"project_id": "P"}, self.socket_path)
+
+    @patch("orchestrator.EILOrchestrator")
+    def test_settings_mismatch_falls_back_with_warning(self, orc_cls):
+        orc_cls.return_value.run_assessment.return_value = {"via": "in-process"}
+        with patch.dict(os.environ, {"EIL_DEM_IFSAR_URI": "/elsewhere/IfSAR.tif"}):
+            code, out, err = self._cli("--socket", self.socket_path)
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["via"], "in-process")
+        self.assertIn("EIL_DEM_", err)
+        self.orc.run_assessment.assert_not_called()
+
+    def test_timeout_is_reported_not_unavailable(self):
+        self.orc.run_assessment.side_effect = lambda payload: threading.Event().wait(1)
+        with self.assertRaisesRegex(DaemonTimeout, "did not answer within 0.1s"):
+            assess_via_daemon({"project_id": "P"}, self.socket_path, timeout=0.1)
+
+    @patch("orchestrator.EILOrchestrator")
+    def test_cli_reports_timeout_without_running_in_process(self, orc_cls):
+        with patch("local_daemon._request", side_effect=DaemonTimeout("did not answer")):
+            code, out, err = self._cli("--socket", self.socket_path)
+        self.assertEqual(code, 1)
+        self.assertEqual(out, "")
+        self.assertIn("Error: did not answer", err)
+        orc_cls.assert_not_called()
+
+    @patch("orchestrator.EILOrchestrator")
+    def test_cli_falls_back_on_permission_error(self, orc_cls):
+        orc_cls.return_value.run_assessment.return_value = {"via": "in-process"}
+        with patch("local_daemon.socket.socket.connect", side_effect=PermissionError(13, "denied")):
+            code, out, err = self._cli("--socket", self.socket_path)
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(out)["via"], "in-process")
+        self.assertIn("PermissionError", err)
+
+    def test_second_daemon_refuses_live_socket(self):
+        with self.assertRaises(RuntimeError):
+            LocalDaemon(self.socket_path, orchestrator=MagicMock()).bind()
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "needs Unix domain sockets")
+class TestNoDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="eil")
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.socket_path = os.path.join(self.tmp, "d.sock")
+
+    def test_client_reports_unavailable(self):
+        with self.assertRaises(DaemonUnavailable):
+            assess_via_daemon({}, self.socket_path)
+
+    @patch("orchestrator.EILOrchestrator")
+    def test_cli_falls_back_silently(self, orc_cls):
+        orc_cls.return_value.run_assessment.return_value = {"via": "in-process"}
+        geojson = os.path.join(self.tmp, "parcel.geojson")
+        with open(geojson, "w") as f:
+            json.dump(_GEOMETRY, f)
+        out, err = io.StringIO(), io.StringIO()
+        with patch.dict(os.environ, {"EIL_LOCAL_SOCKET": self.socket_path}), \
+             redirect_stdout(out), redirect_stderr(err):
+            with self.assertRaises(SystemExit) as cm:
+                main(["--geojson", geojson, "--project-id", "LOT-1"])
+        self.assertEqual(cm.exception.code, 0)
+        self.assertEqual(json.loads(out.getvalue())["via"], "in-process")
+        self.assertEqual(err.getvalue(), "")
+
+    def test_stale_socket_is_replaced(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.socket_path)
+        stale.close()  # file left behind, nobody listening
+        daemon = LocalDaemon(self.socket_path, orchestrator=MagicMock())
+        daemon.bind()
+        daemon.close()
+        self.assertFalse(os.path.exists(self.socket_path))
+
+    def test_settings_identity_follows_dem_settings_only(self):
+        base = settings_identity(os.path.join(self.tmp, "missing.env"))
+        with patch.dict(os.environ, {"EIL_PORT": "9999"}):
+            self.assertEqual(settings_identity(os.path.join(self.tmp, "missing.env")), base)
+        with patch.dict(os.environ, {"eil_dem_srtm_uri": "/other/SRTM.tif"}):
+            self.assertNotEqual(settings_identity(os.path.join(self.tmp, "missing.env")), base)
+        env_file = os.path.join(self.tmp, ".env")
+        with open(env_file, "w") as f:
+            f.write("EIL_PORT=9999\n")
+        self.assertEqual(settings_identity(env_file), base)
+        with open(env_file, "a") as f:
+            f.write("export EIL_COMPUTE_MAX_WINDOW_MB=64\n")
+        self.assertNotEqual(settings_identity(env_file), base)
+
+    def test_default_socket_path_honours_env(self):
+        with patch.dict(os.environ, {"EIL_LOCAL_SOCKET": "/run/x.sock"}):
+            self.assertEqual(local_daemon.default_socket_path(), "/run/x.sock")
+
+
+if __name__ == "__main__":
+    unittest.main()
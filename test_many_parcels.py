@@ -0,0 +1,72 @@
+"""Tests for the multi-lot compute paths (compute_*_many)."""
+import os
+import unittest
+from unittest.mock import patch
+
+import rasterio
+from shapely.geometry import box
+
+from calculate_depositional_safety import (
+    compute_depositional_safety,
+    compute_depositional_safety_many,
+)
+from eil_types import ComputeOptions
+from slope_stability import compute_slope_stability, compute_slope_stability_many
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+
+# A 3×3 block of adjacent ~90 m lots in the middle of the tile, plus one lot
+# a few hundred metres away whose vicinity only partly overlaps theirs.
+_STEP = 0.0008
+_LOTS = [
+    box(124.897 + i * _STEP, 8.097 + j * _STEP, 124.897 + (i + 1) * _STEP, 8.097 + (j + 1) * _STEP)
+    for i in range(3) for j in range(3)
+] + [box(124.9, 8.1, 124.901, 8.1008)]
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestManyParcels(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = rasterio.open(FIXTURE)
+        self.addCleanup(self.dataset.close)
+
+    def test_slope_matches_separate_calls(self):
+        for options in (ComputeOptions(), ComputeOptions(slope_kernel="dog"),
+                        ComputeOptions(precision="float32")):
+            with self.subTest(options=options):
+                many = compute_slope_stability_many(_LOTS, self.dataset, options)
+                self.assertEqual(
+                    many, [compute_slope_stability(g, self.dataset, options) for g in _LOTS]
+                )
+
+    def test_depositional_matches_separate_calls(self):
+        many = compute_depositional_safety_many(_LOTS, self.dataset)
+        self.assertEqual(many, [compute_depositional_safety(g, self.dataset) for g in _LOTS])
+
+    def test_overlapping_lots_fall_back_to_separate_calls(self):
+        # A redrawn copy of the first lot, shifted by half its width.
+        shifted = box(124.897 + _STEP / 2, 8.097, 124.897 + 1.5 * _STEP, 8.097 + _STEP)
+        lots = _LOTS + [shifted]
+        with patch("slope_stability.compute_slope_stability",
+                   wraps=compute_slope_stability) as single:
+            many = compute_slope_stability_many(lots, self.dataset)
+        # The shifted copy overlaps lots 0 and 3; their edge-sharing neighbours
+        # stay in the shared pass.
+        self.assertEqual(single.call_count, 3)
+        self.assertEqual(many, [compute_slope_stability(g, self.dataset) for g in lots])
+
+    def test_over_cap_falls_back_to_separate_calls(self):
+        options = ComputeOptions(max_window_mb=1)
+        with patch("slope_stability.compute_slope_stability",
+                   wraps=compute_slope_stability) as single:
+            compute_slope_stability_many(_LOTS[:2], self.dataset, options)
+        self.assertEqual(single.call_count, 2)
+
+    def test_empty(self):
+        self.assertEqual(compute_slope_stability_many([], self.dataset), [])
+        self.assertEqual(compute_depositional_safety_many([], self.dataset), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,250 @@
+import io
+import json
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_bounds
+
+import generate_mock_parcels
+from generate_mock_parcels import (
+    ArcGISClient, AuthError, TokenBucket, export_layer0, mode_slope, sample_raster,
+)
+
+
+def _layer0_tiff(path=None):
+    """20×20 single-band class raster: left half 3 (High), right half 1 (Low).
+
+    Returns the GeoTIFF bytes, also writing them to `path` when given.
+    """
+    data = np.ones((20, 20), dtype=np.uint8)
+    data[:, :10] = 3
+    data[0, 15] = 2                     # one Moderate speck inside the Low half
+    profile = {
+        "driver": "GTiff", "width": 20, "height": 20, "count": 1,
+        "dtype": "uint8", "crs": "EPSG:4326", "nodata": 0,
+        "transform": from_bounds(121.0, 16.0, 121.02, 16.02, 20, 20),
+    }
+    with rasterio.MemoryFile() as mem:
+        with mem.open(**profile) as dst:
+            dst.write(data, 1)
+        payload = mem.read()
+    if path is not None:
+        Path(path).write_bytes(payload)
+    return payload
+
+
+class _StubArcGIS(BaseHTTPRequestHandler):
+    """Minimal MapServer /identify stub speaking keep-alive HTTP/1.1.
+
+    Behaviour is driven by attributes on the server object:
+      fail_first  — number of initial requests answered with 503
+      valid_token — requests with any other token get an ArcGIS 498 body
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.peers.add(self.client_address)
+            n = server.requests
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path == "/out/export.tif":
+            return self._send_bytes(200, server.tiff, "image/tiff")
+        if n <= server.fail_first:
+            self._send(503, {"error": "busy"})
+        elif query.get("token", [""])[0] != server.valid_token:
+            self._send(200, {"error": {"code": 498, "message": "Invalid token."}})
+        elif url.path.endswith("/export"):
+            host, port = server.server_address
+            self._send(200, {
+                "href": f"http://{host}:{port}/out/export.tif",
+                "extent": {"xmin": 121.0, "ymin": 16.0, "xmax": 121.02, "ymax": 16.02},
+                "width": 20, "height": 20,
+            })
+        else:
+            server.seen_tokens.append(query["token"][0])
+            self._send(200, {"results": [{"attributes": {"Pixel Value": "3"}}]})
+
+    def _send(self, status, body):
+        self._send_bytes(status, json.dumps(body).encode(), "application/json")
+
+    def _send_bytes(self, status, payload, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestArcGISClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubArcGIS)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.peers = set()
+        self.server.seen_tokens = []
+        self.server.fail_first = 0
+        self.server.valid_token = "good"
+        self.server.tiff = _layer0_tiff()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        host, port = self.server.server_address
+        self.base_url = f"http://{host}:{port}/arcgis/rest/services/X/MapServer"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _client(self, **kwargs):
+        kwargs.setdefault("rate", 1000.0)
+        kwargs.setdefault("burst", 100)
+        kwargs.setdefault("backoff", 0.001)
+        client = ArcGISClient(self.base_url, kwargs.pop("token", "good"), **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_connection_reused_per_worker(self):
+        client = self._client()
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            hits = list(pool.map(lambda i: client.identify(121.0, 16.0), range(30)))
+
+        self.assertTrue(all(h["attributes"]["Pixel Value"] == "3" for h in hits))
+        self.assertEqual(self.server.requests, 30)
+        # One keep-alive connection per worker thread, not one per request.
+        self.assertLessEqual(len(self.server.peers), 3)
+
+    def test_retries_transient_failures(self):
+        self.server.fail_first = 2
+        client = self._client()
+
+        self.assertIsNotNone(client.identify(121.0, 16.0))
+        self.assertEqual(self.server.requests, 3)
+
+    def test_refreshes_rejected_token_once(self):
+        refreshes = []
+
+        def provider():
+            refreshes.append(1)
+            return "good"
+
+        client = self._client(token="expired", token_provider=provider)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            hits = list(pool.map(lambda i: client.identify(121.0, 16.0), range(8)))
+
+        self.assertTrue(all(hits))
+        self.assertEqual(len(refreshes), 1)
+        self.assertEqual(set(self.server.seen_tokens), {"good"})
+
+    def test_rejected_token_without_provider_is_a_miss(self):
+        client = self._client(token="expired")
+        self.assertIsNone(client.identify(121.0, 16.0))
+
+    def test_failed_token_refresh_ends_the_run(self):
+        def provider():
+            raise AuthError("Authentication failed: bad password")
+
+        client = self._client(token="expired", token_provider=provider)
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(generate_mock_parcels, "OUT_BASE", Path(tmp)), \
+                redirect_stdout(io.StringIO()):
+            with self.assertRaisesRegex(AuthError, "bad password"):
+                mode_slope(5, client, 2, {"3"}, {"1"})
+
+    def test_slope_sends_no_darts_past_count(self):
+        client = self._client()
+        with tempfile.TemporaryDirectory() as tmp, \
+                patch.object(generate_mock_parcels, "OUT_BASE", Path(tmp)), \
+                redirect_stdout(io.StringIO()):
+            mode_slope(3, client, 4, {"3"}, {"1"})
+            saved = list(Path(tmp, "susceptible").glob("*.geojson"))
+
+        # Every dart hits a High pixel, so three requests make three parcels.
+        self.assertEqual(len(saved), 3)
+        self.assertEqual(self.server.requests, 3)
+
+    def test_export_layer0_downloads_raster(self):
+        client = self._client()
+        with tempfile.TemporaryDirectory() as tmp:
+            out = export_layer0(client, (121.0, 16.0, 121.02, 16.02), 20, Path(tmp) / "l0.tif")
+            with rasterio.open(out) as src:
+                self.assertEqual(src.read(1)[0, 0], 3)
+            self.assertTrue(out.with_suffix(".extent.json").exists())
+
+
+class TestSampleRaster(unittest.TestCase):
+
+    def test_stratified_interior_samples(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "l0.tif"
+            _layer0_tiff(path)
+            samples, histogram = sample_raster(
+                path, 10, {"3"}, {"1"}, rng=np.random.default_rng(0)
+            )
+
+        self.assertEqual(histogram, {"1": 199, "2": 1, "3": 200})
+        self.assertEqual(sum(1 for s in samples if s[3] == "susceptible"), 5)
+        self.assertEqual(sum(1 for s in samples if s[3] == "safe"), 5)
+        for lon, lat, value, category in samples:
+            col = int((lon - 121.0) / 0.001)
+            row = int((16.02 - lat) / 0.001)
+            # Uniform 3×3 neighbourhood: never on the raster edge, the class
+            # boundary (cols 9/10) or next to the Moderate speck at (0, 15).
+            self.assertTrue(1 <= row <= 18 and 1 <= col <= 18)
+            self.assertNotIn(col, (9, 10))
+            self.assertFalse(row <= 1 and 14 <= col <= 16)
+            self.assertEqual(value, "3" if col < 10 else "1")
+            self.assertEqual(category, "susceptible" if value == "3" else "safe")
+
+
+    def test_rgb_export_with_value_classes_fails_loudly(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "l0_rgb.tif"
+            rgb = np.zeros((3, 20, 20), dtype=np.uint8)
+            rgb[0, :, :10] = 255                # red High half, black Low half
+            with rasterio.open(
+                path, "w", driver="GTiff", width=20, height=20, count=3, dtype="uint8",
+                crs="EPSG:4326", transform=from_bounds(121.0, 16.0, 121.02, 16.02, 20, 20),
+            ) as dst:
+                dst.write(rgb)
+            with self.assertRaisesRegex(ValueError, r"most common are \[[^]]*'#ff0000'"):
+                sample_raster(path, 10, {"3"}, {"1"})
+            samples, _ = sample_raster(path, 10, {"#ff0000"}, {"#000000"},
+                                       rng=np.random.default_rng(0))
+        self.assertEqual(len(samples), 10)
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_rate_limits_after_burst(self):
+        now = [0.0]
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        bucket = TokenBucket(rate=4.0, burst=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(6):
+            bucket.acquire()
+
+        # Two free tokens, then four more at 4/s take one second.
+        self.assertAlmostEqual(now[0], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -30,11 +30,18 @@ def _make_mock_dataset():
 
     mock_ds = MagicMock()
     mock_ds.crs = CRS.from_epsg(4326)
+    mock_ds.res = (4.5e-5, 4.5e-5)   # ~5 m IfSAR pixels
     return mock_ds
 
 
 class TestEILOrchestrator(unittest.TestCase):
 
+    def setUp(self):
+        # The mocked DEM "dummy.tif" does not exist to be stat()ed.
+        patcher = patch("orchestrator.dem_identity", return_value="dummy.tif:0:0")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @patch("orchestrator.rasterio.open")
     @patch("orchestrator.calculate_slope_stability")
     @patch("orchestrator.calculate_depositional_safety")
@@ -94,10 +101,35 @@ class TestEILOrchestrator(unittest.TestCase):
 
         self.assertEqual(result["phase_1_compliance"]["overall_status"], "NOT CERTIFIED")
 
+    @patch("orchestrator.rasterio.open")
+    @patch("orchestrator.calculate_slope_stability")
+    @patch("orchestrator.calculate_depositional_safety")
+    @patch("orchestrator.SmartFetcher")
+    def test_reuse_datasets_opens_dem_once(self, mock_fetcher_cls, mock_dep, mock_slope, mock_rasterio_open):
+        mock_fetcher_cls.return_value.fetch_dem_path.return_value = ("dummy.tif", "mock_type")
+        mock_ds = _make_mock_dataset()
+        mock_ds.closed = False
+        mock_rasterio_open.return_value = mock_ds
+        mock_slope.return_value = {"assessment": {"status": "SAFE"}}
+        mock_dep.return_value = {"assessment": {"status": "SAFE (Beyond Runout)"}}
+
+        payload = {"project_id": "p", "geometry": _GEOMETRY, "config": {"mode": "compliance"}}
+        orc = EILOrchestrator(reuse_datasets=True)
+        orc.run_assessment(payload)
+        result = orc.run_assessment(payload)
+
+        mock_rasterio_open.assert_called_once_with("dummy.tif")
+        mock_ds.close.assert_not_called()
+        self.assertIn("slope", result["diagnostics"]["timings_s"])
+        self.assertIn("depositional", result["diagnostics"]["timings_s"])
+
+        orc.close()
+        mock_ds.close.assert_called_once()
+
 
 class TestCLI(unittest.TestCase):
 
-    @patch('cli.EILOrchestrator')
+    @patch('orchestrator.EILOrchestrator')
     def test_cli_stdout(self, mock_orc_cls):
         import tempfile
         import os
@@ -0,0 +1,95 @@
+"""Tests for the wall-to-wall slope classification map (regional_map.py)."""
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from unittest.mock import patch
+
+import numpy as np
+import rasterio
+import rasterio.windows
+from shapely.geometry import box
+
+import regional_map
+from cli import main
+from slope_stability import compute_slope_stability
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestRegionalMap(unittest.TestCase):
+
+    def setUp(self):
+        self.dataset = rasterio.open(FIXTURE)
+        self.addCleanup(self.dataset.close)
+        self.grid = regional_map.grid(self.dataset, cell_m=30)
+
+    def _chunked(self, chunk_cells):
+        codes = np.zeros((self.grid["rows"], self.grid["cols"]), dtype=np.uint8)
+        for r, c, h, w in regional_map.chunks(self.grid, chunk_cells):
+            codes[r:r + h, c:c + w] = regional_map.classify_chunk(
+                self.dataset, self.grid, (r, c, h, w))
+        return codes
+
+    def test_chunking_does_not_change_the_map(self):
+        np.testing.assert_array_equal(self._chunked(7), self._chunked(self.grid["rows"]))
+
+    def test_cells_match_per_parcel_status(self):
+        codes = self._chunked(16)
+        cell_px = self.grid["cell_px"]
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            r, c = (int(v) for v in rng.integers(0, 60, size=2))
+            window = rasterio.windows.Window(c * cell_px, r * cell_px, cell_px, cell_px)
+            cell = box(*rasterio.windows.bounds(window, self.dataset.transform))
+            status = compute_slope_stability(cell, self.dataset)["assessment"]["status"]
+            with self.subTest(cell=(r, c)):
+                self.assertEqual(regional_map.CLASS_NAMES[int(codes[r, c])], status)
+
+    def test_build_map_writes_geotiff_and_resumes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "map.tif")
+            first = regional_map.build_map(FIXTURE, out, chunk_cells=32, workers=2)
+            self.assertEqual(first["computed"], first["chunks"])
+            with rasterio.open(out) as dst:
+                self.assertEqual(dst.shape, (self.grid["rows"], self.grid["cols"]))
+                self.assertTrue(dst.profile["tiled"])
+                written = dst.read(1)
+            np.testing.assert_array_equal(written, self._chunked(32))
+
+            again = regional_map.build_map(FIXTURE, out, chunk_cells=32, workers=2)
+            self.assertEqual((again["computed"], again["resumed"]), (0, first["chunks"]))
+
+            with self.assertRaises(ValueError):
+                regional_map.build_map(FIXTURE, out, chunk_cells=16, workers=2)
+
+    def test_replaced_dem_or_new_thresholds_do_not_resume(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            out = os.path.join(tmp, "map.tif")
+            regional_map.build_map(FIXTURE, out, chunk_cells=64, workers=1)
+            with patch("regional_map.dem_identity", return_value=f"{FIXTURE}:1:1"), \
+                    self.assertRaisesRegex(ValueError, "different run"):
+                regional_map.build_map(FIXTURE, out, chunk_cells=64, workers=1)
+            with patch("regional_map.SLOPE_THRESHOLD_FLAG", 10.0), \
+                    self.assertRaisesRegex(ValueError, "different run"):
+                regional_map.build_map(FIXTURE, out, chunk_cells=64, workers=1)
+
+
+class TestRegionalMapCli(unittest.TestCase):
+
+    def test_unreadable_dem_is_an_error_message(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            dem = os.path.join(tmp, "not_a_dem.tif")
+            with open(dem, "w") as f:
+                f.write("not a GeoTIFF")
+            err = io.StringIO()
+            with redirect_stderr(err), self.assertRaises(SystemExit) as cm:
+                main(["regional-map", "--dem", dem, "--output", os.path.join(tmp, "m.tif")])
+        self.assertEqual(cm.exception.code, 1)
+        self.assertTrue(err.getvalue().startswith("Error: "))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""Startup checks for the CLI and API entry points (see bench_startup.py).
+
+The lazy-import check runs in the default suite. The wall-clock budgets are
+marked ``perf`` and deselected by default, since a loaded CI runner can miss
+them without any regression; run them with ``pytest -m perf``.
+"""
+import unittest
+
+import pytest
+
+import bench_startup
+
+
+class TestLazyImports(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.results = bench_startup.measure(runs=1)
+
+    def test_entry_points_do_not_import_geoprocessing_stack(self):
+        for name, r in self.results.items():
+            with self.subTest(entry_point=name):
+                self.assertEqual(r["heavy"], [])
+
+
+@pytest.mark.perf
+class TestStartupBudget(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.results = bench_startup.measure(runs=3)
+
+    def test_entry_points_within_budget(self):
+        for name, r in self.results.items():
+            with self.subTest(entry_point=name):
+                self.assertLessEqual(r["seconds"], r["budget"])
+
+
+if __name__ == "__main__":
+    unittest.main()
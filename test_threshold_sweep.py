@@ -0,0 +1,98 @@
+import math
+import unittest
+
+import numpy as np
+import rasterio
+from rasterio.io import MemoryFile
+from rasterio.transform import from_origin
+from shapely.geometry import box
+
+from eil_status import (
+    COVERAGE_FRACTION_FLAG,
+    COVERAGE_FRACTION_SUSCEPTIBLE,
+    RUNOUT_RATIO,
+    SLOPE_THRESHOLD_FLAG,
+    SLOPE_THRESHOLD_SUSCEPTIBLE,
+)
+from slope_stability import compute_slope_stability, site_slope_sample
+from threshold_sweep import HIST_EDGES, slope_histogram, sweep
+
+
+def _stats(hists, gt_hazard, transects=()):
+    """A cache dict as collect() would write it. transects: (parcel, ΔE, H)."""
+    transects = list(transects)
+    return {
+        "gt_hazard": np.array(gt_hazard, dtype=np.int8),
+        "crashed": np.zeros(len(hists), dtype=bool),
+        "hist_edges": HIST_EDGES,
+        "slope_hist": np.array(hists),
+        "slope_ok": np.ones(len(hists), dtype=bool),
+        "transect_parcel": np.array([t[0] for t in transects], dtype=np.int64),
+        "transect_delta_e": np.array([t[1] for t in transects], dtype=float),
+        "transect_h": np.array([t[2] for t in transects], dtype=float),
+    }
+
+
+def _current(stats):
+    rows = sweep(
+        stats,
+        [SLOPE_THRESHOLD_FLAG], [SLOPE_THRESHOLD_SUSCEPTIBLE],
+        [COVERAGE_FRACTION_FLAG], [COVERAGE_FRACTION_SUSCEPTIBLE],
+        [RUNOUT_RATIO],
+    )
+    assert len(rows) == 1
+    return rows[0]
+
+
+class TestSlopeHistogram(unittest.TestCase):
+
+    def test_threshold_edge_is_not_counted_above(self):
+        """A sample at exactly 16.0° is not '> 16°', as in the pipeline."""
+        hist = slope_histogram(np.array([16.0, 16.0, 16.05]))
+        self.assertEqual(np.cumsum(hist)[160], 2)
+        self.assertEqual(HIST_EDGES[160], 16.0)
+
+
+class TestSweepMatchesPipeline(unittest.TestCase):
+
+    def _dataset_for(self, target_degrees):
+        rise = math.tan(math.radians(target_degrees))
+        data = np.tile(np.arange(100, dtype=np.float32) * rise, (100, 1))
+        memfile = MemoryFile()
+        ds = memfile.open(
+            driver="GTiff", height=100, width=100, count=1,
+            dtype=rasterio.float32, transform=from_origin(0, 100, 1, 1), nodata=-9999,
+        )
+        ds.write(data, 1)
+        self.addCleanup(memfile.close)
+        self.addCleanup(ds.close)
+        return ds
+
+    def test_current_thresholds_reproduce_slope_status(self):
+        site = box(20, 20, 80, 80)
+        for degrees in (10.0, 15.0, 20.0):
+            with self.subTest(degrees=degrees):
+                ds = self._dataset_for(degrees)
+                expected = compute_slope_stability(site, ds)["assessment"]["status"]
+                hist = slope_histogram(site_slope_sample(site, ds))
+                # Label the parcel hazardous: TP iff the sweep predicts hazard.
+                row = _current(_stats([hist], [1]))
+                self.assertEqual(row["TP"] == 1, expected != "SAFE")
+
+    def test_runout_ratio_decides_prone(self):
+        flat = slope_histogram(np.zeros(10))
+        # ΔE = 50 m, H = 140 m: PRONE at ratio 3 (150 m), SAFE at ratio 2.5 (125 m).
+        stats = _stats([flat], [1], transects=[(0, 50.0, 140.0)])
+        rows = sweep(stats, [14.0], [16.0], [0.1], [0.015], [2.5, 3.0])
+        by_ratio = {r["runout_ratio"]: r for r in rows}
+        self.assertEqual(by_ratio[3.0]["TP"], 1)
+        self.assertEqual(by_ratio[2.5]["FN"], 1)
+
+    def test_unlabelled_parcels_are_not_scored(self):
+        flat = slope_histogram(np.zeros(10))
+        row = _current(_stats([flat, flat], [0, -1]))
+        self.assertEqual(row["TP"] + row["FP"] + row["TN"] + row["FN"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,190 @@
+"""Tests for the ground-truth harness's parcel selection and result cache
+(test_ground_truth.py)."""
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import test_ground_truth as gt
+from fingerprint import dem_identity
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+SQUARE = {"type": "Polygon",
+          "coordinates": [[[124.9, 8.1], [124.9005, 8.1], [124.9005, 8.1005],
+                           [124.9, 8.1005], [124.9, 8.1]]]}
+
+
+def _fetcher():
+    fetcher = MagicMock()
+    fetcher.fetch_dem_path.return_value = (FIXTURE, "ifsar")
+    return fetcher
+
+
+def _row(key, latency=0.5, **extra):
+    return {"key": key, "parcel_id": key.split("/")[1], "category": key.split("/")[0],
+            "overall_status": "CERTIFIED SAFE", "quadrant": "TN", "latency_s": latency,
+            "timings_s": {"slope": latency / 2}, "error": None} | extra
+
+
+class _Tree:
+    """A ground-truth folder with one safe parcel per name."""
+
+    def __init__(self, test, names=("lot0", "lot1")):
+        tmp = tempfile.TemporaryDirectory()
+        test.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        self.base = self.root / "ground_truth"
+        (self.base / "safe").mkdir(parents=True)
+        for name in names:
+            (self.base / "safe" / f"{name}.geojson").write_text(json.dumps(SQUARE))
+        self.cache = self.root / "cache.json"
+
+
+class TestBboxSelection(unittest.TestCase):
+
+    def test_folder_run_keeps_parcels_in_the_box(self):
+        tree = _Tree(self, names=("inside",))
+        far = dict(SQUARE, coordinates=[[[121.0, 14.5], [121.001, 14.5], [121.001, 14.501],
+                                         [121.0, 14.501], [121.0, 14.5]]])
+        (tree.base / "safe" / "outside.geojson").write_text(json.dumps(far))
+        parcels = gt.discover_parcels(tree.base) + [
+            {"parcel_id": "broken", "category": "safe", "path": "/nonexistent.geojson"}
+        ]
+        kept = gt.within_bbox(parcels, (124.8, 8.0, 125.0, 8.2))
+        self.assertEqual([p["parcel_id"] for p in kept], ["inside", "broken"])
+
+    def test_run_validation_applies_the_bbox_without_a_store(self):
+        tree = _Tree(self)
+        with patch.object(gt, "_run_all", lambda parcels, *a: iter(())), \
+                patch.object(gt, "SmartFetcher", _fetcher), \
+                redirect_stdout(StringIO()):
+            summary = gt.run_validation(tree.base, bbox=(121.0, 14.0, 122.0, 15.0))
+        self.assertEqual(summary["parcels"], 0)
+
+
+class TestManifestKey(unittest.TestCase):
+
+    def test_keys_on_content_dem_and_engine(self):
+        tree = _Tree(self)
+        (parcel, _) = gt.discover_parcels(tree.base)
+        key = gt.manifest_key(parcel, _fetcher())
+        self.assertEqual(key["dem"], dem_identity(FIXTURE))
+        self.assertEqual(key["engine"], gt.engine_version())
+        self.assertEqual(len(key["content_sha256"]), 64)
+
+    def test_unreadable_parcel_has_no_key(self):
+        parcel = {"parcel_id": "gone", "category": "safe", "path": "/nonexistent.geojson"}
+        self.assertIsNone(gt.manifest_key(parcel, _fetcher()))
+
+
+class TestCacheFile(unittest.TestCase):
+
+    def test_round_trip(self):
+        tree = _Tree(self, names=())
+        entries = {"safe/lot0": {"key": {"engine": "e"}, "row": _row("safe/lot0")}}
+        gt.save_cache(tree.cache, entries)
+        self.assertEqual(gt.load_cache(tree.cache), entries)
+
+    def test_missing_corrupt_or_old_cache_is_empty(self):
+        tree = _Tree(self, names=())
+        self.assertEqual(gt.load_cache(tree.cache), {})
+        tree.cache.write_text('{"version": ')
+        self.assertEqual(gt.load_cache(tree.cache), {})
+        tree.cache.write_text(json.dumps({"version": 0, "entries": {"k": {}}}))
+        self.assertEqual(gt.load_cache(tree.cache), {})
+
+
+class TestPartition(unittest.TestCase):
+
+    KEY = {"content_sha256": "c", "dem": "d", "engine": "e"}
+
+    def setUp(self):
+        self.parcels = [{"parcel_id": "lot0", "category": "safe", "path": "lot0.geojson"}]
+
+    def _partition(self, key=KEY, row=None):
+        entries = {"safe/lot0": {"key": self.KEY, "row": row or _row("safe/lot0")}}
+        return gt.partition_cached(self.parcels, entries, {"safe/lot0": key})
+
+    def test_matching_key_is_reused(self):
+        rows, stale = self._partition()
+        self.assertEqual((len(rows), stale), (1, []))
+        self.assertTrue(rows[0]["cached"])
+
+    def test_any_changed_component_is_stale(self):
+        for field in self.KEY:
+            with self.subTest(field=field):
+                rows, stale = self._partition(key=self.KEY | {field: "changed"})
+                self.assertEqual((rows, stale), ([], self.parcels))
+
+    def test_crash_and_unknown_key_are_stale(self):
+        self.assertEqual(self._partition(row=_row("safe/lot0", error="boom"))[1], self.parcels)
+        self.assertEqual(self._partition(key=None)[1], self.parcels)
+
+
+class TestLatencySummary(unittest.TestCase):
+
+    def test_cached_rows_are_left_out(self):
+        rows = [_row("safe/a", 1.0), _row("safe/b", 1.0), _row("safe/c", 99.0, cached=True)]
+        summary = gt.latency_summary(rows)
+        self.assertEqual(summary["total"]["p99"], 1.0)
+        self.assertEqual(summary["stages"]["slope"]["mean"], 0.5)
+
+    def test_all_cached_has_no_percentiles(self):
+        self.assertEqual(gt.latency_summary([_row("safe/a", cached=True)])["total"], {})
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestRunValidationCache(unittest.TestCase):
+    """run_validation's reuse and invalidation, with the pipeline stubbed."""
+
+    def _run(self, tree):
+        assessed = []
+
+        def run_all(parcels, workers, with_transects=False):
+            for parcel in parcels:
+                assessed.append(parcel["parcel_id"])
+                yield _row(gt.parcel_key(parcel))
+
+        with patch.object(gt, "_run_all", run_all), \
+                patch.object(gt, "SmartFetcher", _fetcher), \
+                redirect_stdout(StringIO()):
+            summary = gt.run_validation(tree.base, cache=tree.cache)
+        return sorted(assessed), summary
+
+    def test_rerun_reuses_every_row(self):
+        tree = _Tree(self)
+        self.assertEqual(self._run(tree)[0], ["lot0", "lot1"])
+        assessed, summary = self._run(tree)
+        self.assertEqual(assessed, [])
+        self.assertEqual(summary["parcels"], 2)
+        self.assertEqual(summary["matrix"]["TN"], 2)
+
+    def test_edited_parcel_is_reassessed(self):
+        tree = _Tree(self)
+        self._run(tree)
+        moved = dict(SQUARE, coordinates=[[[124.901, 8.1], [124.9015, 8.1], [124.9015, 8.1005],
+                                           [124.901, 8.1005], [124.901, 8.1]]])
+        (tree.base / "safe" / "lot1.geojson").write_text(json.dumps(moved))
+        self.assertEqual(self._run(tree)[0], ["lot1"])
+
+    def test_engine_or_dem_change_reassesses_everything(self):
+        tree = _Tree(self)
+        self._run(tree)
+        with patch.object(gt, "engine_version", return_value="0" * 16):
+            self.assertEqual(self._run(tree)[0], ["lot0", "lot1"])
+        with patch.object(gt, "dem_identity", return_value="replaced.tif:1:1"):
+            self.assertEqual(self._run(tree)[0], ["lot0", "lot1"])
+
+    def test_corrupt_cache_reassesses_and_is_rewritten(self):
+        tree = _Tree(self)
+        tree.cache.write_text("not json")
+        self.assertEqual(self._run(tree)[0], ["lot0", "lot1"])
+        self.assertEqual(len(gt.load_cache(tree.cache)), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
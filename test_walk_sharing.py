@@ -0,0 +1,87 @@
+"""Tests for sharing merged uphill walks in the depositional check."""
+import functools
+import os
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import rasterio
+from affine import Affine
+from shapely.geometry import Point, box
+
+import calculate_depositional_safety as deposit
+from eil_types import ComputeOptions
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+
+
+def _lots(n, seed=0):
+    rng = np.random.default_rng(seed)
+    lots = []
+    for _ in range(n):
+        x, y = rng.uniform(124.8935, 124.9065), rng.uniform(8.0935, 8.1065)
+        half = rng.uniform(0.0001, 0.0008)
+        lots.append(box(x - half, y - half, x + half, y + half))
+    return lots
+
+
+def _unshared():
+    """Patch every _walk call to walk each boundary pixel to its own end."""
+    return patch.object(deposit, "_walk", functools.partial(deposit._walk, share_walks=False))
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestSharedWalksOnFixture(unittest.TestCase):
+
+    def _compare(self, lots, run):
+        with rasterio.open(FIXTURE) as dataset:
+            shared = [run(lot, dataset) for lot in lots]
+            with _unshared():
+                unshared = [run(lot, dataset) for lot in lots]
+        for lot, a, b in zip(lots, shared, unshared):
+            with self.subTest(lot=lot.bounds):
+                self.assertEqual(a, b)
+
+    def test_full_result_identical(self):
+        self._compare(_lots(12), deposit.compute_depositional_safety)
+
+    def test_decision_only_identical(self):
+        options = ComputeOptions(decision_only=True)
+        self._compare(_lots(12, seed=1), functools.partial(
+            deposit.compute_depositional_safety, options=options))
+
+    def test_tiled_identical(self):
+        options = ComputeOptions(max_window_mb=1)
+        self._compare(_lots(3, seed=2), functools.partial(
+            deposit.compute_depositional_safety, options=options))
+
+    def test_many_lots_identical(self):
+        lots = _lots(6, seed=3)
+        with rasterio.open(FIXTURE) as dataset:
+            shared = deposit.compute_depositional_safety_many(lots, dataset)
+            with _unshared():
+                unshared = deposit.compute_depositional_safety_many(lots, dataset)
+        self.assertEqual(shared, unshared)
+
+
+class TestStepCap(unittest.TestCase):
+
+    def test_joining_walk_still_stops_at_max_steps(self):
+        # A 1200-px ramp rising eastwards. The walk from column 700 reaches
+        # the top in 499 steps. The walk from column 300 joins its path at
+        # column 700 after 400 steps, so the 500-step cap stops it at 800.
+        elevations = np.tile(np.arange(1200, dtype=float), (3, 1))
+        peaks = []
+        for share_walks in (True, False):
+            transects = deposit._walk(
+                elevations, Affine.identity(), np.zeros(elevations.shape, dtype=bool),
+                [(1, 700), (1, 300)], 0.0, Point(0, 1), None, seen_peaks=set(),
+                share_walks=share_walks,
+            )
+            peaks.append(sorted(t["metrics"]["elevation_peak"] for t in transects))
+        self.assertEqual(peaks[0], [800.0, 1199.0])
+        self.assertEqual(peaks[0], peaks[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
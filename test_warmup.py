@@ -0,0 +1,220 @@
+"""Tests for DEM warm-up (warmup.py) and its admin endpoint."""
+import os
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from fastapi.testclient import TestClient
+
+import api
+from warmup import Warmer, WarmupBusy, dem_regions
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "test_fixtures", "ifsar_tile.tif")
+
+# Inside the Bukidnon fixture tile.
+_BBOX = (124.899, 8.099, 124.901, 8.101)
+
+
+def _fixture_fetcher():
+    fetcher = MagicMock()
+    fetcher.fetch_dem_path.return_value = (FIXTURE, "ifsar")
+    return fetcher
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestWarmer(unittest.TestCase):
+
+    def test_warms_window_under_bbox(self):
+        warmer = Warmer(fetcher_factory=_fixture_fetcher, chunk_rows=16)
+        batch = warmer.start([_BBOX])
+        self.assertTrue(Warmer.wait(batch, 5))
+
+        job = batch.jobs[0]
+        self.assertEqual(job.status, "done", job.error)
+        self.assertEqual(job.dems, [FIXTURE])
+        # The 1 km search radius reaches past this small tile on every side,
+        # so the whole tile is read.
+        self.assertEqual(job.bytes_read, 397 * 397 * 4)
+
+    def test_bbox_outside_dem_fails_without_raising(self):
+        warmer = Warmer(fetcher_factory=_fixture_fetcher)
+        batch = warmer.start([(120.0, 16.0, 120.1, 16.1)])
+        self.assertTrue(Warmer.wait(batch, 5))
+        self.assertEqual(batch.jobs[0].status, "failed")
+
+    def test_stop_cancels_pending_jobs(self):
+        warmer = Warmer(fetcher_factory=_fixture_fetcher)
+        warmer.stop()
+        batch = warmer.start([_BBOX, _BBOX])
+        self.assertTrue(Warmer.wait(batch, 5))
+        self.assertEqual({j.status for j in batch.jobs}, {"cancelled"})
+
+    def test_oversized_bbox_fails_without_reading(self):
+        warmer = Warmer(fetcher_factory=_fixture_fetcher, max_bbox_deg2=1.0)
+        batch = warmer.start([(120.0, 16.0, 121.5, 17.0)])
+        self.assertTrue(Warmer.wait(batch, 5))
+        self.assertEqual(batch.jobs[0].status, "failed")
+        self.assertIn("EIL_DEM_WARM_MAX_BBOX_DEG2", batch.jobs[0].error)
+        self.assertEqual(batch.jobs[0].bytes_read, 0)
+
+    def test_second_start_while_running_is_refused(self):
+        release = threading.Event()
+
+        def _slow_fetcher():
+            release.wait(5)
+            return _fixture_fetcher()
+
+        warmer = Warmer(fetcher_factory=_slow_fetcher)
+        batch = warmer.start([_BBOX])
+        try:
+            with self.assertRaises(WarmupBusy):
+                warmer.start([_BBOX])
+        finally:
+            release.set()
+        self.assertTrue(Warmer.wait(batch, 5))
+        self.assertTrue(Warmer.wait(warmer.start([_BBOX]), 5))
+
+    def test_wait_respects_budget(self):
+        release = threading.Event()
+
+        def _slow_fetcher():
+            release.wait(5)
+            return _fixture_fetcher()
+
+        warmer = Warmer(fetcher_factory=_slow_fetcher)
+        batch = warmer.start([_BBOX])
+        start = time.perf_counter()
+        try:
+            self.assertFalse(Warmer.wait(batch, 0.1))
+            self.assertLess(time.perf_counter() - start, 1.0)
+        finally:
+            release.set()
+        self.assertTrue(Warmer.wait(batch, 5))
+
+
+class TestDemRegions(unittest.TestCase):
+    """A bbox is warmed on the DEM each lot in it would be assessed on."""
+
+    def _fetcher(self, pick):
+        fetcher = MagicMock()
+        fetcher.fetch_dem_path.side_effect = lambda b, warn=True: (pick(b[0], b[1]), "x")
+        return fetcher
+
+    def test_one_dem_gets_the_whole_bbox(self):
+        regions = dem_regions(self._fetcher(lambda x, y: "ph.tif"), (120.0, 16.0, 120.1, 16.05))
+        self.assertEqual(list(regions), ["ph.tif"])
+        for got, want in zip(regions["ph.tif"], (120.0, 16.0, 120.1, 16.05)):
+            self.assertAlmostEqual(got, want)
+
+    def test_hot_tile_inside_a_province_gets_its_own_region(self):
+        # A small SSD tile wins lots west of 120.04; the province extract the rest.
+        pick = lambda x, y: "ssd.tif" if x < 120.04 else "province.tif"
+        regions = dem_regions(self._fetcher(pick), (120.0, 16.0, 120.1, 16.1))
+        self.assertEqual(set(regions), {"ssd.tif", "province.tif"})
+        self.assertAlmostEqual(regions["ssd.tif"][2], 120.04)
+        self.assertAlmostEqual(regions["province.tif"][0], 120.04)
+
+    def test_points_outside_every_dem_are_left_out(self):
+        def pick(x, y):
+            if x > 120.05:
+                raise FileNotFoundError("no DEM")
+            return "ph.tif"
+
+        regions = dem_regions(self._fetcher(pick), (120.0, 16.0, 120.1, 16.1))
+        self.assertAlmostEqual(regions["ph.tif"][2], 120.06)
+        with self.assertRaises(FileNotFoundError):
+            dem_regions(self._fetcher(lambda x, y: pick(121, y)), (120.0, 16.0, 120.1, 16.1))
+
+
+class _FixtureWarmer(Warmer):
+    def __init__(self):
+        super().__init__(fetcher_factory=_fixture_fetcher)
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestLifespanWarmup(unittest.TestCase):
+
+    def tearDown(self):
+        # The lifespan hook leaves its probe and warmer on the shared app.
+        api.app.state._state.pop("dem_probe", None)
+        api.app.state._state.pop("warmer", None)
+
+    def test_startup_warms_configured_bboxes(self):
+        settings = api.settings.model_copy(update={
+            "dem_warm_bboxes": [_BBOX], "dem_warm_budget_seconds": 5.0,
+        })
+        with patch("api.settings", settings), \
+             patch("warmup.Warmer", _FixtureWarmer), \
+             patch("smart_fetcher.SmartFetcher") as fetcher_cls:
+            fetcher_cls.return_value.resolved_source.return_value = (FIXTURE, "ifsar")
+            with TestClient(api.app) as client:
+                jobs = client.get("/admin/warmup").json()["jobs"]
+
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual(jobs[0]["status"], "done")
+
+
+@unittest.skipUnless(os.path.exists(FIXTURE), "IfSAR fixture missing")
+class TestWarmupEndpoint(unittest.TestCase):
+
+    def setUp(self):
+        self._saved = getattr(api.app.state, "warmer", None)
+        api.app.state.warmer = Warmer(fetcher_factory=_fixture_fetcher)
+
+    def tearDown(self):
+        if self._saved is None:
+            api.app.state._state.pop("warmer", None)
+        else:
+            api.app.state.warmer = self._saved
+
+    def test_post_starts_job_and_get_reports_it(self):
+        client = TestClient(api.app)
+        response = client.post("/admin/warmup", json={"bbox": list(_BBOX)})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["id"]
+
+        for _ in range(50):
+            jobs = client.get("/admin/warmup").json()["jobs"]
+            if jobs[0]["status"] == "done":
+                break
+            time.sleep(0.05)
+        self.assertEqual(jobs[0]["id"], job_id)
+        self.assertEqual(jobs[0]["status"], "done")
+
+    def test_rejects_inverted_bbox(self):
+        response = TestClient(api.app).post(
+            "/admin/warmup", json={"bbox": [121.0, 16.0, 120.0, 17.0]}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_oversized_bbox(self):
+        api.app.state.warmer.max_bbox_deg2 = 0.5
+        response = TestClient(api.app).post(
+            "/admin/warmup", json={"bbox": [120.0, 16.0, 121.0, 17.0]}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(api.app.state.warmer.jobs, {})
+
+    def test_post_while_running_is_409(self):
+        release = threading.Event()
+
+        def _slow_fetcher():
+            release.wait(5)
+            return _fixture_fetcher()
+
+        api.app.state.warmer = Warmer(fetcher_factory=_slow_fetcher)
+        client = TestClient(api.app)
+        try:
+            self.assertEqual(client.post("/admin/warmup", json={"bbox": list(_BBOX)}).status_code, 202)
+            self.assertEqual(client.post("/admin/warmup", json={"bbox": list(_BBOX)}).status_code, 409)
+        finally:
+            release.set()
+
+    def test_excluded_from_openapi(self):
+        paths = TestClient(api.app).get("/openapi.json").json()["paths"]
+        self.assertNotIn("/admin/warmup", paths)
+
+
+if __name__ == "__main__":
+    unittest.main()
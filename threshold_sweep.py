@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+EIL-Calc Threshold Sweep.
+
+Tuning the slope thresholds (14° / 16°), the coverage fractions (1.5% / 10%)
+and the runout ratio (H > 3·ΔE) by rerunning the pipeline per candidate takes
+an hour a setting. None of those thresholds change the expensive part — the
+smoothed slope surface and the traced runout paths — so this tool splits the
+work in two:
+
+  collect — run the expensive part once per ground-truth parcel and cache its
+            sufficient statistics: a histogram of the slope samples inside
+            the SU ∩ parcel mask, and ΔE and H of every runout transect.
+
+  sweep   — evaluate the confusion matrix for every combination on a grid of
+            thresholds from the cache, vectorised across parcels and
+            settings, and print an ROC-style table.
+
+The histogram is exact, not an approximation, for any degree threshold on its
+0.1° grid: bins are right-closed, so "slope > T" counts are exact at each edge.
+
+Usage:
+  python threshold_sweep.py collect --workers 8 --cache gt_stats.npz
+  python threshold_sweep.py sweep --cache gt_stats.npz --csv sweep.csv
+  python threshold_sweep.py sweep --flag-deg 12:15:0.5 --runout-ratio 2.5,3,3.5
+"""
+
+import argparse
+import csv
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from calculate_depositional_safety import trace_transects
+from eil_status import (
+    COVERAGE_FRACTION_FLAG,
+    COVERAGE_FRACTION_SUSCEPTIBLE,
+    RUNOUT_RATIO,
+    SLOPE_THRESHOLD_FLAG,
+    SLOPE_THRESHOLD_SUSCEPTIBLE,
+)
+from orchestrator import EILOrchestrator
+from slope_stability import site_slope_sample
+from test_ground_truth import (
+    _CATEGORIES,
+    _extract_geometry,
+    discover_parcels,
+    load_ledger,
+    parcel_key,
+)
+
+# ── Slope histogram ────────────────────────────────────────────────────────
+# Edges every 0.1° from 0° to 90°. Rounded so 14.0 is exactly 14.0 and not
+# 14.000000000000002, which would misplace samples sitting on the threshold.
+HIST_STEP_DEG = 0.1
+HIST_EDGES = np.round(np.arange(0, 900 + 1) * HIST_STEP_DEG, 6)
+
+
+def slope_histogram(samples: np.ndarray) -> np.ndarray:
+    """Counts per right-closed bin: entry k counts samples in (edge[k-1], edge[k]].
+
+    Entry 0 counts samples ≤ 0°, the last entry samples above 90°, so
+    ``cumsum(hist)[k]`` is exactly the number of samples ≤ ``HIST_EDGES[k]``.
+    """
+    idx = np.searchsorted(HIST_EDGES, samples, side="left")
+    return np.bincount(idx, minlength=len(HIST_EDGES) + 1)
+
+
+def _edge_index(threshold_deg: float) -> int:
+    k = int(round(threshold_deg / HIST_STEP_DEG))
+    if not np.isclose(HIST_EDGES[k], threshold_deg):
+        raise ValueError(
+            f"{threshold_deg}° is not on the {HIST_STEP_DEG}° histogram grid"
+        )
+    return k
+
+# ── collect ────────────────────────────────────────────────────────────────
+
+_worker_orchestrator = None
+
+
+def _init_worker() -> None:
+    global _worker_orchestrator
+    _worker_orchestrator = EILOrchestrator(reuse_datasets=True)
+
+
+def collect_parcel(parcel: dict) -> dict:
+    """Sufficient statistics for one parcel. Never raises."""
+    stats = {
+        "key": parcel_key(parcel),
+        "category": parcel["category"],
+        "hist": None,
+        "delta_e": [],
+        "h": [],
+        "error": None,
+    }
+    try:
+        geometry = _extract_geometry(Path(parcel["path"]))
+        with _worker_orchestrator.dem_context(geometry) as context:
+            samples = site_slope_sample(context.geometry, context.dataset)
+            traced = trace_transects(context.geometry, context.dataset)
+    except Exception as exc:
+        stats["error"] = f"{type(exc).__name__}: {exc}"
+        return stats
+
+    if samples.size:
+        stats["hist"] = slope_histogram(samples)
+    # An error dict here is the pipeline's "No valid elevation data" — the
+    # depositional status is then UNKNOWN, which never counts as PRONE.
+    if not isinstance(traced, dict):
+        _, transects = traced
+        stats["delta_e"] = [t["metrics"]["delta_e"] for t in transects]
+        stats["h"] = [t["metrics"]["horizontal_distance_h"] for t in transects]
+    return stats
+
+
+def collect(parcels: list[dict], workers: int, cache_path: Path) -> None:
+    if workers <= 1:
+        _init_worker()
+        results = [collect_parcel(p) for p in parcels]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = list(pool.map(collect_parcel, parcels, chunksize=1))
+
+    n_bins = len(HIST_EDGES) + 1
+    hist = np.zeros((len(results), n_bins), dtype=np.int64)
+    slope_ok = np.zeros(len(results), dtype=bool)
+    for i, r in enumerate(results):
+        if r["hist"] is not None:
+            hist[i] = r["hist"]
+            slope_ok[i] = True
+        if r["error"]:
+            print(f"  [crash] {r['key']}: {r['error']}")
+
+    gt = [_CATEGORIES.get(r["category"], {"gt_hazard": None})["gt_hazard"] for r in results]
+    np.savez_compressed(
+        cache_path,
+        keys=np.array([r["key"] for r in results]),
+        gt_hazard=np.array([-1 if g is None else int(g) for g in gt], dtype=np.int8),
+        crashed=np.array([r["error"] is not None for r in results]),
+        hist_edges=HIST_EDGES,
+        slope_hist=hist,
+        slope_ok=slope_ok,
+        transect_parcel=np.array(
+            [i for i, r in enumerate(results) for _ in r["delta_e"]], dtype=np.int64
+        ),
+        transect_delta_e=np.array([d for r in results for d in r["delta_e"]], dtype=float),
+        transect_h=np.array([h for r in results for h in r["h"]], dtype=float),
+    )
+    print(f"[collect] Cached statistics for {len(results)} parcel(s) in {cache_path}")
+
+# ── sweep ──────────────────────────────────────────────────────────────────
+
+def load_stats(cache_path: Path) -> dict:
+    with np.load(cache_path) as npz:
+        stats = {k: npz[k] for k in npz.files}
+    if not np.array_equal(stats["hist_edges"], HIST_EDGES):
+        raise ValueError(f"{cache_path} was built with a different histogram grid; re-run collect")
+    return stats
+
+
+def sweep(
+    stats: dict,
+    flag_deg,
+    susceptible_deg,
+    flag_fraction,
+    susceptible_fraction,
+    runout_ratio,
+) -> list[dict]:
+    """Confusion matrix for every threshold combination, one dict per setting.
+
+    Mirrors the pipeline exactly: a parcel is predicted hazardous when its
+    slope status is SUSCEPTIBLE or FLAG FOR REVIEW, or when any transect has
+    H ≤ ratio·ΔE. Combinations with flag_deg ≥ susceptible_deg are skipped.
+    Crashed and unlabelled parcels are left out, as in the harness.
+    """
+    keep = (stats["gt_hazard"] >= 0) & ~stats["crashed"]
+    gt = stats["gt_hazard"][keep].astype(bool)
+    hist = stats["slope_hist"][keep]
+    slope_ok = stats["slope_ok"][keep]
+
+    flag_deg = np.asarray(flag_deg, dtype=float)
+    susceptible_deg = np.asarray(susceptible_deg, dtype=float)
+    flag_fraction = np.asarray(flag_fraction, dtype=float)
+    susceptible_fraction = np.asarray(susceptible_fraction, dtype=float)
+    runout_ratio = np.asarray(runout_ratio, dtype=float)
+
+    # Counts of samples strictly above each threshold, per parcel.
+    n = hist.sum(axis=1)
+    cum_le = np.cumsum(hist, axis=1)
+    gt_flag = n[:, None] - cum_le[:, [_edge_index(t) for t in flag_deg]]           # (P, F)
+    gt_susc = n[:, None] - cum_le[:, [_edge_index(t) for t in susceptible_deg]]    # (P, S)
+
+    # Same float arithmetic as the pipeline's boolean .mean(): count / n.
+    safe_n = np.where(n > 0, n, 1)[:, None]
+    pct_susc = gt_susc / safe_n                                                   # (P, S)
+    pct_flag = (gt_flag[:, :, None] - gt_susc[:, None, :]) / safe_n[:, :, None]   # (P, F, S)
+
+    # (P, F, S, flag_fraction, susceptible_fraction)
+    slope_hazard = (
+        (pct_susc[:, None, :, None, None] > susceptible_fraction[None, None, None, None, :])
+        | (pct_flag[:, :, :, None, None] > flag_fraction[None, None, None, :, None])
+    ) & slope_ok[:, None, None, None, None]
+
+    # PRONE per parcel and ratio. "Any transect prone" equals the pipeline's
+    # "any of the top three prone": the ranking is by ratio·ΔE/H, so if any
+    # transect is prone the worst one is too.
+    parcel_index = np.full(len(keep), -1)
+    parcel_index[keep] = np.arange(keep.sum())
+    t_parcel = parcel_index[stats["transect_parcel"]]
+    t_in = t_parcel >= 0
+    t_parcel = t_parcel[t_in]
+    t_de = stats["transect_delta_e"][t_in]
+    t_h = stats["transect_h"][t_in]
+    prone = np.zeros((len(gt), len(runout_ratio)), dtype=bool)
+    t_idx, r_idx = np.nonzero(~(t_h[:, None] > runout_ratio[None, :] * t_de[:, None]))
+    prone[t_parcel[t_idx], r_idx] = True
+
+    hazard = slope_hazard[..., None] | prone[:, None, None, None, None, :]
+    g = gt[:, None, None, None, None, None]
+    tp = (hazard & g).sum(axis=0)
+    fp = (hazard & ~g).sum(axis=0)
+    fn = (~hazard & g).sum(axis=0)
+    tn = (~hazard & ~g).sum(axis=0)
+
+    rows = []
+    for (fi, si, ffi, sfi, ri) in itertools.product(
+        range(len(flag_deg)), range(len(susceptible_deg)),
+        range(len(flag_fraction)), range(len(susceptible_fraction)),
+        range(len(runout_ratio)),
+    ):
+        if flag_deg[fi] >= susceptible_deg[si]:
+            continue
+        cell = (fi, si, ffi, sfi, ri)
+        TP, FP, TN, FN = int(tp[cell]), int(fp[cell]), int(tn[cell]), int(fn[cell])
+        rows.append({
+            "flag_deg": float(flag_deg[fi]),
+            "susceptible_deg": float(susceptible_deg[si]),
+            "flag_fraction": float(flag_fraction[ffi]),
+            "susceptible_fraction": float(susceptible_fraction[sfi]),
+            "runout_ratio": float(runout_ratio[ri]),
+            "TP": TP, "FP": FP, "TN": TN, "FN": FN,
+            "tpr": TP / (TP + FN) if TP + FN else 0.0,
+            "fpr": FP / (FP + TN) if FP + TN else 0.0,
+            "precision": TP / (TP + FP) if TP + FP else 0.0,
+            "accuracy": (TP + TN) / len(gt) if len(gt) else 0.0,
+        })
+    return rows
+
+
+def roc_frontier(rows: list[dict]) -> list[dict]:
+    """Settings not dominated on (higher TPR, lower FPR), best TPR first."""
+    best = {}
+    for r in rows:
+        key = (r["tpr"], r["fpr"])
+        best.setdefault(key, r)
+    frontier, lowest_fpr = [], float("inf")
+    for (tpr, fpr), r in sorted(best.items(), key=lambda kv: (-kv[0][0], kv[0][1])):
+        if fpr < lowest_fpr:
+            frontier.append(r)
+            lowest_fpr = fpr
+    return frontier
+
+# ── CLI ────────────────────────────────────────────────────────────────────
+
+def _grid(spec: str) -> list[float]:
+    """'a,b,c' or 'start:stop:step' (stop inclusive)."""
+    if ":" in spec:
+        start, stop, step = (float(v) for v in spec.split(":"))
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + i * step, 6) for i in range(count)]
+    return [float(v) for v in spec.split(",")]
+
+
+def _print_table(rows: list[dict]) -> None:
+    print(f"  {'flag°':>6s} {'susc°':>6s} {'flag%':>6s} {'susc%':>6s} {'ratio':>5s}  "
+          f"{'TP':>4s} {'FP':>4s} {'TN':>4s} {'FN':>4s}  {'TPR':>5s} {'FPR':>5s} {'acc':>5s}")
+    for r in rows:
+        current = (
+            r["flag_deg"] == SLOPE_THRESHOLD_FLAG
+            and r["susceptible_deg"] == SLOPE_THRESHOLD_SUSCEPTIBLE
+            and r["flag_fraction"] == COVERAGE_FRACTION_FLAG
+            and r["susceptible_fraction"] == COVERAGE_FRACTION_SUSCEPTIBLE
+            and r["runout_ratio"] == RUNOUT_RATIO
+        )
+        print(f"  {r['flag_deg']:>6.1f} {r['susceptible_deg']:>6.1f} "
+              f"{r['flag_fraction'] * 100:>6.1f} {r['susceptible_fraction'] * 100:>6.2f} "
+              f"{r['runout_ratio']:>5.2f}  {r['TP']:>4d} {r['FP']:>4d} {r['TN']:>4d} {r['FN']:>4d}  "
+              f"{r['tpr']:>5.2f} {r['fpr']:>5.2f} {r['accuracy']:>5.2f}"
+              f"{'  <- current' if current else ''}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="EIL-Calc threshold sweep over cached ground-truth statistics",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_collect = sub.add_parser("collect", help="Cache per-parcel slope and runout statistics.")
+    p_collect.add_argument("--base-dir", default="tests/ground_truth", metavar="DIR")
+    p_collect.add_argument("--ledger", type=Path, metavar="CSV")
+    p_collect.add_argument("--workers", type=int, default=1, metavar="N")
+    p_collect.add_argument("--cache", type=Path, default=Path("gt_stats.npz"), metavar="PATH")
+
+    p_sweep = sub.add_parser("sweep", help="Evaluate a threshold grid from the cache.")
+    p_sweep.add_argument("--cache", type=Path, default=Path("gt_stats.npz"), metavar="PATH")
+    p_sweep.add_argument("--flag-deg", default="10:16:0.5", metavar="GRID")
+    p_sweep.add_argument("--susceptible-deg", default="12:20:0.5", metavar="GRID")
+    p_sweep.add_argument("--flag-fraction", default="0.02,0.05,0.1,0.15,0.2,0.3", metavar="GRID")
+    p_sweep.add_argument("--susceptible-fraction", default="0.005,0.01,0.015,0.02,0.05,0.1",
+                         metavar="GRID")
+    p_sweep.add_argument("--runout-ratio", default="2:4:0.5", metavar="GRID")
+    p_sweep.add_argument("--csv", type=Path, metavar="PATH",
+                         help="Write every evaluated setting, not just the frontier.")
+
+    args = parser.parse_args()
+
+    if args.command == "collect":
+        parcels = load_ledger(args.ledger) if args.ledger else discover_parcels(Path(args.base_dir))
+        print(f"[collect] {len(parcels)} parcel(s), {args.workers} worker(s)")
+        collect(parcels, args.workers, args.cache)
+        return
+
+    stats = load_stats(args.cache)
+    rows = sweep(
+        stats,
+        _grid(args.flag_deg),
+        _grid(args.susceptible_deg),
+        _grid(args.flag_fraction),
+        _grid(args.susceptible_fraction),
+        _grid(args.runout_ratio),
+    )
+    print(f"[sweep] {len(rows)} setting(s) evaluated over "
+          f"{int(((stats['gt_hazard'] >= 0) & ~stats['crashed']).sum())} labelled parcel(s)\n")
+    print("  ROC frontier (no other setting has both higher TPR and lower FPR):")
+    _print_table(roc_frontier(rows))
+    current = [
+        r for r in rows
+        if (r["flag_deg"], r["susceptible_deg"], r["flag_fraction"],
+            r["susceptible_fraction"], r["runout_ratio"])
+        == (SLOPE_THRESHOLD_FLAG, SLOPE_THRESHOLD_SUSCEPTIBLE, COVERAGE_FRACTION_FLAG,
+            COVERAGE_FRACTION_SUSCEPTIBLE, RUNOUT_RATIO)
+    ]
+    if current:
+        print("\n  Current setting (eil_status.py):")
+        _print_table(current)
+
+    if args.csv and rows:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"\n  Full table written to {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
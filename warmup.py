@@ -0,0 +1,205 @@
+"""DEM warm-up: read hot regions once so assessments there start warm.
+
+After a deploy the page cache holds none of the DEM, so the first assessments
+in the busiest regions each pay for cold reads of the nationwide GeoTIFF. A
+warm-up reads the DEM window under each configured bounding box (plus the
+depositional search radius) in row chunks and throws the pixels away — what
+is kept is the kernel's page cache, which every later `rasterio.open` shares.
+
+Two entry points:
+
+* the `api.lifespan` hook starts a warm-up of `EIL_DEM_WARM_BBOXES` in the
+  background and waits for it at most `EIL_DEM_WARM_BUDGET_SECONDS`; past the
+  budget the process becomes ready and the warm-up carries on behind it.
+* `POST /admin/warmup` warms one bbox ahead of a scheduled batch.
+
+One warm-up runs at a time, in a background thread that reads its bboxes one
+after another: the disk is the bottleneck, and parallel reads of one file only
+make it seek. Starting another while one runs raises WarmupBusy (409 from the
+endpoint). A bbox larger than `EIL_DEM_WARM_MAX_BBOX_DEG2` is refused.
+
+With a tile catalog, lots inside one bbox may be assessed on different tiles:
+a small hot-region tile on SSD wins where it covers a lot's search radius, the
+province extract elsewhere. So a bbox is not warmed on the one DEM that covers
+all of it, but split by the DEM a small lot at each point of a grid would be
+assessed on (see dem_regions).
+"""
+import itertools
+import math
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+import rasterio
+from rasterio.warp import transform_bounds
+from rasterio.windows import Window, from_bounds
+
+from dem_catalog import SEARCH_MARGIN_M, parcel_box
+from settings import get_settings
+from smart_fetcher import SmartFetcher
+
+# Rows per read. Large enough to amortise per-call overhead, small enough that
+# stop() takes effect promptly and memory stays bounded on wide rasters.
+DEFAULT_CHUNK_ROWS = 256
+
+# Spacing of the DEM lookups across a bbox, in degrees (~2 km, the search area
+# of a small lot). 2,500 lookups for the largest default bbox.
+GRID_DEG = 0.02
+
+
+class WarmupBusy(RuntimeError):
+    """A warm-up is already running."""
+
+
+@dataclass
+class WarmJob:
+    id: int
+    bbox: tuple[float, float, float, float]
+    status: str = "pending"          # pending | running | done | failed | cancelled
+    dems: list[str] = field(default_factory=list)
+    bytes_read: int = 0
+    seconds: float = 0.0
+    error: str | None = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class _Batch:
+    jobs: list[WarmJob]
+    done: threading.Event = field(default_factory=threading.Event)
+
+
+def check_bbox(bbox, max_deg2: float) -> None:
+    """Raise ValueError unless ``bbox`` is a WGS84 (minx, miny, maxx, maxy) box
+    of at most ``max_deg2`` square degrees."""
+    minx, miny, maxx, maxy = bbox
+    if minx >= maxx or miny >= maxy:
+        raise ValueError("bbox must be minx,miny,maxx,maxy")
+    area = (maxx - minx) * (maxy - miny)
+    if area > max_deg2:
+        raise ValueError(f"bbox covers {area:.3g} deg², over the {max_deg2:g} deg² "
+                         "limit (EIL_DEM_WARM_MAX_BBOX_DEG2)")
+
+
+def dem_regions(fetcher, bbox, grid_deg: float = GRID_DEG) -> dict[str, tuple]:
+    """Part of ``bbox`` to warm on each DEM.
+
+    ``bbox`` is cut into cells of about ``grid_deg``; each cell goes to the DEM
+    that ``fetcher`` picks for a point lot at its centre, and each DEM gets the
+    bounds of its cells. Cells outside every DEM are left out.
+    """
+    minx, miny, maxx, maxy = bbox
+    nx = max(1, math.ceil((maxx - minx) / grid_deg))
+    ny = max(1, math.ceil((maxy - miny) / grid_deg))
+    dx, dy = (maxx - minx) / nx, (maxy - miny) / ny
+    cells: dict[str, list[tuple[int, int]]] = {}
+    for i in range(nx):
+        x = minx + (i + 0.5) * dx
+        for j in range(ny):
+            y = miny + (j + 0.5) * dy
+            try:
+                path, _ = fetcher.fetch_dem_path((x, y, x, y), warn=False)
+            except FileNotFoundError:
+                continue
+            cells.setdefault(path, []).append((i, j))
+    if not cells:
+        raise FileNotFoundError(f"no DEM covers {tuple(bbox)}")
+    regions = {}
+    for path, ij in cells.items():
+        cols, rows = [c for c, _ in ij], [r for _, r in ij]
+        regions[path] = (minx + min(cols) * dx, miny + min(rows) * dy,
+                         minx + (max(cols) + 1) * dx, miny + (max(rows) + 1) * dy)
+    return regions
+
+
+def warm_window(dataset, bbox, job: WarmJob, stop: threading.Event,
+                chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+    """Read the window of ``dataset`` under ``bbox`` plus the search radius."""
+    need = parcel_box(bbox, SEARCH_MARGIN_M).bounds
+    window = from_bounds(*transform_bounds("EPSG:4326", dataset.crs, *need),
+                         transform=dataset.transform)
+    window = window.round_offsets().round_lengths().intersection(
+        Window(0, 0, dataset.width, dataset.height)
+    )
+    row_end = window.row_off + window.height
+    for row in range(window.row_off, row_end, chunk_rows):
+        if stop.is_set():
+            job.status = "cancelled"
+            return
+        chunk = Window(window.col_off, row, window.width, min(chunk_rows, row_end - row))
+        job.bytes_read += dataset.read(1, window=chunk).nbytes
+
+
+class Warmer:
+    """Runs one warm-up at a time in a background thread and keeps the status
+    of every job."""
+
+    def __init__(self, fetcher_factory=SmartFetcher, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                 max_bbox_deg2: float | None = None):
+        self._fetcher_factory = fetcher_factory
+        self._chunk_rows = chunk_rows
+        if max_bbox_deg2 is None:
+            max_bbox_deg2 = get_settings().dem_warm_max_bbox_deg2
+        self.max_bbox_deg2 = max_bbox_deg2
+        self._ids = itertools.count(1)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._batch: _Batch | None = None
+        self.jobs: dict[int, WarmJob] = {}
+
+    def start(self, bboxes) -> _Batch:
+        """Warm ``bboxes`` in a new background thread.
+
+        Raises WarmupBusy if the previous warm-up has not finished.
+        """
+        with self._lock:
+            if self._batch is not None and not self._batch.done.is_set():
+                running = [j.id for j in self._batch.jobs if j.status in ("pending", "running")]
+                raise WarmupBusy(f"warm-up job(s) {running} still running")
+            jobs = [WarmJob(id=next(self._ids), bbox=tuple(b)) for b in bboxes]
+            self.jobs.update((j.id, j) for j in jobs)
+            batch = self._batch = _Batch(jobs)
+        threading.Thread(target=self._run, args=(batch,), name="dem-warmup",
+                         daemon=True).start()
+        return batch
+
+    def _run(self, batch: _Batch) -> None:
+        try:
+            fetcher = self._fetcher_factory()
+            for job in batch.jobs:
+                if self._stop.is_set():
+                    job.status = "cancelled"
+                    continue
+                job.status = "running"
+                start = time.perf_counter()
+                try:
+                    check_bbox(job.bbox, self.max_bbox_deg2)
+                    for dem, region in dem_regions(fetcher, job.bbox).items():
+                        job.dems.append(dem)
+                        with rasterio.open(dem) as dataset:
+                            warm_window(dataset, region, job, self._stop, self._chunk_rows)
+                        if job.status != "running":
+                            break
+                    if job.status == "running":
+                        job.status = "done"
+                except Exception as exc:
+                    job.status = "failed"
+                    job.error = f"{type(exc).__name__}: {exc}"
+                job.seconds = time.perf_counter() - start
+        except Exception as exc:
+            for job in batch.jobs:
+                if job.status == "pending":
+                    job.status, job.error = "failed", f"{type(exc).__name__}: {exc}"
+        finally:
+            batch.done.set()
+
+    @staticmethod
+    def wait(batch: _Batch, timeout: float) -> bool:
+        """Block up to ``timeout`` seconds; True if the batch finished."""
+        return batch.done.wait(timeout)
+
+    def stop(self) -> None:
+        """Ask running warm-ups to stop at their next chunk."""
+        self._stop.set()